@@ -0,0 +1,40 @@
+from data.settings import TILE_SIZE, SPATIAL_HASH_CELL_TILES
+from assets.Tiles.spatial_hash import SolidRectIndex
+from assets.Tiles.walkability import WalkabilityGrid
+from assets.Tiles.map_geometry import prepare_map_data
+
+
+class CollisionMap:
+    """ข้อมูลการชนของแมพแบบไม่มีกราฟิก สำหรับ Simulation ที่รันโดยไม่เปิดหน้าต่าง
+
+    มี attribute ชื่อเดียวกับ KivyTiledMap (filename, width, height, solid_rects, solid_index, walk_grid)
+    จึงส่งให้ Pathfinder / VisibilityService / Player.move ได้เหมือนแมพจริง
+    """
+
+    def __init__(self, solid_rects, cols, rows, cells=None, filename=None):
+        self.filename = filename
+        self.width = cols
+        self.height = rows
+        self.solid_rects = solid_rects
+        self.walk_grid = WalkabilityGrid(cols, rows, TILE_SIZE)
+        if cells is None:
+            self.walk_grid.rasterize(solid_rects)
+        else:
+            self.walk_grid.cells = cells
+        self.solid_index = SolidRectIndex(solid_rects, TILE_SIZE * SPATIAL_HASH_CELL_TILES)
+        self.solid_index.grid = self.walk_grid
+
+    @classmethod
+    def from_map(cls, filename):
+        """สร้างจากไฟล์แมพ .tmj โดยตรง (ไม่ต้องใช้ Kivy/GL)
+
+        ใช้ prepare_map_data ตัวเดียวกับเกม: ถ้ามี compiled map cache ที่ key ตรงจะอ่านจาก cache
+        ไม่เช่นนั้นสร้าง solid rect จาก TSX + layer เอง (และเขียน cache ไว้) คืน None ถ้าอ่านแมพไม่ได้
+        """
+        prepared = prepare_map_data(filename)
+        if prepared['error'] is not None:
+            print(f"DEBUG: Could not read collision data for {filename}: {prepared['error']}")
+            return None
+        payload = prepared['payload']
+        cols, rows, cells = payload['walk']
+        return cls(payload['solid_rects'], cols, rows, cells, filename)
@@ -0,0 +1,195 @@
+import os
+import mmap
+import threading
+import struct
+import hashlib
+from array import array
+
+# ไฟล์ cache ของแมพที่ build แล้ว (solid rects, walkability, vertex/index ของทุก chunk, ตาราง UV)
+# ถ้า .tmj หรือ .tsx เปลี่ยน (mtime/ขนาด/hash) key จะไม่ตรงและจะ build ใหม่เอง
+CACHE_MAGIC = b'BTSM'
+CACHE_VERSION = 2  # เพิ่มเลขนี้ทุกครั้งที่แก้ logic ใน MapGeometry.build_meshes
+CHUNK_LAYERS = ('bg', 'fg', 'ground', 'roof')
+
+
+def _file_fingerprint(path, h):
+    """ใส่ mtime, ขนาด และ sha1 ของไฟล์ลงใน hash ของ key"""
+    h.update(os.path.basename(path).encode('utf-8'))
+    if not path or not os.path.exists(path):
+        h.update(b'<missing>')
+        return
+    st = os.stat(path)
+    h.update(struct.pack('<qQ', st.st_mtime_ns, st.st_size))
+    with open(path, 'rb') as f:
+        h.update(hashlib.sha1(f.read()).digest())
+
+
+def compute_key(map_path, source_paths, extra=b''):
+    """สร้าง key 20 byte จากไฟล์ .tmj + .tsx ทั้งหมดที่แมพอ้างถึง"""
+    h = hashlib.sha1()
+    h.update(struct.pack('<H', CACHE_VERSION))
+    h.update(extra)
+    _file_fingerprint(map_path, h)
+    for p in source_paths:
+        _file_fingerprint(p or '', h)
+    return h.digest()
+
+
+def resolve_map_path(map_dir, filename, sub_dir=None):
+    """Find a file in map_dir, optional sub_dir, or via recursive search."""
+    base = os.path.basename(filename)
+    paths_to_check = [os.path.join(map_dir, base)]
+    if sub_dir:
+        paths_to_check.insert(0, os.path.join(map_dir, sub_dir, base))
+        
+    for p in paths_to_check:
+        if os.path.exists(p): return p
+        
+    # Recursive fallback
+    for root, _, files in os.walk(map_dir):
+        if base in files: return os.path.join(root, base)
+    return None
+
+
+def cache_path_for(cache_dir, map_path):
+    return os.path.join(cache_dir, os.path.basename(map_path) + '.bin')
+
+
+# --- Writing ---
+
+def _pack_str(out, s):
+    raw = s.encode('utf-8')
+    out.append(struct.pack('<H', len(raw)))
+    out.append(raw)
+
+
+def _pack_array(out, arr):
+    out.append(struct.pack('<I', len(arr)))
+    out.append(arr.tobytes())
+
+
+def write_cache(path, key, payload):
+    """เขียน payload ลงไฟล์แบบ atomic (tmp แล้ว os.replace)
+
+    payload = {
+        'images': [img_path, ...],
+        'uvs': [(gid, img_idx, u0, v0, u1, v1, tw, th, tx, inv_y), ...],
+        'solid_rects': [[x, y, w, h], ...],
+        'walk': (cols, rows, bytearray),
+        'chunks': {'bg': {(cx, cy): [(opacity, [(img_idx, vertices, indices), ...]), ...]}, ...},
+    }
+    """
+    out = [CACHE_MAGIC, struct.pack('<H', CACHE_VERSION), key]
+
+    out.append(struct.pack('<H', len(payload['images'])))
+    for img in payload['images']:
+        _pack_str(out, img)
+
+    uvs = payload['uvs']
+    out.append(struct.pack('<I', len(uvs)))
+    for gid, img_idx, u0, v0, u1, v1, tw, th, tx, inv_y in uvs:
+        out.append(struct.pack('<IHddddiiii', gid, img_idx, u0, v0, u1, v1, tw, th, tx, inv_y))
+
+    # rect เก็บเป็น double เพื่อให้ผลการชนเหมือนตอน build สดทุกบิต
+    flat = array('d')
+    for r in payload['solid_rects']:
+        flat.extend(r)
+    _pack_array(out, flat)
+
+    cols, rows, cells = payload['walk']
+    out.append(struct.pack('<II', cols, rows))
+    out.append(bytes(cells))
+
+    for name in CHUNK_LAYERS:
+        chunks = payload['chunks'].get(name, {})
+        out.append(struct.pack('<I', len(chunks)))
+        for (cx, cy), layers in chunks.items():
+            out.append(struct.pack('<iiH', cx, cy, len(layers)))
+            for opacity, meshes in layers:
+                out.append(struct.pack('<dH', opacity, len(meshes)))
+                for img_idx, verts, idx in meshes:
+                    if idx and max(idx) > 0xFFFF:
+                        raise ValueError("mesh index out of uint16 range")
+                    out.append(struct.pack('<H', img_idx))
+                    _pack_array(out, array('f', verts))
+                    _pack_array(out, array('H', idx))
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    # ชื่อ tmp แยกตาม thread: MapPreloader กับ change_map อาจเขียนแมพเดียวกันพร้อมกันได้
+    tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(b''.join(out))
+    os.replace(tmp, path)
+
+
+# --- Reading ---
+
+class _Reader:
+    def __init__(self, buf):
+        self.buf = buf
+        self.pos = 0
+
+    def unpack(self, fmt):
+        vals = struct.unpack_from(fmt, self.buf, self.pos)
+        self.pos += struct.calcsize(fmt)
+        return vals
+
+    def raw(self, n):
+        data = self.buf[self.pos:self.pos + n]
+        self.pos += n
+        return data
+
+    def string(self):
+        (n,) = self.unpack('<H')
+        return bytes(self.raw(n)).decode('utf-8')
+
+    def typed(self, typecode):
+        (n,) = self.unpack('<I')
+        arr = array(typecode)
+        arr.frombytes(self.raw(n * arr.itemsize))
+        return arr
+
+
+def read_cache(path, key):
+    """อ่าน cache ผ่าน mmap คืน payload (รูปแบบเดียวกับ write_cache) หรือ None ถ้าไม่มี/ไม่ตรง key"""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < len(CACHE_MAGIC) + 2 + len(key):
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            rd = _Reader(mm)
+            if bytes(rd.raw(4)) != CACHE_MAGIC: return None
+            if rd.unpack('<H')[0] != CACHE_VERSION: return None
+            if bytes(rd.raw(len(key))) != key: return None
+
+            (n_img,) = rd.unpack('<H')
+            images = [rd.string() for _ in range(n_img)]
+
+            (n_uv,) = rd.unpack('<I')
+            uvs = [rd.unpack('<IHddddiiii') for _ in range(n_uv)]
+
+            flat = rd.typed('d')
+            solid_rects = [list(flat[i:i + 4]) for i in range(0, len(flat), 4)]
+
+            cols, rows = rd.unpack('<II')
+            walk = (cols, rows, bytearray(rd.raw(cols * rows)))
+
+            chunks = {}
+            for name in CHUNK_LAYERS:
+                (n_chunks,) = rd.unpack('<I')
+                layer_chunks = {}
+                for _ in range(n_chunks):
+                    cx, cy, n_layers = rd.unpack('<iiH')
+                    layers = []
+                    for _ in range(n_layers):
+                        opacity, n_mesh = rd.unpack('<dH')
+                        meshes = []
+                        for _ in range(n_mesh):
+                            (img_idx,) = rd.unpack('<H')
+                            meshes.append((img_idx, rd.typed('f'), rd.typed('H')))
+                        layers.append((opacity, meshes))
+                    layer_chunks[(cx, cy)] = layers
+                chunks[name] = layer_chunks
+
+    return {'images': images, 'uvs': uvs, 'solid_rects': solid_rects, 'walk': walk, 'chunks': chunks}
@@ -0,0 +1,592 @@
+import json
+import base64
+import zlib
+import struct
+import os
+import xml.etree.ElementTree as ET
+from data.settings import TILE_SIZE, MAP_CACHE_ENABLED, MAP_CACHE_DIR, MAP_FAST_MESH_BUILDER
+from assets.Tiles.walkability import WalkabilityGrid
+from assets.Tiles import map_cache
+from assets.Tiles.map_cache import resolve_map_path, CHUNK_LAYERS
+from assets.Tiles.mesh_builder import build_tile_layer, decode_tile_gids
+
+# Tiled Flip Flags
+FLIPPED_HORIZONTALLY_FLAG = 0x80000000
+FLIPPED_VERTICALLY_FLAG   = 0x40000000
+FLIPPED_DIAGONALLY_FLAG   = 0x20000000
+ALL_FLAGS = FLIPPED_HORIZONTALLY_FLAG | FLIPPED_VERTICALLY_FLAG | FLIPPED_DIAGONALLY_FLAG
+
+# texture ที่ Kivy โหลดจากไฟล์รูปถูกกลับแกน Y (uvpos=(0, 1), uvsize=(1, -1))
+# UV ทั้งหมดคำนวณบนสมมติฐานนี้ KivyTiledMap จะแปลงให้เองถ้า texture จริงไม่ตรง (เช่น GPU ที่ไม่รองรับ NPOT)
+TEXTURE_UVPOS = (0.0, 1.0)
+TEXTURE_UVSIZE = (1.0, -1.0)
+
+
+def image_size(path, fallback=None):
+    """ขนาดรูปจาก header ของ PNG (ไม่ต้อง decode รูป) ถ้าอ่านไม่ได้ใช้ fallback (ค่าจาก TSX)"""
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(24)
+        if head[:8] == b'\x89PNG\r\n\x1a\n' and head[12:16] == b'IHDR':
+            return struct.unpack('>II', head[16:24])
+    except OSError:
+        pass
+    return fallback
+
+
+def region_coords(img_w, img_h, x, y, w, h):
+    """(u0, v0, u1, v1) แบบเดียวกับ tex_coords[0,1,4,5] ของ Texture.get_region(x, y, w, h)"""
+    ox, oy = TEXTURE_UVPOS
+    ow, oh = TEXTURE_UVSIZE
+    u0 = (x / img_w) * ow + ox
+    v0 = (y / img_h) * oh + oy
+    return u0, v0, u0 + (w / img_w) * ow, v0 + (h / img_h) * oh
+
+
+def prepare_map_data(filename):
+    """งานโหลดแมพทั้งหมดที่ไม่แตะ GL (เรียกจาก worker thread หรือโหมด headless ได้)
+
+    อ่าน JSON แล้วใช้ compiled cache ถ้ามีและ key ตรง ไม่เช่นนั้น parse TSX, ถอด tile layer
+    และสร้าง vertex/UV/solid rect ของทั้งแมพเอง (แล้วเขียน cache ไว้ใช้ครั้งหน้า)
+    ผลลัพธ์ 'payload' อยู่ในรูปแบบเดียวกับ map_cache.write_cache เหลือแค่สร้าง Texture/Mesh
+    """
+    prepared = {'map_data': None, 'error': None, 'payload': None}
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            prepared['map_data'] = json.load(f)
+    except Exception as e:
+        prepared['error'] = e
+        return prepared
+
+    map_data = prepared['map_data']
+    map_dir = os.path.dirname(filename)
+    tsx_paths = [resolve_map_path(map_dir, ts['source'], '.tsx')
+                 for ts in map_data.get('tilesets', []) if ts.get('source')]
+
+    cache_key = None
+    if MAP_CACHE_ENABLED:
+        try:
+            cache_key = map_cache.compute_key(filename, tsx_paths, extra=str(TILE_SIZE).encode())
+            prepared['payload'] = map_cache.read_cache(map_cache.cache_path_for(MAP_CACHE_DIR, filename), cache_key)
+        except (OSError, ValueError, struct.error) as e:
+            print(f"DEBUG: Ignoring map cache for {filename}: {e}")
+        if prepared['payload'] is not None:
+            prepared['from_cache'] = True
+            return prepared
+
+    tsx_trees = {}
+    for tsx_path in tsx_paths:
+        if not tsx_path: continue
+        try:
+            tsx_trees[tsx_path] = ET.parse(tsx_path)
+        except Exception as e:
+            print(f"Error loading tileset {tsx_path}: {e}")
+
+    geometry = MapGeometry(filename, map_data, tsx_trees)
+    geometry.load_tilesets()
+    geometry.build_meshes()
+    payload = geometry.to_payload()
+    prepared['payload'] = payload
+
+    # 5. เก็บผลลัพธ์ลง cache สำหรับการโหลดครั้งถัดไป
+    if cache_key:
+        path = map_cache.cache_path_for(MAP_CACHE_DIR, filename)
+        try:
+            map_cache.write_cache(path, cache_key, payload)
+        except (OSError, ValueError, struct.error) as e:
+            print(f"DEBUG: Could not write map cache {path}: {e}")
+    return prepared
+
+
+class MapGeometry:
+    """สร้าง geometry ของแมพจาก JSON + TSX โดยไม่ใช้ Kivy/GL
+
+    texture อ้างถึงด้วย index ของรูปใน self.images และ UV คำนวณจากขนาดรูป + ตำแหน่ง tile ตรงๆ
+    ได้ solid rect, walkability และ vertex/index ของทุก chunk ชุดเดียวกับที่เกมใช้
+    """
+
+    def __init__(self, filename, map_data, tsx_trees=None):
+        self.filename = filename
+        self.map_dir = os.path.dirname(filename)
+        self.map_data = map_data
+        self.width = map_data.get('width', 0)
+        self.height = map_data.get('height', 0)
+        self.tile_w = map_data.get('tilewidth', 16)
+        self.tile_h = map_data.get('tileheight', 16)
+        self.tsx_trees = tsx_trees or {}  # tsx path -> ElementTree ที่ parse ไว้แล้ว
+        self.images = []            # path ของรูป tileset (index = "texture" ใน geometry)
+        self.image_sizes = []       # (w, h) ของแต่ละรูป
+        self.textures = {}          # gid -> (img_idx, uvs, w, h, x, inv_y)
+        self.solid_rects = []
+        self.walk_grid = WalkabilityGrid(0, 0, TILE_SIZE)
+        self.well_fg_gids = set()
+        self.well_roof_gids = set()
+        self.well_solid_gids = set()
+        self.tile_hitboxes = {}     # gid -> list of (x, y, w, h)
+        self.chunks = {name: {} for name in CHUNK_LAYERS}
+
+        # ถอด tile layer ทั้งหมดไว้ก่อน (build_tile_layer หยิบจาก id(layer))
+        self.decoded_layers = {}
+        for layer in map_data.get('layers', []):
+            if layer.get('type') == 'tilelayer' and layer.get('visible', True):
+                w, h = layer.get('width', self.width), layer.get('height', self.height)
+                self.decoded_layers[id(layer)] = decode_tile_gids(layer, w, h)
+
+    def to_payload(self):
+        """ผลลัพธ์ในรูปแบบเดียวกับ compiled map cache"""
+        uvs = [(gid, img_idx, u0, v0, u1, v1, tw, th, tx, inv_y)
+               for gid, (img_idx, (u0, v0, u1, v1), tw, th, tx, inv_y) in self.textures.items()]
+        chunks = {}
+        for name, data in self.chunks.items():
+            chunks[name] = {coord: [(op, [(img_idx, m['vertices'], m['indices']) for img_idx, m in tex_dict.items()])
+                                    for op, tex_dict in layers]
+                            for coord, layers in data.items()}
+        return {
+            'images': list(self.images),
+            'uvs': uvs,
+            'solid_rects': self.solid_rects,
+            'walk': (self.walk_grid.cols, self.walk_grid.rows, self.walk_grid.cells),
+            'chunks': chunks,
+        }
+
+    # --- Tileset Loading ---
+
+    def load_tilesets(self):
+        """Parse all tilesets defined in the map and prepare UVs/hitboxes."""
+        for ts_info in self.map_data.get('tilesets', []):
+            firstgid = ts_info.get('firstgid', 1)
+            source = ts_info.get('source')
+
+            if source:
+                tsx_path = self._resolve_path(source, '.tsx')
+                if tsx_path:
+                    try:
+                        self._parse_tsx(tsx_path, firstgid)
+                    except Exception as e:
+                        print(f"Error loading tileset {tsx_path}: {e}")
+            else:
+                # Embedded JSON tileset
+                try:
+                    self._parse_embedded_json_tileset(ts_info, firstgid)
+                except Exception as e:
+                    print(f"Error parsing embedded tileset in {self.filename}: {e}")
+
+    def _add_image(self, img_path, declared_size):
+        """ลงทะเบียนรูป tileset คืน (img_idx, width, height) หรือ None ถ้าไม่รู้ขนาด"""
+        size = image_size(img_path, declared_size)
+        if not size or not size[0] or not size[1]:
+            print(f"Error loading tileset image {img_path}: unknown size")
+            return None
+        self.images.append(img_path)
+        self.image_sizes.append(size)
+        return len(self.images) - 1, size[0], size[1]
+
+    def _add_tile_uvs(self, img, firstgid, tw, th, cols, count, margin, spacing):
+        img_idx, img_w, img_h = img
+        pad_x, pad_y = self._get_uv_padding(img_idx)
+        for i in range(count):
+            gid = firstgid + i
+            col, row = i % cols, i // cols
+            tx, ty = margin + col*(tw+spacing), margin + row*(th+spacing)
+
+            # Tiled (Y-down) -> Kivy (Y-up)
+            inv_y = img_h - ty - th
+            u0, v0, u1, v1 = region_coords(img_w, img_h, tx, inv_y, tw, th)
+            self.textures[gid] = (img_idx, (u0+pad_x, v0+pad_y, u1-pad_x, v1-pad_y), tw, th, tx, inv_y)
+
+    def _parse_embedded_json_tileset(self, ts_info, firstgid):
+        """Parse an embedded tileset directly from the JSON map data."""
+        name = ts_info.get('name', '')
+        img_src = ts_info.get('image')
+        if not img_src: return
+
+        img_path = self._resolve_path(img_src, 'prop')
+        if not img_path: return
+
+        declared = (int(ts_info.get('imagewidth', 0)), int(ts_info.get('imageheight', 0)))
+        img = self._add_image(img_path, declared)
+        if img is None: return
+
+        tw = int(ts_info.get('tilewidth', self.tile_w))
+        th = int(ts_info.get('tileheight', self.tile_h))
+        cols = int(ts_info.get('columns', 1))
+        count = int(ts_info.get('tilecount', 0))
+        margin = int(ts_info.get('margin', 0))
+        spacing = int(ts_info.get('spacing', 0))
+
+        self.setup_well(name, firstgid, cols, count)
+        self._add_tile_uvs(img, firstgid, tw, th, cols, count, margin, spacing)
+
+        # Parse objects (hitboxes)
+        for tile in ts_info.get('tiles', []):
+            tid = int(tile.get('id', 0))
+            gid = firstgid + tid
+            obj_group = tile.get('objectgroup')
+            if obj_group:
+                boxes = []
+                for obj in obj_group.get('objects', []):
+                    ox, oy = float(obj.get('x', 0)), float(obj.get('y', 0))
+                    # Simplified for now (only rects)
+                    boxes.append((ox, oy, float(obj.get('width', 0)), float(obj.get('height', 0))))
+                if boxes: self.tile_hitboxes[gid] = boxes
+
+    def _resolve_path(self, filename, sub_dir=None):
+        return resolve_map_path(self.map_dir, filename, sub_dir)
+
+    def _parse_tsx(self, tsx_path, firstgid):
+        tree = self.tsx_trees.get(tsx_path) or ET.parse(tsx_path)
+        root = tree.getroot()
+        name = root.get('name', '')
+
+        img_el = root.find('image')
+        if img_el is None: return
+
+        img_path = self._resolve_path(img_el.get('source'), 'prop')
+        if not img_path: return
+
+        declared = (int(img_el.get('width', 0)), int(img_el.get('height', 0)))
+        img = self._add_image(img_path, declared)
+        if img is None: return
+
+        # Tileset properties
+        tw = int(root.get('tilewidth', self.tile_w))
+        th = int(root.get('tileheight', self.tile_h))
+        cols = int(root.get('columns', 1))
+        count = int(root.get('tilecount', 0))
+        margin = int(root.get('margin', 0))
+        spacing = int(root.get('spacing', 0))
+
+        self.setup_well(name, firstgid, cols, count)
+        self._add_tile_uvs(img, firstgid, tw, th, cols, count, margin, spacing)
+
+        # Parse custom hitboxes
+        for tile in root.findall('tile'):
+            gid = firstgid + int(tile.get('id'))
+            objgrp = tile.find('objectgroup')
+            if objgrp is not None:
+                boxes = []
+                for obj in objgrp.findall('object'):
+                    ox, oy = float(obj.get('x', 0)), float(obj.get('y', 0))
+                    poly, ell = obj.find('polygon'), obj.find('ellipse')
+
+                    if poly is not None:
+                        pts = [tuple(map(float, p.split(','))) for p in poly.get('points', '').split()]
+                        if pts:
+                            x_pts, y_pts = [p[0] for p in pts], [p[1] for p in pts]
+                            boxes.append((ox+min(x_pts), oy+min(y_pts), max(x_pts)-min(x_pts), max(y_pts)-min(y_pts)))
+                    else:
+                        boxes.append((ox, oy, float(obj.get('width', 0)), float(obj.get('height', 0))))
+                if boxes: self.tile_hitboxes[gid] = boxes
+
+    def _get_uv_padding(self, img_idx):
+        img_w, img_h = self.image_sizes[img_idx]
+        return 0.1 / img_w, 0.1 / img_h
+
+    def setup_well(self, tsx_name, firstgid, columns, tilecount):
+        if "well" in tsx_name.lower():
+            # แถวแรก (บนสุด/หลังบ่อ) -> Roof (บังหัวเมื่ออยู่หลังบ่อ) และไม่มี Hitbox
+            self.well_roof_gids.update(range(firstgid, firstgid + columns))
+
+            # บล็อกที่เหลือทั้งหมด (ตั้งแต่แถว 2 จนถึงแถวสุดท้าย) -> ให้ดัก Hitbox (Solid)
+            self.well_solid_gids.update(range(firstgid + columns, firstgid + tilecount))
+
+            # แถวสุดท้าย (หน้าบ่อ) -> Foreground (วาดทับหน้าเท้า) และมี Hitbox (เพราะรวมอยู่ใน solid_gids แล้ว)
+            self.well_fg_gids.update(range(firstgid + tilecount - columns, firstgid + tilecount))
+
+    # --- Mesh Building ---
+
+    def build_meshes(self):
+        """Construct chunked vertex data, solid rects and walkability for the entire map."""
+        self.solid_rects = []
+
+        chunk_size_pixels = TILE_SIZE * 16
+        scale = TILE_SIZE / self.tile_w
+
+        # Accumulators for all chunks
+        chunk_meshes_bg, chunk_meshes_fg, chunk_meshes_ground, chunk_meshes_roof = {}, {}, {}, {}
+
+        for layer in self.map_data.get('layers', []):
+            if not layer.get('visible', True): continue
+
+            layer_type = layer.get('type')
+            name = layer.get('name', '').strip().lower()
+
+            # Logic classifications
+            is_roof = any(kw in name for kw in ("หลังคา", "roof", "หลังคา2 ชั้น", "funiture3", "furniture3", "ผนังลอย", "ผนังลอยตัว"))
+
+            # กฎพิเศษสำหรับ home.tmj: ให้เลเยอร์ "เหนือ" อยู่ชั้นหน้าสุด (High Z)
+            map_basename = os.path.basename(self.filename).lower()
+            if map_basename == "home.tmj" and "เหนือ" in name:
+                is_roof = True
+
+            # ตรวจสอบว่าเป็นชั้นหน้าสุด (Foreground) หรือไม่
+            is_fg = any(kw in name for kw in ("foreground", "fg")) and not is_roof
+
+            # กฎพิเศษสำหรับ home.tmj: ให้ผนังบ้านอยู่ชั้นหน้าสุด (High Z) ตามคำขอ
+            if "home.tmj" in self.filename.lower() and "ผนังบ้านบัง" in name:
+                is_fg = True
+
+            # กฎพิเศษสำหรับ beyond.tmj: ให้ขยะอยู่ชั้นหน้าสุด (High Z)
+            if "beyond.tmj" in self.filename.lower() and "ขยะ" in name:
+                is_fg = True
+
+            # กฎพิกัดบ่อน้ำ (User Request): well2 = พื้น, well1 = บ่อ
+            if "well2" in name:
+                is_ground = True
+                is_fg = False
+                is_well = False
+            elif "well1" in name:
+                is_well = True
+                is_ground = False
+                is_fg = False
+            else:
+                is_ground = any(kw in name for kw in ("พื้น", "ground", "floor", "floor layer", "bottom", "ดิน")) and not is_fg and not is_roof
+                is_well = "well" in name
+
+            # Collision Logic
+            # ผนังลอย/roof ไม่ต้องมี hitbox เลย
+            # 'ของ' ใน underground และ 'ขยะ' ใน beyond: custom_hitbox_only=True
+            # (ใช้เฉพาะ hitbox ที่กำหนดใน TSX objectgroup เท่านั้น ไม่ fallback เป็น full rect)
+            is_solid = False
+            custom_hitbox_only = False
+            if not is_roof:
+                if "underground.tmj" in self.filename.lower():
+                    if "ผนัง" in name and "ลอย" not in name:
+                        is_solid = True
+                        is_ground = False
+                    elif "ของ" in name:
+                        is_solid = True
+                        is_fg = True
+                        is_ground = False
+                        custom_hitbox_only = True  # เหมือน ขยะ ใน beyond: ใช้แค่ hitbox จาก TSX
+                    else:
+                        is_solid = not is_ground and (
+                            any(kw in name for kw in ("ผนัง", "กำแพง", "wall", "solid", "obstacle")) or
+                            name.lower() in ("funiture", "funiture2", "furniture", "props")
+                        )
+                else:
+                    is_solid = not is_ground and (
+                        any(kw in name for kw in ("ผนัง", "ผนังบ้าน", "กองขยะ", "กำแพง", "ขยะ", "wall", "solid", "obstacle", "trash", "chair", "table", "unfloor", "wall layer")) or
+                        name.lower() in ("funiture", "funiture2", "furniture", "props", "ผนัง")
+                    ) and not any(kw in name for kw in ("resources", "floor"))
+                    if is_solid and "ขยะ" in name:
+                        custom_hitbox_only = True  # ขยะ ใน beyond ก็ใช้ custom hitbox only เหมือนกัน
+
+            opacity = layer.get('opacity', 1.0)
+            l_meshes_bg, l_meshes_fg, l_meshes_ground, l_meshes_roof = {}, {}, {}, {}
+
+            if MAP_FAST_MESH_BUILDER and layer_type == 'tilelayer':
+                # 1-2. Tile layer: ถอดและสร้าง vertex ทั้งชั้นแบบ bulk (ผลลัพธ์เหมือน path ด้านล่าง)
+                build_tile_layer(
+                    self, layer, scale, chunk_size_pixels,
+                    is_solid, is_fg, is_well, name, l_meshes_bg, l_meshes_fg, l_meshes_ground, is_ground, is_roof, l_meshes_roof,
+                    custom_hitbox_only=custom_hitbox_only
+                )
+            else:
+                # 1. Parse layer raw tile data into instances (gid, x, y, w, h)
+                instances = self._get_layer_instances(layer, scale)
+                if not instances: continue
+
+                # 2. Process each tile instance
+                for gid_full, x, y, cw, ch in instances:
+                    self._process_tile(
+                        gid_full, x, y, cw, ch, scale, chunk_size_pixels,
+                        is_solid, is_fg, is_well, name, l_meshes_bg, l_meshes_fg, l_meshes_ground, is_ground, is_roof, l_meshes_roof,
+                        custom_hitbox_only=custom_hitbox_only
+                    )
+
+            # 3. Add layer meshes to global chunk data
+            self._merge_layer_to_global(l_meshes_bg, chunk_meshes_bg, opacity)
+            self._merge_layer_to_global(l_meshes_fg, chunk_meshes_fg, opacity)
+            self._merge_layer_to_global(l_meshes_ground, chunk_meshes_ground, opacity)
+            self._merge_layer_to_global(l_meshes_roof, chunk_meshes_roof, opacity)
+
+        # 4. ข้อมูล vertex ของทุก chunk (KivyTiledMap สร้าง Mesh จากตรงนี้บน main thread)
+        self.chunks = {'bg': chunk_meshes_bg, 'fg': chunk_meshes_fg,
+                       'ground': chunk_meshes_ground, 'roof': chunk_meshes_roof}
+
+        # 5. Walkability bitmap (1 byte ต่อ tile) สำหรับตัวละครที่เดินตรง grid
+        self.walk_grid = WalkabilityGrid(self.width, self.height, TILE_SIZE)
+        self.walk_grid.rasterize(self.solid_rects)
+
+    def _get_layer_instances(self, layer, scale):
+        instances = []
+        l_type = layer.get('type')
+
+        if l_type == 'tilelayer':
+            tiles = self._decode_tilelayer(layer)
+            w, h = layer.get('width', self.width), layer.get('height', self.height)
+            # Use self.height (map height) for inversion to stay consistent across all layers
+            map_h_px = self.height * self.tile_h
+            for i, gid in enumerate(tiles):
+                if gid == 0: continue
+                col, row = i % w, i // w
+                x = col * self.tile_w * scale
+                # Reverting to correct Kivy y-up: total_map_height - (row + 1) * tile_height
+                # This ensures Row 99 is at y=0 and Row 0 is at y=1584 (for 100-tile map)
+                y = (map_h_px - (row + 1) * self.tile_h) * scale
+                instances.append((gid, x, y, None, None))
+
+        elif l_type == 'objectgroup':
+            objs = layer.get('objects', [])
+            # Tiled default draworder is "topdown" (sorted by Y)
+            if layer.get('draworder', 'topdown') == 'topdown':
+                objs = sorted(objs, key=lambda o: float(o.get('y', 0)))
+
+            for obj in objs:
+                gid = obj.get('gid', 0)
+                px, py = float(obj.get('x', 0)), float(obj.get('y', 0))
+                pw, ph = float(obj.get('width', self.tile_w)), float(obj.get('height', self.tile_h))
+
+                x = px * scale
+                # GID-based objects (bottom-left) vs Shapes (top-left)
+                if gid != 0:
+                    y = (self.height * self.tile_h - py) * scale
+                else:
+                    # For shapes (GID=0), Tiled y is top. Bottom y = H - (y + h)
+                    y = (self.height * self.tile_h - (py + ph)) * scale
+                instances.append((gid, x, y, pw * scale, ph * scale))
+
+        return instances
+
+    def _decode_tilelayer(self, layer):
+        if id(layer) in self.decoded_layers:
+            return self.decoded_layers[id(layer)]
+        data = layer.get('data')
+        encoding = layer.get('encoding')
+        if encoding != 'base64': return data if isinstance(data, list) else []
+
+        decoded = base64.b64decode(data)
+        comp = layer.get('compression')
+        if comp == 'zlib': decoded = zlib.decompress(decoded)
+        elif comp == 'gzip':
+            import gzip
+            decoded = gzip.decompress(decoded)
+
+        w, h = layer.get('width', self.width), layer.get('height', self.height)
+        return struct.unpack(f"<{w*h}I", decoded)
+
+    def _process_tile(self, gid_full, x, y, cw, ch, scale, chunk_size_pixels, is_solid, is_fg, is_well, name, l_bg, l_fg, l_ground, is_ground, is_roof, l_roof, custom_hitbox_only=False):
+        if gid_full == 0:
+            if is_solid and not custom_hitbox_only:
+                # Shape without Tile (Collision Box) - ข้ามถ้าใช้ custom hitbox only mode
+                self.solid_rects.append([x, y, cw, ch])
+            return
+
+        gid = gid_full & ~ALL_FLAGS
+        t_info = self.textures.get(gid)
+        if not t_info: return
+
+        tex, base_uvs, tsw, tsh, tx, ty_inv = t_info
+        cx, cy = int(x // chunk_size_pixels), int(y // chunk_size_pixels)
+
+        obj_px_w = int(cw / scale) if cw is not None else tsw
+        obj_px_h = int(ch / scale) if ch is not None else tsh
+        w, h = obj_px_w * scale, obj_px_h * scale
+
+        # Special Case: Well (Split into BG/Bottom and Roof/Top)
+        if is_well and (gid in self.well_roof_gids or gid in self.well_fg_gids or gid in self.well_solid_gids) and cw is not None:
+            self._handle_well_split(x, y, w, h, obj_px_w, obj_px_h, scale, tx, ty_inv, tsh, t_info, cx, cy, l_bg, l_fg, l_roof)
+            return
+
+        # Collision Logic
+        if is_solid:
+            # Pass tileset dimensions (tsw, tsh) to scale custom hitboxes correctly
+            self._add_to_solid_rects(gid, x, y, w, h, scale, name, tsw, tsh, custom_only=custom_hitbox_only)
+        elif is_well and gid in self.well_solid_gids:
+            self.solid_rects.append([x, y, w, h])
+
+        # UV & Geometry Calculation
+        # Always use the base tile's UVs. Scaling is handled by the Mesh vertices (w, h).
+        # This prevents "extracting" the wrong area from the texture atlas.
+        uvs = self._get_final_uvs(gid_full, t_info)
+        verts = [x, y, uvs[0], uvs[1], x+w, y, uvs[2], uvs[3], x+w, y+h, uvs[4], uvs[5], x, y+h, uvs[6], uvs[7]]
+
+        # Decide Target Mesh (Roof vs FG vs BG vs Ground)
+        if is_roof or gid in self.well_roof_gids:
+            target_l = l_roof
+        elif is_fg or gid in self.well_fg_gids:
+            target_l = l_fg
+        elif is_ground:
+            target_l = l_ground
+        else:
+            target_l = l_bg
+
+        self._add_to_mesh_data(target_l, cx, cy, tex, verts)
+
+    def _handle_well_split(self, x, y, w, h, opw, oph, scale, tx, ty_i, tsw_h, t_info, cx, cy, l_bg, l_fg, l_roof):
+        img_idx = t_info[0]
+        img_w, img_h = self.image_sizes[img_idx]
+        pad_x, pad_y = self._get_uv_padding(img_idx)
+
+        # Bottom (BG + Solid) - เหลือส่วนล่างไว้
+        # th_px_h = 16 (1 block) ส่วนที่บังหัว/ตัว
+        bh_px_h = max(0, int(oph - 16))
+        bh_h = bh_px_h * scale
+        bh_inv_y = ty_i + tsw_h - bh_px_h
+        bu0, bv0, bu1, bv1 = region_coords(img_w, img_h, tx, bh_inv_y, opw, bh_px_h)
+        bu0, bv0 = bu0+pad_x, bv0+pad_y
+        bu1, bv1 = bu1-pad_x, bv1-pad_y
+
+        b_verts = [x, y, bu0, bv0, x+w, y, bu1, bv0, x+w, y+bh_h, bu1, bv1, x, y+bh_h, bu0, bv1]
+        self._add_to_mesh_data(l_bg, cx, cy, img_idx, b_verts)
+
+        hp = 4 * scale
+        self.solid_rects.append([x + hp, y, w - (hp * 2), bh_h])
+
+        # Top (FG)
+        th_px_h = oph - bh_px_h
+        th_h, th_y = th_px_h * scale, y + bh_h
+        th_inv_y = bh_inv_y - th_px_h
+        tu0, tv0, tu1, tv1 = region_coords(img_w, img_h, tx, th_inv_y, opw, th_px_h)
+        tu0, tv0 = tu0+pad_x, tv0+pad_y
+        tu1, tv1 = tu1-pad_x, tv1-pad_y
+
+        t_verts = [x, th_y, tu0, tv0, x+w, th_y, tu1, tv0, x+w, th_y+th_h, tu1, tv1, x, th_y+th_h, tu0, tv1]
+        self._add_to_mesh_data(l_roof, cx, cy, img_idx, t_verts)
+
+    def _get_final_uvs(self, gid_full, t_info):
+        # Always use the tile's own base UVs from the tileset
+        u0, v0, u1, v1 = t_info[1]
+
+        # Apply Flips
+        fh, fv, fd = bool(gid_full & FLIPPED_HORIZONTALLY_FLAG), bool(gid_full & FLIPPED_VERTICALLY_FLAG), bool(gid_full & FLIPPED_DIAGONALLY_FLAG)
+        if fh: u0, u1 = u1, u0
+        if fv: v0, v1 = v1, v0
+        return [u1, v0, u1, v1, u0, v1, u0, v0] if fd else [u0, v0, u1, v0, u1, v1, u0, v1]
+
+    def _add_to_solid_rects(self, gid, x, y, w, h, scale, name, tsw=None, tsh=None, custom_only=False):
+        """Unified hitbox generation. x,y is the Kivy bottom-left of the tile/object.
+        custom_only=True: ใช้เฉพาะ hitbox จาก TSX objectgroup เท่านั้น (ไม่ fallback เป็น full rect)
+        ใช้สำหรับ layer เช่น 'ของ' ใน underground และ 'ขยะ' ใน beyond ที่ต้องการ hitbox แม่นยำ"""
+        if gid in self.tile_hitboxes:
+            # Calculate object-to-tile ratio for scaling the hitboxes
+            # w and h are already world coordinates; (tsw * scale) is world size of one tile
+            ratio_x = (w / (tsw * scale)) if tsw else 1.0
+            ratio_y = (h / (tsh * scale)) if tsh else 1.0
+
+            for hx, hy, hw, hh in self.tile_hitboxes[gid]:
+                # Scaled relative coordinates (inside the object bounds)
+                shx = hx * ratio_x * scale
+                shy = hy * ratio_y * scale
+                shw = hw * ratio_x * scale
+                shh = hh * ratio_y * scale
+
+                # Conversion: Tiled (y-down) -> Kivy (y-up relative to item bottom)
+                # k_ry = Object Height - (Box Top Y + Box Height)
+                k_ry = h - (shy + shh)
+                self.solid_rects.append([x + shx, y + k_ry, shw, shh])
+        elif not custom_only:
+            # Fallback for generic solids
+            # (ข้ามถ้าเป็น custom_only mode - เช่น 'ของ' หรือ 'ขยะ' ที่ tile ไม่มี hitbox กำหนดไว้)
+            self.solid_rects.append([x, y, w, h])
+
+    def _add_to_mesh_data(self, m_dict, cx, cy, tex, verts):
+        chunk = m_dict.setdefault((cx, cy), {}).setdefault(tex, {'vertices': [], 'indices': []})
+        off = len(chunk['vertices']) // 4
+        chunk['vertices'].extend(verts)
+        chunk['indices'].extend([off, off+1, off+2, off+2, off+3, off])
+
+    def _merge_layer_to_global(self, layer_chunk_meshes, global_chunk_data, opacity):
+        for coord, tex_dict in layer_chunk_meshes.items():
+            global_chunk_data.setdefault(coord, []).append((opacity, tex_dict))
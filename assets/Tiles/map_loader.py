@@ -1,21 +1,21 @@
-import json
-import base64
-import zlib
-import struct
 import os
-import xml.etree.ElementTree as ET
-from kivy.graphics import Color, Rectangle, InstructionGroup, Mesh
+from array import array
+from kivy.graphics import Color, InstructionGroup, Mesh
 from kivy.core.image import Image as CoreImage
-from data.settings import TILE_SIZE, CAMERA_WIDTH, CAMERA_HEIGHT
+from data.settings import TILE_SIZE, SPATIAL_HASH_CELL_TILES
+from assets.Tiles.spatial_hash import SolidRectIndex
+from assets.Tiles.walkability import WalkabilityGrid
+from assets.Tiles.map_geometry import prepare_map_data, TEXTURE_UVPOS, TEXTURE_UVSIZE
 
-# Tiled Flip Flags
-FLIPPED_HORIZONTALLY_FLAG = 0x80000000
-FLIPPED_VERTICALLY_FLAG   = 0x40000000
-FLIPPED_DIAGONALLY_FLAG   = 0x20000000
-ALL_FLAGS = FLIPPED_HORIZONTALLY_FLAG | FLIPPED_VERTICALLY_FLAG | FLIPPED_DIAGONALLY_FLAG
 
 class KivyTiledMap:
-    def __init__(self, filename):
+    """แมพที่วาดได้: สร้าง Texture/Mesh จาก payload ของ prepare_map_data (ส่วน GL อย่างเดียว)
+
+    การ parse TSX, ถอด layer, คำนวณ vertex/UV และ solid rect อยู่ใน map_geometry ซึ่งไม่แตะ GL
+    (MapPreloader จึงทำส่วนนั้นบน worker ได้ทั้งหมด ไม่ว่าจะมี compiled cache หรือไม่)
+    """
+
+    def __init__(self, filename, prepared=None):
         self.filename = filename
         self.map_dir = os.path.dirname(filename)
         self.map_data = {}
@@ -23,19 +23,18 @@ class KivyTiledMap:
         self.height = 0
         self.tile_w = 16
         self.tile_h = 16
-        self.tilesets = []
         self.textures = {}  # gid -> (tex, uvs, w, h, x, inv_y)
         self.core_images = [] # Prevent garbage collection
         self.solid_rects = []
-        self.well_fg_gids = set()
-        self.well_roof_gids = set()
-        self.well_solid_gids = set()
-        self.tile_hitboxes = {} # gid -> list of (x, y, w, h)
+        self.solid_index = SolidRectIndex(self.solid_rects, TILE_SIZE * SPATIAL_HASH_CELL_TILES)
+        self.walk_grid = WalkabilityGrid(0, 0, TILE_SIZE)
         self.visible_chunks = set()
         self.chunk_groups_bg = {}
         self.chunk_groups_fg = {}
         self.chunk_groups_ground = {} # ชั้นพื้นดิน (อยู่ล่างสุด)
         self.chunk_groups_roof = {}   # ชั้นหลังคา (อยู่บนสุด)
+        self.mesh_bytes = 0           # ขนาดโดยประมาณของ vertex/index (ใช้กับ MapRegistry)
+        self.attached_to = []         # (canvas, group) ที่ถูก draw_* ลงไป เพื่อถอดออกตอนใช้ซ้ำ
         
         # Instruction groups for Kivy rendering
         self.ground_group = InstructionGroup()
@@ -43,20 +42,22 @@ class KivyTiledMap:
         self.fg_group = InstructionGroup()
         self.roof_group = InstructionGroup()
         
-        # 1. Load data
-        if not self._load_map_file(filename):
+        # 1. Load data (ส่วน CPU ทั้งหมดอาจถูกเตรียมไว้แล้วจาก MapPreloader)
+        if prepared is None:
+            prepared = prepare_map_data(filename)
+        if not self._load_map_file(filename, prepared):
             return
-            
-        # 2. Setup resources
-        self.load_tilesets()
-        
-        # 3. Generate geometry
-        self._build_meshes()
+
+        # 2. สร้าง texture / Mesh จาก vertex ที่คำนวณไว้แล้ว
+        self._load_payload(prepared['payload'])
+        if prepared.get('from_cache'):
+            print(f"DEBUG: Loaded compiled map cache for {self.filename}")
         
-    def _load_map_file(self, filename):
+    def _load_map_file(self, filename, prepared):
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                self.map_data = json.load(f)
+            if prepared['error'] is not None:
+                raise prepared['error']
+            self.map_data = prepared['map_data']
             self.width = self.map_data.get('width', 0)
             self.height = self.map_data.get('height', 0)
             self.tile_w = self.map_data.get('tilewidth', 16)
@@ -66,456 +67,82 @@ class KivyTiledMap:
             print(f"Failed to load map {filename}: {e}")
             return False
 
-    # --- Tileset Loading ---
-
-    def load_tilesets(self):
-        """Parse all tilesets defined in the map and prepare textures/hitboxes."""
-        for ts_info in self.map_data.get('tilesets', []):
-            firstgid = ts_info.get('firstgid', 1)
-            source = ts_info.get('source')
-            
-            if source:
-                tsx_path = self._resolve_path(source, '.tsx')
-                if tsx_path:
-                    try:
-                        self._parse_tsx(tsx_path, firstgid)
-                    except Exception as e:
-                        print(f"Error loading tileset {tsx_path}: {e}")
-            else:
-                # Embedded JSON tileset
-                try:
-                    self._parse_embedded_json_tileset(ts_info, firstgid)
-                except Exception as e:
-                    print(f"Error parsing embedded tileset in {self.filename}: {e}")
-
-    def _parse_embedded_json_tileset(self, ts_info, firstgid):
-        """Parse an embedded tileset directly from the JSON map data."""
-        name = ts_info.get('name', '')
-        img_src = ts_info.get('image')
-        if not img_src: return
-            
-        img_path = self._resolve_path(img_src, 'prop')
-        if not img_path: return
-
-        # Load Texture
-        cimg = CoreImage(img_path)
-        self.core_images.append(cimg)
-        tex = cimg.texture
-        tex.mag_filter = tex.min_filter = 'nearest'
-        
-        tw = int(ts_info.get('tilewidth', self.tile_w))
-        th = int(ts_info.get('tileheight', self.tile_h))
-        cols = int(ts_info.get('columns', 1))
-        count = int(ts_info.get('tilecount', 0))
-        margin = int(ts_info.get('margin', 0))
-        spacing = int(ts_info.get('spacing', 0))
-
-        self.setup_well(name, firstgid, cols, count)
-        pad_x, pad_y = self._get_uv_padding(tex)
-        
-        for i in range(count):
-            gid = firstgid + i
-            col, row = i % cols, i // cols
-            tx, ty = margin + col*(tw+spacing), margin + row*(th+spacing)
-            inv_y = cimg.height - ty - th
-            region = tex.get_region(tx, inv_y, tw, th)
-            u0, v0 = region.tex_coords[0], region.tex_coords[1]
-            u1, v1 = region.tex_coords[4], region.tex_coords[5]
-            self.textures[gid] = (tex, (u0+pad_x, v0+pad_y, u1-pad_x, v1-pad_y), tw, th, tx, inv_y)
-
-        # Parse objects (hitboxes)
-        for tile in ts_info.get('tiles', []):
-            tid = int(tile.get('id', 0))
-            gid = firstgid + tid
-            obj_group = tile.get('objectgroup')
-            if obj_group:
-                boxes = []
-                for obj in obj_group.get('objects', []):
-                    ox, oy = float(obj.get('x', 0)), float(obj.get('y', 0))
-                    # Simplified for now (only rects)
-                    boxes.append((ox, oy, float(obj.get('width', 0)), float(obj.get('height', 0))))
-                if boxes: self.tile_hitboxes[gid] = boxes
-
-    def _resolve_path(self, filename, sub_dir=None):
-        """Find a file in map_dir, optional sub_dir, or via recursive search."""
-        base = os.path.basename(filename)
-        paths_to_check = [os.path.join(self.map_dir, base)]
-        if sub_dir:
-            paths_to_check.insert(0, os.path.join(self.map_dir, sub_dir, base))
-            
-        for p in paths_to_check:
-            if os.path.exists(p): return p
-            
-        # Recursive fallback
-        for root, _, files in os.walk(self.map_dir):
-            if base in files: return os.path.join(root, base)
-        return None
-
-    def _parse_tsx(self, tsx_path, firstgid):
-        tree = ET.parse(tsx_path)
-        root = tree.getroot()
-        name = root.get('name', '')
-        
-        img_el = root.find('image')
-        if img_el is None: return
-            
-        img_path = self._resolve_path(img_el.get('source'), 'prop')
-        if not img_path: return
-
-        # Load Texture
-        cimg = CoreImage(img_path)
-        self.core_images.append(cimg)
-        tex = cimg.texture
-        tex.mag_filter = tex.min_filter = 'nearest'
-        
-        # Tileset properties
-        tw = int(root.get('tilewidth', self.tile_w))
-        th = int(root.get('tileheight', self.tile_h))
-        cols = int(root.get('columns', 1))
-        count = int(root.get('tilecount', 0))
-        margin = int(root.get('margin', 0))
-        spacing = int(root.get('spacing', 0))
-
-        self.setup_well(name, firstgid, cols, count)
-        
-        pad_x, pad_y = self._get_uv_padding(tex)
-        
-        for i in range(count):
-            gid = firstgid + i
-            col, row = i % cols, i // cols
-            tx, ty = margin + col*(tw+spacing), margin + row*(th+spacing)
-            
-            # Tiled (Y-down) -> Kivy (Y-up)
-            inv_y = cimg.height - ty - th
-            region = tex.get_region(tx, inv_y, tw, th)
-            
-            u0, v0 = region.tex_coords[0], region.tex_coords[1]
-            u1, v1 = region.tex_coords[4], region.tex_coords[5]
-            
-            self.textures[gid] = (tex, (u0+pad_x, v0+pad_y, u1-pad_x, v1-pad_y), tw, th, tx, inv_y)
-
-        # Parse custom hitboxes
-        for tile in root.findall('tile'):
-            gid = firstgid + int(tile.get('id'))
-            objgrp = tile.find('objectgroup')
-            if objgrp is not None:
-                boxes = []
-                for obj in objgrp.findall('object'):
-                    ox, oy = float(obj.get('x', 0)), float(obj.get('y', 0))
-                    poly, ell = obj.find('polygon'), obj.find('ellipse')
-                    
-                    if poly is not None:
-                        pts = [tuple(map(float, p.split(','))) for p in poly.get('points', '').split()]
-                        if pts:
-                            x_pts, y_pts = [p[0] for p in pts], [p[1] for p in pts]
-                            boxes.append((ox+min(x_pts), oy+min(y_pts), max(x_pts)-min(x_pts), max(y_pts)-min(y_pts)))
-                    else:
-                        boxes.append((ox, oy, float(obj.get('width', 0)), float(obj.get('height', 0))))
-                if boxes: self.tile_hitboxes[gid] = boxes
-
-    def _get_uv_padding(self, tex):
-        return 0.1 / tex.width, 0.1 / tex.height
-
-    def setup_well(self, tsx_name, firstgid, columns, tilecount):
-        if "well" in tsx_name.lower():
-            # แถวแรก (บนสุด/หลังบ่อ) -> Roof (บังหัวเมื่ออยู่หลังบ่อ) และไม่มี Hitbox
-            self.well_roof_gids.update(range(firstgid, firstgid + columns))
-            
-            # บล็อกที่เหลือทั้งหมด (ตั้งแต่แถว 2 จนถึงแถวสุดท้าย) -> ให้ดัก Hitbox (Solid)
-            self.well_solid_gids.update(range(firstgid + columns, firstgid + tilecount))
-            
-            # แถวสุดท้าย (หน้าบ่อ) -> Foreground (วาดทับหน้าเท้า) และมี Hitbox (เพราะรวมอยู่ใน solid_gids แล้ว)
-            self.well_fg_gids.update(range(firstgid + tilecount - columns, firstgid + tilecount))
-
-    # --- Mesh Building ---
-
-    def _build_meshes(self):
-        """Construct chunked meshes for the entire map."""
-        self.bg_group.clear()
-        self.fg_group.clear()
-        self.ground_group.clear()
-        self.solid_rects = []
-        
-        chunk_size_pixels = TILE_SIZE * 16
-        scale = TILE_SIZE / self.tile_w
-        
-        # Accumulators for all chunks
-        chunk_meshes_bg, chunk_meshes_fg, chunk_meshes_ground, chunk_meshes_roof = {}, {}, {}, {}
-
-        for layer in self.map_data.get('layers', []):
-            if not layer.get('visible', True): continue
-            
-            layer_type = layer.get('type')
-            name = layer.get('name', '').strip().lower()
-            
-            # Logic classifications
-            is_roof = any(kw in name for kw in ("หลังคา", "roof", "หลังคา2 ชั้น", "funiture3", "furniture3", "ผนังลอย", "ผนังลอยตัว"))
-            
-            # กฎพิเศษสำหรับ home.tmj: ให้เลเยอร์ "เหนือ" อยู่ชั้นหน้าสุด (High Z)
-            map_basename = os.path.basename(self.filename).lower()
-            if map_basename == "home.tmj" and "เหนือ" in name:
-                is_roof = True
-            
-            # ตรวจสอบว่าเป็นชั้นหน้าสุด (Foreground) หรือไม่
-            is_fg = any(kw in name for kw in ("foreground", "fg")) and not is_roof
-            
-            # กฎพิเศษสำหรับ home.tmj: ให้ผนังบ้านอยู่ชั้นหน้าสุด (High Z) ตามคำขอ
-            if "home.tmj" in self.filename.lower() and "ผนังบ้านบัง" in name:
-                is_fg = True
-                
-            # กฎพิเศษสำหรับ beyond.tmj: ให้ขยะอยู่ชั้นหน้าสุด (High Z)
-            if "beyond.tmj" in self.filename.lower() and "ขยะ" in name:
-                is_fg = True
-                
-            # กฎพิกัดบ่อน้ำ (User Request): well2 = พื้น, well1 = บ่อ
-            if "well2" in name:
-                is_ground = True
-                is_fg = False
-                is_well = False
-            elif "well1" in name:
-                is_well = True
-                is_ground = False
-                is_fg = False
-            else:
-                is_ground = any(kw in name for kw in ("พื้น", "ground", "floor", "floor layer", "bottom", "ดิน")) and not is_fg and not is_roof
-                is_well = "well" in name
-            
-            # Collision Logic
-            # ผนังลอย/roof ไม่ต้องมี hitbox เลย
-            # 'ของ' ใน underground และ 'ขยะ' ใน beyond: custom_hitbox_only=True
-            # (ใช้เฉพาะ hitbox ที่กำหนดใน TSX objectgroup เท่านั้น ไม่ fallback เป็น full rect)
-            is_solid = False
-            custom_hitbox_only = False
-            if not is_roof:
-                if "underground.tmj" in self.filename.lower():
-                    if "ผนัง" in name and "ลอย" not in name:
-                        is_solid = True
-                        is_ground = False
-                    elif "ของ" in name:
-                        is_solid = True
-                        is_fg = True
-                        is_ground = False
-                        custom_hitbox_only = True  # เหมือน ขยะ ใน beyond: ใช้แค่ hitbox จาก TSX
-                    else:
-                        is_solid = not is_ground and (
-                            any(kw in name for kw in ("ผนัง", "กำแพง", "wall", "solid", "obstacle")) or
-                            name.lower() in ("funiture", "funiture2", "furniture", "props")
-                        )
-                else:
-                    is_solid = not is_ground and (
-                        any(kw in name for kw in ("ผนัง", "ผนังบ้าน", "กองขยะ", "กำแพง", "ขยะ", "wall", "solid", "obstacle", "trash", "chair", "table", "unfloor", "wall layer")) or
-                        name.lower() in ("funiture", "funiture2", "furniture", "props", "ผนัง")
-                    ) and not any(kw in name for kw in ("resources", "floor"))
-                    if is_solid and "ขยะ" in name:
-                        custom_hitbox_only = True  # ขยะ ใน beyond ก็ใช้ custom hitbox only เหมือนกัน
-            
-            opacity = layer.get('opacity', 1.0)
-
-            # 1. Parse layer raw tile data into instances (gid, x, y, w, h)
-            instances = self._get_layer_instances(layer, scale)
-            if not instances: continue
-
-            # 2. Process each tile instance
-            l_meshes_bg, l_meshes_fg, l_meshes_ground, l_meshes_roof = {}, {}, {}, {}
-            for gid_full, x, y, cw, ch in instances:
-                self._process_tile(
-                    gid_full, x, y, cw, ch, scale, chunk_size_pixels,
-                    is_solid, is_fg, is_well, name, l_meshes_bg, l_meshes_fg, l_meshes_ground, is_ground, is_roof, l_meshes_roof,
-                    custom_hitbox_only=custom_hitbox_only
-                )
-            
-            # 3. Add layer meshes to global chunk data
-            self._merge_layer_to_global(l_meshes_bg, chunk_meshes_bg, opacity)
-            self._merge_layer_to_global(l_meshes_fg, chunk_meshes_fg, opacity)
-            self._merge_layer_to_global(l_meshes_ground, chunk_meshes_ground, opacity)
-            self._merge_layer_to_global(l_meshes_roof, chunk_meshes_roof, opacity)
-
-        # 4. Finalize Kivy groups
-        self.chunk_groups_bg = self._create_mesh_groups(chunk_meshes_bg)
-        self.chunk_groups_fg = self._create_mesh_groups(chunk_meshes_fg)
-        self.chunk_groups_ground = self._create_mesh_groups(chunk_meshes_ground)
-        self.chunk_groups_roof = self._create_mesh_groups(chunk_meshes_roof)
-
-    def _get_layer_instances(self, layer, scale):
-        instances = []
-        l_type = layer.get('type')
-        
-        if l_type == 'tilelayer':
-            tiles = self._decode_tilelayer(layer)
-            w, h = layer.get('width', self.width), layer.get('height', self.height)
-            # Use self.height (map height) for inversion to stay consistent across all layers
-            map_h_px = self.height * self.tile_h
-            for i, gid in enumerate(tiles):
-                if gid == 0: continue
-                col, row = i % w, i // w
-                x = col * self.tile_w * scale
-                # Reverting to correct Kivy y-up: total_map_height - (row + 1) * tile_height
-                # This ensures Row 99 is at y=0 and Row 0 is at y=1584 (for 100-tile map)
-                y = (map_h_px - (row + 1) * self.tile_h) * scale
-                instances.append((gid, x, y, None, None))
-                
-        elif l_type == 'objectgroup':
-            objs = layer.get('objects', [])
-            # Tiled default draworder is "topdown" (sorted by Y)
-            if layer.get('draworder', 'topdown') == 'topdown':
-                objs = sorted(objs, key=lambda o: float(o.get('y', 0)))
-                
-            for obj in objs:
-                gid = obj.get('gid', 0)
-                px, py = float(obj.get('x', 0)), float(obj.get('y', 0))
-                pw, ph = float(obj.get('width', self.tile_w)), float(obj.get('height', self.tile_h))
-                
-                x = px * scale
-                # GID-based objects (bottom-left) vs Shapes (top-left)
-                if gid != 0:
-                    y = (self.height * self.tile_h - py) * scale
-                else:
-                    # For shapes (GID=0), Tiled y is top. Bottom y = H - (y + h)
-                    y = (self.height * self.tile_h - (py + ph)) * scale
-                instances.append((gid, x, y, pw * scale, ph * scale))
-                
-        return instances
-
-    def _decode_tilelayer(self, layer):
-        data = layer.get('data')
-        encoding = layer.get('encoding')
-        if encoding != 'base64': return data if isinstance(data, list) else []
-        
-        decoded = base64.b64decode(data)
-        comp = layer.get('compression')
-        if comp == 'zlib': decoded = zlib.decompress(decoded)
-        elif comp == 'gzip': 
-            import gzip
-            decoded = gzip.decompress(decoded)
-            
-        w, h = layer.get('width', self.width), layer.get('height', self.height)
-        return struct.unpack(f"<{w*h}I", decoded)
-
-    def _process_tile(self, gid_full, x, y, cw, ch, scale, chunk_size_pixels, is_solid, is_fg, is_well, name, l_bg, l_fg, l_ground, is_ground, is_roof, l_roof, custom_hitbox_only=False):
-        if gid_full == 0:
-            if is_solid and not custom_hitbox_only:
-                # Shape without Tile (Collision Box) - ข้ามถ้าใช้ custom hitbox only mode
-                self.solid_rects.append([x, y, cw, ch])
-            return
-
-        gid = gid_full & ~ALL_FLAGS
-        t_info = self.textures.get(gid)
-        if not t_info: return
-        
-        tex, base_uvs, tsw, tsh, tx, ty_inv = t_info
-        cx, cy = int(x // chunk_size_pixels), int(y // chunk_size_pixels)
-        
-        obj_px_w = int(cw / scale) if cw is not None else tsw
-        obj_px_h = int(ch / scale) if ch is not None else tsh
-        w, h = obj_px_w * scale, obj_px_h * scale
-
-        # Special Case: Well (Split into BG/Bottom and Roof/Top)
-        if is_well and (gid in self.well_roof_gids or gid in self.well_fg_gids or gid in self.well_solid_gids) and cw is not None:
-            self._handle_well_split(x, y, w, h, obj_px_w, obj_px_h, scale, tx, ty_inv, tsh, t_info, cx, cy, l_bg, l_fg, l_roof)
-            return
-
-        # Collision Logic
-        if is_solid:
-            # Pass tileset dimensions (tsw, tsh) to scale custom hitboxes correctly
-            self._add_to_solid_rects(gid, x, y, w, h, scale, name, tsw, tsh, custom_only=custom_hitbox_only)
-        elif is_well and gid in self.well_solid_gids:
-            self.solid_rects.append([x, y, w, h])
-
-        # UV & Geometry Calculation
-        # Always use the base tile's UVs. Scaling is handled by the Mesh vertices (w, h).
-        # This prevents "extracting" the wrong area from the texture atlas.
-        uvs = self._get_final_uvs(gid_full, t_info)
-        verts = [x, y, uvs[0], uvs[1], x+w, y, uvs[2], uvs[3], x+w, y+h, uvs[4], uvs[5], x, y+h, uvs[6], uvs[7]]
-        
-        # Decide Target Mesh (Roof vs FG vs BG vs Ground)
-        if is_roof or gid in self.well_roof_gids:
-            target_l = l_roof
-        elif is_fg or gid in self.well_fg_gids:
-            target_l = l_fg
-        elif is_ground:
-            target_l = l_ground
-        else:
-            target_l = l_bg
-            
-        self._add_to_mesh_data(target_l, cx, cy, tex, verts)
-
-    def _handle_well_split(self, x, y, w, h, opw, oph, scale, tx, ty_i, tsw_h, t_info, cx, cy, l_bg, l_fg, l_roof):
-        tex = t_info[0]
-        pad_x, pad_y = self._get_uv_padding(tex)
-        
-        # Bottom (BG + Solid) - เหลือส่วนล่างไว้ 
-        # th_px_h = 16 (1 block) ส่วนที่บังหัว/ตัว
-        bh_px_h = max(0, int(oph - 16)) 
-        bh_h = bh_px_h * scale
-        bh_inv_y = ty_i + tsw_h - bh_px_h
-        reg_b = tex.get_region(tx, bh_inv_y, opw, bh_px_h)
-        bu0, bv0 = reg_b.tex_coords[0]+pad_x, reg_b.tex_coords[1]+pad_y
-        bu1, bv1 = reg_b.tex_coords[4]-pad_x, reg_b.tex_coords[5]-pad_y
-        
-        b_verts = [x, y, bu0, bv0, x+w, y, bu1, bv0, x+w, y+bh_h, bu1, bv1, x, y+bh_h, bu0, bv1]
-        self._add_to_mesh_data(l_bg, cx, cy, tex, b_verts)
-        
-        hp = 4 * scale
-        self.solid_rects.append([x + hp, y, w - (hp * 2), bh_h])
-
-        # Top (FG)
-        th_px_h = oph - bh_px_h
-        th_h, th_y = th_px_h * scale, y + bh_h
-        th_inv_y = bh_inv_y - th_px_h
-        reg_t = tex.get_region(tx, th_inv_y, opw, th_px_h)
-        tu0, tv0 = reg_t.tex_coords[0]+pad_x, reg_t.tex_coords[1]+pad_y
-        tu1, tv1 = reg_t.tex_coords[4]-pad_x, reg_t.tex_coords[5]-pad_y
-        
-        t_verts = [x, th_y, tu0, tv0, x+w, th_y, tu1, tv0, x+w, th_y+th_h, tu1, tv1, x, th_y+th_h, tu0, tv1]
-        self._add_to_mesh_data(l_roof, cx, cy, tex, t_verts)
-
-    def _get_final_uvs(self, gid_full, t_info):
-        # Always use the tile's own base UVs from the tileset
-        u0, v0, u1, v1 = t_info[1]
-
-        # Apply Flips
-        fh, fv, fd = bool(gid_full & FLIPPED_HORIZONTALLY_FLAG), bool(gid_full & FLIPPED_VERTICALLY_FLAG), bool(gid_full & FLIPPED_DIAGONALLY_FLAG)
-        if fh: u0, u1 = u1, u0
-        if fv: v0, v1 = v1, v0
-        return [u1, v0, u1, v1, u0, v1, u0, v0] if fd else [u0, v0, u1, v0, u1, v1, u0, v1]
-
-    def _add_to_solid_rects(self, gid, x, y, w, h, scale, name, tsw=None, tsh=None, custom_only=False):
-        """Unified hitbox generation. x,y is the Kivy bottom-left of the tile/object.
-        custom_only=True: ใช้เฉพาะ hitbox จาก TSX objectgroup เท่านั้น (ไม่ fallback เป็น full rect)
-        ใช้สำหรับ layer เช่น 'ของ' ใน underground และ 'ขยะ' ใน beyond ที่ต้องการ hitbox แม่นยำ"""
-        if gid in self.tile_hitboxes:
-            # Calculate object-to-tile ratio for scaling the hitboxes
-            # w and h are already world coordinates; (tsw * scale) is world size of one tile
-            ratio_x = (w / (tsw * scale)) if tsw else 1.0
-            ratio_y = (h / (tsh * scale)) if tsh else 1.0
-            
-            for hx, hy, hw, hh in self.tile_hitboxes[gid]:
-                # Scaled relative coordinates (inside the object bounds)
-                shx = hx * ratio_x * scale
-                shy = hy * ratio_y * scale
-                shw = hw * ratio_x * scale
-                shh = hh * ratio_y * scale
-                
-                # Conversion: Tiled (y-down) -> Kivy (y-up relative to item bottom)
-                # k_ry = Object Height - (Box Top Y + Box Height)
-                k_ry = h - (shy + shh)
-                self.solid_rects.append([x + shx, y + k_ry, shw, shh])
-        elif not custom_only:
-            # Fallback for generic solids
-            # (ข้ามถ้าเป็น custom_only mode - เช่น 'ของ' หรือ 'ขยะ' ที่ tile ไม่มี hitbox กำหนดไว้)
-            self.solid_rects.append([x, y, w, h])
-
-    # --- Mesh Management & Rendering ---
-
-    def _add_to_mesh_data(self, m_dict, cx, cy, tex, verts):
-        chunk = m_dict.setdefault((cx, cy), {}).setdefault(tex, {'vertices': [], 'indices': []})
-        off = len(chunk['vertices']) // 4
-        chunk['vertices'].extend(verts)
-        chunk['indices'].extend([off, off+1, off+2, off+2, off+3, off])
-
-    def _merge_layer_to_global(self, layer_chunk_meshes, global_chunk_data, opacity):
-        for coord, tex_dict in layer_chunk_meshes.items():
-            global_chunk_data.setdefault(coord, []).append((opacity, tex_dict))
+    def _build_collision_index(self):
+        """Spatial index สำหรับ query กำแพง (แทนการวน solid_rects ทั้งหมด)"""
+        self.solid_index = SolidRectIndex(self.solid_rects, TILE_SIZE * SPATIAL_HASH_CELL_TILES)
+        self.solid_index.grid = self.walk_grid
+
+    # --- Textures / Meshes ---
+
+    def _load_textures(self, images):
+        """โหลด texture ของรูป tileset คืน [(tex, remap)] ตามลำดับ index ใน payload
+
+        remap = None เมื่อ texture ใช้ UV แบบเดียวกับที่ map_geometry สมมติไว้ (กรณีปกติ)
+        ไม่เช่นนั้นเป็น (uvx, uvy, uvw, uvh) ของ texture จริงสำหรับแปลง UV ใน vertex
+        """
+        texs = []
+        for img_path in images:
+            cimg = CoreImage(img_path)
+            self.core_images.append(cimg)
+            tex = cimg.texture
+            tex.mag_filter = tex.min_filter = 'nearest'
+            uvpos, uvsize = tuple(tex.uvpos), tuple(tex.uvsize)
+            remap = None
+            if uvpos != TEXTURE_UVPOS or uvsize != TEXTURE_UVSIZE:
+                remap = uvpos + uvsize
+            texs.append((tex, remap))
+        return texs
+
+    @staticmethod
+    def _remap_uv(remap, u, v):
+        # UV ของ map_geometry -> UV ของ texture จริง (สัดส่วนบนรูปเท่าเดิม)
+        ox, oy = TEXTURE_UVPOS
+        ow, oh = TEXTURE_UVSIZE
+        x, y, w, h = remap
+        return x + (u - ox) / ow * w, y + (v - oy) / oh * h
+
+    def _remap_vertices(self, remap, verts):
+        verts = list(verts)
+        for i in range(2, len(verts), 4):
+            verts[i], verts[i + 1] = self._remap_uv(remap, verts[i], verts[i + 1])
+        return verts
+
+    def _load_payload(self, payload):
+        texs = self._load_textures(payload['images'])
+
+        for gid, img_idx, u0, v0, u1, v1, tw, th, tx, inv_y in payload['uvs']:
+            tex, remap = texs[img_idx]
+            if remap is not None:
+                (u0, v0), (u1, v1) = self._remap_uv(remap, u0, v0), self._remap_uv(remap, u1, v1)
+            self.textures[gid] = (tex, (u0, v0, u1, v1), tw, th, tx, inv_y)
+
+        self.solid_rects = payload['solid_rects']
+        cols, rows, cells = payload['walk']
+        self.walk_grid = WalkabilityGrid(cols, rows, TILE_SIZE)
+        self.walk_grid.cells = cells
+        self._build_collision_index()
+
+        def as_list(data):
+            return data.tolist() if isinstance(data, array) else data
+
+        def to_chunk_data(chunks):
+            out = {}
+            for coord, layers in chunks.items():
+                out[coord] = []
+                for op, meshes in layers:
+                    tex_dict = {}
+                    for i, v, idx in meshes:
+                        tex, remap = texs[i]
+                        v = as_list(v) if remap is None else self._remap_vertices(remap, v)
+                        tex_dict[tex] = {'vertices': v, 'indices': as_list(idx)}
+                    out[coord].append((op, tex_dict))
+            return out
+
+        chunks = payload['chunks']
+        self.chunk_groups_bg = self._create_mesh_groups(to_chunk_data(chunks['bg']))
+        self.chunk_groups_fg = self._create_mesh_groups(to_chunk_data(chunks['fg']))
+        self.chunk_groups_ground = self._create_mesh_groups(to_chunk_data(chunks['ground']))
+        self.chunk_groups_roof = self._create_mesh_groups(to_chunk_data(chunks['roof']))
 
     def _create_mesh_groups(self, chunk_data):
         groups = {}
@@ -524,24 +151,55 @@ class KivyTiledMap:
             for op, tex_dict in layers:
                 grp.add(Color(1, 1, 1, op))
                 for tex, mesh in tex_dict.items():
+                    self.mesh_bytes += len(mesh['vertices']) * 4 + len(mesh['indices']) * 2
                     grp.add(Mesh(vertices=mesh['vertices'], indices=mesh['indices'], 
                                 fmt=[(b'vPosition', 2, 'float'), (b'vTexCoords0', 2, 'float')],
                                 texture=tex, mode='triangles'))
             groups[coord] = grp
         return groups
 
-    def draw_background(self, canvas): canvas.add(self.bg_group)
-    def draw_foreground(self, canvas): canvas.add(self.fg_group)
-    def draw_ground(self, canvas): canvas.add(self.ground_group)
-    def draw_roof(self, canvas): canvas.add(self.roof_group)
+    def draw_background(self, canvas): self._attach(canvas, self.bg_group)
+    def draw_foreground(self, canvas): self._attach(canvas, self.fg_group)
+    def draw_ground(self, canvas): self._attach(canvas, self.ground_group)
+    def draw_roof(self, canvas): self._attach(canvas, self.roof_group)
+
+    def _attach(self, canvas, group):
+        canvas.add(group)
+        self.attached_to.append((canvas, group))
+
+    def detach(self):
+        """ถอด group ของแมพออกจาก canvas เดิมทั้งหมด (ก่อนนำ instance ไปวาดที่ใหม่)"""
+        for canvas, group in self.attached_to:
+            try:
+                canvas.remove(group)
+            except Exception:
+                pass  # canvas ถูก clear ไปแล้ว
+        self.attached_to = []
+
+    def release(self):
+        """คืนทรัพยากรเมื่อแมพถูกไล่ออกจาก MapRegistry"""
+        self.detach()
+        for g in (self.ground_group, self.bg_group, self.fg_group, self.roof_group):
+            g.clear()
+        self.chunk_groups_bg, self.chunk_groups_fg = {}, {}
+        self.chunk_groups_ground, self.chunk_groups_roof = {}, {}
+        self.visible_chunks = set()
+        self.textures = {}
+        self.core_images = []
+
+    def estimate_bytes(self):
+        """ขนาดโดยประมาณที่แมพนี้กินหน่วยความจำ (texture RGBA + mesh + collision)"""
+        tex_bytes = sum(img.width * img.height * 4 for img in self.core_images)
+        rect_bytes = len(self.solid_rects) * 4 * 8
+        return tex_bytes + self.mesh_bytes + rect_bytes + len(self.walk_grid.cells)
 
     def is_solid(self, x, y, size=TILE_SIZE):
         """คืนค่า True ถ้าจุด (x,y) ทับกับ solid_rect ใดๆ (ใช้ตรวจ hitbox ก่อนสปาวน์/knockback)"""
-        for r in self.solid_rects:
-            if (x < r[0] + r[2] and x + size > r[0] and
-                    y < r[1] + r[3] and y + size > r[1]):
-                return True
-        return False
+        return self.solid_index.tile_blocked_at(x, y, size)
+
+    def is_walkable(self, tx, ty):
+        """คืนค่า True ถ้าช่อง tile (tx, ty) ว่างทั้งช่อง (ดู WalkabilityGrid)"""
+        return self.walk_grid.is_walkable(tx, ty)
 
     def update_chunks(self, cam_x, cam_y):
         ws = TILE_SIZE * 16
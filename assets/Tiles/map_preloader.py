@@ -0,0 +1,64 @@
+import threading
+from kivy.clock import Clock
+from assets.Tiles.map_loader import KivyTiledMap, prepare_map_data
+from assets.Tiles.map_registry import map_registry
+
+
+class MapPreloader:
+    """โหลดแมพล่วงหน้าบน worker thread ก่อนผู้เล่นจะเดินเข้าประตู/portal
+
+    worker ทำงาน CPU ทั้งหมดผ่าน prepare_map_data (JSON, compiled cache หรือ TSX + ถอด layer
+    + สร้าง vertex/UV/solid rect ทั้งแมพเมื่อยังไม่มี cache) แล้วส่งผลกลับมาที่ main thread
+    ด้วย Clock.schedule_once ซึ่งเหลือแค่สร้าง texture/Mesh บน GL thread
+    แมพที่เสร็จแล้วจะถูกเก็บใน map_registry ให้ change_map หยิบไปใช้ได้ทันที
+    """
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.pending = set()
+        self.lock = threading.Lock()
+
+    def prefetch(self, filename, on_ready=None):
+        """เริ่มโหลดแมพเบื้องหลัง คืน True ถ้ามีการเริ่มงานใหม่"""
+        if self.registry.has(filename):
+            return False
+        with self.lock:
+            if filename in self.pending:
+                return False
+            self.pending.add(filename)
+
+        print(f"DEBUG: Prefetching map {filename}")
+        worker = threading.Thread(target=self._worker, args=(filename, on_ready), daemon=True)
+        worker.start()
+        return True
+
+    def is_pending(self, filename):
+        with self.lock:
+            return filename in self.pending
+
+    def _worker(self, filename, on_ready):
+        try:
+            prepared = prepare_map_data(filename)
+        except Exception as e:
+            print(f"DEBUG: Map prefetch failed for {filename}: {e}")
+            prepared = None
+        Clock.schedule_once(lambda dt: self._finish(filename, prepared, on_ready))
+
+    def _finish(self, filename, prepared, on_ready):
+        with self.lock:
+            self.pending.discard(filename)
+        if prepared is None or prepared['error'] is not None:
+            return
+        # ถ้าระหว่างรอ change_map โหลดแมพนี้ไปแล้ว ก็ทิ้งผลลัพธ์นี้ได้เลย
+        if self.registry.has(filename):
+            return
+
+        # vertex พร้อมแล้วทั้งหมด ตรงนี้แค่โหลด texture และสร้าง Mesh ต่อ chunk
+        game_map = KivyTiledMap(filename, prepared=prepared)
+        self.registry.put(filename, game_map)
+        print(f"DEBUG: Map {filename} ready (prefetched)")
+        if on_ready:
+            on_ready(game_map)
+
+
+map_preloader = MapPreloader(map_registry)
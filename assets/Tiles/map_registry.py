@@ -0,0 +1,65 @@
+import os
+from collections import OrderedDict
+from assets.Tiles.map_loader import KivyTiledMap
+from data.settings import MAP_REGISTRY_BUDGET_MB
+
+
+class MapRegistry:
+    """เก็บ KivyTiledMap ที่เพิ่งใช้ไว้ในหน่วยความจำ (รวม chunk InstructionGroup และ texture)
+
+    เข้าแมพเดิมซ้ำ (beyond -> underground -> beyond) จะได้ instance เดิมกลับมาแล้วแค่ attach กลุ่มใหม่
+    ถ้าขนาดรวมเกิน budget จะไล่แมพที่ไม่ได้ใช้นานที่สุดออก (LRU) แต่จะไม่ยุ่งกับแมพที่กำลังแสดงอยู่
+    """
+
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self.maps = OrderedDict()  # normalized filename -> KivyTiledMap
+        self.current_key = None    # แมพที่ get() คืนไปล่าสุด (กำลังแสดงอยู่ ห้าม release)
+
+    def get(self, filename):
+        key = os.path.normpath(filename)
+        self.current_key = key
+        game_map = self.maps.get(key)
+        if game_map is not None:
+            self.maps.move_to_end(key)
+            game_map.detach()
+            print(f"DEBUG: Reusing cached map {filename}")
+            return game_map
+
+        game_map = KivyTiledMap(filename)
+        if game_map.width and game_map.height:
+            self.maps[key] = game_map
+            self._evict()
+        return game_map
+
+    def has(self, filename):
+        return os.path.normpath(filename) in self.maps
+
+    def put(self, filename, game_map):
+        """เพิ่มแมพที่สร้างเสร็จแล้ว (เช่นจาก MapPreloader)"""
+        key = os.path.normpath(filename)
+        if key in self.maps or not (game_map.width and game_map.height):
+            return
+        self.maps[key] = game_map
+        self._evict()
+
+    def total_bytes(self):
+        return sum(m.estimate_bytes() for m in self.maps.values())
+
+    def _evict(self):
+        while len(self.maps) > 1 and self.total_bytes() > self.budget_bytes:
+            # ไล่ตัวที่เก่าที่สุดที่ไม่ได้ถูกวาดอยู่บนจอ (แมพปัจจุบันห้ามถูก release)
+            victim = next((k for k in self.maps if k != self.current_key), None)
+            if victim is None:
+                break
+            old_map = self.maps.pop(victim)
+            old_map.release()
+            print(f"DEBUG: Evicted map {victim} from registry")
+
+    def clear(self):
+        for m in self.maps.values():
+            m.release()
+        self.maps.clear()
+
+
+map_registry = MapRegistry(MAP_REGISTRY_BUDGET_MB * 1024 * 1024)
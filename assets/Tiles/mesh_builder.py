@@ -0,0 +1,108 @@
+import sys
+import base64
+import zlib
+from array import array
+from itertools import compress
+
+# ตัวสร้าง mesh แบบ bulk สำหรับ tile layer (ใช้แทน _get_layer_instances + _process_tile ทีละช่อง)
+# ผลลัพธ์ (solid_rects, vertex/index ของแต่ละ chunk และลำดับข้อมูล) ต้องเหมือน path เดิมทุกค่า
+# object layer ยังใช้ path เดิมเพราะมีจำนวนน้อยและมีกรณีพิเศษ (บ่อน้ำ, ขนาด object)
+
+FLIP_MASK = 0x1FFFFFFF  # ~ALL_FLAGS สำหรับ gid 32 บิต
+
+
+def decode_tile_gids(layer, width, height):
+    """ถอด data ของ tile layer เป็น array('I') ทั้งก้อน (แทน struct.unpack + tuple)"""
+    data = layer.get('data')
+    if layer.get('encoding') != 'base64':
+        return data if isinstance(data, list) else []
+
+    raw = base64.b64decode(data)
+    comp = layer.get('compression')
+    if comp == 'zlib': raw = zlib.decompress(raw)
+    elif comp == 'gzip':
+        import gzip
+        raw = gzip.decompress(raw)
+
+    gids = array('I')
+    gids.frombytes(raw[:width * height * 4])
+    if sys.byteorder == 'big':
+        gids.byteswap()  # Tiled เก็บเป็น little-endian
+    return gids
+
+
+def build_tile_layer(tmap, layer, scale, chunk_size_pixels, is_solid, is_fg, is_well, name,
+                     l_bg, l_fg, l_ground, is_ground, is_roof, l_roof, custom_hitbox_only=False):
+    """เทียบเท่า _get_layer_instances + _process_tile สำหรับ tile layer หนึ่งชั้น"""
+    w = layer.get('width', tmap.width)
+    h = layer.get('height', tmap.height)
+    tiles = tmap.decoded_layers.get(id(layer))
+    if tiles is None:
+        tiles = decode_tile_gids(layer, w, h)
+    if not tiles: return
+
+    # พิกัดของแต่ละคอลัมน์/แถว คำนวณสูตรเดียวกับ path เดิมเพื่อให้ได้ float ตรงกันทุกบิต
+    map_h_px = tmap.height * tmap.tile_h
+    n_rows = (len(tiles) + w - 1) // w
+    xs = [col * tmap.tile_w * scale for col in range(w)]
+    ys = [(map_h_px - (row + 1) * tmap.tile_h) * scale for row in range(n_rows)]
+
+    textures = tmap.textures
+    solid_rects = tmap.solid_rects
+    tile_hitboxes = tmap.tile_hitboxes
+    well_roof, well_fg, well_solid = tmap.well_roof_gids, tmap.well_fg_gids, tmap.well_solid_gids
+
+    prepared = {}  # gid_full -> (tex, uvs, gw, gh, target, t_id, solid_mode, gid, tsw, tsh) หรือ None
+    chunk_cache = {}  # (t_id, cx, cy, tex) -> {'vertices', 'indices'}
+
+    for i in compress(range(len(tiles)), tiles):
+        gid_full = tiles[i]
+        info = prepared.get(gid_full, False)
+        if info is False:
+            gid = gid_full & FLIP_MASK
+            t_info = textures.get(gid)
+            if not t_info:
+                info = None
+            else:
+                tex, _, tsw, tsh, _, _ = t_info
+                if is_roof or gid in well_roof:
+                    target, t_id = l_roof, 0
+                elif is_fg or gid in well_fg:
+                    target, t_id = l_fg, 1
+                elif is_ground:
+                    target, t_id = l_ground, 2
+                else:
+                    target, t_id = l_bg, 3
+                # 0 = ไม่มี hitbox, 1 = full rect, 2 = ผ่าน _add_to_solid_rects (custom hitbox)
+                if is_solid:
+                    solid_mode = 2 if (gid in tile_hitboxes or custom_hitbox_only) else 1
+                elif is_well and gid in well_solid:
+                    solid_mode = 1
+                else:
+                    solid_mode = 0
+                uvs = tmap._get_final_uvs(gid_full, t_info)
+                info = (tex, uvs, tsw * scale, tsh * scale, target, t_id, solid_mode, gid, tsw, tsh)
+            prepared[gid_full] = info
+        if info is None: continue
+
+        tex, uvs, gw, gh, target, t_id, solid_mode, gid, tsw, tsh = info
+        x = xs[i % w]
+        y = ys[i // w]
+
+        if solid_mode == 1:
+            solid_rects.append([x, y, gw, gh])
+        elif solid_mode == 2:
+            tmap._add_to_solid_rects(gid, x, y, gw, gh, scale, name, tsw, tsh, custom_only=custom_hitbox_only)
+
+        cx, cy = int(x // chunk_size_pixels), int(y // chunk_size_pixels)
+        key = (t_id, cx, cy, tex)
+        chunk = chunk_cache.get(key)
+        if chunk is None:
+            chunk = target.setdefault((cx, cy), {}).setdefault(tex, {'vertices': [], 'indices': []})
+            chunk_cache[key] = chunk
+
+        verts = chunk['vertices']
+        off = len(verts) // 4
+        xw, yh = x + gw, y + gh
+        verts.extend((x, y, uvs[0], uvs[1], xw, y, uvs[2], uvs[3], xw, yh, uvs[4], uvs[5], x, yh, uvs[6], uvs[7]))
+        chunk['indices'].extend((off, off + 1, off + 2, off + 2, off + 3, off))
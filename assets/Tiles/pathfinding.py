@@ -0,0 +1,201 @@
+import heapq
+from array import array
+from collections import OrderedDict, deque
+from assets.Tiles.walkability import TILE_FREE
+
+# ทิศทางบน grid (พิกัดโลกเป็น y-up: dy=+1 คือขึ้น)
+NEIGHBOURS = ((0, 1), (0, -1), (1, 0), (-1, 0))
+UNREACHED = 0xFFFF
+
+
+def pos_to_tile(x, y, tile_size):
+    """ช่อง tile ที่ใกล้มุมล่างซ้ายของตัวละครที่สุด (รองรับตำแหน่งที่ไม่ตรง grid)"""
+    half = tile_size / 2
+    return int((x + half) // tile_size), int((y + half) // tile_size)
+
+
+class FlowField:
+    """BFS จากช่องของผู้เล่นออกไปรอบๆ บน WalkabilityGrid
+
+    คำนวณใหม่เฉพาะตอนผู้เล่นเปลี่ยนช่อง (หรือเปลี่ยนแมพ) ศัตรูทุกตัวอ่านก้าวถัดไปได้ใน O(1)
+    จำกัดระยะค้นหาไว้ที่ max_steps ช่อง เพราะศัตรูไล่เฉพาะในรัศมีตรวจจับ
+    """
+
+    def __init__(self, max_steps):
+        self.max_steps = max_steps
+        self.grid = None
+        self.origin = None
+        self.dist = array('H')
+
+    def update(self, grid, player_pos):
+        """คืน True ถ้ามีการคำนวณ field ใหม่"""
+        origin = pos_to_tile(player_pos[0], player_pos[1], grid.tile_size)
+        if grid is self.grid and origin == self.origin:
+            return False
+        self.grid = grid
+        self.origin = origin
+        self._rebuild()
+        return True
+
+    def _rebuild(self):
+        grid = self.grid
+        cols, rows, cells = grid.cols, grid.rows, grid.cells
+        dist = array('H', [UNREACHED]) * (cols * rows)
+        self.dist = dist
+        ox, oy = self.origin
+        if not (0 <= ox < cols and 0 <= oy < rows):
+            return
+
+        dist[oy * cols + ox] = 0
+        queue = deque([(ox, oy)])
+        max_steps = self.max_steps
+        while queue:
+            x, y = queue.popleft()
+            d = dist[y * cols + x] + 1
+            if d > max_steps: continue
+            for dx, dy in NEIGHBOURS:
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < cols and 0 <= ny < rows:
+                    i = ny * cols + nx
+                    if dist[i] == UNREACHED and cells[i] == TILE_FREE:
+                        dist[i] = d
+                        queue.append((nx, ny))
+
+    def distance(self, tx, ty):
+        grid = self.grid
+        if grid is None or not (0 <= tx < grid.cols and 0 <= ty < grid.rows):
+            return UNREACHED
+        return self.dist[ty * grid.cols + tx]
+
+    def next_step(self, pos):
+        """คืน (dx, dy) หน่วยเป็นช่อง ที่พาเข้าใกล้ผู้เล่นที่สุด หรือ None ถ้าอยู่นอก field"""
+        if self.grid is None: return None
+        tx, ty = pos_to_tile(pos[0], pos[1], self.grid.tile_size)
+        here = self.distance(tx, ty)
+        best, best_d = None, here
+        for dx, dy in NEIGHBOURS:
+            d = self.distance(tx + dx, ty + dy)
+            if d < best_d:
+                best, best_d = (dx, dy), d
+        return best
+
+
+class AStarPathfinder:
+    """A* บน WalkabilityGrid พร้อม cache แยกตามเป้าหมาย
+
+    path ที่หาได้จะถูกเก็บทุกช่องระหว่างทาง (suffix ของ path ก็เป็น path สั้นสุดไปเป้าเดียวกัน)
+    ตัวอื่นที่ไล่เป้าเดียวกันจึงมักได้ผลจาก cache ทันที
+    """
+
+    def __init__(self, max_nodes=2000, max_targets=8):
+        self.max_nodes = max_nodes
+        self.max_targets = max_targets
+        self.grid = None
+        self.cache = OrderedDict()  # goal -> {start: next tile หรือ None ถ้าไปไม่ถึง}
+
+    def find_path(self, grid, start, goal):
+        """คืน list ของช่องจาก start ถึง goal (ไม่รวม start) หรือ None ถ้าหาไม่เจอภายใน max_nodes"""
+        if grid is not self.grid:
+            self.grid = grid
+            self.cache.clear()
+
+        per_goal = self.cache.get(goal)
+        if per_goal is not None:
+            self.cache.move_to_end(goal)
+            if start in per_goal and per_goal[start] is None:
+                return None  # เคยค้นแล้วไปไม่ถึง ไม่ต้องค้นซ้ำจนกว่าเป้าจะเปลี่ยน
+            path = self._follow(per_goal, start, goal)
+            if path is not None:
+                return path
+        else:
+            per_goal = self.cache[goal] = {}
+            while len(self.cache) > self.max_targets:
+                self.cache.popitem(last=False)
+
+        path = self._search(grid, start, goal)
+        if path is None:
+            per_goal[start] = None
+            return None
+
+        prev = start
+        for step in path:
+            per_goal[prev] = step
+            prev = step
+        return path
+
+    def next_step(self, grid, start, goal):
+        path = self.find_path(grid, start, goal)
+        if not path: return None
+        return path[0][0] - start[0], path[0][1] - start[1]
+
+    def _follow(self, per_goal, start, goal):
+        if start not in per_goal: return None
+        path, node = [], start
+        while node != goal:
+            node = per_goal.get(node)
+            if node is None: return None
+            path.append(node)
+        return path
+
+    def _search(self, grid, start, goal):
+        cols, rows, cells = grid.cols, grid.rows, grid.cells
+        gx, gy = goal
+        if not (0 <= gx < cols and 0 <= gy < rows): return None
+
+        def h(n):
+            return abs(n[0] - gx) + abs(n[1] - gy)
+
+        open_heap = [(h(start), 0, start)]
+        came_from = {start: None}
+        g_score = {start: 0}
+        expanded = 0
+        while open_heap:
+            _, g, node = heapq.heappop(open_heap)
+            if node == goal:
+                path = []
+                while node != start:
+                    path.append(node)
+                    node = came_from[node]
+                path.reverse()
+                return path
+            if g > g_score.get(node, g): continue
+            expanded += 1
+            if expanded > self.max_nodes: return None
+            x, y = node
+            for dx, dy in NEIGHBOURS:
+                nx, ny = x + dx, y + dy
+                if not (0 <= nx < cols and 0 <= ny < rows): continue
+                # ช่องของเป้าหมายเดินเข้าได้เสมอ (ผู้เล่นอาจยืนคร่อมช่อง partial)
+                if cells[ny * cols + nx] != TILE_FREE and (nx, ny) != goal: continue
+                ng = g + 1
+                nb = (nx, ny)
+                if ng < g_score.get(nb, ng + 1):
+                    g_score[nb] = ng
+                    came_from[nb] = node
+                    heapq.heappush(open_heap, (ng + h(nb), ng, nb))
+        return None
+
+
+class Pathfinder:
+    """จุดรวมของ flow field (ศัตรูหลายตัว) และ A* (fallback รายตัว) สำหรับแมพปัจจุบัน"""
+
+    def __init__(self, max_steps, max_nodes=2000):
+        self.flow = FlowField(max_steps)
+        self.astar = AStarPathfinder(max_nodes=max_nodes)
+        self.grid = None
+        self.goal = None
+
+    def update(self, grid, player_pos):
+        """เรียกครั้งเดียวต่อเฟรมก่อนอัปเดตศัตรู"""
+        self.grid = grid
+        self.goal = pos_to_tile(player_pos[0], player_pos[1], grid.tile_size)
+        self.flow.update(grid, player_pos)
+
+    def next_step(self, pos):
+        step = self.flow.next_step(pos)
+        if step is not None or self.grid is None:
+            return step
+        # นอกระยะ flow field: ใช้ A* (cache ตามช่องเป้าหมาย)
+        start = pos_to_tile(pos[0], pos[1], self.grid.tile_size)
+        if start == self.goal: return None
+        return self.astar.next_step(self.grid, start, self.goal)
@@ -0,0 +1,131 @@
+import math
+
+
+class SolidRectIndex:
+    """Uniform-grid spatial hash ของ solid_rects (สร้างครั้งเดียวตอนโหลดแมพ)
+
+    แต่ละ rect ถูกบันทึกลงทุก cell ที่มันทับ (รวมขอบ) เพื่อให้ query ใดๆ
+    ดูแค่ cell รอบตัวแทนการวนทั้ง list ทุกเฟรม
+    """
+
+    def __init__(self, rects, cell_size):
+        self.rects = rects
+        self.cell_size = float(cell_size)
+        self.cells = {}  # (cx, cy) -> list of rect index
+        self.grid = None  # WalkabilityGrid (ตั้งโดย KivyTiledMap หลัง rasterize)
+        self.rebuild()
+
+    def rebuild(self):
+        self.cells = {}
+        cs = self.cell_size
+        for i, (rx, ry, rw, rh) in enumerate(self.rects):
+            x0, x1 = int(math.floor(rx / cs)), int(math.floor((rx + rw) / cs))
+            y0, y1 = int(math.floor(ry / cs)), int(math.floor((ry + rh) / cs))
+            for cx in range(x0, x1 + 1):
+                for cy in range(y0, y1 + 1):
+                    self.cells.setdefault((cx, cy), []).append(i)
+
+    # --- Queries ---
+
+    def _candidates(self, x, y, w, h):
+        cs = self.cell_size
+        x0, x1 = int(math.floor(x / cs)), int(math.floor((x + w) / cs))
+        y0, y1 = int(math.floor(y / cs)), int(math.floor((y + h) / cs))
+        cells = self.cells
+        if x0 == x1 and y0 == y1:
+            return cells.get((x0, y0), ())
+        seen = set()
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket: seen.update(bucket)
+        return seen
+
+    def query_rect(self, x, y, w, h):
+        """คืน list ของ rect ที่ทับกับกล่อง (x, y, w, h) แบบเต็มพื้นที่ (ขอบชนกันไม่นับ)"""
+        hits = []
+        rects = self.rects
+        for i in self._candidates(x, y, w, h):
+            r = rects[i]
+            if x < r[0] + r[2] and x + w > r[0] and y < r[1] + r[3] and y + h > r[1]:
+                hits.append(r)
+        return hits
+
+    def tile_blocked_at(self, x, y, size):
+        """เช็คกล่องขนาด 1 tile ที่ (x, y): ใช้ bitmap ถ้าตรง grid ไม่งั้นเช็ค rect จริง"""
+        grid = self.grid
+        if grid is not None and size == grid.tile_size:
+            blocked = grid.tile_blocked_at(x, y)
+            if blocked is not None:
+                return blocked
+        return self.any_overlap(x, y, size, size)
+
+    def any_overlap(self, x, y, w, h):
+        """เหมือน query_rect แต่หยุดทันทีที่เจอ rect แรก"""
+        rects = self.rects
+        for i in self._candidates(x, y, w, h):
+            r = rects[i]
+            if x < r[0] + r[2] and x + w > r[0] and y < r[1] + r[3] and y + h > r[1]:
+                return True
+        return False
+
+    def segment_hits(self, x1, y1, x2, y2):
+        """คืน rect ที่กล่องครอบทับกับเส้น (x1,y1)-(x2,y2)
+
+        เดิน cell ตามเส้นแบบ DDA (Amanatides-Woo) แล้วกรองด้วย bounding box ของเส้น
+        ผลลัพธ์เป็น candidate สำหรับเช็คตัดขอบแบบละเอียดต่อ (เช่น Enemy.line_intersects_rect)
+        """
+        cs = self.cell_size
+        min_x, max_x = min(x1, x2), max(x1, x2)
+        min_y, max_y = min(y1, y2), max(y1, y2)
+
+        cx, cy = int(math.floor(x1 / cs)), int(math.floor(y1 / cs))
+        end_cx, end_cy = int(math.floor(x2 / cs)), int(math.floor(y2 / cs))
+        dx, dy = x2 - x1, y2 - y1
+        step_x = 1 if dx > 0 else -1
+        step_y = 1 if dy > 0 else -1
+        if dx != 0:
+            next_x = (cx + (1 if dx > 0 else 0)) * cs
+            t_max_x = (next_x - x1) / dx
+            t_delta_x = cs / abs(dx)
+        else:
+            t_max_x = t_delta_x = math.inf
+        if dy != 0:
+            next_y = (cy + (1 if dy > 0 else 0)) * cs
+            t_max_y = (next_y - y1) / dy
+            t_delta_y = cs / abs(dy)
+        else:
+            t_max_y = t_delta_y = math.inf
+
+        seen = set()
+        cells = self.cells
+        # จำนวน cell สูงสุดที่เส้นผ่านได้ (กันลูปค้างจาก floating error)
+        limit = abs(end_cx - cx) + abs(end_cy - cy) + 1
+        for _ in range(limit):
+            bucket = cells.get((cx, cy))
+            if bucket: seen.update(bucket)
+            if t_max_x < t_max_y:
+                t_max_x += t_delta_x
+                cx += step_x
+            elif t_max_y < t_max_x:
+                t_max_y += t_delta_y
+                cy += step_y
+            else:
+                # ผ่านมุม cell พอดี: เก็บ cell ข้างเคียงทั้งสองด้วยเพื่อไม่ให้พลาด
+                for nb in ((cx + step_x, cy), (cx, cy + step_y)):
+                    bucket = cells.get(nb)
+                    if bucket: seen.update(bucket)
+                t_max_x += t_delta_x
+                t_max_y += t_delta_y
+                cx += step_x
+                cy += step_y
+        bucket = cells.get((end_cx, end_cy))
+        if bucket: seen.update(bucket)
+
+        hits = []
+        rects = self.rects
+        for i in seen:
+            r = rects[i]
+            if r[0] + r[2] < min_x or r[0] > max_x or r[1] + r[3] < min_y or r[1] > max_y: continue
+            hits.append(r)
+        return hits
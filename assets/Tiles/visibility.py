@@ -0,0 +1,140 @@
+import math
+from assets.Tiles.walkability import TILE_SOLID, TILE_PARTIAL
+from assets.Tiles.pathfinding import pos_to_tile
+
+# ระยะเยื้องจากกึ่งกลางช่องสำหรับรังสี "แอบมอง" (เหมือน Enemy.has_line_of_sight เดิม: +2 และ +TILE_SIZE-2)
+PEEK_INSET = 2
+
+
+def _ccw(ax, ay, bx, by, cx, cy):
+    val = (cy - ay) * (bx - ax) - (by - ay) * (cx - ax)
+    if abs(val) < 1e-9: return 0 # ขนานหรือทับ
+    return 1 if val > 0 else -1
+
+
+def segment_crosses_rect(x1, y1, x2, y2, r):
+    """เส้น (x1,y1)-(x2,y2) ตัดขอบใดขอบหนึ่งของ rect หรือไม่
+
+    เงื่อนไขเดียวกับ EnemyLogic.line_intersects_rect (CCW ทีละขอบ) ผลจึงตรงกับ ray แบบเดิมทุกกรณี
+    รวมถึงเส้นที่แตะมุม rect พอดี
+    """
+    rx, ry, rw, rh = r
+    xr, yt = rx + rw, ry + rh
+    for ax, ay, bx, by in ((rx, ry, xr, ry), (xr, ry, xr, yt), (xr, yt, rx, yt), (rx, yt, rx, ry)):
+        if (_ccw(x1, y1, ax, ay, bx, by) != _ccw(x2, y2, ax, ay, bx, by) and
+                _ccw(x1, y1, x2, y2, ax, ay) != _ccw(x1, y1, x2, y2, bx, by)):
+            return True
+    return False
+
+
+class VisibilityService:
+    """Line-of-sight บน walkability grid ของแมพ พร้อม memo ตาม (from_tile, to_tile, map_version)
+
+    รังสีเดินผ่านช่องด้วย DDA: ช่อง TILE_SOLID บังทันที ช่อง TILE_PARTIAL เช็คเฉพาะส่วนของ rect ที่อยู่ในช่องนั้น
+    รังสีที่ผ่านมุมช่องพอดีนับทั้งสองช่องที่แตะมุม (แบบเดิมนับการแตะมุม rect ว่าบัง)
+    ช่องต้นทางและปลายทางไม่นับ (ตัวละครยืนอยู่) ผลลัพธ์ที่ได้ใช้ซ้ำได้ทั้งในเฟรมเดียวกันและข้ามเฟรม
+    ตราบใดที่ทั้งสองฝั่งยังอยู่ช่องเดิม
+    """
+
+    def __init__(self, max_entries=8192):
+        self.max_entries = max_entries
+        self.game_map = None
+        self.map_version = 0
+        self.cache = {}
+        self.hits = 0
+        self.misses = 0
+
+    def bind(self, game_map):
+        """ผูกกับแมพปัจจุบัน เปลี่ยนแมพเมื่อไหร่ version จะเพิ่มและ cache เดิมใช้ไม่ได้"""
+        if game_map is not self.game_map:
+            self.game_map = game_map
+            self.map_version += 1
+            self.cache.clear()
+
+    def has_line_of_sight(self, from_pos, to_pos):
+        grid = self.game_map.walk_grid
+        ts = grid.tile_size
+        key = (pos_to_tile(from_pos[0], from_pos[1], ts), pos_to_tile(to_pos[0], to_pos[1], ts), self.map_version)
+        result = self.cache.get(key)
+        if result is not None:
+            self.hits += 1
+            return result
+
+        self.misses += 1
+        if len(self.cache) >= self.max_entries:
+            self.cache.clear()
+        result = self._compute(key[0], key[1])
+        self.cache[key] = result
+        return result
+
+    def batch_line_of_sight(self, sources, target_pos):
+        """LOS จากหลายจุด (เช่นศัตรูทุกตัว) ไปยังเป้าหมายเดียวในครั้งเดียว คืน list ของ bool"""
+        return [self.has_line_of_sight(pos, target_pos) for pos in sources]
+
+    def _compute(self, from_tile, to_tile):
+        if from_tile == to_tile:
+            return True
+        ts = self.game_map.walk_grid.tile_size
+        half = ts / 2
+        fx, fy = from_tile[0] * ts + half, from_tile[1] * ts + half
+        tx, ty = to_tile[0] * ts + half, to_tile[1] * ts + half
+
+        # 1. เส้นกลาง (Center to Center)
+        if self._ray_clear(fx, fy, tx, ty, from_tile, to_tile):
+            return True
+        # 2. แอบมองจากมุมที่หดเข้ามา (Edge peek) เหมือนของเดิม
+        off = half - PEEK_INSET
+        return (self._ray_clear(fx - off, fy - off, tx, ty, from_tile, to_tile) or
+                self._ray_clear(fx + off, fy + off, tx, ty, from_tile, to_tile))
+
+    def _ray_clear(self, x1, y1, x2, y2, from_tile, to_tile):
+        grid = self.game_map.walk_grid
+        ts = grid.tile_size
+        cx, cy = int(math.floor(x1 / ts)), int(math.floor(y1 / ts))
+        end = (int(math.floor(x2 / ts)), int(math.floor(y2 / ts)))
+        dx, dy = x2 - x1, y2 - y1
+        step_x = 1 if dx > 0 else -1
+        step_y = 1 if dy > 0 else -1
+        t_max_x = ((cx + (dx > 0)) * ts - x1) / dx if dx else math.inf
+        t_max_y = ((cy + (dy > 0)) * ts - y1) / dy if dy else math.inf
+        t_delta_x = ts / abs(dx) if dx else math.inf
+        t_delta_y = ts / abs(dy) if dy else math.inf
+
+        for _ in range(abs(end[0] - cx) + abs(end[1] - cy) + 1):
+            if self._tile_blocks(x1, y1, x2, y2, cx, cy, from_tile, to_tile):
+                return False
+            if (cx, cy) == end:
+                break
+            if abs(t_max_x - t_max_y) < 1e-9:
+                # ผ่านมุมช่องพอดี: DDA ไปต่อได้แค่แกนเดียว (ขึ้นกับเศษ float) อีกช่องที่แตะมุมเดียวกันต้องเช็คด้วย
+                if (self._tile_blocks(x1, y1, x2, y2, cx + step_x, cy, from_tile, to_tile) or
+                        self._tile_blocks(x1, y1, x2, y2, cx, cy + step_y, from_tile, to_tile)):
+                    return False
+            if t_max_x < t_max_y:
+                t_max_x += t_delta_x
+                cx += step_x
+            else:
+                t_max_y += t_delta_y
+                cy += step_y
+        return True
+
+    def _tile_blocks(self, x1, y1, x2, y2, cx, cy, from_tile, to_tile):
+        tile = (cx, cy)
+        if tile == from_tile or tile == to_tile:
+            return False
+        st = self.game_map.walk_grid.state(cx, cy)
+        if st == TILE_SOLID:
+            return True
+        return st == TILE_PARTIAL and self._partial_blocks(x1, y1, x2, y2, cx, cy)
+
+    def _partial_blocks(self, x1, y1, x2, y2, cx, cy):
+        ts = self.game_map.walk_grid.tile_size
+        tx0, ty0 = cx * ts, cy * ts
+        tx1, ty1 = tx0 + ts, ty0 + ts
+        for rx, ry, rw, rh in self.game_map.solid_index.query_rect(tx0, ty0, ts, ts):
+            # ตัด rect ให้เหลือแค่ส่วนในช่องนี้ ส่วนที่เลยออกไปอยู่ในช่องอื่น (หรือช่องต้นทาง/ปลายทางที่ไม่นับ)
+            x0, y0 = max(rx, tx0), max(ry, ty0)
+            clipped = (x0, y0, min(rx + rw, tx1) - x0, min(ry + rh, ty1) - y0)
+            if segment_crosses_rect(x1, y1, x2, y2, clipped):
+                return True
+        return False
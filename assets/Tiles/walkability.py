@@ -0,0 +1,68 @@
+import math
+
+# ค่าในแต่ละช่องของ walkability grid
+TILE_FREE = 0      # เดินได้ ไม่มี hitbox ทับเลย
+TILE_SOLID = 1     # มี rect ทับเต็มช่อง
+TILE_PARTIAL = 2   # มี hitbox ย่อย (TSX objectgroup) ทับบางส่วนของช่อง
+
+
+class WalkabilityGrid:
+    """Bitmap ขนาด cols x rows tile (1 byte ต่อช่อง) ที่ rasterize มาจาก solid_rects
+
+    ตัวละครที่เดินทีละ TILE_SIZE และยืนตรง grid ใช้ lookup เดียวแทนการเช็ค AABB
+    ช่อง TILE_PARTIAL เก็บแยกไว้สำหรับ query ที่เล็กกว่า 1 tile (ต้องเช็ค rect จริงต่อ)
+    สำหรับตัวที่กินเต็ม 1 tile ช่อง partial ถือว่าชนเสมอ เพราะมี rect ทับช่องนั้นแน่นอน
+    """
+
+    def __init__(self, cols, rows, tile_size):
+        self.cols = max(0, int(cols))
+        self.rows = max(0, int(rows))
+        self.tile_size = tile_size
+        self.cells = bytearray(self.cols * self.rows)
+
+    def rasterize(self, rects):
+        ts = self.tile_size
+        cols, rows, cells = self.cols, self.rows, self.cells
+        for rx, ry, rw, rh in rects:
+            if rw <= 0 or rh <= 0: continue
+            x0 = max(0, int(math.floor(rx / ts)))
+            x1 = min(cols - 1, int(math.ceil((rx + rw) / ts)) - 1)
+            y0 = max(0, int(math.floor(ry / ts)))
+            y1 = min(rows - 1, int(math.ceil((ry + rh) / ts)) - 1)
+            for ty in range(y0, y1 + 1):
+                tyy = ty * ts
+                # ใช้เงื่อนไขเดียวกับ AABB เดิม (ขอบชนกันไม่นับว่าทับ)
+                if not (tyy < ry + rh and tyy + ts > ry): continue
+                full_y = ry <= tyy and ry + rh >= tyy + ts
+                row = ty * cols
+                for tx in range(x0, x1 + 1):
+                    txx = tx * ts
+                    if not (txx < rx + rw and txx + ts > rx): continue
+                    if full_y and rx <= txx and rx + rw >= txx + ts:
+                        cells[row + tx] = TILE_SOLID
+                    elif cells[row + tx] == TILE_FREE:
+                        cells[row + tx] = TILE_PARTIAL
+
+    def state(self, tx, ty):
+        """คืนสถานะช่อง (TILE_FREE/SOLID/PARTIAL) หรือ None ถ้าอยู่นอกแมพ"""
+        if 0 <= tx < self.cols and 0 <= ty < self.rows:
+            return self.cells[ty * self.cols + tx]
+        return None
+
+    def is_walkable(self, tx, ty):
+        """True ถ้าตัวละครขนาด 1 tile ยืนที่ช่อง (tx, ty) ได้โดยไม่ทับ hitbox ใดๆ"""
+        return self.state(tx, ty) == TILE_FREE
+
+    def tile_blocked_at(self, x, y):
+        """เช็คการชนของกล่อง 1 tile ที่พิกัดโลก (x, y)
+
+        คืน True/False ถ้าตำแหน่งตรง grid และอยู่ในแมพ
+        คืน None ถ้าต้องไปเช็ค rect แบบละเอียดแทน (ไม่ตรง grid หรือนอกแมพ)
+        """
+        ts = self.tile_size
+        if x % ts or y % ts:
+            return None
+        st = self.state(int(x // ts), int(y // ts))
+        if st is None:
+            return None
+        return st != TILE_FREE
@@ -0,0 +1,109 @@
+import os
+import threading
+from kivy.core.audio import SoundLoader
+from data.settings import SOUND_VOICE_LIMITS
+
+
+class SoundBank:
+    """คลังเสียงกลางของเกม: โหลดไฟล์เสียงแต่ละไฟล์ครั้งเดียวแล้วแจก handle ที่ใช้ร่วมกัน
+
+    - load(path, volume, loop) คืน Sound ตัวเดิมทุกครั้งที่ขอด้วยค่าเดียวกัน (สร้าง Player ใหม่ไม่ต้องโหลด WAV ซ้ำ)
+    - preload_async() โหลดไฟล์ล่วงหน้าบน thread เบื้องหลังตอนเปิดเกม ตัวที่โหลดไว้แล้ว
+      จะถูก "จอง" ให้คำขอแรกของไฟล์นั้นโดยไม่ต้องอ่านดิสก์
+    - play(sound, category) จำกัดจำนวนเสียงที่เล่นพร้อมกันต่อหมวด (SOUND_VOICE_LIMITS)
+    """
+
+    def __init__(self):
+        self.handles = {}    # (path, volume, loop) -> Sound หรือ None ถ้าโหลดไม่ได้
+        self.unclaimed = {}  # path -> [Sound, ...] ที่ preload แล้วแต่ยังไม่มีใครขอ
+        self.voices = {}     # category -> [Sound, ...] ที่กำลังเล่นอยู่ (เรียงจากเก่าไปใหม่)
+        self._lock = threading.Lock()
+        self._preload_thread = None
+
+    def load(self, path, volume=None, loop=False):
+        key = (path, volume, loop)
+        with self._lock:
+            if key in self.handles:
+                return self.handles[key]
+            pool = self.unclaimed.get(path)
+            sound = pool.pop() if pool else SoundLoader.load(path)
+            if sound:
+                if volume is not None:
+                    sound.volume = volume
+                sound.loop = loop
+            self.handles[key] = sound
+            return sound
+
+    def load_dir(self, directory, volume=None):
+        """โหลดไฟล์ .wav ทุกไฟล์ในโฟลเดอร์ (เรียงตามชื่อ) คืนเฉพาะตัวที่โหลดได้"""
+        if not os.path.exists(directory):
+            return []
+        sounds = []
+        for name in sorted(os.listdir(directory)):
+            if name.lower().endswith('.wav'):
+                s = self.load(os.path.join(directory, name), volume)
+                if s:
+                    sounds.append(s)
+        return sounds
+
+    def preload_async(self, paths=(), dirs=()):
+        """เริ่มโหลดไฟล์ล่วงหน้าบน thread เบื้องหลัง (เรียกครั้งเดียวตอนเปิดเกม)"""
+        files = list(paths)
+        for d in dirs:
+            if os.path.exists(d):
+                files.extend(os.path.join(d, n) for n in sorted(os.listdir(d)) if n.lower().endswith('.wav'))
+        self._preload_thread = threading.Thread(target=self._preload, args=(files,), daemon=True)
+        self._preload_thread.start()
+
+    def _preload(self, files):
+        loaded = 0
+        for path in files:
+            if not os.path.exists(path):
+                continue
+            with self._lock:
+                if self._claimed(path):
+                    continue
+            # อ่าน/ถอดไฟล์นอก lock: load() บน main thread ไม่ต้องรอไฟล์ที่ตัวเองไม่ได้ขอ
+            try:
+                sound = SoundLoader.load(path)
+            except Exception as e:
+                print(f"DEBUG: Sound preload failed for {path}: {e}")
+                continue
+            if not sound:
+                continue
+            with self._lock:
+                # มีคนขอไฟล์นี้ไปแล้วระหว่างที่โหลด (load() โหลดเองไปแล้ว) ทิ้งตัวสำรอง
+                if self._claimed(path):
+                    sound.unload()
+                    continue
+                self.unclaimed[path] = [sound]
+                loaded += 1
+        print(f"DEBUG: Preloaded {loaded} sounds in background")
+
+    def _claimed(self, path):
+        """(ต้องถือ _lock) มีคนขอไฟล์นี้ไปแล้ว หรือมีตัวที่ preload รออยู่แล้ว"""
+        return path in self.unclaimed or any(k[0] == path for k in self.handles)
+
+    def play(self, sound, category=None, steal=True):
+        """เล่นเสียงโดยจำกัดจำนวนเสียงพร้อมกันของหมวด
+
+        steal=True: ถ้าเต็มให้หยุดเสียงที่เก่าที่สุด (เหมาะกับเสียงสั้นเช่นเสียงเท้า)
+        steal=False: ถ้าเต็มไม่ต้องเล่น (เหมาะกับเสียง loop เช่นเสียงผีไล่ จะได้ไม่สลับกันไปมา)
+        คืน True ถ้าได้เล่น
+        """
+        if not sound:
+            return False
+        if category:
+            limit = SOUND_VOICE_LIMITS.get(category)
+            voices = self.voices.setdefault(category, [])
+            voices[:] = [s for s in voices if s is not sound and s.state == 'play']
+            if limit and len(voices) >= limit:
+                if not steal:
+                    return False
+                voices.pop(0).stop()
+            voices.append(sound)
+        sound.play()
+        return True
+
+
+sound_bank = SoundBank()
@@ -0,0 +1,51 @@
+from kivy.core.image import Image as CoreImage
+
+
+class TextureCache:
+    """Texture ของ sprite/ไอเทม/UI ที่ใช้ร่วมกันทั้งเกม (decode ไฟล์ภาพแต่ละไฟล์ครั้งเดียว)
+
+    ศัตรู 60 ตัวที่ใช้ spritesheet เดียวกันจะได้ texture object เดียวกัน
+    พร้อมตาราง tex_coords ของทุก (แถว, คอลัมน์) ที่คำนวณไว้ล่วงหน้าแทนการคำนวณ float ทุกเฟรม
+    """
+
+    def __init__(self):
+        self.textures = {}  # (path, nearest) -> Texture
+        self.frames = {}    # (path, cols, rows, flip_rows, frame_uv) -> ((coords, ...), ...) ต่อแถว
+
+    def get(self, path, nearest=False):
+        """คืน texture ของไฟล์ (โหลดครั้งแรกครั้งเดียว) ถ้าโหลดไม่ได้จะโยน exception เหมือน CoreImage"""
+        key = (path, nearest)
+        tex = self.textures.get(key)
+        if tex is None:
+            tex = CoreImage(path).texture
+            if nearest:
+                tex.mag_filter = 'nearest'
+                tex.min_filter = 'nearest'
+            self.textures[key] = tex
+        return tex
+
+    def sprite_frames(self, path, cols, rows, flip_rows=True, frame_uv=None):
+        """ตาราง tex_coords ของ spritesheet: frames[row][col] = (u, v + h, u + w, v + h, u + w, v, u, v)
+
+        flip_rows=True นับแถว 0 จากด้านบนของภาพ (v = 1 - (row + 1) * h) แบบ Player/Enemy/Reaper
+        flip_rows=False นับแถวจากด้านล่าง (v = row * h) แบบ NPC
+        frame_uv=(w, h) ใช้แทน 1/cols, 1/rows เมื่อขนาดเฟรมไม่ได้แบ่งภาพพอดี
+        """
+        key = (path, cols, rows, flip_rows, frame_uv)
+        table = self.frames.get(key)
+        if table is None:
+            w, h = frame_uv if frame_uv else (1.0 / cols, 1.0 / rows)
+            table = []
+            for row in range(rows):
+                v = 1.0 - ((row + 1) * h) if flip_rows else (row * h)
+                table.append(tuple((c * w, v + h, c * w + w, v + h, c * w + w, v, c * w, v) for c in range(cols)))
+            table = tuple(table)
+            self.frames[key] = table
+        return table
+
+    def clear(self):
+        self.textures.clear()
+        self.frames.clear()
+
+
+texture_cache = TextureCache()
@@ -0,0 +1,123 @@
+import random
+from data.settings import *
+from entities.characters.enemy_logic import EnemyLogic
+from entities.characters.player_logic import PlayerLogic
+from managers.simulation import Simulation, UPDATE_DISTANCE
+from managers.world import random_enemy_spawns
+
+SAMPLES = 2000  # จำนวนจุด/คู่สุ่มต่อรอบของ benchmark แบบ throughput
+
+
+def _random_points(game_map, count, seed):
+    r = random.Random(seed)
+    w = game_map.width * TILE_SIZE
+    h = game_map.height * TILE_SIZE
+    return [(r.randrange(0, w), r.randrange(0, h)) for _ in range(count)]
+
+
+def run_collision_benchmarks(run, name, game_map):
+    """check_map_collision / is_solid ที่จุดสุ่มทั่วแมพ (ผลเป็นเวลาต่อ SAMPLES ครั้ง)"""
+    points = _random_points(game_map, SAMPLES, seed=1)
+    index = game_map.solid_index
+    player = PlayerLogic()
+    check = player.check_map_collision
+
+    def check_all():
+        for x, y in points:
+            check(x, y, index)
+
+    def solid_all():
+        # KivyTiledMap.is_solid คือ tile_blocked_at ของ index ตัวเดียวกัน (CollisionMap ไม่มี is_solid)
+        for x, y in points:
+            index.tile_blocked_at(x, y, TILE_SIZE)
+
+    run.run(f'collision.{name}.check_map_collision_x{SAMPLES}', check_all, number=None, repeat=7)
+    run.run(f'collision.{name}.is_solid_x{SAMPLES}', solid_all, number=None, repeat=7)
+
+
+def run_los_benchmarks(run, name, game_map):
+    """Enemy.has_line_of_sight บนคู่จุดสุ่มที่ห่างกันไม่เกินรัศมีตรวจจับ (กรณีที่เกมถามจริง)"""
+    r = random.Random(2)
+    pairs = []
+    for x, y in _random_points(game_map, SAMPLES, seed=3):
+        enemy = EnemyLogic(x, y, enemy_id=len(pairs))
+        target = (x + r.uniform(-ENEMY_DETECTION_RADIUS, ENEMY_DETECTION_RADIUS),
+                  y + r.uniform(-ENEMY_DETECTION_RADIUS, ENEMY_DETECTION_RADIUS))
+        pairs.append((enemy, target))
+    index = game_map.solid_index
+
+    def los_all():
+        for enemy, target in pairs:
+            enemy.has_line_of_sight(target, index)
+
+    run.run(f'ai.{name}.has_line_of_sight_x{SAMPLES}', los_all, number=3)
+
+
+def run_spawn_benchmark(run, game_map):
+    for day in (1, 3):
+        run.run(f'ai.spawn_random_enemies.day{day}',
+                lambda: random_enemy_spawns(game_map.solid_index, day), number=3)
+
+
+def _chase_spawns(game_map, enemy_count):
+    """ตำแหน่งผู้เล่น + ศัตรู enemy_count ตัวที่อยู่ในระยะ UPDATE_DISTANCE ของผู้เล่นทุกตัว
+
+    เริ่มจากจุดเกิดของ random_enemy_spawns (ผู้เล่นยืนกลางฝูง) เก็บเฉพาะตัวที่อยู่ในระยะอัปเดต
+    แล้วเติมช่องว่างสุ่ม (seed คงที่) ให้ครบ โดยเลือกช่องในรัศมีตรวจจับก่อน เพื่อให้มีตัวไล่ล่าจริง
+    คืน None ถ้าแมพไม่มีจุดเกิดหรือช่องว่างไม่พอ
+    """
+    grid = game_map.walk_grid
+    spawns = random_enemy_spawns(game_map.solid_index, 2)
+    if not spawns:
+        return None
+    cx = sum(s[1] for s in spawns) / len(spawns)
+    cy = sum(s[2] for s in spawns) / len(spawns)
+    free = [(tx * TILE_SIZE, ty * TILE_SIZE) for ty in range(grid.rows) for tx in range(grid.cols)
+            if grid.is_walkable(tx, ty)]
+    if not free:
+        return None
+    px, py = min(free, key=lambda p: (p[0] - cx) ** 2 + (p[1] - cy) ** 2)
+
+    def in_range(x, y):
+        # ไม่เอาช่องที่ติดผู้เล่น (ชนกันตั้งแต่ tick แรกจะกลายเป็นวัด respawn แทนการไล่ล่า)
+        return TILE_SIZE < abs(x - px) + abs(y - py) <= UPDATE_DISTANCE
+
+    chosen = [(x, y, t) for _, x, y, t in spawns if in_range(x, y)][:enemy_count]
+    taken = {(x, y) for x, y, _ in chosen}
+    r = random.Random(60)
+    near = [p for p in free if p not in taken and in_range(*p)]
+    r.shuffle(near)
+    r_sq = ENEMY_DETECTION_RADIUS * ENEMY_DETECTION_RADIUS
+    near.sort(key=lambda p: (p[0] - px) ** 2 + (p[1] - py) ** 2 > r_sq)  # sort แบบ stable: ในรัศมีก่อน
+    for x, y in near[:enemy_count - len(chosen)]:
+        chosen.append((x, y, r.choice((1, 2))))
+    if len(chosen) < enemy_count:
+        return None
+    return (px, py), chosen
+
+
+def run_chase_benchmark(run, game_map, enemy_count=60):
+    """หนึ่ง tick ของ Simulation ที่มีศัตรู enemy_count ตัวในระยะอัปเดตรอบผู้เล่น (pathfinding + LOS + safe zone)"""
+    placed = _chase_spawns(game_map, enemy_count)
+    if placed is None:
+        run.skip('ai.chase_tick', f'not enough free tiles for {enemy_count} enemies near the player')
+        return
+    (px, py), spawns = placed
+    sim = Simulation(game_map)
+
+    def reset():
+        sim.enemies = [EnemyLogic(x, y, enemy_id=i, enemy_type=t) for i, (x, y, t) in enumerate(spawns)]
+        sim.destroyed_enemies = []
+        sim.player.logic_pos = [px, py]
+        sim.player.target_pos = list(sim.player.logic_pos)
+        sim.health = sim.max_health
+
+    dt = 1.0 / FPS
+    # ถ้าไม่มีตัวไหนไล่ล่าเลย ตัวเลขที่ได้จะวัดแค่ศัตรูยืนเฉยๆ ไม่ใช่ chase tick
+    reset()
+    sim.step(dt, ())
+    chasing = sum(1 for e in sim.enemies if e.is_chasing)
+    if not chasing:
+        raise RuntimeError(f"ai.chase_tick: none of the {enemy_count} enemies is chasing the player")
+    print(f"DEBUG: chase benchmark {len(spawns)} enemies, {chasing} chasing after one tick")
+    run.run('ai.chase_tick', lambda: sim.step(dt, ()), number=60, setup=reset)
@@ -0,0 +1,81 @@
+import os
+from contextlib import contextmanager
+from assets.Tiles import map_geometry
+from assets.Tiles.map_geometry import MapGeometry, prepare_map_data
+from assets.Tiles.collision_map import CollisionMap
+
+MAP_FILES = (
+    'assets/Tiles/beyond.tmj',
+    'assets/Tiles/home.tmj',
+    'assets/Tiles/underground.tmj',
+)
+
+
+def map_key(filename):
+    return os.path.splitext(os.path.basename(filename))[0]
+
+
+@contextmanager
+def cache_disabled():
+    """ปิด compiled map cache ชั่วคราว เพื่อจับเวลาเส้นทางโหลดแมพแบบครั้งแรก (parse TSX/base64 + สร้าง vertex เต็มๆ)"""
+    saved = map_geometry.MAP_CACHE_ENABLED
+    map_geometry.MAP_CACHE_ENABLED = False
+    try:
+        yield
+    finally:
+        map_geometry.MAP_CACHE_ENABLED = saved
+
+
+@contextmanager
+def legacy_mesh_builder():
+    """ใช้ path เดิม (_get_layer_instances + _process_tile ทีละช่อง) แทน mesh_builder ชั่วคราว ไว้เทียบเวลา"""
+    saved = map_geometry.MAP_FAST_MESH_BUILDER
+    map_geometry.MAP_FAST_MESH_BUILDER = False
+    try:
+        yield
+    finally:
+        map_geometry.MAP_FAST_MESH_BUILDER = saved
+
+
+def run_map_benchmarks(run, gl):
+    """จับเวลาการโหลดแมพจริงทั้งสามไฟล์ คืน {ชื่อแมพ: CollisionMap} ให้ benchmark ถัดไปใช้
+
+    ส่วน CPU ทั้งหมด (prepare_map_data / MapGeometry) รันได้โดยไม่มี GL
+    gl=True จะจับเวลาการสร้าง texture/Mesh ของ KivyTiledMap เพิ่มด้วย
+    """
+    maps = {}
+    for filename in MAP_FILES:
+        name = map_key(filename)
+
+        with cache_disabled():
+            run.run(f'map.{name}.prepare_cold', lambda: prepare_map_data(filename), number=None, repeat=9)
+            cold = prepare_map_data(filename)
+
+        # แยกเป็นขั้นย่อยของ MapGeometry (แต่ละขั้นสร้างผลใหม่ทับของเดิมได้)
+        geometry = MapGeometry(filename, cold['map_data'])
+        # build_meshes ต้องมี texture/UV ของ tileset ก่อน (ถ้า --only ข้าม load_tilesets ไป tile ทุกช่องจะถูกข้าม)
+        geometry.load_tilesets()
+        run.run(f'map.{name}.load_tilesets', geometry.load_tilesets, number=None, repeat=9)
+        run.run(f'map.{name}.build_meshes', geometry.build_meshes, number=None, repeat=9)
+        with legacy_mesh_builder():
+            run.run(f'map.{name}.build_meshes_legacy', geometry.build_meshes, number=None, repeat=9)
+        payload = cold['payload']
+        cols, rows, cells = payload['walk']
+        run.run(f'map.{name}.collision_index',
+                lambda: CollisionMap(payload['solid_rects'], cols, rows, cells, filename), number=None, repeat=9)
+
+        # โหลดครั้งแรกแบบปกติเพื่อเขียน cache แล้วจับเวลาการอ่านจาก cache
+        prepare_map_data(filename)
+        run.run(f'map.{name}.prepare_cached', lambda: prepare_map_data(filename), number=None, repeat=9)
+        maps[name] = CollisionMap.from_map(filename)
+
+        if not gl:
+            for phase in ('construct_cold', 'construct_cached'):
+                run.skip(f'map.{name}.{phase}', 'needs a GL window (run without --no-gl, e.g. under xvfb-run)')
+            continue
+
+        from assets.Tiles.map_loader import KivyTiledMap
+        # ส่วนที่ต้องทำบน main thread: สร้าง texture + Mesh จาก vertex ที่เตรียมไว้แล้ว
+        run.run(f'map.{name}.construct_cold', lambda: KivyTiledMap(filename, cold), number=None, repeat=7)
+        run.run(f'map.{name}.construct_cached', lambda: KivyTiledMap(filename), number=None, repeat=7)
+    return maps
@@ -0,0 +1,34 @@
+#!/bin/sh
+# CI: วัด baseline จาก commit ฐานบนเครื่องเดียวกัน แล้วเทียบกับโค้ดปัจจุบัน (ผลต่างเครื่องเทียบกันไม่ได้)
+#
+#   sh benchmarks/ci.sh [base-ref] [extra args for benchmarks.run...]
+#
+# base-ref ค่าเริ่มต้นคือ origin/main ถ้าไม่มีหน้าต่าง GL (ไม่มี $DISPLAY) จะรันแบบ --no-gl ทั้งสองฝั่ง
+# จบด้วย exit code 1 เมื่อช้าลงเกิน tolerance หรือ benchmark ที่ฐานมีแต่รอบนี้ไม่ได้ผล
+set -e
+
+BASE_REF="${1:-origin/main}"
+[ $# -gt 0 ] && shift
+
+ROOT="$(git rev-parse --show-toplevel)"
+WORK="$(mktemp -d)"
+trap 'git -C "$ROOT" worktree remove --force "$WORK/base" >/dev/null 2>&1 || true; rm -rf "$WORK"' EXIT
+
+GL_ARGS=""
+if [ -z "$DISPLAY" ]; then
+    GL_ARGS="--no-gl"
+fi
+
+git -C "$ROOT" worktree add --detach "$WORK/base" "$BASE_REF" >/dev/null
+if [ ! -f "$WORK/base/benchmarks/run.py" ]; then
+    echo "No benchmarks at $BASE_REF; nothing to compare against"
+    exit 0
+fi
+
+echo "== Baseline: $BASE_REF =="
+(cd "$WORK/base" && python -m benchmarks.run $GL_ARGS "$@" \
+    --output "$WORK/baseline.json" --baseline "$WORK/baseline.json" --update-baseline)
+
+echo "== Current: $(git -C "$ROOT" rev-parse --short HEAD) =="
+cd "$ROOT"
+python -m benchmarks.run $GL_ARGS "$@" --baseline "$WORK/baseline.json"
@@ -0,0 +1,116 @@
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+MIN_SAMPLE_S = 0.05  # number=None: เพิ่มจำนวนครั้งต่อรอบจนแต่ละรอบใช้เวลาอย่างน้อยเท่านี้ (ลด noise ของงานสั้นๆ)
+
+
+def calibrate(func, setup=None):
+    """หา number แบบ timeit.autorange: 1, 2, 5, 10, ... จนรอบหนึ่งนานพอ"""
+    number = 1
+    while True:
+        for step in (1, 2, 5):
+            n = number * step
+            if setup:
+                setup()
+            start = time.perf_counter()
+            for _ in range(n):
+                func()
+            if time.perf_counter() - start >= MIN_SAMPLE_S:
+                return n
+        number *= 10
+
+
+def measure(func, number=1, repeat=5, setup=None):
+    """จับเวลา func() แบบ timeit: ทำ repeat รอบ รอบละ number ครั้ง คืนเวลาต่อครั้ง (วินาที)
+
+    setup() (ถ้ามี) ถูกเรียกก่อนทุกรอบและไม่นับเวลา ใช้รีเซ็ตสถานะที่ func เปลี่ยน
+    number=None จะเลือกจำนวนครั้งต่อรอบเองด้วย calibrate()
+    """
+    if number is None:
+        number = calibrate(func, setup)
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+    return {
+        'median_s': statistics.median(samples),
+        'min_s': min(samples),
+        'max_s': max(samples),
+        'number': number,
+        'repeat': repeat,
+    }
+
+
+class BenchmarkRun:
+    """เก็บผลของทุก benchmark ในรอบนี้ แล้วเขียนเป็น JSON / เทียบกับ baseline"""
+
+    def __init__(self, only=None):
+        self.only = only        # ถ้ากำหนด จะรันเฉพาะ benchmark ที่ชื่อมีคำนี้
+        self.results = {}
+        self.skipped = {}
+
+    def wants(self, name):
+        return not self.only or any(key in name for key in self.only)
+
+    def run(self, name, func, number=1, repeat=5, setup=None):
+        if not self.wants(name):
+            return None
+        result = measure(func, number, repeat, setup)
+        self.results[name] = result
+        print(f"{name:<48} {result['median_s'] * 1e3:10.3f} ms  (min {result['min_s'] * 1e3:.3f}, x{result['number']})")
+        return result
+
+    def skip(self, name, reason):
+        if self.wants(name):
+            self.skipped[name] = reason
+            print(f"{name:<48} skipped: {reason}")
+
+    def to_dict(self):
+        return {
+            'meta': {
+                'python': sys.version.split()[0],
+                'platform': platform.platform(),
+                'machine': platform.machine(),
+                'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            },
+            'results': self.results,
+            'skipped': self.skipped,
+        }
+
+    def write(self, path):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, sort_keys=True)
+        print(f"Results written to {path}")
+
+
+def compare(run, baseline, tolerance):
+    """เทียบเวลาที่ดีที่สุดต่อรอบกับ baseline คืน (regressions, missing)
+
+    regressions = [(ชื่อ, baseline_s, ปัจจุบัน_s, อัตราส่วน)] ที่ช้าลงเกิน tolerance
+    missing = [(ชื่อ, เหตุผล)] ที่มีใน baseline แต่รอบนี้ไม่ได้ผล (ถูก skip หรือหายไป) นับเป็นความล้มเหลวด้วย
+    """
+    regressions = []
+    missing = []
+    for name, base in baseline.get('results', {}).items():
+        if not run.wants(name):
+            continue
+        current = run.results.get(name)
+        if current is None:
+            missing.append((name, run.skipped.get(name, 'not run (renamed or removed?)')))
+            continue
+        # เทียบรอบที่เร็วที่สุด (แบบ timeit) ซึ่งนิ่งกว่า median บนเครื่อง CI ที่มีงานอื่นแทรก
+        ratio = current['min_s'] / base['min_s'] if base['min_s'] else float('inf')
+        if ratio > 1.0 + tolerance:
+            regressions.append((name, base['min_s'], current['min_s'], ratio))
+    return regressions, missing
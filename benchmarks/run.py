@@ -0,0 +1,89 @@
+"""ชุด benchmark ของเส้นทางที่ร้อนที่สุดในเกม (โหลดแมพ, collision, AI ศัตรู)
+
+รันจากโฟลเดอร์โปรเจกต์:
+    python -m benchmarks.run                         # รันทั้งหมด (ต้องมีหน้าต่าง GL, บน CI ใช้ xvfb-run)
+    python -m benchmarks.run --no-gl                 # เฉพาะส่วนที่ไม่ใช้ GL (collision ใช้ map cache ถ้ามี)
+    python -m benchmarks.run --update-baseline       # บันทึกผลรอบนี้เป็น baseline ใหม่
+    python -m benchmarks.run --only collision ai     # เลือกเฉพาะ benchmark ที่ชื่อมีคำเหล่านี้
+    sh benchmarks/ci.sh origin/main                  # CI: วัด baseline จาก commit ฐานบนเครื่องเดียวกันแล้วเทียบ
+
+ถ้ามี baseline อยู่ จะเทียบเวลาที่ดีที่สุด (min) ของทุก benchmark และจบด้วย exit code 1 เมื่อช้าลงเกิน --tolerance
+หรือเมื่อ benchmark ที่อยู่ใน baseline ไม่ได้ผลในรอบนี้ (ถูก skip / พัง / เปลี่ยนชื่อ)
+"""
+import argparse
+import json
+import os
+import sys
+
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, 'results', 'latest.json')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Beyond the Sight performance benchmarks')
+    parser.add_argument('--no-gl', action='store_true', help='skip benchmarks that need a GL window')
+    parser.add_argument('--only', nargs='*', help='run only benchmarks whose name contains one of these')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='where to write the JSON results')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON to compare against')
+    parser.add_argument('--update-baseline', action='store_true', help='write these results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown before failing (0.25 = 25%%)')
+    args = parser.parse_args(argv)
+
+    # benchmark อ่านไฟล์แมพ/asset ด้วย path แบบ relative เหมือนตัวเกม
+    os.chdir(os.path.dirname(BENCH_DIR))
+    sys.path.insert(0, os.getcwd())
+
+    if not args.no_gl:
+        # สร้างหน้าต่าง (GL context) ก่อนสร้าง texture/mesh ใดๆ
+        from kivy.core.window import Window  # noqa: F401
+
+    from benchmarks.harness import BenchmarkRun, compare
+    from benchmarks import bench_maps, bench_ai
+
+    run = BenchmarkRun(args.only)
+    maps = bench_maps.run_map_benchmarks(run, gl=not args.no_gl)
+    for name, game_map in maps.items():
+        if game_map is None:
+            run.skip(f'collision.{name}', 'no compiled map cache yet (run once with GL to build it)')
+            continue
+        bench_ai.run_collision_benchmarks(run, name, game_map)
+        bench_ai.run_los_benchmarks(run, name, game_map)
+
+    main_map = maps.get('beyond')
+    if main_map is not None:
+        bench_ai.run_spawn_benchmark(run, main_map)
+        bench_ai.run_chase_benchmark(run, main_map)
+    else:
+        run.skip('ai.beyond', 'main map collision data unavailable')
+
+    run.write(args.output)
+
+    if args.update_baseline:
+        run.write(args.baseline)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions, missing = compare(run, baseline, args.tolerance)
+    if missing:
+        print("\n!!! BENCHMARKS MISSING FROM THIS RUN (present in baseline) !!!")
+        for name, reason in missing:
+            print(f"  {name}: {reason}")
+    if regressions:
+        print("\n!!! PERFORMANCE REGRESSION !!!")
+        for name, base, current, ratio in regressions:
+            print(f"  {name}: {base * 1e3:.3f} ms -> {current * 1e3:.3f} ms ({ratio:.2f}x)")
+    if missing or regressions:
+        return 1
+    print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -141,7 +141,14 @@ DIALOGUE_CONFIG = {
     "msg_font_size": 28,
     "name_color": (1, 1, 0, 1), # สีเหลือง
     "msg_color": (1, 1, 1, 1),  # สีขาว
-    "bg_opacity": 0.85
+    "bg_opacity": 0.85,
+    "reveal_speed": 45,      # ความเร็วพิมพ์ข้อความทีละตัว (ตัวอักษร/วินาที) 0 = แสดงทั้งประโยคทันที
+    "reveal_speed_by_character": {  # ความเร็วเฉพาะตัวละคร (ไม่ระบุ = ใช้ reveal_speed)
+        "Reaper": 30,
+        "Father": 35,
+        "Mother": 35,
+        "Little girl": 50,
+    },
 }
 
 # เควสเทียน Day 3
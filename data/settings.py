@@ -13,11 +13,62 @@ MAP_HEIGHT = 1600
 # Camera Settings
 CAMERA_WIDTH = 260
 CAMERA_HEIGHT = 180
+ENTITY_CULL_MARGIN = 64  # ระยะเผื่อ (px) รอบกรอบกล้อง ก่อนถอดตัวละครที่อยู่นอกจอออกจาก canvas
+
+# Sound Settings
+# จำนวนเสียงสูงสุดที่เล่นพร้อมกันต่อหมวด (SoundBank.play)
+SOUND_VOICE_LIMITS = {
+    'footsteps': 2,  # เสียงเท้า: เกินแล้วตัดเสียงที่เก่าที่สุดทิ้ง
+    'ghost': 2,      # เสียง loop ของผีที่กำลังไล่: เกินแล้วตัวใหม่ไม่ต้องเล่น
+}
+# ไฟล์เสียงที่โหลดล่วงหน้าบน thread เบื้องหลังตอนเปิดเกม (เปลี่ยนฉาก/เปลี่ยนวันจะได้ไม่ค้างรออ่านไฟล์)
+SOUND_PRELOAD_FILES = [
+    'assets/sound/ghost/Ghost chior.wav',
+    'assets/sound/ghost/Ghost_scream_3.wav',
+    'assets/sound/ghost/Ghost_moan_2.wav',
+    'assets/sound/ghost/Crying_moaning_ambience_3.wav',
+    'assets/sound/find.wav',
+    'assets/sound/Keys_pick up.wav',
+    'assets/sound/sit.wav',
+    'assets/sound/click.wav',
+    'assets/sound/breath.wav',
+    'assets/sound/feeling/shocked.wav',
+    'assets/sound/feeling/curious.wav',
+    'assets/sound/feeling/reaper.wav',
+    'assets/sound/door/Door_squeeky_2.wav',
+    'assets/sound/door/Door_close.wav',
+    'assets/sound/hit/hit.mp3',
+    'assets/sound/loop/music-box.wav',
+    'assets/sound/loop/Underground.wav',
+]
+SOUND_PRELOAD_DIRS = [
+    'assets/sound/walk', 'assets/sound/run',
+    'assets/sound/walk_w', 'assets/sound/run_w',
+    'assets/sound/walk_r', 'assets/sound/run_r',
+]
+
+# Replay Settings
+REPLAY_RECORD_PATH = None  # ใส่ path (เช่น 'replays/run.bin') เพื่ออัดอินพุตทุก tick ของการเล่นรอบนี้
+REPLAY_PLAY_PATH = None    # ใส่ path ไฟล์ที่อัดไว้ เพื่อเล่นซ้ำแทนการรับปุ่มจริง (เขียนเวลาต่อเฟรมเป็น .timings.csv)
+REPLAY_SEED = None         # seed ของ game_rng ตอนอัด (None = สุ่มใหม่ทุกครั้ง แต่ถูกบันทึกลงไฟล์เสมอ)
+
+# Save Settings
+SAVE_DIR = 'saves'                # โฟลเดอร์เก็บไฟล์เซฟ
+SAVE_SLOT_COUNT = 5               # จำนวนสล็อตเซฟแบบแมนนวล
+SAVE_COMPACT_ENEMIES = True       # เก็บ enemies_data / destroyed_enemies เป็น array ไบนารีท้ายไฟล์ (False = อยู่ใน JSON)
+SAVE_BACKGROUND_WRITE = True      # เขียนไฟล์เซฟบน thread แยก (False = เขียนทันทีบน main thread)
+
+# Profiler Settings
+PROFILER_TOGGLE_KEY = 'f3'      # ปุ่มเปิด/ปิด overlay จับเวลาต่อเฟรม
+PROFILER_WINDOW = 300           # จำนวนเฟรมล่าสุดที่ใช้คำนวณ p50/p95/p99
+PROFILER_OVERLAY_EVERY = 30     # อัปเดตข้อความ overlay ทุกกี่เฟรม
+PROFILER_CSV_DIR = 'profiles'   # โฟลเดอร์เก็บ CSV เวลาทุกเฟรม (เขียนตอนปิด profiler / ออกจากเกม)
 
 # Tile Settings
 TILE_SIZE = 16
 WALK_SPEED = 2   # ความเร็วเดินปกติ
 RUN_SPEED = 4    # ความเร็วตอนวิ่ง (ต้องหาร TILE_SIZE ลงตัวจะดีที่สุด)
+SPATIAL_HASH_CELL_TILES = 4  # ขนาด cell ของ spatial hash (หน่วยเป็นจำนวน tile) สำหรับเช็คกำแพง
 PLAYER_START_X = 1152
 PLAYER_START_Y = 80
 
@@ -27,6 +78,11 @@ STAMINA_DRAIN = MAX_STAMINA / (3 * FPS)  # ใช้เวลา 3 วินา
 STAMINA_REGEN = MAX_STAMINA / (6 * FPS)  # ใช้เวลา 6 วินาทีในการฟื้นฟูจนเต็ม
 
 MAP_FILE = 'assets/Tiles/beyond.tmj'
+MAP_CACHE_ENABLED = True                 # ใช้ compiled map cache (ข้ามการ parse TSX/base64 ตอนเปลี่ยนแมพ)
+MAP_CACHE_DIR = 'assets/Tiles/.cache'    # โฟลเดอร์เก็บไฟล์ .bin ที่ build แล้ว
+MAP_FAST_MESH_BUILDER = True            # สร้าง mesh ของ tile layer แบบ bulk (assets/Tiles/mesh_builder.py)
+MAP_REGISTRY_BUDGET_MB = 64              # งบหน่วยความจำของแมพที่เก็บไว้ใช้ซ้ำ (LRU) ตอน change_map
+MAP_PREFETCH_DISTANCE = 160              # ระยะ (px) จาก portal/ประตูที่เริ่มโหลดแมพถัดไปเบื้องหลัง
 SPLASH_COVER_IMG      = 'assets/Covers/main_cover.png'
 SPLASH_COVER_TRUE_IMG = 'assets/Covers/red.png'    # True Ending
 SPLASH_COVER_NORM_IMG = 'assets/Covers/run.png'    # Normal Ending
@@ -102,6 +158,7 @@ NPC_IMAGE_LIST = [
 NPC_COUNT = len(NPC_IMAGE_LIST)
 
 # Reaper Settings
+REAPER_START_POS = (1168, 80)  # จุดยืนของยมทูตในแมพหลัก
 REAPER_WIDTH = 16  # Hitbox width
 REAPER_HEIGHT = 4  # Hitbox height (feet only)
 REAPER_VISUAL_WIDTH = 64  # Visual sprite size
@@ -115,6 +172,8 @@ ENEMY_WIDTH = 32
 ENEMY_HEIGHT = 32
 ENEMY_SPEED = WALK_SPEED + 1.5
 ENEMY_DETECTION_RADIUS = 200
+PATHFINDING_MAX_STEPS = (ENEMY_DETECTION_RADIUS // TILE_SIZE) * 2  # ระยะ (ช่อง) ของ flow field รอบผู้เล่น
+ENEMY_SPRITE_BATCHING = False  # True = วาดศัตรูที่ใช้ texture เดียวกันในแถวเดียวกันเป็น Mesh เดียว (ลด draw call)
 
 # ข้อมูลศัตรูแต่ละประเภท (ระบุภาพและขนาด spritesheet)
 ENEMY_TYPES = {
@@ -1,49 +1,20 @@
 from kivy.graphics import Rectangle, Color, InstructionGroup
-from kivy.core.image import Image as CoreImage
-from kivy.clock import Clock
+from assets.texture_cache import texture_cache
 from data.settings import *
-import math
-import random
+from managers.animation import animation_scheduler
+from entities.characters.enemy_logic import EnemyLogic
 
-class Enemy:
+# enemy_type -> (anim_config, anim_row_map) ใช้ร่วมกันทุกตัวที่เป็นประเภทเดียวกัน
+_TYPE_ASSETS = {}
+
+class Enemy(EnemyLogic):
     """
     Renders and manages Enemy characters.
     Enemies chase the player unless they enter a safe zone around the Reaper.
     """
     def __init__(self, canvas, x, y, enemy_id, enemy_type=1):
         self.canvas = canvas
-        self.x = x
-        self.y = y
-        self.id = enemy_id
-        self.enemy_type = enemy_type
-
-        # Stats and behavior
-        self.speed = ENEMY_SPEED
-        self.detection_radius = ENEMY_DETECTION_RADIUS
-        self.safe_zone_radius = SAFE_ZONE_RADIUS
-        
-        # Fade & Stun system
-        self.is_stunned = False
-        self.stun_timer = 0
-        self.is_fading = False
-        self.fading_done = False
-        self.alpha = 1.0
-        
-        # Position system (เหมือน player)
-        self.logic_pos = [x, y]  # ตำแหน่ง 32x32 ทางตรรกะสำหรับการคำนวณเดินตาม Grid
-        self.is_moving = False
-        self.target_pos = [x, y]
-        self.turn_delay = 0
-        self.direction = 'down'
-        self.is_chasing = False
-        
-        # Animation properties
-        self.state = 'idle'
-        self.frame_index = 0
-        self.current_fps = 12
-        self.direction_change_timer = 0
-        self.direction_change_interval = 3.0
-        self.directions = ['down', 'left', 'right', 'up']
+        super().__init__(x, y, enemy_id, enemy_type)
         
         # Load textures and configure spritesheets
         self._init_assets(enemy_type)
@@ -51,20 +22,30 @@ class Enemy:
         # Initialize graphics on canvas
         self._init_graphics()
         
-        # Schedule updates
+        # ลงทะเบียนกับ animation scheduler กลาง (เดินเฟรมจาก GameWidget.move_step)
         self.update_frame()
-        self.anim_event = Clock.schedule_interval(self.animate, 1.0 / self.current_fps)
+        animation_scheduler.register(self, self.current_fps)
             
     def _init_assets(self, enemy_type):
         """Loads textures and sets up animation configuration based on enemy types in settings.py."""
+        shared = _TYPE_ASSETS.get(enemy_type)
+        if shared is not None:
+            # ประเภทนี้เคยโหลดแล้ว ใช้ texture และตาราง tex_coords ชุดเดิม
+            self.anim_config, self.anim_row_map = shared
+            self.idle_texture = self.anim_config['idle']['tex']
+            self.walk_texture = self.anim_config['walk']['tex']
+            return
+
         config = ENEMY_TYPES.get(enemy_type, ENEMY_TYPES[1])
         
         try:
-            self.idle_texture = CoreImage(config['idle']['path']).texture
-            self.walk_texture = CoreImage(config['walk']['path']).texture
+            self.idle_texture = texture_cache.get(config['idle']['path'])
+            self.walk_texture = texture_cache.get(config['walk']['path'])
             self.anim_config = {
-                'idle': {'tex': self.idle_texture, 'cols': config['idle']['cols'], 'rows': config['idle']['rows']},
-                'walk': {'tex': self.walk_texture, 'cols': config['walk']['cols'], 'rows': config['walk']['rows']}
+                'idle': {'tex': self.idle_texture, 'cols': config['idle']['cols'], 'rows': config['idle']['rows'],
+                         'frames': texture_cache.sprite_frames(config['idle']['path'], config['idle']['cols'], config['idle']['rows'])},
+                'walk': {'tex': self.walk_texture, 'cols': config['walk']['cols'], 'rows': config['walk']['rows'],
+                         'frames': texture_cache.sprite_frames(config['walk']['path'], config['walk']['cols'], config['walk']['rows'])}
             }
         except Exception as e:
             print(f"Error loading Enemy{enemy_type} textures: {e}")
@@ -87,15 +68,16 @@ class Enemy:
             walk_rows = {'down': 1, 'left': 2, 'right': 0, 'up': 3}
             
         self.anim_row_map = {'idle': idle_rows, 'walk': walk_rows}
+        _TYPE_ASSETS[enemy_type] = (self.anim_config, self.anim_row_map)
 
     def _init_graphics(self):
         """Create the Kivy canvas instructions for the enemy."""
         self.group = InstructionGroup()
         
         # Sprite appearance
-        self.color_instr = Color(1, 1, 1, 1)
         if not self.idle_texture:
-            self.color_instr.rgb = (1, 0, 0)
+            self.tint = (1, 0, 0)
+        self.color_instr = Color(*self.tint, self.alpha)
         self.group.add(self.color_instr)
         
         offset_x = (TILE_SIZE - ENEMY_WIDTH) / 2
@@ -107,8 +89,16 @@ class Enemy:
     def destroy(self):
         """Cleans up canvas instructions and events when the enemy is removed."""
         self.canvas.remove(self.group)
-        self.anim_event.cancel()
+        animation_scheduler.unregister(self)
             
+    def sync_graphics_pos(self):
+        ox = (TILE_SIZE - ENEMY_WIDTH) / 2
+        oy = TILE_SIZE / 2
+        self.rect.pos = (self.logic_pos[0] + ox, self.logic_pos[1] + oy)
+
+    def apply_color(self):
+        self.color_instr.rgba = (*self.tint, self.alpha)
+
     def update_frame(self):
         """Updates the texture region (tex_coords) based on state, direction, and frame."""
         config = self.anim_config.get(self.state)
@@ -117,17 +107,13 @@ class Enemy:
             return
             
         tex = config['tex']
-        w = 1.0 / config['cols']
-        h = 1.0 / config['rows']
-        
-        u = self.frame_index * w
         row_index = self.anim_row_map[self.state].get(self.direction, 0)
         
-        # Standardize vertical coordinate (Kivy textures often need Y-flip correction)
-        v = 1.0 - ((row_index + 1) * h)
-        
-        self.rect.texture = tex
-        self.rect.tex_coords = (u, v + h, u + w, v + h, u + w, v, u, v)
+        # tex_coords คำนวณไว้แล้วใน TextureCache (แถว 0 = บนสุดของภาพ)
+        frames = config['frames'][row_index]
+        if self.rect.texture is not tex:
+            self.rect.texture = tex
+        self.rect.tex_coords = frames[int(self.frame_index) % len(frames)]
     
     def animate(self, dt):
         """Handles state transitions and frame updates."""
@@ -166,249 +152,4 @@ class Enemy:
         
         if self.current_fps != target_fps:
             self.current_fps = target_fps
-            self.anim_event.cancel()
-            self.anim_event = Clock.schedule_interval(self.animate, 1.0 / target_fps)
-            
-    def update(self, dt, player_pos, reaper_pos=None, map_rects=None, enemies=None):
-        """Main update loop called by the game logic."""
-        if self.is_fading:
-            self.is_chasing = False
-            self.alpha -= dt * 1.5 # ปรับความเร็วในการจางหาย
-            if self.alpha <= 0:
-                self.alpha = 0
-                self.fading_done = True
-            self.color_instr.a = self.alpha
-            return
-
-        if self.is_moving:
-            self.continue_move()
-            
-        if not self.is_moving:
-            # Randomly change direction while idle
-            self.direction_change_timer += dt
-            if self.direction_change_timer >= self.direction_change_interval:
-                self.direction_change_timer = 0
-                available_dirs = [d for d in self.directions if d != self.direction]
-                self.direction = random.choice(available_dirs)
-                self.frame_index = 0
-
-            # Stun check
-            if self.is_stunned:
-                self.is_chasing = False
-                self.stun_timer -= dt
-                if self.stun_timer <= 0:
-                    self.is_stunned = False
-                    self.color_instr.rgb = (1, 1, 1) # Reset color
-                return # Don't move or chase while stunned
-
-            # Decide whether to chase the player (Optimization: Squared Distance)
-            dist_sq = (player_pos[0] - self.logic_pos[0])**2 + (player_pos[1] - self.logic_pos[1])**2
-            if dist_sq <= (self.detection_radius ** 2) and self.has_line_of_sight(player_pos, map_rects):
-                self.is_chasing = True
-                self.chase_player_grid(player_pos, reaper_pos, map_rects, enemies)
-            else:
-                self.is_chasing = False
-        else:
-            # ขณะเดินไปเป้าหมาย (is_moving) ถ้ายังอยู่ในรัศมีและมองเห็น ก็ถือว่ายังไล่อยู่
-            dist_sq = (player_pos[0] - self.logic_pos[0])**2 + (player_pos[1] - self.logic_pos[1])**2
-            self.is_chasing = dist_sq <= (self.detection_radius ** 2) and self.has_line_of_sight(player_pos, map_rects)
-        
-    def calculate_distance(self, target_pos):
-        """Calculates squared distance between enemy and target."""
-        # Note: Returned value is squared distance to avoid sqrt
-        return (target_pos[0] - self.logic_pos[0])**2 + (target_pos[1] - self.logic_pos[1])**2
-        
-    def chase_player_grid(self, player_pos, reaper_pos=None, map_rects=None, enemies=None):
-        """Implements grid-based chasing logic with safe zone detection."""
-        # ... (rest of the logic remains same but uses logic_pos)
-        self.turn_delay = 0
-
-        dx = player_pos[0] - self.logic_pos[0]
-        dy = player_pos[1] - self.logic_pos[1]
-        # พยายามเดินในแกนที่ระยะห่างมากที่สุดก่อน
-        primary_axis_blocked = False
-        if abs(dy) >= abs(dx) and abs(dy) > 0:
-            move_y = TILE_SIZE if dy > 0 else -TILE_SIZE
-            new_dir = 'up' if dy > 0 else 'down'
-            
-            # เช็คว่าแกน Y เดินได้ไหม
-            new_x = self.logic_pos[0]
-            new_y = self.logic_pos[1] + move_y
-            if self._is_pos_safe_and_clear(new_x, new_y, reaper_pos, map_rects, enemies):
-                self.direction = new_dir
-                self.frame_index = 0
-                self.start_move(0, move_y)
-                return
-            primary_axis_blocked = True
-            
-        if abs(dx) > 0:
-            move_x = TILE_SIZE if dx > 0 else -TILE_SIZE
-            new_dir = 'right' if dx > 0 else 'left'
-            
-            # เช็คว่าแกน X เดินได้ไหม
-            new_x = self.logic_pos[0] + move_x
-            new_y = self.logic_pos[1]
-            if self._is_pos_safe_and_clear(new_x, new_y, reaper_pos, map_rects, enemies):
-                self.direction = new_dir
-                self.frame_index = 0
-                self.start_move(move_x, 0)
-                return
-            
-        # ถ้าแกน X เป็นแกนหลักแต่โดนบล็อก ให้มาลองแกน Y ที่เมื่อกี้ข้ามไป
-        if not primary_axis_blocked and abs(dy) > 0:
-            move_y = TILE_SIZE if dy > 0 else -TILE_SIZE
-            new_dir = 'up' if dy > 0 else 'down'
-            new_x = self.logic_pos[0]
-            new_y = self.logic_pos[1] + move_y
-            if self._is_pos_safe_and_clear(new_x, new_y, reaper_pos, map_rects, enemies):
-                self.direction = new_dir
-                self.frame_index = 0
-                self.start_move(0, move_y)
-                return
-
-    def _is_pos_safe_and_clear(self, new_x, new_y, reaper_pos, map_rects, enemies=None):
-        """ตรวจสอบว่าตำแหน่งใหม่ปลอดภัยจาก Reaper และไม่มีกำแพงหรือศัตรูอื่นขวาง"""
-        # 1. เช็คขอบเขตแผนที่
-        if not (0 <= new_x <= MAP_WIDTH - TILE_SIZE and 0 <= new_y <= MAP_HEIGHT - TILE_SIZE):
-            return False
-            
-        # 3. เช็คกำแพง
-        if map_rects and self.check_map_collision(new_x, new_y, map_rects):
-            return False
-            
-        # 4. เช็คการชนกับศัตรูตัวอื่น
-        if enemies and self.check_enemy_collision(new_x, new_y, enemies):
-            return False
-            
-        return True
-
-    def start_move(self, dx, dy):
-        """Sets the target position and begins movement (เหมือน player)."""
-        self.target_pos = [self.logic_pos[0] + dx, self.logic_pos[1] + dy]
-        self.is_moving = True
-
-    def continue_move(self):
-        """เลื่อนตำแหน่งศัตรูเข้าหาเป้าหมายอย่างลื่นไหล"""
-        for i in range(2):
-            if self.logic_pos[i] < self.target_pos[i]:
-                self.logic_pos[i] = min(self.logic_pos[i] + self.speed, self.target_pos[i])
-            elif self.logic_pos[i] > self.target_pos[i]:
-                self.logic_pos[i] = max(self.logic_pos[i] - self.speed, self.target_pos[i])
-        
-        ox = (TILE_SIZE - ENEMY_WIDTH) / 2
-        oy = TILE_SIZE / 2
-        self.rect.pos = (self.logic_pos[0] + ox, self.logic_pos[1] + oy)
-        
-        if self.logic_pos == self.target_pos:
-            self.is_moving = False
-            
-    def check_map_collision(self, new_x, new_y, map_rects):
-        """ตรวจสอบว่าตำแหน่งใหม่จะชนกับกำแพง (Map tiles) หรือไม่"""
-        enemy_rect = [new_x, new_y, TILE_SIZE, TILE_SIZE]
-        
-        for r in map_rects:
-            # เพิ่ม Optimized check: เช็คเฉพาะกล่องที่อยู่ใกล้
-            if abs(r[0] - new_x) > 64 or abs(r[1] - new_y) > 64:
-                continue
-            if (enemy_rect[0] < r[0] + r[2] and
-                enemy_rect[0] + enemy_rect[2] > r[0] and
-                enemy_rect[1] < r[1] + r[3] and
-                enemy_rect[1] + enemy_rect[3] > r[1]):
-                return True
-        return False
-
-    def check_enemy_collision(self, new_x, new_y, enemies):
-        """ตรวจสอบว่าตำแหน่งใหม่จะชนกับศัตรูตัวอื่นหรือไม่"""
-        enemy_rect = [new_x, new_y, TILE_SIZE, TILE_SIZE]
-        
-        for other_enemy in enemies:
-            if other_enemy.id == self.id or other_enemy.is_fading: continue
-            
-            other_pos = other_enemy.logic_pos
-            if abs(other_pos[0] - new_x) > 32 or abs(other_pos[1] - new_y) > 32: continue
-            
-            if (enemy_rect[0] < other_pos[0] + TILE_SIZE and
-                enemy_rect[0] + TILE_SIZE > other_pos[0] and
-                enemy_rect[1] < other_pos[1] + TILE_SIZE and
-                enemy_rect[1] + TILE_SIZE > other_pos[1]):
-                return True
-        return False
-
-    def check_player_collision_logic(self, player_pos, tile_size):
-        """Check for collision with player using logic coordinates"""
-        buffer = 4
-        return (self.logic_pos[0] < player_pos[0] + tile_size + buffer and
-                self.logic_pos[0] + TILE_SIZE + buffer > player_pos[0] and
-                self.logic_pos[1] < player_pos[1] + tile_size + buffer and
-                self.logic_pos[1] + TILE_SIZE + buffer > player_pos[1])
-            
-    def has_line_of_sight(self, target_pos, map_rects):
-        """ตรวจสอบว่ามีกำแพงกั้นระหว่างศัตรูกับผู้เล่นหรือไม่ (Optimization: ลด Ray count)"""
-        if not map_rects: return True
-            
-        ex, ey = self.logic_pos[0] + TILE_SIZE/2, self.logic_pos[1] + TILE_SIZE/2
-        px, py = target_pos[0] + TILE_SIZE/2, target_pos[1] + TILE_SIZE/2
-        
-        # 1. เช็คเส้นกลางก่อน (Center to Center)
-        if self._check_ray(ex, ey, px, py, map_rects):
-            return True
-            
-        # 2. เช็คจากมุมที่หดเข้ามานิดหน่อย (Edge peek)
-        # ถ้ากลางไม่ผ่าน ลองเช็คอีก 2 จุดเพื่อความฉลาดในการเลี้ยว
-        pts = [(self.logic_pos[0]+2, self.logic_pos[1]+2), (self.logic_pos[0]+TILE_SIZE-2, self.logic_pos[1]+TILE_SIZE-2)]
-        for pt in pts:
-            if self._check_ray(pt[0], pt[1], px, py, map_rects):
-                return True
-        return False
-
-    def _check_ray(self, x1, y1, x2, y2, map_rects):
-        min_x, max_x = min(x1, x2), max(x1, x2)
-        min_y, max_y = min(y1, y2), max(y1, y2)
-        for r in map_rects:
-            rx, ry, rw, rh = r
-            if rx + rw < min_x or rx > max_x or ry + rh < min_y or ry > max_y: continue
-            if self.line_intersects_rect(x1, y1, x2, y2, r):
-                return False
-        return True
-
-    def line_intersects_rect(self, x1, y1, x2, y2, rect):
-        """ตรวจสอบว่าเส้นตรงตัดกับสี่เหลี่ยมหรือไม่"""
-        rx, ry, rw, rh = rect
-        # ขอบทั้ง 4 ของสี่เหลี่ยม
-        edges = [
-            ((rx, ry), (rx + rw, ry)),           # ล่าง
-            ((rx + rw, ry), (rx + rw, ry + rh)), # ขวา
-            ((rx + rw, ry + rh), (rx, ry + rh)), # บน
-            ((rx, ry + rh), (rx, ry))            # ซ้าย
-        ]
-        
-        for p3, p4 in edges:
-            if self.segments_intersect((x1, y1), (x2, y2), p3, p4):
-                return True
-        return False
-
-    def segments_intersect(self, p1, p2, p3, p4):
-        """อัลกอริทึม CCW เพื่อเช็คว่าเส้นตรง 2 เส้นตัดกันหรือไม่"""
-        def ccw(A, B, C):
-            val = (C[1] - A[1]) * (B[0] - A[0]) - (B[1] - A[1]) * (C[0] - A[0])
-            if abs(val) < 1e-9: return 0 # ขนานหรือทับ
-            return 1 if val > 0 else -1
-
-        res1 = ccw(p1, p3, p4) != ccw(p2, p3, p4)
-        res2 = ccw(p1, p2, p3) != ccw(p1, p2, p4)
-        return res1 and res2
-
-    def stun(self, duration=3.0):
-        """Stuns the enemy for a specified duration."""
-        if self.is_fading: return
-        self.is_stunned = True
-        self.stun_timer = duration
-        self.is_moving = False
-        self.color_instr.rgb = (0.4, 0.4, 0.4) # Dark greyish tint for stun effect
-        self.update_frame()
-
-    def start_fade(self):
-        """เริ่มกระบวนการจางหาย"""
-        self.is_fading = True
-        self.is_moving = False
-        self.is_stunned = False # ยกเลิกสถานะอื่น
+            animation_scheduler.set_fps(self, target_fps)
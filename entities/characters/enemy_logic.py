@@ -0,0 +1,308 @@
+from data.settings import *
+from managers.replay import game_rng
+
+# (dx, dy) หน่วยเป็นช่อง -> ทิศของ sprite (ใช้กับก้าวที่ได้จาก pathfinding)
+STEP_DIRECTIONS = {(0, 1): 'up', (0, -1): 'down', (1, 0): 'right', (-1, 0): 'left'}
+
+class EnemyLogic:
+    """
+    Enemy state, chasing and collision rules without any Kivy dependency.
+    Shared by the rendered Enemy and the headless Simulation; Enemy overrides the graphics hooks.
+    """
+    def __init__(self, x, y, enemy_id, enemy_type=1):
+        self.x = x
+        self.y = y
+        self.id = enemy_id
+        self.enemy_type = enemy_type
+
+        # Stats and behavior
+        self.speed = ENEMY_SPEED
+        self.detection_radius = ENEMY_DETECTION_RADIUS
+        self.safe_zone_radius = SAFE_ZONE_RADIUS
+        
+        # Fade & Stun system
+        self.is_stunned = False
+        self.stun_timer = 0
+        self.is_fading = False
+        self.fading_done = False
+        self.alpha = 1.0
+        self.tint = (1, 1, 1)  # สีคูณของสไปรต์ (เทาตอนโดน stun)
+        
+        # Position system (เหมือน player)
+        self.logic_pos = [x, y]  # ตำแหน่ง 32x32 ทางตรรกะสำหรับการคำนวณเดินตาม Grid
+        self.is_moving = False
+        self.target_pos = [x, y]
+        self.turn_delay = 0
+        self.direction = 'down'
+        self.is_chasing = False
+        
+        # Animation properties
+        self.state = 'idle'
+        self.frame_index = 0
+        self.current_fps = 12
+        self.direction_change_timer = 0
+        self.direction_change_interval = 3.0
+        self.directions = ['down', 'left', 'right', 'up']
+
+    # --- Graphics hooks (Enemy วาดจริง, Simulation ไม่ต้องทำอะไร) ---
+    def update_frame(self):
+        pass
+
+    def sync_graphics_pos(self):
+        pass
+
+    def apply_color(self):
+        """ใช้ self.tint / self.alpha กับสไปรต์"""
+        pass
+
+    def destroy(self):
+        pass
+
+    def update(self, dt, player_pos, reaper_pos=None, solid_index=None, enemies=None, pathfinder=None, visibility=None):
+        """Main update loop called by the game logic."""
+        if self.is_fading:
+            self.is_chasing = False
+            self.alpha -= dt * 1.5 # ปรับความเร็วในการจางหาย
+            if self.alpha <= 0:
+                self.alpha = 0
+                self.fading_done = True
+            self.apply_color()
+            return
+
+        if self.is_moving:
+            self.continue_move()
+            
+        if not self.is_moving:
+            # Randomly change direction while idle
+            self.direction_change_timer += dt
+            if self.direction_change_timer >= self.direction_change_interval:
+                self.direction_change_timer = 0
+                available_dirs = [d for d in self.directions if d != self.direction]
+                self.direction = game_rng.choice(available_dirs)
+                self.frame_index = 0
+
+            # Stun check
+            if self.is_stunned:
+                self.is_chasing = False
+                self.stun_timer -= dt
+                if self.stun_timer <= 0:
+                    self.is_stunned = False
+                    self.tint = (1, 1, 1) # Reset color
+                    self.apply_color()
+                return # Don't move or chase while stunned
+
+            # Decide whether to chase the player (Optimization: Squared Distance)
+            dist_sq = (player_pos[0] - self.logic_pos[0])**2 + (player_pos[1] - self.logic_pos[1])**2
+            if dist_sq <= (self.detection_radius ** 2) and self.can_see(player_pos, solid_index, visibility):
+                self.is_chasing = True
+                self.chase_player_grid(player_pos, reaper_pos, solid_index, enemies, pathfinder)
+            else:
+                self.is_chasing = False
+        else:
+            # ขณะเดินไปเป้าหมาย (is_moving) ถ้ายังอยู่ในรัศมีและมองเห็น ก็ถือว่ายังไล่อยู่
+            dist_sq = (player_pos[0] - self.logic_pos[0])**2 + (player_pos[1] - self.logic_pos[1])**2
+            self.is_chasing = dist_sq <= (self.detection_radius ** 2) and self.can_see(player_pos, solid_index, visibility)
+        
+    def calculate_distance(self, target_pos):
+        """Calculates squared distance between enemy and target."""
+        # Note: Returned value is squared distance to avoid sqrt
+        return (target_pos[0] - self.logic_pos[0])**2 + (target_pos[1] - self.logic_pos[1])**2
+        
+    def chase_player_grid(self, player_pos, reaper_pos=None, solid_index=None, enemies=None, pathfinder=None):
+        """Implements grid-based chasing logic with safe zone detection."""
+        # ... (rest of the logic remains same but uses logic_pos)
+        self.turn_delay = 0
+
+        # ใช้ flow field / A* ก่อน (เดินอ้อมกำแพงได้) ถ้าไม่มีเส้นทางหรือก้าวไม่ได้ค่อยใช้การเดินตามแกนแบบเดิม
+        if pathfinder is not None:
+            step = pathfinder.next_step(self.logic_pos)
+            if step is not None:
+                move_x, move_y = step[0] * TILE_SIZE, step[1] * TILE_SIZE
+                new_x = self.logic_pos[0] + move_x
+                new_y = self.logic_pos[1] + move_y
+                if self._is_pos_safe_and_clear(new_x, new_y, reaper_pos, solid_index, enemies):
+                    self.direction = STEP_DIRECTIONS[step]
+                    self.frame_index = 0
+                    self.start_move(move_x, move_y)
+                    return
+
+        dx = player_pos[0] - self.logic_pos[0]
+        dy = player_pos[1] - self.logic_pos[1]
+        # พยายามเดินในแกนที่ระยะห่างมากที่สุดก่อน
+        primary_axis_blocked = False
+        if abs(dy) >= abs(dx) and abs(dy) > 0:
+            move_y = TILE_SIZE if dy > 0 else -TILE_SIZE
+            new_dir = 'up' if dy > 0 else 'down'
+            
+            # เช็คว่าแกน Y เดินได้ไหม
+            new_x = self.logic_pos[0]
+            new_y = self.logic_pos[1] + move_y
+            if self._is_pos_safe_and_clear(new_x, new_y, reaper_pos, solid_index, enemies):
+                self.direction = new_dir
+                self.frame_index = 0
+                self.start_move(0, move_y)
+                return
+            primary_axis_blocked = True
+            
+        if abs(dx) > 0:
+            move_x = TILE_SIZE if dx > 0 else -TILE_SIZE
+            new_dir = 'right' if dx > 0 else 'left'
+            
+            # เช็คว่าแกน X เดินได้ไหม
+            new_x = self.logic_pos[0] + move_x
+            new_y = self.logic_pos[1]
+            if self._is_pos_safe_and_clear(new_x, new_y, reaper_pos, solid_index, enemies):
+                self.direction = new_dir
+                self.frame_index = 0
+                self.start_move(move_x, 0)
+                return
+            
+        # ถ้าแกน X เป็นแกนหลักแต่โดนบล็อก ให้มาลองแกน Y ที่เมื่อกี้ข้ามไป
+        if not primary_axis_blocked and abs(dy) > 0:
+            move_y = TILE_SIZE if dy > 0 else -TILE_SIZE
+            new_dir = 'up' if dy > 0 else 'down'
+            new_x = self.logic_pos[0]
+            new_y = self.logic_pos[1] + move_y
+            if self._is_pos_safe_and_clear(new_x, new_y, reaper_pos, solid_index, enemies):
+                self.direction = new_dir
+                self.frame_index = 0
+                self.start_move(0, move_y)
+                return
+
+    def _is_pos_safe_and_clear(self, new_x, new_y, reaper_pos, solid_index, enemies=None):
+        """ตรวจสอบว่าตำแหน่งใหม่ปลอดภัยจาก Reaper และไม่มีกำแพงหรือศัตรูอื่นขวาง"""
+        # 1. เช็คขอบเขตแผนที่
+        if not (0 <= new_x <= MAP_WIDTH - TILE_SIZE and 0 <= new_y <= MAP_HEIGHT - TILE_SIZE):
+            return False
+            
+        # 3. เช็คกำแพง
+        if solid_index is not None and self.check_map_collision(new_x, new_y, solid_index):
+            return False
+            
+        # 4. เช็คการชนกับศัตรูตัวอื่น
+        if enemies and self.check_enemy_collision(new_x, new_y, enemies):
+            return False
+            
+        return True
+
+    def start_move(self, dx, dy):
+        """Sets the target position and begins movement (เหมือน player)."""
+        self.target_pos = [self.logic_pos[0] + dx, self.logic_pos[1] + dy]
+        self.is_moving = True
+
+    def continue_move(self):
+        """เลื่อนตำแหน่งศัตรูเข้าหาเป้าหมายอย่างลื่นไหล"""
+        for i in range(2):
+            if self.logic_pos[i] < self.target_pos[i]:
+                self.logic_pos[i] = min(self.logic_pos[i] + self.speed, self.target_pos[i])
+            elif self.logic_pos[i] > self.target_pos[i]:
+                self.logic_pos[i] = max(self.logic_pos[i] - self.speed, self.target_pos[i])
+        
+        self.sync_graphics_pos()
+        
+        if self.logic_pos == self.target_pos:
+            self.is_moving = False
+            
+    def check_map_collision(self, new_x, new_y, solid_index):
+        """ตรวจสอบว่าตำแหน่งใหม่จะชนกับกำแพง (Map tiles) หรือไม่ (solid_index = SolidRectIndex ของแมพ)"""
+        return solid_index.tile_blocked_at(new_x, new_y, TILE_SIZE)
+
+    def check_enemy_collision(self, new_x, new_y, enemies):
+        """ตรวจสอบว่าตำแหน่งใหม่จะชนกับศัตรูตัวอื่นหรือไม่"""
+        enemy_rect = [new_x, new_y, TILE_SIZE, TILE_SIZE]
+        
+        for other_enemy in enemies:
+            if other_enemy.id == self.id or other_enemy.is_fading: continue
+            
+            other_pos = other_enemy.logic_pos
+            if abs(other_pos[0] - new_x) > 32 or abs(other_pos[1] - new_y) > 32: continue
+            
+            if (enemy_rect[0] < other_pos[0] + TILE_SIZE and
+                enemy_rect[0] + TILE_SIZE > other_pos[0] and
+                enemy_rect[1] < other_pos[1] + TILE_SIZE and
+                enemy_rect[1] + TILE_SIZE > other_pos[1]):
+                return True
+        return False
+
+    def check_player_collision_logic(self, player_pos, tile_size):
+        """Check for collision with player using logic coordinates"""
+        buffer = 4
+        return (self.logic_pos[0] < player_pos[0] + tile_size + buffer and
+                self.logic_pos[0] + TILE_SIZE + buffer > player_pos[0] and
+                self.logic_pos[1] < player_pos[1] + tile_size + buffer and
+                self.logic_pos[1] + TILE_SIZE + buffer > player_pos[1])
+            
+    def can_see(self, target_pos, solid_index, visibility=None):
+        """ใช้ VisibilityService (grid + memo) ถ้ามี ไม่งั้นใช้การยิง ray แบบเดิม"""
+        if visibility is not None:
+            return visibility.has_line_of_sight(self.logic_pos, target_pos)
+        return self.has_line_of_sight(target_pos, solid_index)
+
+    def has_line_of_sight(self, target_pos, solid_index):
+        """ตรวจสอบว่ามีกำแพงกั้นระหว่างศัตรูกับผู้เล่นหรือไม่ (Optimization: ลด Ray count)"""
+        if solid_index is None: return True
+            
+        ex, ey = self.logic_pos[0] + TILE_SIZE/2, self.logic_pos[1] + TILE_SIZE/2
+        px, py = target_pos[0] + TILE_SIZE/2, target_pos[1] + TILE_SIZE/2
+        
+        # 1. เช็คเส้นกลางก่อน (Center to Center)
+        if self._check_ray(ex, ey, px, py, solid_index):
+            return True
+            
+        # 2. เช็คจากมุมที่หดเข้ามานิดหน่อย (Edge peek)
+        # ถ้ากลางไม่ผ่าน ลองเช็คอีก 2 จุดเพื่อความฉลาดในการเลี้ยว
+        pts = [(self.logic_pos[0]+2, self.logic_pos[1]+2), (self.logic_pos[0]+TILE_SIZE-2, self.logic_pos[1]+TILE_SIZE-2)]
+        for pt in pts:
+            if self._check_ray(pt[0], pt[1], px, py, solid_index):
+                return True
+        return False
+
+    def _check_ray(self, x1, y1, x2, y2, solid_index):
+        # ใช้ spatial hash: ได้เฉพาะ rect ที่อยู่ใน cell ที่เส้นลากผ่าน
+        for r in solid_index.segment_hits(x1, y1, x2, y2):
+            if self.line_intersects_rect(x1, y1, x2, y2, r):
+                return False
+        return True
+
+    def line_intersects_rect(self, x1, y1, x2, y2, rect):
+        """ตรวจสอบว่าเส้นตรงตัดกับสี่เหลี่ยมหรือไม่"""
+        rx, ry, rw, rh = rect
+        # ขอบทั้ง 4 ของสี่เหลี่ยม
+        edges = [
+            ((rx, ry), (rx + rw, ry)),           # ล่าง
+            ((rx + rw, ry), (rx + rw, ry + rh)), # ขวา
+            ((rx + rw, ry + rh), (rx, ry + rh)), # บน
+            ((rx, ry + rh), (rx, ry))            # ซ้าย
+        ]
+        
+        for p3, p4 in edges:
+            if self.segments_intersect((x1, y1), (x2, y2), p3, p4):
+                return True
+        return False
+
+    def segments_intersect(self, p1, p2, p3, p4):
+        """อัลกอริทึม CCW เพื่อเช็คว่าเส้นตรง 2 เส้นตัดกันหรือไม่"""
+        def ccw(A, B, C):
+            val = (C[1] - A[1]) * (B[0] - A[0]) - (B[1] - A[1]) * (C[0] - A[0])
+            if abs(val) < 1e-9: return 0 # ขนานหรือทับ
+            return 1 if val > 0 else -1
+
+        res1 = ccw(p1, p3, p4) != ccw(p2, p3, p4)
+        res2 = ccw(p1, p2, p3) != ccw(p1, p2, p4)
+        return res1 and res2
+
+    def stun(self, duration=3.0):
+        """Stuns the enemy for a specified duration."""
+        if self.is_fading: return
+        self.is_stunned = True
+        self.stun_timer = duration
+        self.is_moving = False
+        self.tint = (0.4, 0.4, 0.4) # Dark greyish tint for stun effect
+        self.apply_color()
+        self.update_frame()
+
+    def start_fade(self):
+        """เริ่มกระบวนการจางหาย"""
+        self.is_fading = True
+        self.is_moving = False
+        self.is_stunned = False # ยกเลิกสถานะอื่น
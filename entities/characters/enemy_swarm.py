@@ -0,0 +1,55 @@
+class EnemySwarm:
+    """ตำแหน่งของศัตรูทั้งแมพแบบ struct-of-arrays (xs / ys เรียงตาม index ของ list ที่ bind ไว้)
+
+    xs / ys เป็น list ของตัวเลขธรรมดา ไม่ใช่ array('d') เพราะ array ต้องสร้าง float object ใหม่ทุกครั้งที่อ่าน
+    (วนทั้งฝูงช้ากว่า list ราว 35% ตอนวัดกับศัตรู 1000 ตัว)
+
+    Simulation.update_enemies ใช้คัดกรองทั้งฝูงในรอบเดียว (ระยะ culling + รัศมีตรวจจับ)
+    แล้วค่อยเรียก object ของศัตรูเฉพาะตัวที่อยู่ใกล้หรือเพิ่งเปลี่ยนสถานะ
+    ตำแหน่งศัตรูเปลี่ยนได้แค่ใน EnemyLogic.update ผู้เรียกจึงต้องเขียน xs[i] / ys[i] ใหม่หลัง update ทุกครั้ง
+    """
+
+    def __init__(self):
+        self.enemies = []
+        self.xs = []
+        self.ys = []
+        self.near = set()  # index ของตัวที่อยู่ในระยะอัปเดตเมื่อเฟรมก่อน
+
+    def bind(self, enemies):
+        """ผูกกับ list ของศัตรู: อ่านตำแหน่งใหม่ทั้งหมดเฉพาะตอนสมาชิกเปลี่ยน (เกิด/ลบ/เปลี่ยนแมพ)"""
+        if enemies == self.enemies:
+            return
+        self.enemies = list(enemies)
+        self.xs = [e.logic_pos[0] for e in enemies]
+        self.ys = [e.logic_pos[1] for e in enemies]
+        # ยังไม่รู้ว่าใครเคยอยู่ใกล้ ให้ถือว่าทุกตัวเคยอยู่ใกล้ (ตัวที่ไกลจะถูกรีเซ็ต is_chasing หนึ่งครั้ง)
+        self.near = set(range(len(self.enemies)))
+
+    def cull(self, px, py, distance, start=0):
+        """index ของตัวที่อยู่ในระยะ Manhattan ไม่เกิน distance จากผู้เล่น (วนคู่ xs/ys รอบเดียว)
+
+        ตัวที่เพิ่งออกนอกระยะถูกตั้ง is_chasing = False ตัวที่ไกลอยู่แล้วไม่ถูกแตะเลย
+        start: คัดเฉพาะ index ตั้งแต่ start (ใช้ตอนผู้เล่นถูกย้ายกลางเฟรม ตัวก่อนหน้าถูกอัปเดตไปแล้ว)
+        """
+        xs, ys = self.xs, self.ys
+        n = len(xs)
+        # เทียบกรอบสี่เหลี่ยมก่อน (แค่เปรียบเทียบ ไม่เรียก abs) ตัวที่ไกลส่วนใหญ่ตกรอบตั้งแต่ตรงนี้
+        x0, x1, y0, y1 = px - distance, px + distance, py - distance, py + distance
+        indices = [i for i, x, y in zip(range(start, n), xs[start:], ys[start:])
+                   if x0 <= x <= x1 and y0 <= y <= y1 and abs(x - px) + abs(y - py) <= distance]
+        near = set(indices)
+        enemies = self.enemies
+        for i in self.near - near:
+            if i >= start:
+                enemies[i].is_chasing = False
+            else:
+                near.add(i)
+        self.near = near
+        return indices
+
+    def within(self, indices, px, py, radius):
+        """ตำแหน่งของตัวใน indices ที่ยังไม่จางหายและอยู่ในรัศมี (ระยะยกกำลังสอง ไม่ใช้ sqrt)"""
+        xs, ys, enemies = self.xs, self.ys, self.enemies
+        r_sq = radius * radius
+        return [(xs[i], ys[i]) for i in indices
+                if (xs[i] - px) ** 2 + (ys[i] - py) ** 2 <= r_sq and not enemies[i].is_fading]
@@ -1,8 +1,9 @@
 from kivy.graphics import Rectangle, Color, InstructionGroup
-from kivy.core.image import Image as CoreImage
-from kivy.clock import Clock
+from assets.texture_cache import texture_cache
 from data.settings import *
+from managers.animation import animation_scheduler
 import random
+from managers.replay import game_rng
 
 NPC_START_POSITIONS = {
     'NPC1': (896, 256),
@@ -92,7 +93,7 @@ class NPC:
         
         # โหลด Texture
         try:
-            self.idle_texture = CoreImage(self.image_path).texture
+            self.idle_texture = texture_cache.get(self.image_path)
             print(f"NPC loaded: {self.image_path}, size: {self.idle_texture.size}")
         except Exception as e:
             print(f"Failed to load NPC texture {self.image_path}: {e}")
@@ -101,7 +102,8 @@ class NPC:
         
         # ตั้งค่า animation config (ใช้ spritesheet แบบไดนามิก)
         self.anim_config = {
-            'idle': {'tex': self.idle_texture, 'cols': self.cols, 'rows': self.rows}
+            'idle': {'tex': self.idle_texture, 'cols': self.cols, 'rows': self.rows,
+                     'frames': texture_cache.sprite_frames(self.image_path, self.cols, self.rows, flip_rows=False)}
         }
         
         self.state = 'idle'
@@ -142,7 +144,7 @@ class NPC:
         self.canvas.add(self.group)
         
         self.update_frame()
-        self.anim_event = Clock.schedule_interval(self.animate, 1.0 / self.current_fps)
+        animation_scheduler.register(self, self.current_fps)
     
     def update_frame(self):
         # ใช้ spritesheet แบบเดียวกับ player
@@ -150,24 +152,16 @@ class NPC:
         tex = config['tex']
         
         if tex:
-            # คำนวณขนาดของแต่ละเฟรมใน spritesheet
-            w = 1.0 / config['cols']  # ความกว้างของแต่ละเฟรม
-            h = 1.0 / config['rows']  # ความสูงของแต่ละเฟรม
-            
-            u = 0  # 1 คอลัมน์ ดังนั้น u จะเป็น 0 เสมอ
-            
             # Get row index based on state and direction
             try:
                 row_index = self.anim_row_map[self.state][self.direction]
             except KeyError:
                 row_index = 0 # Fallback
                 
-            # คำนวณแถว - ปรับพิกัดให้ภาพไม่แหว่ง
-            v = (row_index * h)
-            
-            self.rect.texture = tex
-            # ปรับ tex_coords ให้ภาพอยู่ในกรอบ
-            self.rect.tex_coords = (u, v + h, u + w, v + h, u + w, v, u, v)
+            if self.rect.texture is not tex:
+                self.rect.texture = tex
+            # tex_coords คำนวณไว้แล้ว (แถวนับจากล่าง, 1 คอลัมน์ ดังนั้นใช้คอลัมน์ 0 เสมอ)
+            self.rect.tex_coords = config['frames'][row_index][0]
         else:
             # ไม่มี texture ให้แสดงสี่เหลี่ยมสีแดง
             self.rect.texture = None
@@ -237,7 +231,7 @@ class NPC:
                 # เลือกทิศทางใหม่แบบสุ่ม (แต่ไม่ซ้ำทิศทางปัจจุบัน)
                 current_direction = self.direction
                 available_directions = [d for d in self.directions if d != current_direction]
-                self.direction = random.choice(available_directions)
+                self.direction = game_rng.choice(available_directions)
                 self.frame_index = 0  # รีเซ็ตเฟรมเมื่อเปลี่ยนทิศทาง
         else:
             # NPCs อื่นๆ อยู่ในท่า down เสมอเมื่อไม่ได้เคลื่อนไหว
@@ -255,8 +249,6 @@ class NPC:
 
     def destroy(self):
         """ลบ NPC ออกจากจอโดยสมบูรณ์"""
-        if self.anim_event:
-            Clock.unschedule(self.anim_event)
-            self.anim_event = None
+        animation_scheduler.unregister(self)
         if self.group in self.canvas.children:
             self.canvas.remove(self.group)
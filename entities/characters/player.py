@@ -1,44 +1,27 @@
 from kivy.graphics import Rectangle, Color, InstructionGroup
-from kivy.core.image import Image as CoreImage
-from kivy.clock import Clock
-from kivy.core.audio import SoundLoader
+from assets.texture_cache import texture_cache
+from assets.sound_bank import sound_bank
 import random
-import os
 from data.settings import *
+from managers.animation import animation_scheduler
+from entities.characters.player_logic import PlayerLogic
 
-class Player:
+class Player(PlayerLogic):
     def __init__(self, canvas, x=None, y=None):
         self.canvas = canvas
-        self.is_moving = False
-        
-        # กำหนดตำแหน่งเริ่มต้น (จากพิกัดที่ส่งมา หรือจากค่าเริ่มต้นใน settings)
-        if x is not None and y is not None:
-            start_x, start_y = x, y
-        else:
-            start_x = (PLAYER_START_X // TILE_SIZE) * TILE_SIZE
-            start_y = (PLAYER_START_Y // TILE_SIZE) * TILE_SIZE
-            
-        self.x, self.y = start_x, start_y
-        self.target_pos = [start_x, start_y]
-        self.logic_pos = [start_x, start_y]
-        self.current_speed = WALK_SPEED
-        self.turn_delay = 0  # <--- เพิ่มตัวหน่วงเวลาตอนเปลี่ยนทิศทาง
-        self.is_in_home = False      # เช็คว่าอยู่ในบ้านหรือไม่เพื่อเปลี่ยนเสียงเดิน
-        self.is_underground = False   # เช็คว่าอยู่ใน underground หรือไม่
-        self.cutscene_mode = False # บังคับให้เล่นอนิเมชั่นเดินแม้ไม่ได้กดปุ่ม (เช่น ในคัทซีน)
-        self.animation_disabled = False # ปิดการอนิเมชั่นทั้งหมด (สำหรับยืนนิ่งๆ ในคัทซีน)
-        # ขอบเขตแมพจริง (อัปเดตเมื่อเปลี่ยนแมพ) รูปแบบ: (min_x, min_y, max_x, max_y)
-        # กิน 1 block เข้ามาทุกด้าน ป้องกันการเดินชิดขอบแมพ
-        self.map_bounds = (TILE_SIZE, TILE_SIZE, MAP_WIDTH - TILE_SIZE * 2, MAP_HEIGHT - TILE_SIZE * 2)
+        super().__init__(x, y)
         
         # โหลด Texture
-        self.idle_texture = CoreImage(PLAYER_IDLE_IMG).texture
-        self.walk_texture = CoreImage(PLAYER_WALK_IMG).texture
+        self.idle_texture = texture_cache.get(PLAYER_IDLE_IMG)
+        self.walk_texture = texture_cache.get(PLAYER_WALK_IMG)
         
         # ตั้งชื่อให้ตรงกันทั้งหมด (ใช้ anim_config และ key 'tex')
+        # เฟรมละ 128px: ขนาด UV ของเฟรมคิดจากขนาดจริงของภาพ
         self.anim_config = {
-            'idle': {'tex': self.idle_texture, 'cols': 3, 'rows': 4},
-            'walk': {'tex': self.walk_texture, 'cols': 8, 'rows': 4}
+            'idle': {'tex': self.idle_texture, 'cols': 3, 'rows': 4,
+                     'frames': texture_cache.sprite_frames(PLAYER_IDLE_IMG, 3, 4, frame_uv=(128.0 / self.idle_texture.width, 128.0 / self.idle_texture.height))},
+            'walk': {'tex': self.walk_texture, 'cols': 8, 'rows': 4,
+                     'frames': texture_cache.sprite_frames(PLAYER_WALK_IMG, 8, 4, frame_uv=(128.0 / self.walk_texture.width, 128.0 / self.walk_texture.height))}
         }
         
         # สลับตัวเลข 0, 1, 2, 3 เพื่อให้ตรงกับแถวในรูป Spritesheet ได้เลยครับ
@@ -57,15 +40,6 @@ class Player:
                 'up': 2
             }
         }
-        
-        self.state = 'idle'
-        self.direction = 'up' 
-        self.frame_index = 0
-        
-        # Stamina
-        self.stamina = MAX_STAMINA
-        self.max_stamina = MAX_STAMINA
-        self.exhausted = False
 
         # สร้าง InstructionGroup เพื่อจัดการการวาดแบบแยกส่วน (สำหรับ Y-sorting)
         self.group = InstructionGroup()
@@ -83,57 +57,31 @@ class Player:
         self.update_frame()
         self.current_fps = 2
         
-        # โหลดเสียงเดิน
-        self.walk_sounds = []
-        walk_sound_dir = 'assets/sound/walk'
-        if os.path.exists(walk_sound_dir):
-            for file in os.listdir(walk_sound_dir):
-                if file.endswith('.wav'):
-                    s = SoundLoader.load(os.path.join(walk_sound_dir, file))
-                    if s:
-                        s.volume = 0.5
-                        self.walk_sounds.append(s)
+        # โหลดเสียงเดิน (handle ใช้ร่วมกันจาก SoundBank ไม่โหลดไฟล์ซ้ำตอนสร้าง Player ใหม่)
+        self.walk_sounds = sound_bank.load_dir('assets/sound/walk', 0.5)
         
         # โหลดเสียงวิ่ง
-        self.run_sounds = self._load_sounds('assets/sound/run', 0.6)
+        self.run_sounds = sound_bank.load_dir('assets/sound/run', 0.6)
         
         # โหลดเสียงเดินในบ้าน (ไม้)
-        self.walk_w_sounds = self._load_sounds('assets/sound/walk_w', 0.5)
+        self.walk_w_sounds = sound_bank.load_dir('assets/sound/walk_w', 0.5)
         
         # โหลดเสียงวิ่งในบ้าน (ไม้)
-        self.run_w_sounds = self._load_sounds('assets/sound/run_w', 0.6)
+        self.run_w_sounds = sound_bank.load_dir('assets/sound/run_w', 0.6)
 
         # โหลดเสียงเดิน/วิ่งใน Underground (หิน)
-        self.walk_r_sounds = self._load_sounds('assets/sound/walk_r', 0.5)
-        self.run_r_sounds  = self._load_sounds('assets/sound/run_r', 0.6)
+        self.walk_r_sounds = sound_bank.load_dir('assets/sound/walk_r', 0.5)
+        self.run_r_sounds  = sound_bank.load_dir('assets/sound/run_r', 0.6)
         
         # โหลดเสียงหอบเมื่อเหนื่อย
-        self.breath_sound = SoundLoader.load('assets/sound/breath.wav')
-        if self.breath_sound:
-            self.breath_sound.loop = True
-            self.breath_sound.volume = 0.5
+        self.breath_sound = sound_bank.load('assets/sound/breath.wav', 0.5, loop=True)
         
-        self.anim_event = Clock.schedule_interval(self.animate, 1.0 / self.current_fps)
-
-    def _load_sounds(self, directory, volume):
-        sounds = []
-        if os.path.exists(directory):
-            for file in os.listdir(directory):
-                if file.endswith('.wav'):
-                    s = SoundLoader.load(os.path.join(directory, file))
-                    if s:
-                        s.volume = volume
-                        sounds.append(s)
-        return sounds
+        animation_scheduler.register(self, self.current_fps)
 
     def update_frame(self):
         # เรียกใช้ตัวแปรที่ชื่อตรงกัน
         config = self.anim_config[self.state]
         tex = config['tex']
-        w = 128.0 / tex.width
-        h = 128.0 / tex.height
-        
-        u = self.frame_index * w
         
         # Get row index based on state and direction
         try:
@@ -141,12 +89,11 @@ class Player:
         except KeyError:
             row_index = 0 # Fallback
             
-        # คำนวณแถว
-        v = 1.0 - ((row_index + 1) * h)
-        
-        self.rect.texture = config['tex']
-        # Flip texture vertically by swapping v and v + h
-        self.rect.tex_coords = (u, v + h, u + w, v + h, u + w, v, u, v)
+        # tex_coords ของทุกเฟรมคำนวณไว้แล้ว (flip แนวตั้งแล้ว)
+        frames = config['frames'][row_index]
+        if self.rect.texture is not tex:
+            self.rect.texture = tex
+        self.rect.tex_coords = frames[self.frame_index % len(frames)]
         
     def animate(self, dt):
         # ถ้า animation_disabled เป็น True ให้ข้ามการอนิเมชั่นทั้งหมด
@@ -172,82 +119,15 @@ class Player:
                     if self.is_underground:  sounds = self.run_r_sounds
                     elif self.is_in_home:    sounds = self.run_w_sounds
                     else:                    sounds = self.run_sounds
-                    if sounds: random.choice(sounds).play()
+                    if sounds: sound_bank.play(random.choice(sounds), 'footsteps')
                 else:
                     if self.is_underground:  sounds = self.walk_r_sounds
                     elif self.is_in_home:    sounds = self.walk_w_sounds
                     else:                    sounds = self.walk_sounds
-                    if sounds: random.choice(sounds).play()
+                    if sounds: sound_bank.play(random.choice(sounds), 'footsteps')
             
         self.update_frame()
         
-    def move(self, pressed_keys, npcs=None, reaper=None, map_rects=None, candles=None):  # เพิ่ม map_rects และ candles
-        # 1. อัปเดตตำแหน่งก่อน หากเดินอยู่ให้เดินจนจบช่อง
-        if self.is_moving:
-            self.continue_move()
-
-        # 2. ถ้าตรวจสอบแล้วพบว่าหยุดนิ่ง (หรือเพิ่งเดินถึงเป้าหมายในเฟรมนี้พอดี) ให้รับคำสั่งเดินต่อทันที
-        if not self.is_moving:
-            if self.turn_delay > 0:
-                self.turn_delay -= 1
-            else:
-                dx, dy = 0, 0
-                new_dir = self.direction
-
-                if 'w' in pressed_keys or 'up' in pressed_keys: 
-                    dy = TILE_SIZE; new_dir = 'up' 
-                elif 's' in pressed_keys or 'down' in pressed_keys: 
-                    dy = -TILE_SIZE; new_dir = 'down' 
-                elif 'a' in pressed_keys or 'left' in pressed_keys: 
-                    dx = -TILE_SIZE; new_dir = 'left' 
-                elif 'd' in pressed_keys or 'right' in pressed_keys: 
-                    dx = TILE_SIZE; new_dir = 'right'
-
-                if dx != 0 or dy != 0:
-                    if self.direction != new_dir:
-                        # ถ้าเปลี่ยนทิศ ให้หันหน้าก่อนแล้วหน่วงเวลาเล็กน้อย
-                        self.direction = new_dir
-                        self.turn_delay = 6  # จำนวนเฟรมที่รอก่อนเดิน (ประมาน 0.1 วินาที)
-                        self.update_frame()
-                    else:
-                        self.start_move(dx, dy, npcs, reaper, map_rects, candles)  # ส่ง candles ไปด้วย
-
-        # 3. Handling stamina and animation speed
-        is_running = 'shift' in pressed_keys and self.is_moving
-        self.update_stamina(is_running)
-        self.update_animation_speed()
-            
-        # 4. Return to idle instantly if not moving
-        if not self.is_moving and self.state != 'idle':
-            # ถ้าอยู่ในคัทซีนและเป็นการเดินต่อเนื่อง ไม่ต้องรีเซตเฟรมเป็น 0 ทุกช่อง
-            if not getattr(self, 'cutscene_mode', False):
-                self.state = 'idle'
-                self.frame_index = 0
-                self.update_frame()
-            else:
-                # ในคัทซีน ให้ค้างท่าเดินไว้จนกว่าจะสั่งหยุดจริงๆ
-                pass
-
-    def update_stamina(self, is_running):
-        """Manages stamina drain, regeneration, and exhausted state."""
-        # Handle exhaustion recovery
-        if self.exhausted and self.stamina >= self.max_stamina:
-            self.exhausted = False
-            if self.breath_sound and self.breath_sound.state == 'play':
-                self.breath_sound.stop()
-
-        if is_running and not self.exhausted:
-            self.current_speed = RUN_SPEED
-            self.stamina = max(0, self.stamina - STAMINA_DRAIN)
-            if self.stamina <= 0:
-                self.exhausted = True
-                if self.breath_sound and self.breath_sound.state != 'play':
-                    self.breath_sound.play()
-        else:
-            self.current_speed = WALK_SPEED
-            if self.stamina < self.max_stamina:
-                self.stamina = min(self.max_stamina, self.stamina + STAMINA_REGEN)
-
     def update_animation_speed(self):
         """Sets animation FPS based on movement state and fatigue."""
         if self.is_moving or getattr(self, 'cutscene_mode', False):
@@ -258,126 +138,15 @@ class Player:
         
         if self.current_fps != target_fps:
             self.current_fps = target_fps
-            self.anim_event.cancel()
-            self.anim_event = Clock.schedule_interval(self.animate, 1.0 / target_fps)
+            animation_scheduler.set_fps(self, target_fps)
 
-    def get_stamina_ratio(self):
-        """Returns current stamina as a 0.0-1.0 ratio."""
-        return max(0.0, self.stamina / self.max_stamina)
+    def on_exhausted(self):
+        if self.breath_sound and self.breath_sound.state != 'play':
+            self.breath_sound.play()
 
-    def start_move(self, dx, dy, npcs=None, reaper=None, map_rects=None, candles=None):
-        new_x = self.logic_pos[0] + dx
-        new_y = self.logic_pos[1] + dy
-        
-        # ตรวจสอบขอบเขตแมพ (ใช้ self.map_bounds ซึ่งอัปเดตตามแมพจริง ไม่ใช่ MAP_WIDTH/HEIGHT จาก settings)
-        is_cutscene = getattr(self, 'cutscene_mode', False)
-        bounds = getattr(self, 'map_bounds', (TILE_SIZE, TILE_SIZE, MAP_WIDTH - TILE_SIZE * 2, MAP_HEIGHT - TILE_SIZE * 2))
-        min_x, min_y, max_x, max_y = bounds
-        if is_cutscene or (min_x <= new_x <= max_x and min_y <= new_y <= max_y):
-            # ตรวจสอบกำแพงจากแผนที่
-            if map_rects and self.check_map_collision(new_x, new_y, map_rects) and not is_cutscene:
-                # print("Cannot move - Wall blocking!") # ปิด log เพื่อไม่ให้รกจอ
-                return
-                
-            # ตรวจสอบการชนกับ NPC
-            if npcs and self.check_npc_collision(new_x, new_y, npcs):
-                print("Cannot move - NPC blocking!")
-                return
-            
-            # ตรวจสอบการชนกับ Reaper
-            if reaper and self.check_reaper_collision(new_x, new_y, reaper) and not is_cutscene:
-                print("Cannot move - Reaper blocking!")
-                return
-            
-            # ตรวจสอบการชนกับเทียน (Day 3)
-            if candles and self.check_candle_collision(new_x, new_y, candles) and not is_cutscene:
-                # print("Cannot move - Candle blocking!")
-                return
-            
-            
-            self.target_pos = [new_x, new_y]
-            self.is_moving = True
-            
-            # บังคับแสดงท่าก้าวขาทันที (โดยเฉพาะเมื่อเดินแค่ 1 ช่อง สล็อตเวลาจะไม่พอให้อนิเมชั่นเล่นเอง)
-            if self.state != 'walk':
-                self.state = 'walk'
-                self.frame_index = 1
-                self.update_frame()
-            
-    def check_map_collision(self, new_x, new_y, map_rects):
-        """ตรวจสอบว่าตำแหน่งใหม่จะชนกับกำแพง (Map tiles) หรือไม่"""
-        player_rect = [new_x, new_y, TILE_SIZE, TILE_SIZE]
-        
-        for r in map_rects:
-            # ใช้ Logic กล่องแบบห้ามซ้อนทับกันเต็มขนาด (ถ้ามากกว่าคือทับ)
-            if (player_rect[0] < r[0] + r[2] and
-                player_rect[0] + player_rect[2] > r[0] and
-                player_rect[1] < r[1] + r[3] and
-                player_rect[1] + player_rect[3] > r[1]):
-                return True
-        return False
-
-    def check_candle_collision(self, new_x, new_y, candles):
-        """ตรวจสอบว่าตำแหน่งใหม่จะชนกับเทียนหรือไม่"""
-        player_rect = [new_x, new_y, TILE_SIZE, TILE_SIZE]
-        for candle in candles:
-            candle_rect = [candle.x, candle.y, TILE_SIZE, TILE_SIZE]
-            if (player_rect[0] < candle_rect[0] + candle_rect[2] and
-                player_rect[0] + player_rect[2] > candle_rect[0] and
-                player_rect[1] < candle_rect[1] + candle_rect[3] and
-                player_rect[1] + player_rect[3] > candle_rect[1]):
-                return True
-        return False
-    
-    def check_npc_collision(self, new_x, new_y, npcs):
-        """ตรวจสอบว่าตำแหน่งใหม่จะชนกับ NPC หรือไม่"""
-        player_rect = [new_x, new_y, TILE_SIZE, TILE_SIZE]
-        
-        for npc in npcs:
-            # ใช้พิกัด x, y ตัวแปรหลักของระบบ Hitbox ใหม่ 
-            npc_rect = [npc.x, npc.y, TILE_SIZE, TILE_SIZE]
-            
-            # ตรวจสอบการชนระหว่างสี่เหลี่ยม
-            if (player_rect[0] < npc_rect[0] + npc_rect[2] and
-                player_rect[0] + player_rect[2] > npc_rect[0] and
-                player_rect[1] < npc_rect[1] + npc_rect[3] and
-                player_rect[1] + player_rect[3] > npc_rect[1]):
-                print(f"DEBUG: Blocked by NPC physically located at {npc.x}, {npc.y}")
-                return True
-        
-        return False
-
-    def check_reaper_collision(self, new_x, new_y, reaper):
-        """ตรวจสอบว่าตำแหน่งใหม่จะชนกับ Reaper หรือไม่"""
-        player_rect = [new_x, new_y, TILE_SIZE, TILE_SIZE]
-        
-        reapers = reaper if isinstance(reaper, list) else [reaper]
-        for r in reapers:
-            if not r: continue
-            # ใช้พิกัด x, y ตัวแปรหลักของระบบ Hitbox ใหม่ 
-            reaper_rect = [r.x, r.y, TILE_SIZE, TILE_SIZE]
-            
-            # ตรวจสอบการชนระหว่างสี่เหลี่ยม
-            if (player_rect[0] < reaper_rect[0] + reaper_rect[2] and
-                player_rect[0] + player_rect[2] > reaper_rect[0] and
-                player_rect[1] < reaper_rect[1] + reaper_rect[3] and
-                player_rect[1] + player_rect[3] > reaper_rect[1]):
-                return True
-        
-        return False
-
-    def continue_move(self):
-        """เลื่อนตำแหน่งผู้เล่นเข้าหาเป้าหมาย (Grid-based)"""
-        for i in range(2): # x, y
-            if self.logic_pos[i] < self.target_pos[i]:
-                self.logic_pos[i] = min(self.logic_pos[i] + self.current_speed, self.target_pos[i])
-            elif self.logic_pos[i] > self.target_pos[i]:
-                self.logic_pos[i] = max(self.logic_pos[i] - self.current_speed, self.target_pos[i])
-
-        self.x, self.y = self.logic_pos
-        self.sync_graphics_pos()
-        if self.logic_pos == self.target_pos:
-            self.is_moving = False
+    def on_recovered(self):
+        if self.breath_sound and self.breath_sound.state == 'play':
+            self.breath_sound.stop()
 
     def sync_graphics_pos(self):
         """อัปเดตตำแหน่งกราฟิกให้ตรงกับ Logic"""
@@ -393,17 +162,6 @@ class Player:
         # เมธอดนี้อาจเหลือไว้เพียงเพื่อให้รองรับโค้ดเก่าในบางจุด
         return None, None, None, 0, 0
 
-    def stop(self):
-        """หยุดการเดินและรีเซ็ตสถานะทั้งหมด"""
-        self.is_moving = False
-        self.target_pos = list(self.logic_pos)
-        self.state = 'idle'
-        self.frame_index = 0
-        self.cutscene_mode = False
-        self.animation_disabled = False
-        self.update_frame()
-        self.update_animation_speed()
-
     def cleanup(self):
         """หยุดเสียงทั้งหมดของ Player"""
         all_sound_groups = [
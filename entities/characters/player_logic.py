@@ -0,0 +1,242 @@
+from data.settings import *
+
+class PlayerLogic:
+    """
+    Player movement, collision and stamina rules without any Kivy dependency.
+    Shared by the rendered Player and the headless Simulation; Player overrides the graphics/sound hooks.
+    """
+    def __init__(self, x=None, y=None):
+        self.is_moving = False
+        
+        # กำหนดตำแหน่งเริ่มต้น (จากพิกัดที่ส่งมา หรือจากค่าเริ่มต้นใน settings)
+        if x is not None and y is not None:
+            start_x, start_y = x, y
+        else:
+            start_x = (PLAYER_START_X // TILE_SIZE) * TILE_SIZE
+            start_y = (PLAYER_START_Y // TILE_SIZE) * TILE_SIZE
+            
+        self.x, self.y = start_x, start_y
+        self.target_pos = [start_x, start_y]
+        self.logic_pos = [start_x, start_y]
+        self.current_speed = WALK_SPEED
+        self.turn_delay = 0  # <--- เพิ่มตัวหน่วงเวลาตอนเปลี่ยนทิศทาง
+        self.is_in_home = False      # เช็คว่าอยู่ในบ้านหรือไม่เพื่อเปลี่ยนเสียงเดิน
+        self.is_underground = False   # เช็คว่าอยู่ใน underground หรือไม่
+        self.cutscene_mode = False # บังคับให้เล่นอนิเมชั่นเดินแม้ไม่ได้กดปุ่ม (เช่น ในคัทซีน)
+        self.animation_disabled = False # ปิดการอนิเมชั่นทั้งหมด (สำหรับยืนนิ่งๆ ในคัทซีน)
+        # ขอบเขตแมพจริง (อัปเดตเมื่อเปลี่ยนแมพ) รูปแบบ: (min_x, min_y, max_x, max_y)
+        # กิน 1 block เข้ามาทุกด้าน ป้องกันการเดินชิดขอบแมพ
+        self.map_bounds = (TILE_SIZE, TILE_SIZE, MAP_WIDTH - TILE_SIZE * 2, MAP_HEIGHT - TILE_SIZE * 2)
+        
+        self.state = 'idle'
+        self.direction = 'up' 
+        self.frame_index = 0
+        
+        # Stamina
+        self.stamina = MAX_STAMINA
+        self.max_stamina = MAX_STAMINA
+        self.exhausted = False
+
+    # --- Graphics / sound hooks (Player วาดและเล่นเสียงจริง, Simulation ไม่ต้องทำอะไร) ---
+    def update_frame(self):
+        pass
+
+    def sync_graphics_pos(self):
+        pass
+
+    def update_animation_speed(self):
+        pass
+
+    def on_exhausted(self):
+        """เรียกตอนสตามิน่าหมด"""
+        pass
+
+    def on_recovered(self):
+        """เรียกตอนสตามิน่ากลับมาเต็มหลังหมดแรง"""
+        pass
+
+    def move(self, pressed_keys, npcs=None, reaper=None, solid_index=None, candles=None):  # เพิ่ม solid_index และ candles
+        # 1. อัปเดตตำแหน่งก่อน หากเดินอยู่ให้เดินจนจบช่อง
+        if self.is_moving:
+            self.continue_move()
+
+        # 2. ถ้าตรวจสอบแล้วพบว่าหยุดนิ่ง (หรือเพิ่งเดินถึงเป้าหมายในเฟรมนี้พอดี) ให้รับคำสั่งเดินต่อทันที
+        if not self.is_moving:
+            if self.turn_delay > 0:
+                self.turn_delay -= 1
+            else:
+                dx, dy = 0, 0
+                new_dir = self.direction
+
+                if 'w' in pressed_keys or 'up' in pressed_keys: 
+                    dy = TILE_SIZE; new_dir = 'up' 
+                elif 's' in pressed_keys or 'down' in pressed_keys: 
+                    dy = -TILE_SIZE; new_dir = 'down' 
+                elif 'a' in pressed_keys or 'left' in pressed_keys: 
+                    dx = -TILE_SIZE; new_dir = 'left' 
+                elif 'd' in pressed_keys or 'right' in pressed_keys: 
+                    dx = TILE_SIZE; new_dir = 'right'
+
+                if dx != 0 or dy != 0:
+                    if self.direction != new_dir:
+                        # ถ้าเปลี่ยนทิศ ให้หันหน้าก่อนแล้วหน่วงเวลาเล็กน้อย
+                        self.direction = new_dir
+                        self.turn_delay = 6  # จำนวนเฟรมที่รอก่อนเดิน (ประมาน 0.1 วินาที)
+                        self.update_frame()
+                    else:
+                        self.start_move(dx, dy, npcs, reaper, solid_index, candles)  # ส่ง candles ไปด้วย
+
+        # 3. Handling stamina and animation speed
+        is_running = 'shift' in pressed_keys and self.is_moving
+        self.update_stamina(is_running)
+        self.update_animation_speed()
+            
+        # 4. Return to idle instantly if not moving
+        if not self.is_moving and self.state != 'idle':
+            # ถ้าอยู่ในคัทซีนและเป็นการเดินต่อเนื่อง ไม่ต้องรีเซตเฟรมเป็น 0 ทุกช่อง
+            if not getattr(self, 'cutscene_mode', False):
+                self.state = 'idle'
+                self.frame_index = 0
+                self.update_frame()
+            else:
+                # ในคัทซีน ให้ค้างท่าเดินไว้จนกว่าจะสั่งหยุดจริงๆ
+                pass
+
+    def update_stamina(self, is_running):
+        """Manages stamina drain, regeneration, and exhausted state."""
+        # Handle exhaustion recovery
+        if self.exhausted and self.stamina >= self.max_stamina:
+            self.exhausted = False
+            self.on_recovered()
+
+        if is_running and not self.exhausted:
+            self.current_speed = RUN_SPEED
+            self.stamina = max(0, self.stamina - STAMINA_DRAIN)
+            if self.stamina <= 0:
+                self.exhausted = True
+                self.on_exhausted()
+        else:
+            self.current_speed = WALK_SPEED
+            if self.stamina < self.max_stamina:
+                self.stamina = min(self.max_stamina, self.stamina + STAMINA_REGEN)
+
+    def get_stamina_ratio(self):
+        """Returns current stamina as a 0.0-1.0 ratio."""
+        return max(0.0, self.stamina / self.max_stamina)
+
+    def start_move(self, dx, dy, npcs=None, reaper=None, solid_index=None, candles=None):
+        new_x = self.logic_pos[0] + dx
+        new_y = self.logic_pos[1] + dy
+        
+        # ตรวจสอบขอบเขตแมพ (ใช้ self.map_bounds ซึ่งอัปเดตตามแมพจริง ไม่ใช่ MAP_WIDTH/HEIGHT จาก settings)
+        is_cutscene = getattr(self, 'cutscene_mode', False)
+        bounds = getattr(self, 'map_bounds', (TILE_SIZE, TILE_SIZE, MAP_WIDTH - TILE_SIZE * 2, MAP_HEIGHT - TILE_SIZE * 2))
+        min_x, min_y, max_x, max_y = bounds
+        if is_cutscene or (min_x <= new_x <= max_x and min_y <= new_y <= max_y):
+            # ตรวจสอบกำแพงจากแผนที่
+            if solid_index is not None and self.check_map_collision(new_x, new_y, solid_index) and not is_cutscene:
+                # print("Cannot move - Wall blocking!") # ปิด log เพื่อไม่ให้รกจอ
+                return
+                
+            # ตรวจสอบการชนกับ NPC
+            if npcs and self.check_npc_collision(new_x, new_y, npcs):
+                print("Cannot move - NPC blocking!")
+                return
+            
+            # ตรวจสอบการชนกับ Reaper
+            if reaper and self.check_reaper_collision(new_x, new_y, reaper) and not is_cutscene:
+                print("Cannot move - Reaper blocking!")
+                return
+            
+            # ตรวจสอบการชนกับเทียน (Day 3)
+            if candles and self.check_candle_collision(new_x, new_y, candles) and not is_cutscene:
+                # print("Cannot move - Candle blocking!")
+                return
+            
+            
+            self.target_pos = [new_x, new_y]
+            self.is_moving = True
+            
+            # บังคับแสดงท่าก้าวขาทันที (โดยเฉพาะเมื่อเดินแค่ 1 ช่อง สล็อตเวลาจะไม่พอให้อนิเมชั่นเล่นเอง)
+            if self.state != 'walk':
+                self.state = 'walk'
+                self.frame_index = 1
+                self.update_frame()
+            
+    def check_map_collision(self, new_x, new_y, solid_index):
+        """ตรวจสอบว่าตำแหน่งใหม่จะชนกับกำแพง (Map tiles) หรือไม่ (solid_index = SolidRectIndex ของแมพ)"""
+        # ตรง grid ใช้ walkability bitmap ไม่งั้น query เฉพาะ cell รอบตัว
+        return solid_index.tile_blocked_at(new_x, new_y, TILE_SIZE)
+
+    def check_candle_collision(self, new_x, new_y, candles):
+        """ตรวจสอบว่าตำแหน่งใหม่จะชนกับเทียนหรือไม่"""
+        player_rect = [new_x, new_y, TILE_SIZE, TILE_SIZE]
+        for candle in candles:
+            candle_rect = [candle.x, candle.y, TILE_SIZE, TILE_SIZE]
+            if (player_rect[0] < candle_rect[0] + candle_rect[2] and
+                player_rect[0] + player_rect[2] > candle_rect[0] and
+                player_rect[1] < candle_rect[1] + candle_rect[3] and
+                player_rect[1] + player_rect[3] > candle_rect[1]):
+                return True
+        return False
+    
+    def check_npc_collision(self, new_x, new_y, npcs):
+        """ตรวจสอบว่าตำแหน่งใหม่จะชนกับ NPC หรือไม่"""
+        player_rect = [new_x, new_y, TILE_SIZE, TILE_SIZE]
+        
+        for npc in npcs:
+            # ใช้พิกัด x, y ตัวแปรหลักของระบบ Hitbox ใหม่ 
+            npc_rect = [npc.x, npc.y, TILE_SIZE, TILE_SIZE]
+            
+            # ตรวจสอบการชนระหว่างสี่เหลี่ยม
+            if (player_rect[0] < npc_rect[0] + npc_rect[2] and
+                player_rect[0] + player_rect[2] > npc_rect[0] and
+                player_rect[1] < npc_rect[1] + npc_rect[3] and
+                player_rect[1] + player_rect[3] > npc_rect[1]):
+                print(f"DEBUG: Blocked by NPC physically located at {npc.x}, {npc.y}")
+                return True
+        
+        return False
+
+    def check_reaper_collision(self, new_x, new_y, reaper):
+        """ตรวจสอบว่าตำแหน่งใหม่จะชนกับ Reaper หรือไม่"""
+        player_rect = [new_x, new_y, TILE_SIZE, TILE_SIZE]
+        
+        reapers = reaper if isinstance(reaper, list) else [reaper]
+        for r in reapers:
+            if not r: continue
+            # ใช้พิกัด x, y ตัวแปรหลักของระบบ Hitbox ใหม่ 
+            reaper_rect = [r.x, r.y, TILE_SIZE, TILE_SIZE]
+            
+            # ตรวจสอบการชนระหว่างสี่เหลี่ยม
+            if (player_rect[0] < reaper_rect[0] + reaper_rect[2] and
+                player_rect[0] + player_rect[2] > reaper_rect[0] and
+                player_rect[1] < reaper_rect[1] + reaper_rect[3] and
+                player_rect[1] + player_rect[3] > reaper_rect[1]):
+                return True
+        
+        return False
+
+    def continue_move(self):
+        """เลื่อนตำแหน่งผู้เล่นเข้าหาเป้าหมาย (Grid-based)"""
+        for i in range(2): # x, y
+            if self.logic_pos[i] < self.target_pos[i]:
+                self.logic_pos[i] = min(self.logic_pos[i] + self.current_speed, self.target_pos[i])
+            elif self.logic_pos[i] > self.target_pos[i]:
+                self.logic_pos[i] = max(self.logic_pos[i] - self.current_speed, self.target_pos[i])
+
+        self.x, self.y = self.logic_pos
+        self.sync_graphics_pos()
+        if self.logic_pos == self.target_pos:
+            self.is_moving = False
+
+    def stop(self):
+        """หยุดการเดินและรีเซ็ตสถานะทั้งหมด"""
+        self.is_moving = False
+        self.target_pos = list(self.logic_pos)
+        self.state = 'idle'
+        self.frame_index = 0
+        self.cutscene_mode = False
+        self.animation_disabled = False
+        self.update_frame()
+        self.update_animation_speed()
@@ -1,12 +1,10 @@
 from kivy.graphics import Rectangle, Color, Ellipse, InstructionGroup
-from kivy.core.image import Image as CoreImage
-from kivy.clock import Clock
+from assets.texture_cache import texture_cache
 from data.settings import *
+from managers.animation import animation_scheduler
 import math
 import random
 
-REAPER_START_POS = (1168, 80)
-
 class Reaper:
     """
     Renders and manages the Reaper character.
@@ -35,14 +33,15 @@ class Reaper:
         
         # Load texture with fallback
         try:
-            self.idle_texture = CoreImage(self.image_path).texture
+            self.idle_texture = texture_cache.get(self.image_path)
         except Exception as e:
             print(f"Error loading Reaper texture: {e}")
             self.idle_texture = None
         
         # Animation data
         self.anim_config = {
-            'idle': {'tex': self.idle_texture, 'cols': self.cols, 'rows': self.rows}
+            'idle': {'tex': self.idle_texture, 'cols': self.cols, 'rows': self.rows,
+                     'frames': texture_cache.sprite_frames(self.image_path, self.cols, self.rows)}
         }
         self.state = 'idle'
         self.direction = 'left'
@@ -63,7 +62,7 @@ class Reaper:
         
         # Schedule animation and update initial frame
         self.update_frame()
-        self.anim_event = Clock.schedule_interval(self.animate, 1.0 / self.animation_fps)
+        animation_scheduler.register(self, self.animation_fps)
     
     def _init_graphics(self):
         """Create the Kivy canvas instructions for the Reaper."""
@@ -93,20 +92,13 @@ class Reaper:
             return
             
         tex = config['tex']
-        w = 1.0 / config['cols']
-        h = 1.0 / config['rows']
-        
-        # Calculate texture coordinates for the current direction and frame
-        u = self.frame_index * w
         row_index = self.anim_row_map.get(self.state, {}).get(self.direction, 0)
         
-        # Standardize vertical coordinate (Kivy textures often need Y-flip correction)
-        # Match the logic used in Player and Enemy classes
-        v = 1.0 - ((row_index + 1) * h)
-        
-        self.rect.texture = tex
-        # Map texture to rect corners (standard sprite mapping)
-        self.rect.tex_coords = (u, v + h, u + w, v + h, u + w, v, u, v)
+        # tex_coords ของทุกเฟรมคำนวณไว้แล้วใน TextureCache (แถว 0 = บนสุด เหมือน Player และ Enemy)
+        frames = config['frames'][row_index]
+        if self.rect.texture is not tex:
+            self.rect.texture = tex
+        self.rect.tex_coords = frames[self.frame_index % len(frames)]
     
     def animate(self, dt):
         """Periodic animation update."""
@@ -188,5 +180,4 @@ class Reaper:
         """Cleans up canvas instructions and events."""
         if self.canvas and self.group in self.canvas.children:
             self.canvas.remove(self.group)
-        if hasattr(self, 'anim_event'):
-            self.anim_event.cancel()
+        animation_scheduler.unregister(self)
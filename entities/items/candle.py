@@ -1,5 +1,5 @@
 from kivy.graphics import Rectangle, Color, InstructionGroup
-from kivy.core.image import Image as CoreImage
+from assets.texture_cache import texture_cache
 from data.settings import TILE_SIZE
 
 class Candle:
@@ -35,10 +35,8 @@ class Candle:
         }
         for name, path in paths.items():
             try:
-                tex = CoreImage(path).texture
+                tex = texture_cache.get(path, nearest=True)
                 if tex:
-                    tex.min_filter = 'nearest'
-                    tex.mag_filter = 'nearest'
                     self.textures[name] = tex
             except Exception as e:
                 print(f"Error loading Candle texture {name}: {e}")
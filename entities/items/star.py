@@ -1,7 +1,7 @@
 from kivy.graphics import Rectangle, Color, InstructionGroup
-from kivy.core.image import Image as CoreImage
-from kivy.clock import Clock
+from assets.texture_cache import texture_cache
 from data.settings import TILE_SIZE, STAR_IMG
+from managers.animation import animation_scheduler
 
 class Star:
     def __init__(self, canvas, x, y, is_true=True, hidden=False):
@@ -14,10 +14,7 @@ class Star:
         
         self.image_path = STAR_IMG
         try:
-            self.texture = CoreImage(self.image_path).texture
-            if self.texture:
-                self.texture.min_filter = 'nearest'
-                self.texture.mag_filter = 'nearest'
+            self.texture = texture_cache.get(self.image_path, nearest=True)
         except Exception as e:
             print(f"Error loading Star texture: {e}")
             self.texture = None
@@ -37,18 +34,14 @@ class Star:
             self.canvas.add(self.group)
             
             self.update_frame()
-            self.anim_event = Clock.schedule_interval(self.animate, 1.0 / 3) # 3 FPS for stars
-        else:
-            self.anim_event = None
+            animation_scheduler.register(self, 3) # 3 FPS for stars
 
     def update_frame(self):
         if not self.texture or self.group is None: return
-        w = 1.0 / self.cols
-        h = 1.0 / self.rows
-        u = self.frame_index * w
-        v = 0
-        self.rect.texture = self.texture
-        self.rect.tex_coords = (u, v + h, u + w, v + h, u + w, v, u, v)
+        if self.rect.texture is not self.texture:
+            self.rect.texture = self.texture
+        # ภาพดาวมีแถวเดียว: ตาราง tex_coords จาก TextureCache ใช้ร่วมกันทุกดวง
+        self.rect.tex_coords = texture_cache.sprite_frames(self.image_path, self.cols, self.rows)[0][self.frame_index]
 
     def animate(self, dt):
         if self.group is None: return
@@ -58,5 +51,4 @@ class Star:
     def destroy(self):
         if self.group and self.group in self.canvas.children:
             self.canvas.remove(self.group)
-        if self.anim_event:
-            self.anim_event.cancel()
+        animation_scheduler.unregister(self)
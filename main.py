@@ -24,7 +24,7 @@ from kivy.app import App
 from kivy.clock import Clock 
 from kivy.animation import Animation
 from kivy.core.image import Image as CoreImage
-from kivy.core.audio import SoundLoader
+from assets.sound_bank import sound_bank
 import random
 
 from entities.characters.player import Player
@@ -34,11 +34,13 @@ from entities.items.candle import Candle
 from entities.characters.enemy import Enemy
 
 from ui.heart import HeartUI
-from assets.Tiles.map_loader import KivyTiledMap
+from assets.Tiles.map_registry import map_registry
 
 from ui.load import SaveLoadScreen # นำเข้าหน้าจอเซฟ
 from ui.screen import SplashScreen
 from ui.camera import Camera
+from ui.y_sort import YSortedLayer
+from ui.sprite_batch import SpriteBatcher
 from ui.pause import PauseMenu
 
 from ui.intro import IntroScreen # นำเข้าหน้าจอ Intro (Day 1)
@@ -50,13 +52,30 @@ from ui.dialogue_manager import DialogueManager # นำเข้า Dialogue Ma
 from entities.items.star import Star # นำเข้า Star
 from managers.world import WorldManager
 from managers.save import SaveManager
+from managers.save_store import save_writer
 from managers.cutscene import CutsceneManager
 from managers.input_handler import InputHandler
 from managers.interaction import InteractionManager
+from managers.animation import animation_scheduler
 from managers.game_logic import GameplayManager
+from managers.simulation import Simulation
+from managers.replay import game_rng, InputRecorder, InputReplayer
+from managers.profiler import FrameProfiler
 class GameWidget(Widget): 
     def __init__(self, initial_data=None, **kwargs): 
         super().__init__(**kwargs) 
+        # Record / Replay: seed ตัวสุ่มของเกมเพลย์ก่อนสร้างอะไรทั้งหมด (replay ใช้ seed และข้อมูลเริ่มต้นจากไฟล์)
+        self.recorder = None
+        self.replayer = None
+        if REPLAY_PLAY_PATH:
+            self.replayer = InputReplayer(REPLAY_PLAY_PATH)
+            initial_data = self.replayer.initial_data
+            seed = self.replayer.seed
+        else:
+            seed = REPLAY_SEED if REPLAY_SEED is not None else random.getrandbits(63)
+        game_rng.seed(seed)
+        if REPLAY_RECORD_PATH and not self.replayer:
+            self.recorder = InputRecorder(REPLAY_RECORD_PATH, seed, initial_data)
         self.initial_data = initial_data
         
         # จัดการข้อมูลศัตรูที่ถูกกำจัดไปแล้ว (ไม่เกิดใหม่)
@@ -123,6 +142,13 @@ class GameWidget(Widget):
         # Setup Camera
         self.camera = Camera(self.canvas.before)
 
+        # แกนเกมเพลย์ (ไม่พึ่ง Kivy) ที่ใช้คำนวณศัตรูทั้งฝูงทุกเฟรม
+        self.simulation = Simulation()
+        # Pathfinding ของศัตรู (flow field จากช่องผู้เล่น คำนวณใหม่เมื่อผู้เล่นเปลี่ยนช่อง)
+        self.pathfinder = self.simulation.pathfinder
+        # Line of sight แบบ grid + memo (ใช้ร่วมกันทั้งศัตรู, Safe Zone ของ Reaper และ tutorial trigger)
+        self.visibility = self.simulation.visibility
+
         # self.debug_label = Label(
         #     text="", 
         #     size_hint=(None, None),
@@ -143,6 +169,7 @@ class GameWidget(Widget):
         self.interaction_manager = InteractionManager(self)
         self.gameplay_manager = GameplayManager(self)
         self.input_handler = InputHandler(self)
+        self.profiler = FrameProfiler(self)
         self.dialogue_timer = 0
         self.is_dialogue_active = False # คืนสถานะการคุย
         self.current_dialogue_queue = []
@@ -186,7 +213,7 @@ class GameWidget(Widget):
         if initial_data and 'correct_food_spot' in initial_data:
             self.correct_food_spot = tuple(initial_data['correct_food_spot'])
         else:
-            self.correct_food_spot = random.choice(SEARCHABLE_SPOTS_HOME)
+            self.correct_food_spot = game_rng.choice(SEARCHABLE_SPOTS_HOME)
         
         # โหลดเสียงผีไล่ตามประเภท
         self.ghost_sounds = {}
@@ -196,63 +223,44 @@ class GameWidget(Widget):
             3: 'assets/sound/ghost/Ghost_moan_2.wav'
         }
         for etype, path in sound_files.items():
-            s = SoundLoader.load(path)
+            s = sound_bank.load(path, 0.4 if etype == 1 else 0.5, loop=True) # ปรับ volume ตามความเหมาะสม
             if s:
-                s.loop = True
-                s.volume = 0.4 if etype == 1 else 0.5 # ปรับ volume ตามความเหมาะสม
                 self.ghost_sounds[etype] = s
         
-        # โหลดเสียงรื้อของ/หาของ
-        self.find_sound = SoundLoader.load('assets/sound/find.wav')
-        if self.find_sound:
-            self.find_sound.volume = 0.7
+        # โหลดเสียงรื้อของ/หาของ (handle ใช้ร่วมกันจาก SoundBank เริ่มเกมใหม่ไม่ต้องโหลดไฟล์ซ้ำ)
+        self.find_sound = sound_bank.load('assets/sound/find.wav', 0.7)
         
         # โหลดเสียงหยิบกุญแจ (Day 4)
-        self.key_pickup_sound = SoundLoader.load('assets/sound/Keys_pick up.wav')
-        if self.key_pickup_sound:
-            self.key_pickup_sound.volume = 0.8
+        self.key_pickup_sound = sound_bank.load('assets/sound/Keys_pick up.wav', 0.8)
 
         # โหลดเสียงกินอาหาร/ชุดคลุมขยับ
-        self.sit_sound = SoundLoader.load('assets/sound/sit.wav')
-        if self.sit_sound:
-            self.sit_sound.volume = 0.6
+        self.sit_sound = sound_bank.load('assets/sound/sit.wav', 0.6)
             
         # โหลดเสียงตกใจเมื่อชนผี
-        self.shock_sound = SoundLoader.load('assets/sound/feeling/shocked.wav')
-        if self.shock_sound:
-            self.shock_sound.volume = 0.8
+        self.shock_sound = sound_bank.load('assets/sound/feeling/shocked.wav', 0.8)
             
         # โหลดเสียงสงสัย (Curious) เมื่อมีทางเลือก
-        self.curious_sound = SoundLoader.load('assets/sound/feeling/curious.wav')
-        if self.curious_sound:
-            self.curious_sound.volume = 0.7
+        self.curious_sound = sound_bank.load('assets/sound/feeling/curious.wav', 0.7)
             
         # โหลดเสียงคร่ำครวญของ The Sad Soul (NPC1)
-        self.sad_soul_sound = SoundLoader.load('assets/sound/ghost/Crying_moaning_ambience_3.wav')
-        if self.sad_soul_sound:
-            self.sad_soul_sound.loop = True
-            self.sad_soul_sound.volume = 0.5
+        self.sad_soul_sound = sound_bank.load('assets/sound/ghost/Crying_moaning_ambience_3.wav', 0.5, loop=True)
             
         # โหลดเสียงพูดของ Reaper
-        self.reaper_voice_sound = SoundLoader.load('assets/sound/feeling/reaper.wav')
-        if self.reaper_voice_sound:
-            self.reaper_voice_sound.volume = 0.8
+        self.reaper_voice_sound = sound_bank.load('assets/sound/feeling/reaper.wav', 0.8)
             
         # โหลดเสียงคลิก (Click) เวลากดปุ่ม
-        self.click_sound = SoundLoader.load('assets/sound/click.wav')
-        if self.click_sound:
-            self.click_sound.volume = 0.6
+        self.click_sound = sound_bank.load('assets/sound/click.wav', 0.6)
 
         # โหลดเสียงกล่องดนตรี (Day 4 NPC4 Success / House Cutscene)
-        self.music_box_sound = SoundLoader.load('assets/sound/loop/music-box.wav')
-        if self.music_box_sound:
-            self.music_box_sound.loop = True
-            self.music_box_sound.volume = 0.7
+        self.music_box_sound = sound_bank.load('assets/sound/loop/music-box.wav', 0.7, loop=True)
 
         # 1. สร้าง Sorting Layer สำหรับตัวละคร (เพื่อให้วาดทับกันตามค่า Y)
         # ต้องสร้างก่อน Quest/Stars เผื่อมีการโหลดเซฟแล้วเรียกใช้ทันที
         self.sorting_layer = InstructionGroup()
         self.canvas.add(self.sorting_layer)
+        self.y_sorted_layer = YSortedLayer(self.sorting_layer)
+        # (ตัวเลือก) รวมสไปรต์ศัตรูเป็น Mesh ต่อแถว แทนการวาดทีละตัว
+        self.enemy_batcher = SpriteBatcher() if ENEMY_SPRITE_BATCHING else None
 
         # 1.1 สร้างระบบ Clipping เพื่อตัดส่วนเกืนของแมพ (Stencil)
         # จะถูกแปะลงใน canvas.before ให้เริ่มหลังจาก Camera PushMatrix
@@ -314,7 +322,7 @@ class GameWidget(Widget):
             if 'player_pos' in initial_data:
                 start_pos = initial_data['player_pos']
 
-        self.game_map = KivyTiledMap(starting_map)
+        self.game_map = map_registry.get(starting_map)
         
         # วาดพื้นดินและวัตถุลงใน Container
         # อัปเดตขนาด Clipping Rectangle ตามขนาดแมพใหม่
@@ -424,8 +432,11 @@ class GameWidget(Widget):
         # สถานะช่วงรอยต่อวัน
         self._pending_day_transition = False
 
-        # เริ่มลูปเกม
-        self._main_loop_event = Clock.schedule_interval(self.move_step, 1.0 / FPS)  
+        # เริ่มลูปเกม (โหมด replay ใช้ dt จากไฟล์แทน dt จริงของ Clock)
+        if self.replayer:
+            self._main_loop_event = Clock.schedule_interval(self._replay_step, 1.0 / FPS)
+        else:
+            self._main_loop_event = Clock.schedule_interval(self.move_step, 1.0 / FPS)  
 
     def _set_game_ready(self, dt):
         """ปลดล็อกให้ผู้เล่นเดินได้หลังจากเริ่มเกมไปแล้ว 1 วินาที"""
@@ -509,7 +520,17 @@ class GameWidget(Widget):
                     self.show_vn_dialogue("Little girl", "The path is clear now. I should return to him.")
                 self.quest_manager.update_quest_list_ui()
 
+    def _replay_step(self, dt):
+        """เล่น tick ถัดไปจากไฟล์ replay พอหมดไฟล์ให้หยุดลูปและเขียนเวลาต่อเฟรม"""
+        if not self.replayer.step(self):
+            if self._main_loop_event:
+                self._main_loop_event.cancel()
+                self._main_loop_event = None
+            self.replayer.write_timings()
+
     def move_step(self, dt):
+        if self.recorder:
+            self.recorder.tick(dt, self.pressed_keys)
         try:
             self._move_step_logic(dt)
         except Exception as e:
@@ -521,6 +542,12 @@ class GameWidget(Widget):
     def _move_step_logic(self, dt):
         # ป้องกันอาการ 'กระโดด' หลังจากการชะงักโหลด (Cap DT)
         dt = min(dt, 0.05)
+
+        # เดินเฟรมอนิเมชันของทุกตัวละคร/ไอเทมในครั้งเดียว (แทน Clock interval รายตัว)
+        animation_scheduler.tick(dt)
+
+        # พิมพ์ข้อความบทสนทนาทีละตัว (ลูปเกมยังเดินระหว่างคุย)
+        self.dialogue_manager.tick(dt)
         
         # จัดการเสียงของ Sad Soul (NPC1) จนกว่าจะข้ามวัน/หายไป
         if self.sad_soul_sound:
@@ -547,103 +574,11 @@ class GameWidget(Widget):
             
             # 1. การเคลื่อนที่ของตัวละคร
             all_reapers = [self.reaper] + getattr(self, 'extra_reapers', [])
-            self.player.move(self.pressed_keys, self.npcs, all_reapers, self.game_map.solid_rects, getattr(self, 'candles', []))
-            self.heart_ui.update_stamina(self.player.get_stamina_ratio())
+            self._step_player(all_reapers)
             
             # อัปเดต NPCs / Reaper / Enemies (Culling - อัปเดตเฉพาะที่อยู่ใกล้)
-            px, py = self.player.logic_pos
-            damage_taken_this_frame = False # ป้องกันโดนดาเมจซ้อนในเฟรมเดียว (1 ผี = 1 เล็กด้าเมจ)
-            
-            for npc in self.npcs:
-                # Cull distance: 600px
-                if abs(npc.x - px) + abs(npc.y - py) < 600:
-                    npc.update(dt)
-            
-            if abs(self.reaper.x - px) + abs(self.reaper.y - py) < 600:
-                self.reaper.update(dt, self.player.logic_pos)
-            
-            for er in getattr(self, 'extra_reapers', []):
-                if abs(er.x - px) + abs(er.y - py) < 600:
-                    er.update(dt, self.player.logic_pos)
-            
-            for enemy in self.enemies[:]:
-                # Cull far enemies
-                if abs(enemy.logic_pos[0] - px) + abs(enemy.logic_pos[1] - py) > 600:
-                    enemy.is_chasing = False # หยุดไล่ถ้าไกลเกินไป
-                    continue
-                # ส่งรายการตำแหน่ง reaper ทั้งหมด (หลัก + extra) ไปให้ศัตรูตรวจสอบ Safe Zone
-                reaper_positions = [(self.reaper.x, self.reaper.y)]
-                for er in getattr(self, 'extra_reapers', []):
-                    reaper_positions.append((er.x, er.y))
-                    
-                # ส่ง solid_rects และ enemies เข้าไปด้วยเพื่อให้ศัตรูไม่เดินทะลุกำแพงและไม่ชนกัน
-                enemy.update(dt, self.player.logic_pos, reaper_positions, self.game_map.solid_rects, self.enemies)
-
-                # บันทึกสถานะศัตรูที่กำลังจางหาย (ไม่ว่าจะจากชนหรือวง Reaper) ให้จดจำในเซฟ
-                if enemy.is_fading:
-                    if enemy.id not in self.destroyed_enemies:
-                        self.destroyed_enemies.append(enemy.id)
-                
-                # ถ้าจางหายจนจบแล้ว ให้ลบจริงออกจากฉาก
-                if enemy.fading_done:
-                    enemy.destroy()
-                    if enemy in self.enemies:
-                        self.enemies.remove(enemy)
-                    continue
-
-                # ถ้ากำลังจางหาย ไม่ต้องตรวจจับการชนซ้ำ
-                if enemy.is_fading:
-                    continue
-
-                # เช็คการชนระหว่าง Player กับ Enemy
-                if enemy.check_player_collision_logic(self.player.logic_pos, TILE_SIZE):
-                    if enemy.id not in self.destroyed_enemies:
-                        self.destroyed_enemies.append(enemy.id)
-                    enemy.start_fade()
-                    
-                    # หักเลือดเพียงครั้งเดียวต่อเฟรม (แก้ปัญหาผีซ้อนกันแล้วลด 2 เลือด)
-                    if not damage_taken_this_frame:
-                        self.heart_ui.take_damage()
-                        damage_taken_this_frame = True
-                    
-                        # เล่นเสียงตกใจ
-                        if self.shock_sound:
-                            self.shock_sound.play()
-                        
-                        # ตรวจสอบว่าเลือดหมดหรือยัง
-                        if self.heart_ui.current_health <= 0:
-                            self.respawn_at_reaper()
-                
-                # ตรวจสอบว่าศัตรูเข้าใกล้ Reaper หรือยัง (Safe Zone)
-                # Optimization: ใช้ Squared Distance เพื่อเลี่ยง sqrt
-                enemy_center_x = enemy.logic_pos[0] + TILE_SIZE / 2
-                enemy_center_y = enemy.logic_pos[1] + TILE_SIZE / 2
-                
-                safe_radius_sq = SAFE_ZONE_RADIUS ** 2
-                for r_obj in [self.reaper] + getattr(self, 'extra_reapers', []):
-                    r_cx = r_obj.x + TILE_SIZE / 2
-                    r_cy = r_obj.y + TILE_SIZE / 2
-                    dist_sq = (enemy_center_x - r_cx)**2 + (enemy_center_y - r_cy)**2
-                    
-                    if dist_sq < safe_radius_sq:
-                        # ตรวจสอบว่ามีกำแพงกั้นระหว่างศัตรูกับ Reaper หรือไม่
-                        if enemy.has_line_of_sight((r_obj.x, r_obj.y), self.game_map.solid_rects):
-                            print(f"Enemy {enemy.id} entered safe zone and starting fade!")
-                            if enemy.id not in self.destroyed_enemies:
-                                self.destroyed_enemies.append(enemy.id)
-                            enemy.start_fade()
-                            break
-
-            # --- จัดการเสียงผีไล่ตามประเภทตัวละคร ---
-            chasing_types = {e.enemy_type for e in self.enemies if e.is_chasing}
-            
-            for etype, sound in self.ghost_sounds.items():
-                if etype in chasing_types:
-                    if sound.state != 'play':
-                        sound.play()
-                else:
-                    if sound.state == 'play':
-                        sound.stop()
+            self._step_npcs(dt)
+            self._step_enemies(dt, all_reapers)
 
             if self.stun_cooldown > 0:
                 self.stun_cooldown -= dt
@@ -677,11 +612,7 @@ class GameWidget(Widget):
         px, py = self.player.logic_pos
         self.update_camera()
         
-        # Optimization: อัปเดต Chunk เฉพาะตอนขยับเกิน 2px เพื่อลดภาระ Grid search
-        if not hasattr(self, '_last_chunk_px'): self._last_chunk_px, self._last_chunk_py = -999, -999
-        if abs(px - self._last_chunk_px) > 2 or abs(py - self._last_chunk_py) > 2:
-            self.game_map.update_chunks(px, py)
-            self._last_chunk_px, self._last_chunk_py = px, py
+        self._step_chunks(px, py)
         
         # อัปเดต Debug Label (อัปเดตแค่บางเฟรมเพื่อลดภาระ CPU ในการจัดการ String)
         if not hasattr(self, '_debug_frame_count'): self._debug_frame_count = 0
@@ -700,6 +631,57 @@ class GameWidget(Widget):
         self.y_sorting()
 
 
+    # แต่ละ stage ของลูปแยกเป็น method เพื่อให้ FrameProfiler ห่อจับเวลาได้ (managers/profiler.py)
+    def _step_player(self, all_reapers):
+        self.player.move(self.pressed_keys, self.npcs, all_reapers, self.game_map.solid_index, getattr(self, 'candles', []))
+        self.heart_ui.update_stamina(self.player.get_stamina_ratio())
+
+    def _step_npcs(self, dt):
+        px, py = self.player.logic_pos
+        
+        for npc in self.npcs:
+            # Cull distance: 600px
+            if abs(npc.x - px) + abs(npc.y - py) < 600:
+                npc.update(dt)
+        
+        if abs(self.reaper.x - px) + abs(self.reaper.y - py) < 600:
+            self.reaper.update(dt, self.player.logic_pos)
+        
+        for er in getattr(self, 'extra_reapers', []):
+            if abs(er.x - px) + abs(er.y - py) < 600:
+                er.update(dt, self.player.logic_pos)
+
+    def _step_enemies(self, dt, all_reapers):
+        # ศัตรูทั้งฝูง (ไล่ / ชน / safe zone) ใช้แกน Simulation ตัวเดียวกับโหมด headless
+        # ส่งรายการตำแหน่ง reaper ทั้งหมด (หลัก + extra) ไปให้ศัตรูตรวจสอบ Safe Zone
+        reaper_positions = [(r.x, r.y) for r in all_reapers]
+        chasing_types = self.simulation.update_enemies(
+            dt, self.player, self.enemies, self.game_map, reaper_positions,
+            self.destroyed_enemies, self._on_enemy_contact)
+
+        # --- จัดการเสียงผีไล่ตามประเภทตัวละคร ---
+        for etype, sound in self.ghost_sounds.items():
+            if etype in chasing_types:
+                if sound.state != 'play':
+                    # จำกัดจำนวนเสียงผีพร้อมกัน ตัวที่เกินรอจนกว่าเสียงอื่นจะหยุด
+                    sound_bank.play(sound, 'ghost', steal=False)
+            else:
+                if sound.state == 'play':
+                    sound.stop()
+
+    def _step_chunks(self, px, py):
+        # Optimization: อัปเดต Chunk เฉพาะตอนขยับเกิน 2px เพื่อลดภาระ Grid search
+        if not hasattr(self, '_last_chunk_px'): self._last_chunk_px, self._last_chunk_py = -999, -999
+        if abs(px - self._last_chunk_px) > 2 or abs(py - self._last_chunk_py) > 2:
+            self.game_map.update_chunks(px, py)
+            self._last_chunk_px, self._last_chunk_py = px, py
+
+        # โหลดแมพปลายทางล่วงหน้าเมื่อเข้าใกล้ portal: เช็คเฉพาะตอนผู้เล่นเปลี่ยนช่อง tile ไม่ใช่ทุกเฟรม
+        tile = (int(px) // TILE_SIZE, int(py) // TILE_SIZE)
+        if self.is_ready and tile != getattr(self, '_last_prefetch_tile', None):
+            self._last_prefetch_tile = tile
+            self.world_manager.prefetch_nearby_maps()
+
     def _update_debug_text(self, px, py):
         """อัปเดตข้อมูล Debug ที่มุมจอ"""
         pass
@@ -714,31 +696,57 @@ class GameWidget(Widget):
         # )
 
     def y_sorting(self):
-        """จัดลำดับการวาดตัวละครตามค่า Y (Y-Sorting)"""
-        # Optimization: ถ้าไม่มีอะไรขยับ ไม่ต้องเสียเวลาจัดเลเยอร์ใหม่
-        is_anything_moving = self.player.is_moving or any(e.is_chasing for e in self.enemies)
-        if not is_anything_moving and hasattr(self, '_y_sorted_done') and self._y_sorted_done:
-            return
-            
-        if self.is_dialogue_active and not self.player.is_moving:
-            return
+        """จัดลำดับการวาดตัวละครตามค่า Y (Y-Sorting) และถอดตัวที่อยู่นอกกล้องออกจาก canvas"""
+        # ถ้ากล้องขยับ (เช่นแพนกล้องในคัทซีน) ต้องคำนวณใหม่เสมอ เพื่อให้ตัวที่เข้ามาในจอถูกวาด
+        view = self.camera.get_view_rect(ENTITY_CULL_MARGIN)
+        view_changed = view != getattr(self, '_last_cull_view', None)
+        self._last_cull_view = view
+        x1, y1, x2, y2 = view
 
-        # เพิ่ม Reaper เฉพาะเมื่อไม่อยู่ในจุดพัก (เช่น ตอนเปลี่ยนแมพมาบ้าน)
-        reaper_list = [self.reaper] if (self.reaper.logic_pos[0] > -1000) else []
-        reaper_list.extend(getattr(self, 'extra_reapers', []))
-        sortable_chars = [self.player] + reaper_list + self.npcs + self.enemies + self.stars + self.candles
-        
         def get_sort_y(char):
             base_y = char.y if hasattr(char, 'y') else char.logic_pos[1]
             if char == self.player:
                 return base_y - 0.1
             return base_y
 
-        sortable_chars.sort(key=get_sort_y, reverse=True)
-        self.sorting_layer.clear()
-        for char in sortable_chars:
-            if hasattr(char, 'group'):
-                self.sorting_layer.add(char.group)
+        # View-frustum culling: ตัวที่อยู่นอกกรอบกล้อง (+margin) ไม่ต้องส่งไปวาด (ผู้เล่นวาดเสมอ)
+        def in_view(char):
+            if char is self.player: return True
+            pos = getattr(char, 'logic_pos', None) or (char.x, char.y)
+            return x1 <= pos[0] <= x2 and y1 <= pos[1] <= y2
+
+        # โหมด batch: vertex ของศัตรู (เฟรมอนิเมชัน/alpha/สี stun) ต้องอัปเดตทุกเฟรมแม้ไม่มีใครขยับ
+        batches_changed = False
+        if self.enemy_batcher is not None:
+            batches_changed = self.enemy_batcher.update(
+                [(get_sort_y(e), e) for e in self.enemies if in_view(e)])
+
+        if not view_changed and not batches_changed:
+            # Optimization: ถ้าไม่มีอะไรขยับ ไม่ต้องเสียเวลาจัดเลเยอร์ใหม่
+            is_anything_moving = self.player.is_moving or any(e.is_chasing for e in self.enemies)
+            if not is_anything_moving and hasattr(self, '_y_sorted_done') and self._y_sorted_done:
+                return
+                
+            if self.is_dialogue_active and not self.player.is_moving:
+                return
+
+        # เพิ่ม Reaper เฉพาะเมื่อไม่อยู่ในจุดพัก (เช่น ตอนเปลี่ยนแมพมาบ้าน)
+        reaper_list = [self.reaper] if (self.reaper.logic_pos[0] > -1000) else []
+        reaper_list.extend(getattr(self, 'extra_reapers', []))
+        if self.enemy_batcher is None:
+            sortable_chars = [self.player] + reaper_list + self.npcs + self.enemies + self.stars + self.candles
+        else:
+            sortable_chars = [self.player] + reaper_list + self.npcs
+        
+        # ย้ายเฉพาะ group ที่ลำดับเปลี่ยน (ไม่ clear แล้ว add ใหม่ทั้งหมดทุกเฟรม)
+        items = [(get_sort_y(char), char.group) for char in sortable_chars
+                 if getattr(char, 'group', None) is not None and in_view(char)]
+        if self.enemy_batcher is not None:
+            # batch ของศัตรูแทรกตรงตำแหน่งเดิมของศัตรูในลำดับ (ก่อน stars/candles)
+            items += self.enemy_batcher.items()
+            items += [(get_sort_y(char), char.group) for char in self.stars + self.candles
+                      if getattr(char, 'group', None) is not None and in_view(char)]
+        self.y_sorted_layer.update(items)
         self._y_sorted_done = True
 
     def update_camera(self):
@@ -827,6 +835,22 @@ class GameWidget(Widget):
     def clear_interaction_hints(self):
         self.interaction_manager.clear_interaction_hints()
 
+    def _on_enemy_contact(self):
+        """ผีชนผู้เล่น (Simulation เรียกไม่เกินครั้งละหนึ่งต่อเฟรม) คืน True ถ้าเลือดหมดแล้วเกิดใหม่"""
+        self.heart_ui.take_damage()
+
+        # เล่นเสียงตกใจ
+        if self.shock_sound:
+            self.shock_sound.play()
+
+        # ตรวจสอบว่าเลือดหมดหรือยัง
+        if self.heart_ui.current_health <= 0:
+            self.respawn_at_reaper()
+            return True
+        # ยังไม่ตาย: เริ่มโหลดแมพของจุดเกิดใหม่ไว้ก่อน เผื่อโดนชนอีกครั้ง
+        self.world_manager.prefetch_respawn_map()
+        return False
+
     def respawn_at_reaper(self):
         self.gameplay_manager.respawn_at_reaper()
 
@@ -969,6 +993,11 @@ class GameWidget(Widget):
         if self._main_loop_event:
             self._main_loop_event.cancel()
             self._main_loop_event = None
+        if self.recorder:
+            self.recorder.close()
+        # เขียน CSV ของ profiler (ถ้าเปิดอยู่) ก่อนออกจากเกม
+        self.profiler.disable()
+        animation_scheduler.clear()
             
         # 2. ปิดเสียงทั้งหมด
         self.stop_all_sounds()
@@ -1081,11 +1110,12 @@ class MyApp(App):
         # เล่นเสียง Ambiance Loop ตั้งแต่เริ่มเกม (เปิดโปรแกรมปุ๊บเปิดเสียงเลย)
         ambiance_path = 'assets/sound/loop/Ambiance_Cave_Dark_Loop_Stereo.wav'
         if os.path.exists(ambiance_path):
-            self.bg_loop = SoundLoader.load(ambiance_path)
+            self.bg_loop = sound_bank.load(ambiance_path, 0.8, loop=True)
             if self.bg_loop:
-                self.bg_loop.loop = True
-                self.bg_loop.volume = 0.8
                 self.bg_loop.play()
+        
+        # โหลดเสียงที่เหลือล่วงหน้าบน thread เบื้องหลัง ระหว่างที่ผู้เล่นอยู่หน้าปก/เมนู
+        sound_bank.preload_async(SOUND_PRELOAD_FILES, SOUND_PRELOAD_DIRS)
                 
         self.root = FloatLayout()
         
@@ -1164,6 +1194,16 @@ class MyApp(App):
         # ผูกเหตุการณ์คีย์บอร์ดระดับ Window เพื่อให้กด F11 ได้ทุกหน้าจอ
         Window.bind(on_key_down=self._on_window_key_down)
 
+    def on_stop(self):
+        # ปิดหน้าต่างตรงๆ: เขียน CSV ของ profiler และปิดไฟล์อัดอินพุตให้ครบ
+        for child in self.root.children[:]:
+            if isinstance(child, GameWidget):
+                child.profiler.disable()
+                if child.recorder:
+                    child.recorder.close()
+        # รอเซฟที่ยังเขียนอยู่บน thread แยกให้เสร็จก่อนโปรเซสจบ
+        save_writer.flush()
+
     def _on_window_key_down(self, window, key, scancode, codepoint, modifiers):
         # 292 คือ keycode ของ F11, 27 คือ keycode ของ Escape
         if key == 27:
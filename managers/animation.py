@@ -0,0 +1,46 @@
+class AnimationScheduler:
+    """ตัวเดินเฟรมอนิเมชันของทุก entity จากจุดเดียว (แทน Clock.schedule_interval รายตัว)
+
+    GameWidget.move_step เรียก tick(dt) ครั้งเดียวต่อเฟรม แต่ละ entity มีตัวสะสมเวลาของตัวเอง
+    เมื่อสะสมครบ 1/fps จะเรียก entity.animate(interval) หนึ่งครั้ง (fixed timestep)
+    entity ลงทะเบียนด้วย register() ตอนสร้าง และ unregister() ตอน destroy
+    """
+
+    def __init__(self):
+        self.entries = {}  # entity -> [interval, accumulated]
+
+    def register(self, entity, fps):
+        self.entries[entity] = [1.0 / fps, 0.0]
+
+    def unregister(self, entity):
+        self.entries.pop(entity, None)
+
+    def set_fps(self, entity, fps):
+        """เปลี่ยนความเร็วอนิเมชัน (รีเซ็ตตัวสะสมเหมือนการ schedule ใหม่แบบเดิม)"""
+        entry = self.entries.get(entity)
+        if entry is None:
+            self.register(entity, fps)
+            return
+        interval = 1.0 / fps
+        if entry[0] != interval:
+            entry[0] = interval
+            entry[1] = 0.0
+
+    def tick(self, dt):
+        # copy รายการก่อนวน เพราะ animate() อาจทำให้ entity ถูก destroy/unregister
+        for entity, entry in list(self.entries.items()):
+            entry[1] += dt
+            interval = entry[0]
+            if entry[1] < interval - 1e-9:  # กัน error ของ float เช่น 15 * (1/60) < 0.25
+                continue
+            # ถ้าเฟรมค้างนานเกินหลายรอบ ให้ขยับแค่รอบเดียวเหมือน Clock (ไม่เร่งตามให้ทัน)
+            entry[1] = max(0.0, entry[1] - interval)
+            if entry[1] >= interval:
+                entry[1] = 0.0
+            entity.animate(interval)
+
+    def clear(self):
+        self.entries.clear()
+
+
+animation_scheduler = AnimationScheduler()
@@ -3,13 +3,14 @@ from kivy.clock import Clock
 from kivy.uix.widget import Widget
 from kivy.uix.label import Label
 from kivy.graphics import Color, Rectangle
-from kivy.core.audio import SoundLoader
+from assets.sound_bank import sound_bank
 from kivy.animation import Animation
 from kivy.core.image import Image as CoreImage
 from ui.intro import IntroScreen
 from data.settings import *
 from data.settings import PLAYER_PORTRAIT_IMG
 from data.chat import ENDING_TITLES
+from assets.Tiles.map_preloader import map_preloader
 
 class CutsceneManager:
     def __init__(self, game):
@@ -19,23 +20,14 @@ class CutsceneManager:
         self._pending_find_food_quest = False
         
         # โหลดเสียงประตู
-        self.door_sound = SoundLoader.load('assets/sound/door/Door_squeeky_2.wav')
-        self.door_close_sound = SoundLoader.load('assets/sound/door/Door_close.wav')
-        
-        if self.door_sound:
-            self.door_sound.volume = 0.6
-        if self.door_close_sound:
-            self.door_close_sound.volume = 0.6
+        self.door_sound = sound_bank.load('assets/sound/door/Door_squeeky_2.wav', 0.6)
+        self.door_close_sound = sound_bank.load('assets/sound/door/Door_close.wav', 0.6)
         
         # โหลดเสียงนั่ง
-        self.sit_sound = SoundLoader.load('assets/sound/sit.wav')
-        if self.sit_sound:
-            self.sit_sound.volume = 0.5
+        self.sit_sound = sound_bank.load('assets/sound/sit.wav', 0.5)
         
         # โหลดเสียงกระทืบ
-        self.hit_sound = SoundLoader.load('assets/sound/hit/hit.mp3')
-        if self.hit_sound:
-            self.hit_sound.volume = 0.8
+        self.hit_sound = sound_bank.load('assets/sound/hit/hit.mp3', 0.8)
         
         # โหลด father hit animation
         self._init_father_hit_animation()
@@ -159,6 +151,8 @@ class CutsceneManager:
         self.game.clear_interaction_hints()
         self.game.is_cutscene_active = True
         self.game.cutscene_step = 1 # ขั้นตอนเดินออกจากจอ
+        # คัทซีนนี้จะจบที่แมพบ้าน (end_cutscene) เริ่มโหลดไว้ระหว่างที่ตัวละครเดินออกจากจอ
+        map_preloader.prefetch('assets/Tiles/home.tmj')
         self.game.camera.locked = True
         
         # สำหรับ Day 3: ใช้ waypoint เพื่อเดินเลี้ยว
@@ -284,7 +278,7 @@ class CutsceneManager:
             else:
                 # 2. ถ้ากำลังเดินอยู่ ให้ปล่อยให้ระบบเดินต่อไปจนจบช่อง
                 if self.game.player.is_moving:
-                    self.game.player.move(set(), self.game.npcs, self.game.reaper, self.game.game_map.solid_rects)
+                    self.game.player.move(set(), self.game.npcs, self.game.reaper, self.game.game_map.solid_index)
                 else:
                     # 3. เลือกทิศทาง (Dodge Logic)
                     dx, dy = tx - px, ty - py
@@ -302,7 +296,7 @@ class CutsceneManager:
                         elif d == 'left': sx = -TILE_SIZE
                         elif d == 'right': sx = TILE_SIZE
                         nx, ny = px + sx, py + sy
-                        return (self.game.player.check_map_collision(nx, ny, self.game.game_map.solid_rects) or 
+                        return (self.game.player.check_map_collision(nx, ny, self.game.game_map.solid_index) or 
                                 self.game.player.check_npc_collision(nx, ny, self.game.npcs))
 
                     for k in priorities:
@@ -316,13 +310,13 @@ class CutsceneManager:
                     if chosen_key:
                         self.game.player.current_speed = WALK_SPEED
                         self.game.player.direction = chosen_key
-                        self.game.player.move({chosen_key}, self.game.npcs, self.game.reaper, self.game.game_map.solid_rects)
+                        self.game.player.move({chosen_key}, self.game.npcs, self.game.reaper, self.game.game_map.solid_index)
                         self.game.player.update_animation_speed()
 
         elif self.game.cutscene_step == 21:
             # ยืนรอ 3 วิ
             if self.game.player.is_moving:
-                self.game.player.move(set(), self.game.npcs, self.game.reaper, self.game.game_map.solid_rects)
+                self.game.player.move(set(), self.game.npcs, self.game.reaper, self.game.game_map.solid_index)
             
             self.game.player.stop()
             self.game.player.update_frame()
@@ -406,7 +400,7 @@ class CutsceneManager:
             else:
                 # 2. ถ้ากำลังเดินอยู่ ให้เดินให้สุดช่อง (Grid) ก่อน
                 if self.game.player.is_moving:
-                    self.game.player.move(set(), self.game.npcs, self.game.reaper, self.game.game_map.solid_rects)
+                    self.game.player.move(set(), self.game.npcs, self.game.reaper, self.game.game_map.solid_index)
                 else:
                     # 3. ลอจิกการเดินแบบ L-Shape (เดินเป็นเส้นตรง เนียนกว่าเดินเฉียง)
                     dx, dy = tx - px, ty - py
@@ -420,7 +414,7 @@ class CutsceneManager:
                         elif d == 'right': sx = TILE_SIZE
                         nx, ny = px + sx, py + sy
                         # เช็คทั้งแมพและ NPC (ใช้ logic ปกติไม่ข้ามคัตซีน)
-                        return (self.game.player.check_map_collision(nx, ny, self.game.game_map.solid_rects) or 
+                        return (self.game.player.check_map_collision(nx, ny, self.game.game_map.solid_index) or 
                                 self.game.player.check_npc_collision(nx, ny, self.game.npcs))
 
                     # พยายามเดินในแกนที่ระยะห่างเยอะที่สุดก่อน
@@ -452,7 +446,7 @@ class CutsceneManager:
                         self.game.player.current_speed = WALK_SPEED
                         self.game.player.direction = chosen_key
                         # ในคัทซีนเดินที่นี่ เรายอมให้เดินชน hitbox ปกติ (ไม่ข้าม) เพื่อความเป๊ะ
-                        self.game.player.move({chosen_key}, self.game.npcs, self.game.reaper, self.game.game_map.solid_rects)
+                        self.game.player.move({chosen_key}, self.game.npcs, self.game.reaper, self.game.game_map.solid_index)
                         self.game.player.update_animation_speed()
                     else:
                         self.game.player.logic_pos = [tx, ty]
@@ -637,7 +631,6 @@ class CutsceneManager:
 
         # ---- เสียง: ปิดทุกอย่าง แล้วสลับเป็น Ambiance Cave (loop ต่อจนถึง main menu) ----
         from kivy.app import App
-        from kivy.core.audio import SoundLoader as _SL
         _app = App.get_running_app()
 
         # 1. หยุด bg_loop ปัจจุบัน (เช่น Underground BGM หรือ loop เก่า)
@@ -652,10 +645,8 @@ class CutsceneManager:
         _ambiance_path = 'assets/sound/loop/Ambiance_Cave_Dark_Loop_Stereo.wav'
         import os as _os
         if _os.path.exists(_ambiance_path):
-            _new_bgm = _SL.load(_ambiance_path)
+            _new_bgm = sound_bank.load(_ambiance_path, 0.7, loop=True)
             if _new_bgm:
-                _new_bgm.loop = True
-                _new_bgm.volume = 0.7
                 _new_bgm.play()
                 _app.bg_loop = _new_bgm  # เก็บไว้เพื่อให้ main menu ไม่ต้องโหลดใหม่
         # -----------------------------------------------------------------------
@@ -726,6 +717,8 @@ class CutsceneManager:
     def end_cutscene(self):
         """จบ Cutscene และย้ายตัวละครเข้าบ้าน"""
         self.game.sorting_layer.clear()              
+        self.game.y_sorted_layer.reset()
+        self.game._y_sorted_done = False  # จัดลำดับใหม่ในเฟรมถัดไปแม้ไม่มีใครขยับ
         self.game.sorting_layer.add(self.game.player.group) 
         self.game.npcs, self.game.enemies, self.game.stars = [], [], []
         
@@ -1093,7 +1086,7 @@ class CutsceneManager:
         else:
             # Queue หมดแล้ว — เล่นเสียง Nod แล้วโชว์ title
             self.game.close_dialogue()
-            nod_sound = SoundLoader.load('assets/sound/feeling/Nod.wav')
+            nod_sound = sound_bank.load('assets/sound/feeling/Nod.wav')
             if nod_sound:
                 nod_sound.play()
                 # รอเสียงจบ (ประมาณ 1.5 วิ) แล้วโชว์ IntroScreen
@@ -1142,19 +1135,13 @@ class CutsceneManager:
         run_files = sorted(
             [f for f in os.listdir(run_dir) if f.lower().endswith('.wav')]
         )
-        self._ne_run_sounds  = [SoundLoader.load(os.path.join(run_dir, f)) for f in run_files]
+        self._ne_run_sounds  = [sound_bank.load(os.path.join(run_dir, f), 0.85) for f in run_files]
         self._ne_run_idx     = 0
         self._ne_run_events  = []
 
-        # ตั้งค่า volume
-        for s in self._ne_run_sounds:
-            if s: s.volume = 0.85
-
         # 3. โหลด breath.wav และเล่นพร้อมกัน
-        self._ne_breath = SoundLoader.load('assets/sound/breath.wav')
+        self._ne_breath = sound_bank.load('assets/sound/breath.wav', 0.7, loop=True)
         if self._ne_breath:
-            self._ne_breath.volume = 0.7
-            self._ne_breath.loop   = True
             self._ne_breath.play()
 
         # 4. เล่นเสียงวิ่งวนไปเรื่อยๆ ทุก ~0.7 วิ (10 ไฟล์ ≈ 7 วิ)
@@ -1270,9 +1257,8 @@ class CutsceneManager:
         has_gore = False
         if os.path.exists(gore_path):
             try:
-                self._bad_gore = SoundLoader.load(gore_path)
+                self._bad_gore = sound_bank.load(gore_path, 1.0)
                 if self._bad_gore:
-                    self._bad_gore.volume = 1.0
                     self._bad_gore.play()
                     gore_dur = self._bad_gore.length if self._bad_gore.length > 0 else 2.0
                     has_gore = True
@@ -1282,7 +1268,7 @@ class CutsceneManager:
         scream_dur = 3.0 # fallback
         if os.path.exists(scream_path):
             try:
-                self._bad_scream = SoundLoader.load(scream_path)
+                self._bad_scream = sound_bank.load(scream_path, 1.0)
                 if self._bad_scream:
                     scream_dur = self._bad_scream.length if self._bad_scream.length > 0 else 3.0
                     def _play_scream(dt):
@@ -1,4 +1,4 @@
-import random
+from managers.replay import game_rng
 from kivy.uix.widget import Widget
 from kivy.graphics import Color, Rectangle, Ellipse
 from kivy.animation import Animation
@@ -9,6 +9,22 @@ class GameplayManager:
     def __init__(self, game):
         self.game = game
 
+    def respawn_target(self):
+        """(x, y, map_file) ที่จะเกิดใหม่: จุดเซฟ Manual ล่าสุด (อ่านจาก index) ไม่เช่นนั้นจุดเริ่มต้นดั้งเดิม"""
+        start_x = (PLAYER_START_X // TILE_SIZE) * TILE_SIZE
+        start_y = (PLAYER_START_Y // TILE_SIZE) * TILE_SIZE
+        target_map = MAP_FILE
+
+        if getattr(self.game, 'save_manager', None):
+            # ใช้แค่ตำแหน่ง/แมพ อ่านจาก index ไม่ต้อง parse เซฟเต็มทุกครั้งที่ตาย
+            latest_save = self.game.save_manager.get_latest_save_summary()
+            if latest_save and 'player_pos' in latest_save:
+                saved_x, saved_y = latest_save['player_pos']
+                start_x = (saved_x // TILE_SIZE) * TILE_SIZE
+                start_y = (saved_y // TILE_SIZE) * TILE_SIZE
+                target_map = latest_save.get('current_map', MAP_FILE)
+        return start_x, start_y, target_map
+
     def respawn_at_reaper(self):
         """เมื่อหัวใจหมด วาปผู้เล่นกลับไปยังจุดเริ่มต้นและรีเซ็ตหัวใจ"""
         # หยุดเสียงทั้งหมดทันที (รวมถึงเสียงผีไล่)
@@ -23,17 +39,7 @@ class GameplayManager:
         self.game.player.state = 'idle'
         
         # วาร์ปผู้เล่นไปยังจุดที่เซฟไว้ล่าสุด (ถ้ามี) ไม่เช่นนั้นใช้จุดเริ่มต้นดั้งเดิม
-        start_x = (PLAYER_START_X // TILE_SIZE) * TILE_SIZE
-        start_y = (PLAYER_START_Y // TILE_SIZE) * TILE_SIZE
-        target_map = MAP_FILE
-        
-        if getattr(self.game, 'save_manager', None):
-            latest_save = self.game.save_manager.get_latest_save_data()
-            if latest_save and 'player_pos' in latest_save:
-                saved_x, saved_y = latest_save['player_pos']
-                start_x = (saved_x // TILE_SIZE) * TILE_SIZE
-                start_y = (saved_y // TILE_SIZE) * TILE_SIZE
-                target_map = latest_save.get('current_map', MAP_FILE)
+        start_x, start_y, target_map = self.respawn_target()
                 
         # ถ้าพิกัดที่เซฟไว้ไม่ได้อยู่ในแมพปัจจุบัน ให้ทำการเปลี่ยนแมพก่อน
         if self.game.game_map.filename != target_map:
@@ -63,7 +69,7 @@ class GameplayManager:
         # ส่งคำพูดผ่าน InteractionManager เพื่อให้ระบบ Dialogue ทำงานถูกต้อง (และหยุดเสียงผี)
         available_indices = [i for i in range(len(REAPER_DEATH_QUOTES)) if i != self.game.last_death_quote_index]
         if available_indices:
-            q_idx = random.choice(available_indices)
+            q_idx = game_rng.choice(available_indices)
             self.game.last_death_quote_index = q_idx
             # เรียกผ่านระบบ Interaction เพื่อให้ is_dialogue_active = True
             # พอตายแล้วขึ้น chat reaper ไม่ต้องให้ขึ้น save (can_save=False)
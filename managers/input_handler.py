@@ -30,7 +30,21 @@ class InputHandler:
 
     def on_key_down(self, keyboard, keycode, text, modifiers):
         key_name = keycode[1]
-        
+        # ระหว่างเล่น replay ไม่รับปุ่มจริง (InputReplayer ส่ง keyboard=None มาเอง)
+        if self.game.replayer and keyboard is not None:
+            return True
+        result = self.handle_key_down(key_name)
+        # ปุ่มที่ไม่ได้ค้างใน pressed_keys (E/Enter/Q/ลูกศร/Esc) ต้องอัดแยกไว้กดซ้ำตอน replay
+        if self.game.recorder and key_name not in self.pressed_keys:
+            self.game.recorder.press(key_name)
+        return result
+
+    def handle_key_down(self, key_name):
+        # เปิด/ปิด Frame Profiler ได้ทุกสถานะ (แม้หยุดเกม/คัทซีน)
+        if key_name == PROFILER_TOGGLE_KEY:
+            self.game.profiler.toggle()
+            return True
+
         # ป้องกันการกดปุ่มถ้าเกมหยุดหรือยังไม่พร้อม (ยกเว้นตอนจบ Ending)
         if (self.game.is_paused or not self.game.is_ready) and getattr(self.game, 'cutscene_step', 0) != 103:
             return True
@@ -55,6 +69,10 @@ class InputHandler:
                 elif self.game.is_dialogue_active:
                     self.game.next_dialogue()
                 return True
+
+            # 2. ข้อความยังพิมพ์ไม่จบ: กดครั้งแรกให้แสดงทั้งประโยคก่อน (ยังไม่ไปประโยคถัดไป/ไม่เลือก choice)
+            if self.game.is_dialogue_active and self.game.dialogue_manager.skip_reveal():
+                return True
         
         # คีย์ Q สำหรับกดใช้ไอเทม Blue Stone
         if key_name == 'q':
@@ -111,6 +129,8 @@ class InputHandler:
         return True
         
     def on_key_up(self, keyboard, keycode): 
+        if self.game.replayer and keyboard is not None:
+            return True
         key_name = keycode[1] 
         if key_name in self.pressed_keys:
             self.pressed_keys.remove(key_name)
@@ -3,9 +3,13 @@ from kivy.graphics import Color, RoundedRectangle
 from data.settings import *
 from data.chat import CANDLE_LIGHT_DIALOGUE, CANDLE_LIGHT_CHOICES
 
+HINT_BOX_WIDTH = 28 # ความกว้างกล่องปุ่ม E (เดิม 25 เพิ่มขึ้นนิดเดียว)
+
 class InteractionManager:
     def __init__(self, game):
         self.game = game
+        self.hint_pool = []            # Label ปุ่ม E ที่สร้างไว้แล้ว (ใช้ซ้ำ ไม่สร้างใหม่ทุกเฟรม)
+        self._hints_used = 0           # จำนวน hint ที่ถูกวางในเฟรมนี้
 
     def get_interaction_target(self, targets, limit=32):
         """ค้นหาเป้าหมายที่อยู่ใกล้และผู้เล่นหันหน้าเข้าหา"""
@@ -61,9 +65,15 @@ class InteractionManager:
         return None
 
     def update_interaction_hints(self):
-        """จัดการแสดงผลปุ่ม [E] ขึ้นเหนือหัว NPC หรือไอเทม เมื่อเดินไปใกล้"""
-        self.game.clear_interaction_hints()
-        
+        """จัดการแสดงผลปุ่ม [E] ขึ้นเหนือหัว NPC หรือไอเทม เมื่อเดินไปใกล้
+
+        hint จาก pool ที่ไม่ได้ถูกวางในเฟรมนี้จะถูกซ่อน ส่วนตัวที่ยังแสดงอยู่แค่ขยับตำแหน่ง
+        """
+        self._hints_used = 0
+        self._update_interaction_hints()
+        self._hide_unused_hints()
+
+    def _update_interaction_hints(self):
         # 0. บล็อกการทำงานในสถานะที่ไม่เหมาะสม
         if not getattr(self.game, 'is_ready', False):
             return
@@ -122,13 +132,11 @@ class InteractionManager:
 
         self.game.current_search_target = self.get_search_target()
 
-    def _draw_interaction_hint(self, target, offset_y=50, pos_override=None):
-        """Helper สำหรับวาดปุ่ม E ใน Screen Space"""
-        hint_text = "E"
-        box_width = 28 # เดิม 25 เพิ่มขึ้นนิดเดียว
+    def _create_hint(self):
+        """สร้าง Label ปุ่ม E หนึ่งอัน (เรียกเฉพาะตอน pool ไม่พอ)"""
         hint = Label(
-            text=hint_text, font_name=GAME_FONT, font_size='13sp', # เดิม 12sp
-            color=(1, 1, 1, 1), size_hint=(None, None), size=(box_width, 28), # เดิม 25, 25
+            text="E", font_name=GAME_FONT, font_size='13sp', # เดิม 12sp
+            color=(1, 1, 1, 1), size_hint=(None, None), size=(HINT_BOX_WIDTH, 28), # เดิม 25, 25
             halign='center', valign='middle', bold=True
         )
         hint.bind(size=lambda l, s: setattr(l, 'text_size', s))
@@ -139,16 +147,40 @@ class InteractionManager:
         
         hint.bind(pos=lambda inst, val: setattr(inst.bg_rect, 'pos', inst.pos))
         hint.bind(size=lambda inst, val: setattr(inst.bg_rect, 'size', inst.size))
-        
+        return hint
+
+    def _draw_interaction_hint(self, target, offset_y=50, pos_override=None):
+        """Helper สำหรับวาดปุ่ม E ใน Screen Space (ดึงจาก pool แล้วขยับตำแหน่งเท่านั้น)"""
+        if self._hints_used == len(self.hint_pool):
+            self.hint_pool.append(self._create_hint())
+        hint = self.hint_pool[self._hints_used]
+        self._hints_used += 1
+
         if pos_override:
             spos = self.game.camera.world_to_screen(pos_override[0] + TILE_SIZE/2, pos_override[1] + offset_y)
         else:
             spos = self.game.camera.world_to_screen(target.logic_pos[0] + TILE_SIZE/2, target.logic_pos[1] + offset_y)
             
-        hint.pos = (spos[0] - (box_width / 2), spos[1])
+        new_pos = (spos[0] - (HINT_BOX_WIDTH / 2), spos[1])
+        if tuple(hint.pos) != new_pos:
+            hint.pos = new_pos
         
-        if self.game.dialogue_root: self.game.dialogue_root.add_widget(hint)
-        self.game.interaction_hints.append(hint)
+        # เพิ่มเข้า widget tree เฉพาะตอนเพิ่งเริ่มแสดง (หรือ dialogue_root ถูกสร้างใหม่)
+        root = self.game.dialogue_root
+        if root and hint.parent is not root:
+            if hint.parent:
+                hint.parent.remove_widget(hint)
+            root.add_widget(hint)
+        if hint not in self.game.interaction_hints:
+            self.game.interaction_hints.append(hint)
+
+    def _hide_unused_hints(self):
+        """ซ่อน hint ใน pool ที่ไม่ได้ใช้ในเฟรมนี้ (ไม่ทำลายทิ้ง)"""
+        for hint in self.hint_pool[self._hints_used:]:
+            if hint.parent:
+                hint.parent.remove_widget(hint)
+            if hint in self.game.interaction_hints:
+                self.game.interaction_hints.remove(hint)
 
     def interact(self):
         """จัดการการกดปุ่ม [E] เพื่อคุยหรือสำรวจ"""
@@ -166,6 +198,8 @@ class InteractionManager:
             for er in getattr(self.game, 'extra_reapers', []): er.destroy()
             
             self.game.sorting_layer.clear()
+            self.game.y_sorted_layer.reset()
+            self.game._y_sorted_done = False  # จัดลำดับใหม่ในเฟรมถัดไปแม้ไม่มีใครขยับ
             self.game.npcs, self.game.enemies, self.game.stars = [], [], []
             self.game.extra_reapers = []
 
@@ -187,14 +221,12 @@ class InteractionManager:
 
             # สลับ bg loop เป็นเสียง Underground
             from kivy.app import App
-            from kivy.core.audio import SoundLoader
+            from assets.sound_bank import sound_bank
             app = App.get_running_app()
             if hasattr(app, 'bg_loop') and app.bg_loop:
                 app.bg_loop.stop()
-            underground_bgm = SoundLoader.load('assets/sound/loop/Underground.wav')
+            underground_bgm = sound_bank.load('assets/sound/loop/Underground.wav', 0.7, loop=True)
             if underground_bgm:
-                underground_bgm.loop = True
-                underground_bgm.volume = 0.7
                 underground_bgm.play()
                 app.bg_loop = underground_bgm  # เก็บไว้สำหรับหยุดทีหลัง
             
@@ -425,6 +457,7 @@ class InteractionManager:
         return [random.choice(REAPER_DIALOGUES)]
 
     def clear_interaction_hints(self):
+        """ซ่อน hint ทั้งหมด (widget ยังอยู่ใน pool ให้ใช้ซ้ำ)"""
         for hint in self.game.interaction_hints:
             if hint.parent:
                 hint.parent.remove_widget(hint)
@@ -0,0 +1,158 @@
+import math
+import os
+import time
+from collections import deque
+from kivy.uix.label import Label
+from data.settings import *
+
+# (ชื่อ stage, object ที่ถือ method, ชื่อ method) ที่จะถูกจับเวลาเมื่อเปิด profiler
+# 'collision' ซ้อนอยู่ใน 'player' (เรียกจาก Player.move) จึงไม่นับแยกใน frame
+STAGES = (
+    ('player', 'game', '_step_player'),
+    ('collision', 'player', 'check_map_collision'),
+    ('collision', 'player', 'check_npc_collision'),
+    ('collision', 'player', 'check_reaper_collision'),
+    ('collision', 'player', 'check_candle_collision'),
+    ('npcs', 'game', '_step_npcs'),
+    ('enemies', 'game', '_step_enemies'),
+    ('hints', 'game', 'update_interaction_hints'),
+    ('story', 'story_manager', 'update'),
+    ('camera', 'game', 'update_camera'),
+    ('chunks', 'game', '_step_chunks'),
+    ('ysort', 'game', 'y_sorting'),
+    ('frame', 'game', '_move_step_logic'),
+)
+STAGE_NAMES = tuple(dict.fromkeys(name for name, _, _ in STAGES))
+
+
+def percentile(sorted_values, p):
+    """nearest-rank percentile ของ list ที่เรียงแล้ว"""
+    if not sorted_values:
+        return 0.0
+    k = max(0, math.ceil(p / 100.0 * len(sorted_values)) - 1)
+    return sorted_values[k]
+
+
+class FrameProfiler:
+    """จับเวลาต่อเฟรมของแต่ละ stage ใน GameWidget._move_step_logic (เปิด/ปิดด้วยปุ่ม PROFILER_TOGGLE_KEY)
+
+    ตอนเปิดจะห่อ method ของแต่ละ stage ด้วยตัวจับเวลาเป็น attribute ของ instance
+    ตอนปิดจะลบ attribute นั้นทิ้ง (กลับไปใช้ method ของ class ตรงๆ) ลูปเกมจึงไม่มีงานเพิ่มเลยขณะปิด
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.enabled = False
+        self.wrapped = []       # [(object, ชื่อ method), ...] ที่ห่อไว้
+        self.current = {}       # เวลาสะสม (วินาที) ของแต่ละ stage ในเฟรมนี้
+        self.windows = {name: deque(maxlen=PROFILER_WINDOW) for name in STAGE_NAMES}
+        self.rows = []          # เวลาทุกเฟรม (ms) สำหรับเขียน CSV ตอนปิด
+        self.frame_count = 0
+        self.overlay = None
+
+    def toggle(self):
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable()
+
+    def enable(self):
+        if self.enabled:
+            return
+        owners = {'game': self.game, 'player': self.game.player, 'story_manager': self.game.story_manager}
+        for name, owner_key, method in STAGES:
+            owner = owners[owner_key]
+            setattr(owner, method, self._timed(name, getattr(owner, method), name == 'frame'))
+            self.wrapped.append((owner, method))
+        self.enabled = True
+        self._show_overlay()
+        print("DEBUG: Frame profiler enabled")
+
+    def disable(self):
+        if not self.enabled:
+            return
+        for owner, method in self.wrapped:
+            # ลบตัวห่อออกจาก instance -> กลับไปใช้ method ของ class
+            owner.__dict__.pop(method, None)
+        self.wrapped = []
+        self.enabled = False
+        if self.overlay and self.overlay.parent:
+            self.overlay.parent.remove_widget(self.overlay)
+        self.write_csv()
+        print("DEBUG: Frame profiler disabled")
+
+    def _timed(self, name, func, is_frame):
+        clock = time.perf_counter
+        current = self.current
+
+        if is_frame:
+            def wrapper(*args, **kwargs):
+                start = clock()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    current['frame'] = clock() - start
+                    self._end_frame()
+        else:
+            def wrapper(*args, **kwargs):
+                start = clock()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    current[name] = current.get(name, 0.0) + clock() - start
+        return wrapper
+
+    def _end_frame(self):
+        row = []
+        for name in STAGE_NAMES:
+            ms = self.current.get(name, 0.0) * 1000
+            self.windows[name].append(ms)
+            row.append(ms)
+        self.current.clear()
+        self.rows.append(row)
+        self.frame_count += 1
+        if self.frame_count % PROFILER_OVERLAY_EVERY == 0:
+            self._update_overlay()
+
+    def summary(self):
+        """{stage: (p50, p95, p99)} หน่วย ms ของหน้าต่างล่าสุด"""
+        result = {}
+        for name in STAGE_NAMES:
+            values = sorted(self.windows[name])
+            result[name] = (percentile(values, 50), percentile(values, 95), percentile(values, 99))
+        return result
+
+    def _show_overlay(self):
+        if self.overlay is None:
+            self.overlay = Label(
+                font_size='11sp', halign='left', valign='top', color=(0.6, 1, 0.6, 1),
+                size_hint=(None, None), size=(260, 16 * (len(STAGE_NAMES) + 1)),
+                pos_hint={'x': 0.01, 'top': 0.99}
+            )
+            self.overlay.bind(size=self.overlay.setter('text_size'))
+        root = self.game.dialogue_root or self.game.parent
+        if root and self.overlay.parent is None:
+            root.add_widget(self.overlay)
+        self.overlay.text = "profiling..."
+
+    def _update_overlay(self):
+        if not self.overlay:
+            return
+        lines = ["stage       p50    p95    p99 (ms)"]
+        for name, (p50, p95, p99) in self.summary().items():
+            lines.append(f"{name:<10}{p50:6.2f} {p95:6.2f} {p99:6.2f}")
+        self.overlay.text = "\n".join(lines)
+
+    def write_csv(self):
+        """เขียนเวลาของทุกเฟรมตั้งแต่เปิด profiler ลง PROFILER_CSV_DIR แล้วเริ่มนับใหม่"""
+        if not self.rows:
+            return None
+        os.makedirs(PROFILER_CSV_DIR, exist_ok=True)
+        path = os.path.join(PROFILER_CSV_DIR, time.strftime('frames_%Y%m%d_%H%M%S.csv'))
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('frame,' + ','.join(STAGE_NAMES) + '\n')
+            for i, row in enumerate(self.rows):
+                f.write(f"{i}," + ','.join(f"{ms:.3f}" for ms in row) + '\n')
+        print(f"DEBUG: Wrote {len(self.rows)} profiled frames to {path}")
+        self.rows = []
+        return path
@@ -0,0 +1,180 @@
+import hashlib
+import json
+import random
+import struct
+import time
+
+# ตัวสุ่มของเกมเพลย์ (ทิศเดินสุ่มของผี, คำพูดตอนตาย, ชนิดผีที่เกิด ฯลฯ) แยกจาก random กลาง
+# เพื่อให้ seed เดียวกัน + อินพุตชุดเดียวกัน ได้ผลเหมือนเดิมทุกครั้ง (เสียงเท้า/เอฟเฟกต์ยังใช้ random ปกติได้)
+game_rng = random.Random()
+
+# รูปแบบไฟล์: MAGIC + header แล้วตามด้วย record ต่อกัน (byte แรกคือชนิด)
+MAGIC = b'BTSR'
+VERSION = 1
+_HEADER = struct.Struct('<BQI')  # version, seed, ความยาว initial_data (JSON)
+_OP = struct.Struct('<BB')       # op, index ของชื่อปุ่ม
+_TICK = struct.Struct('<Bd')     # OP_TICK, dt ของเฟรม (double ให้ตรงกับที่ Clock ส่งมาเป๊ะ)
+
+OP_TICK = 0      # จบหนึ่ง tick (move_step ถูกเรียกด้วย dt นี้)
+OP_DOWN = 1      # ปุ่มเข้า pressed_keys
+OP_UP = 2        # ปุ่มออกจาก pressed_keys
+OP_PRESS = 3     # กดปุ่มที่ไม่ได้ค้างใน pressed_keys (E/Enter/Q/ลูกศรเลือก choice/Esc)
+OP_KEY_NAME = 4  # ลงทะเบียนชื่อปุ่มใหม่ (index ถัดไป) ตามด้วยความยาว + utf-8
+
+
+def trajectory_update(digest, player, enemies):
+    """ใส่ตำแหน่งผู้เล่นและศัตรูของ tick นี้ลงใน hash (ใช้เทียบว่าสองรอบเดินเหมือนกันทุกเฟรม)"""
+    digest.update(struct.pack('<dd', *player.logic_pos))
+    for enemy in enemies:
+        digest.update(struct.pack('<idd', enemy.id, *enemy.logic_pos))
+
+
+class InputRecorder:
+    """อัดอินพุตของ GameWidget ลงไฟล์ binary: ปุ่มที่เข้า/ออก pressed_keys, ปุ่มกดครั้งเดียว และ dt ทุก tick"""
+
+    FLUSH_EVERY = 256  # เขียนลงดิสก์ทุกกี่ tick (กันข้อมูลหายถ้าเกมปิดกลางคัน)
+
+    def __init__(self, path, seed, initial_data=None):
+        self.path = path
+        self.key_ids = {}
+        self.held = set()
+        self.presses = []
+        self.ticks = 0
+        blob = json.dumps(initial_data).encode('utf-8') if initial_data else b''
+        self.file = open(path, 'wb')
+        self.file.write(MAGIC + _HEADER.pack(VERSION, seed, len(blob)) + blob)
+        print(f"DEBUG: Recording input to {path} (seed={seed})")
+
+    def _key(self, name):
+        idx = self.key_ids.get(name)
+        if idx is None:
+            idx = self.key_ids[name] = len(self.key_ids)
+            raw = name.encode('utf-8')
+            self.file.write(bytes((OP_KEY_NAME, len(raw))) + raw)
+        return idx
+
+    def press(self, key_name):
+        """ปุ่มที่ InputHandler จัดการเองโดยไม่ใส่ลง pressed_keys (เล่นซ้ำก่อน tick ถัดไป)"""
+        self.presses.append(key_name)
+
+    def tick(self, dt, pressed_keys):
+        if self.file is None:
+            return
+        out = self.file
+        for key in self.presses:
+            out.write(_OP.pack(OP_PRESS, self._key(key)))
+        self.presses = []
+        if pressed_keys != self.held:
+            for key in pressed_keys - self.held:
+                out.write(_OP.pack(OP_DOWN, self._key(key)))
+            for key in self.held - pressed_keys:
+                out.write(_OP.pack(OP_UP, self._key(key)))
+            self.held = set(pressed_keys)
+        out.write(_TICK.pack(OP_TICK, dt))
+        self.ticks += 1
+        if self.ticks % self.FLUSH_EVERY == 0:
+            out.flush()
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+            print(f"DEBUG: Recorded {self.ticks} ticks to {self.path}")
+
+
+class InputReplayer:
+    """อ่านไฟล์จาก InputRecorder แล้วป้อนกลับทีละ tick
+
+    for dt, presses, held in replayer: ... ใช้กับ Simulation ได้ตรงๆ
+    step(game) ใช้กับ GameWidget: กดปุ่มผ่าน InputHandler เดิม ตั้ง pressed_keys แล้วเรียก move_step(dt)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            data = f.read()
+        if data[:4] != MAGIC:
+            raise ValueError(f"{path} is not an input recording")
+        version, self.seed, blob_len = _HEADER.unpack_from(data, 4)
+        if version != VERSION:
+            raise ValueError(f"Unsupported recording version {version}")
+        pos = 4 + _HEADER.size
+        self.initial_data = json.loads(data[pos:pos + blob_len].decode('utf-8')) if blob_len else None
+        pos += blob_len
+
+        # แปลงเป็น list ของ (dt, presses, held) ล่วงหน้า ตอนเล่นจะได้ไม่ต้อง parse
+        self.ticks = []
+        names = []
+        presses = []
+        held = set()
+        end = len(data)
+        while pos < end:
+            op = data[pos]
+            if op == OP_TICK:
+                size = _TICK.size
+            elif op == OP_KEY_NAME:
+                size = 2 + data[pos + 1] if pos + 1 < end else 2
+            else:
+                size = _OP.size
+            if pos + size > end:
+                # เกมถูกปิดกลางคัน (crash/kill) ระหว่างเขียน record สุดท้าย: ใช้ถึง tick ที่ครบล่าสุด
+                print(f"DEBUG: Replay {path} ends with a partial record at byte {pos}, "
+                      f"ignoring the last {end - pos} bytes")
+                break
+            if op == OP_TICK:
+                self.ticks.append((_TICK.unpack_from(data, pos)[1], tuple(presses), frozenset(held)))
+                presses = []
+                pos += _TICK.size
+            elif op == OP_KEY_NAME:
+                n = data[pos + 1]
+                names.append(data[pos + 2:pos + 2 + n].decode('utf-8'))
+                pos += 2 + n
+            else:
+                key = names[data[pos + 1]]
+                if op == OP_DOWN:
+                    held.add(key)
+                elif op == OP_UP:
+                    held.discard(key)
+                else:
+                    presses.append(key)
+                pos += _OP.size
+
+        self.index = 0
+        self.timings = []  # เวลาจริง (วินาที) ของ move_step แต่ละ tick ตอนเล่นซ้ำ
+        self.digest = hashlib.sha1()
+        print(f"DEBUG: Loaded replay {path}: {len(self.ticks)} ticks, seed={self.seed}")
+
+    def __iter__(self):
+        return iter(self.ticks)
+
+    @property
+    def finished(self):
+        return self.index >= len(self.ticks)
+
+    def step(self, game):
+        """เล่น tick ถัดไปกับ GameWidget คืน False เมื่อหมดไฟล์แล้ว"""
+        if self.finished:
+            return False
+        dt, presses, held = self.ticks[self.index]
+        self.index += 1
+        for key in presses:
+            # keyboard=None บอก InputHandler ว่ามาจาก replay (ปุ่มจริงถูกเมินระหว่างเล่นซ้ำ)
+            game.input_handler.on_key_down(None, (0, key), '', [])
+        game.pressed_keys.clear()
+        game.pressed_keys.update(held)
+
+        start = time.perf_counter()
+        game.move_step(dt)
+        self.timings.append(time.perf_counter() - start)
+        trajectory_update(self.digest, game.player, game.enemies)
+        return True
+
+    def write_timings(self, path=None):
+        """เขียนเวลาต่อ tick เป็น CSV (tick, dt, ms) ไว้เทียบระหว่าง build"""
+        path = path or self.path + '.timings.csv'
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('tick,dt,ms\n')
+            for i, elapsed in enumerate(self.timings):
+                f.write(f"{i},{self.ticks[i][0]:.6f},{elapsed * 1000:.3f}\n")
+        print(f"DEBUG: Replay finished ({len(self.timings)} ticks), trajectory={self.digest.hexdigest()}, timings -> {path}")
+        return path
@@ -1,12 +1,18 @@
 # storygame/save.py
-import os
-import json
 import datetime
+from kivy.clock import Clock
 from ui.load import SaveLoadScreen
+from managers.save_store import save_writer, load_save, slot_name, read_index, latest_save_name, manual_save_names
 
 class SaveManager:
     def __init__(self, game):
         self.game = game
+        # เซฟเขียนบน thread แยก ถ้าพังให้ผู้เล่นรู้ (slot ยังค้างอยู่ใน save_writer.failed และจะลองใหม่ตอนเซฟครั้งถัดไป)
+        save_writer.on_error = self._on_save_failed
+
+    def _on_save_failed(self, name, error):
+        # ถูกเรียกจาก thread ที่เขียนไฟล์ ต้องไปแตะ widget บน main thread
+        Clock.schedule_once(lambda dt: self.game.quest_manager.show_quest_notification("SAVE FAILED - WILL RETRY"))
 
     def show_save_screen(self):
         """เปิดหน้าจอเลือกสล็อตเพื่อเซฟเกม"""
@@ -47,7 +53,8 @@ class SaveManager:
             "stun_cooldown": getattr(self.game, 'stun_cooldown', 0),
             
             # สถานะของมอนสเตอร์และสภาพแวดล้อมในแมพปัจจุบัน
-            "destroyed_enemies": self.game.destroyed_enemies,
+            # สำเนา list: เซฟถูก serialize บน thread แยก ระหว่างนั้นเกมยังแก้ list เดิมได้
+            "destroyed_enemies": list(self.game.destroyed_enemies),
             "enemies_data": [
                 {
                     "id": enemy.id,
@@ -82,7 +89,7 @@ class SaveManager:
             
         if day == 2:
             save_data["letters_held"] = getattr(self.game, 'letters_held', 0)
-            save_data["delivered_house_indices"] = getattr(self.game, 'delivered_house_indices', [])
+            save_data["delivered_house_indices"] = list(getattr(self.game, 'delivered_house_indices', []))
             
         elif day == 3:
             save_data["current_candle_lit_count"] = getattr(self.game, 'current_candle_lit_count', 0)
@@ -101,14 +108,8 @@ class SaveManager:
 
     def on_save_confirmed(self, slot_id, save_screen=None):
         """บันทึกข้อมูลแบบสล็อต (Manual Save)"""
-        if not os.path.exists('saves'):
-            os.makedirs('saves')
-            
         save_data = self.get_save_data(slot_id)
-        file_path = f'saves/slot_{slot_id}.json'
-        
-        with open(file_path, 'w') as f:
-            json.dump(save_data, f)
+        save_writer.submit(slot_name(slot_id), save_data)
 
         # จำ slot ที่ใช้งานอยู่
         self.game.current_save_slot = slot_id
@@ -121,21 +122,12 @@ class SaveManager:
 
     def auto_save(self):
         """บันทึกข้อมูลอัตโนมัติลงไฟล์แยก (Autosave) และไฟล์ความคืบหน้ากลาง"""
-        if not os.path.exists('saves'):
-            os.makedirs('saves')
-
         slot_id = getattr(self.game, 'current_save_slot', None)
         save_data = self.get_save_data(slot_id)
         save_data["is_auto_save"] = True
 
-        # 1. เซฟลงไฟล์ Autosave แยกต่างหาก (ไม่ทับสล็อตแมนนวล)
-        file_path = 'saves/autosave.json'
-        try:
-            with open(file_path, 'w') as f:
-                json.dump(save_data, f)
-            print(f"DEBUG: Auto-save successful to {file_path}")
-        except Exception as e:
-            print(f"DEBUG: Auto-save failed: {e}")
+        # 1. เซฟลงไฟล์ Autosave แยกต่างหาก (ไม่ทับสล็อตแมนนวล) เขียนเบื้องหลัง ไม่หยุดเฟรม
+        save_writer.submit('autosave', save_data)
 
     def load_game_from_pause(self):
         """เปิดหน้าจอโหลดเซฟจากเมนู Pause"""
@@ -159,70 +151,29 @@ class SaveManager:
             self.game.dialogue_root.add_widget(load_screen)
 
     def get_latest_manual_save_data(self):
-        """ค้นหาไฟล์เซฟ MANUAL ล่าสุด (slot_*.json)"""
-        saves_dir = 'saves'
-        if not os.path.exists(saves_dir):
-            return None
-            
-        files = [os.path.join(saves_dir, f) for f in os.listdir(saves_dir)
-                 if f.startswith('slot_') and f.endswith('.json')]
-        if not files:
-            return None
-
-        best_file, best_ts = None, ""
-        for fp in files:
-            try:
-                with open(fp, 'r') as f:
-                    d = json.load(f)
-                ts = d.get('saved_at', '')
-                if ts > best_ts:
-                    best_ts, best_file = ts, fp
-            except Exception:
-                pass
-
-        if not best_file:
-            best_file = max(files, key=os.path.getmtime)
-
-        try:
-            with open(best_file, 'r') as f:
-                return json.load(f)
-        except:
-            return None
+        """ค้นหาไฟล์เซฟ MANUAL ล่าสุด (เลือกจาก index แล้วอ่านไฟล์เต็มแค่ไฟล์เดียว)"""
+        name = latest_save_name(manual_save_names())
+        return load_save(name) if name else None
 
     def get_latest_checkpoint_data(self):
         """ค้นหาข้อมูลที่ใหม่ที่สุด (รวมทั้ง Manual และ Auto) สำหรับใช้ Respawn"""
-        manual_data = self.get_latest_manual_save_data()
-        
-        # เช็ค Autosave
-        auto_path = 'saves/autosave.json'
-        auto_data = None
-        if os.path.exists(auto_path):
-            try:
-                with open(auto_path, 'r') as f:
-                    auto_data = json.load(f)
-            except:
-                pass
-        
-        if not manual_data and not auto_data:
-            return None
-        if not manual_data: return auto_data
-        if not auto_data: return manual_data
-        
-        # เทียบ Timestamp
-        if auto_data.get('saved_at', '') > manual_data.get('saved_at', ''):
-            return auto_data
-        return manual_data
+        # เทียบ Timestamp ของ Manual ทุกสล็อตกับ Autosave จาก index
+        name = latest_save_name(manual_save_names() + ['autosave'])
+        return load_save(name) if name else None
+
+    def get_latest_save_summary(self):
+        """summary ของเซฟ Manual ล่าสุดจาก index (day, player_pos, current_map, ...) ไม่เปิดไฟล์เซฟ"""
+        index = read_index()
+        name = latest_save_name(manual_save_names(), index)
+        return index.get(name) if name else None
 
     def get_latest_save_data(self):
         """(Legacy/Compatibility) คืนค่าเซฟที่ใหม่ที่สุด (เฉพาะ Manual)"""
         return self.get_latest_manual_save_data()
 
     def _on_pause_load_selected(self, slot_id, load_screen=None):
-        save_path = f'saves/slot_{slot_id}.json'
-        if os.path.exists(save_path):
-            with open(save_path, 'r') as f:
-                data = json.load(f)
-            
+        data = load_save(slot_name(slot_id))
+        if data is not None:
             if load_screen: load_screen.close()
             self.game.resume_game()
             
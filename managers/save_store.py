@@ -0,0 +1,401 @@
+import os
+import json
+import queue
+import struct
+import threading
+from array import array
+from data.settings import *
+
+# ไฟล์เซฟ: MAGIC + (schema version, flags, ความยาว JSON) + JSON ของ state + ส่วนท้ายแบบไบนารี (ถ้ามี flag)
+# ไฟล์ slot_N.json แบบเก่า (JSON ล้วน ไม่มี header) ถือเป็น schema 1 และถูก migrate ตอนอ่าน
+SAVE_MAGIC = b'BTSS'
+SCHEMA_VERSION = 2  # เพิ่มเลขนี้ทุกครั้งที่เปลี่ยนโครงสร้าง state แล้วลงทะเบียน @migration(เลขเดิม)
+FLAG_PACKED_ENEMIES = 1  # enemies_data / destroyed_enemies เก็บเป็น array ต่อท้ายแทนการอยู่ใน JSON
+
+_HEADER = struct.Struct('<HBI')
+_COUNT = struct.Struct('<I')
+
+SAVE_EXT = '.sav'
+LEGACY_EXT = '.json'
+
+
+def slot_name(slot_id):
+    return f'slot_{slot_id}'
+
+
+def save_path(name):
+    """path ของไฟล์เซฟรูปแบบปัจจุบัน (name = 'slot_3', 'autosave')"""
+    return os.path.join(SAVE_DIR, name + SAVE_EXT)
+
+
+def find_save(name):
+    """path ของไฟล์เซฟที่มีอยู่จริง (ไฟล์ใหม่ก่อน แล้วค่อยไฟล์ JSON เก่า) หรือ None"""
+    for ext in (SAVE_EXT, LEGACY_EXT):
+        path = os.path.join(SAVE_DIR, name + ext)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+# --- Migration ---
+
+_migrations = {}  # schema เดิม -> ฟังก์ชันแปลง state ไป schema ถัดไป
+
+
+def migration(from_version):
+    def register(fn):
+        _migrations[from_version] = fn
+        return fn
+    return register
+
+
+@migration(1)
+def _v1_to_v2(state):
+    # เซฟ JSON เก่าบางไฟล์ไม่มี saved_at (ก่อนมีระบบ respawn จากเซฟล่าสุด)
+    state.setdefault('saved_at', '')
+    state.setdefault('destroyed_enemies', [])
+    return state
+
+
+def migrate(state, version):
+    if version > SCHEMA_VERSION:
+        raise ValueError(f"save schema {version} is newer than this build ({SCHEMA_VERSION})")
+    while version < SCHEMA_VERSION:
+        fn = _migrations.get(version)
+        if fn is None:
+            raise ValueError(f"no migration from save schema {version}")
+        state = fn(state)
+        version += 1
+    return state
+
+
+# --- Encoding ---
+
+def _num(v):
+    # ตำแหน่งที่เป็นจำนวนเต็มกลับมาเป็น int เหมือนตอนเก็บใน JSON (ใช้เป็น index ของ grid ได้)
+    return int(v) if v.is_integer() else v
+
+
+def _pack_enemies(out, enemies, destroyed):
+    ids, xs, ys, types = array('q'), array('d'), array('d'), array('h')
+    for e in enemies:
+        ids.append(e['id'])
+        xs.append(e['pos'][0])
+        ys.append(e['pos'][1])
+        types.append(e['type'])
+    for arr in (ids, xs, ys, types, array('q', destroyed)):
+        out.append(_COUNT.pack(len(arr)))
+        out.append(arr.tobytes())
+
+
+def _unpack_enemies(buf, pos):
+    arrays = []
+    for typecode in ('q', 'd', 'd', 'h', 'q'):
+        (n,) = _COUNT.unpack_from(buf, pos)
+        pos += _COUNT.size
+        arr = array(typecode)
+        arr.frombytes(buf[pos:pos + n * arr.itemsize])
+        pos += n * arr.itemsize
+        arrays.append(arr)
+    ids, xs, ys, types, destroyed = arrays
+    enemies = [{"id": i, "pos": [_num(x), _num(y)], "type": t} for i, x, y, t in zip(ids, xs, ys, types)]
+    return enemies, list(destroyed)
+
+
+def encode(state, compact=SAVE_COMPACT_ENEMIES):
+    """state dict -> bytes ของไฟล์เซฟ (JSON แบบไม่มีช่องว่าง + array ศัตรูถ้า compact)"""
+    state = dict(state)
+    flags = 0
+    tail = []
+    if compact:
+        flags |= FLAG_PACKED_ENEMIES
+        _pack_enemies(tail, state.pop('enemies_data', []), state.pop('destroyed_enemies', []))
+    blob = json.dumps(state, separators=(',', ':')).encode('utf-8')
+    return b''.join([SAVE_MAGIC, _HEADER.pack(SCHEMA_VERSION, flags, len(blob)), blob] + tail)
+
+
+def decode(raw):
+    """bytes ของไฟล์เซฟ (รูปแบบใหม่หรือ JSON เก่า) -> state dict ที่ migrate เป็น schema ปัจจุบันแล้ว"""
+    if not raw.startswith(SAVE_MAGIC):
+        return migrate(json.loads(raw.decode('utf-8')), 1)
+    pos = len(SAVE_MAGIC)
+    version, flags, n = _HEADER.unpack_from(raw, pos)
+    pos += _HEADER.size
+    state = json.loads(raw[pos:pos + n].decode('utf-8'))
+    pos += n
+    if flags & FLAG_PACKED_ENEMIES:
+        state['enemies_data'], state['destroyed_enemies'] = _unpack_enemies(raw, pos)
+    return migrate(state, version)
+
+
+# --- Files ---
+
+def _fsync_dir(directory):
+    # ให้การ rename ลงดิสก์ด้วย ไม่งั้นไฟดับหลัง os.replace อาจได้ไฟล์เดิมกลับมา
+    # Windows เปิดโฟลเดอร์เป็นไฟล์ไม่ได้ (และ rename ที่นั่น durable อยู่แล้ว) จึงข้ามไป
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_atomic(path, raw):
+    """เขียนไฟล์แบบ crash-safe: tmp + fsync แล้ว os.replace + fsync โฟลเดอร์ (ไฟล์เดิมยังอยู่ครบถ้าเขียนไม่สำเร็จ)"""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(raw)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _fsync_dir(directory)
+
+
+def read_save(path):
+    with open(path, 'rb') as f:
+        return decode(f.read())
+
+
+# --- Index (saves/index.json) ---
+# สรุปของทุกสล็อต (วัน/หัวใจ/เวลาเล่น/saved_at/ตำแหน่ง) ให้เมนูและการ respawn อ่านไฟล์เล็กไฟล์เดียว
+# อัปเดตแบบ atomic ทุกครั้งที่เขียนเซฟ ถ้าไฟล์หาย/เสีย/ไม่ตรงกับไฟล์เซฟ (mtime, ขนาด) จะสร้างรายการนั้นใหม่เอง
+
+INDEX_VERSION = 1
+SUMMARY_KEYS = ('day', 'heart', 'play_time', 'saved_at', 'current_map', 'player_pos', 'is_auto_save')
+
+_index_lock = threading.Lock()
+_index_file_lock = threading.Lock()  # กันการเขียน index.json ซ้อนกัน (แยกจาก _index_lock ให้ผู้อ่านไม่ต้องรอ fsync)
+_index = None  # name -> summary (โหลดจากดิสก์ครั้งแรกที่ใช้ หลังจากนั้นในหน่วยความจำเป็นตัวจริง)
+
+
+def index_path():
+    return os.path.join(SAVE_DIR, 'index.json')
+
+
+def manual_save_names():
+    return [slot_name(i) for i in range(1, SAVE_SLOT_COUNT + 1)]
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _state_summary(state):
+    return {k: state[k] for k in SUMMARY_KEYS if k in state}
+
+
+def _summary(path, state):
+    entry = _state_summary(state)
+    entry['file'] = os.path.basename(path)
+    entry['stamp'] = _stamp(path)
+    return entry
+
+
+def _write_index(entries):
+    raw = json.dumps({'version': INDEX_VERSION, 'slots': entries}, separators=(',', ':')).encode('utf-8')
+    with _index_file_lock:
+        write_atomic(index_path(), raw)
+
+
+def _ensure_index():
+    """โหลด index (ต้องถือ _index_lock) ตรวจกับไฟล์เซฟจริงแค่ครั้งแรกด้วย stat แล้วเขียนกลับถ้ามีรายการเปลี่ยน"""
+    global _index
+    if _index is not None:
+        return _index
+    entries = {}
+    try:
+        with open(index_path(), 'r', encoding='utf-8') as f:
+            raw = json.load(f)
+        if raw.get('version') == INDEX_VERSION:
+            entries = raw.get('slots', {})
+    except (OSError, ValueError):
+        pass
+
+    changed = False
+    for name in manual_save_names() + ['autosave']:
+        path = find_save(name)
+        entry = entries.get(name)
+        if path is None:
+            if entry is not None:
+                del entries[name]
+                changed = True
+            continue
+        if entry is not None and entry.get('file') == os.path.basename(path) and entry.get('stamp') == _stamp(path):
+            continue
+        # เซฟก่อนมี index หรือไฟล์ถูกแก้นอกเกม: อ่านไฟล์เต็มครั้งเดียวแล้วจำ summary ไว้
+        try:
+            entries[name] = _summary(path, read_save(path))
+        except Exception as e:
+            print(f"DEBUG: Error indexing save {path}: {e}")
+            entries.pop(name, None)
+        changed = True
+
+    if changed:
+        try:
+            _write_index(entries)
+        except OSError as e:
+            print(f"DEBUG: Could not write save index: {e}")
+    _index = entries
+    return entries
+
+
+class SaveWriter:
+    """เขียนไฟล์เซฟบน thread แยก (serialize + fsync ไม่ไปกินเวลาเฟรมของเกม)
+
+    งานเข้าคิวเดียวตามลำดับ เซฟ slot เดียวกันซ้ำหลายครั้งจึงได้ไฟล์ของครั้งล่าสุดเสมอ
+    state ที่ส่งมาต้องเป็นสำเนาที่เกมจะไม่แก้ต่อ (get_save_data สร้าง list ใหม่ให้แล้ว)
+
+    state ที่ยังอยู่ในคิวถูกจำไว้ใน pending ให้ read_index / load_save อ่านได้ทันทีโดยไม่ต้องรอ thread
+    เซฟที่เขียนไม่สำเร็จถูกเก็บไว้ใน failed (slot ยัง "dirty") และลองเขียนใหม่ตอน submit ครั้งถัดไป
+    on_error(name, error) ถูกเรียกจาก thread ที่เขียน ผู้ใช้ที่แตะ UI ต้องส่งต่อไป main thread เอง
+    """
+
+    def __init__(self, on_error=None):
+        self.jobs = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+        self.on_error = on_error
+        self.pending = {}  # name -> state ล่าสุดที่อยู่ในคิว/กำลังเขียน
+        self.failed = {}  # name -> state ของเซฟล่าสุดที่เขียนไม่สำเร็จ
+
+    def _ensure_thread(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name='SaveWriter', daemon=True)
+                self.thread.start()
+
+    def _run(self):
+        while True:
+            name, state = self.jobs.get()
+            try:
+                self._write_job(name, state)
+            finally:
+                with self.lock:
+                    # ถ้ามีเซฟใหม่ของ slot เดียวกันเข้าคิวมาแล้ว ตัวนั้นยังค้างอยู่ต่อ
+                    if self.pending.get(name) is state:
+                        del self.pending[name]
+                self.jobs.task_done()
+
+    def _write_job(self, name, state):
+        try:
+            self.write(name, state)
+        except Exception as e:
+            print(f"DEBUG: Save to {name} failed: {e}")
+            with self.lock:
+                # เก็บไว้ลองใหม่เฉพาะเมื่อยังไม่มีเซฟใหม่กว่าของ slot นี้รออยู่ในคิว
+                if self.pending.get(name, state) is state:
+                    self.failed[name] = state
+            if self.on_error is not None:
+                self.on_error(name, e)
+            return False
+        with self.lock:
+            self.failed.pop(name, None)
+        return True
+
+    def write(self, name, state):
+        path = save_path(name)
+        with _index_lock:
+            _ensure_index()
+        write_atomic(path, encode(state))
+        # ไฟล์ JSON เก่าของ slot เดียวกันจะไม่ถูกอ่านอีก (find_save เจอ .sav ก่อน) ลบทิ้งไม่ให้ค้าง
+        legacy = os.path.join(SAVE_DIR, name + LEGACY_EXT)
+        if os.path.exists(legacy):
+            os.remove(legacy)
+        with _index_lock:
+            entries = _ensure_index()
+            entries[name] = _summary(path, state)
+            snapshot = dict(entries)
+        # เขียน index นอก _index_lock: read_index บน main thread ไม่ต้องรอ fsync
+        _write_index(snapshot)
+        print(f"DEBUG: Saved {path}")
+
+    def submit(self, name, state):
+        """ส่งเซฟเข้าคิว (พร้อมเซฟของ slot อื่นที่ยังค้างจากครั้งก่อนที่เขียนไม่สำเร็จ)"""
+        with self.lock:
+            # state ใหม่ของ slot เดียวกันแทนของที่ค้างอยู่
+            self.failed.pop(name, None)
+            jobs = list(self.failed.items()) + [(name, state)]
+            self.failed.clear()
+            if SAVE_BACKGROUND_WRITE:
+                self.pending.update(jobs)
+        if not SAVE_BACKGROUND_WRITE:
+            for job in jobs:
+                self._write_job(*job)
+            return
+        self._ensure_thread()
+        for job in jobs:
+            self.jobs.put(job)
+
+    def is_dirty(self, name):
+        """True ถ้าเซฟล่าสุดของ name ยังไม่ได้ลงดิสก์ (เขียนไม่สำเร็จ)"""
+        with self.lock:
+            return name in self.failed
+
+    def unwritten(self):
+        """{name: state} ของเซฟที่ยังไม่ลงดิสก์ (ในคิว/กำลังเขียน หรือเขียนไม่สำเร็จ) ของใหม่กว่าทับของเก่า"""
+        with self.lock:
+            states = dict(self.failed)
+            states.update(self.pending)
+            return states
+
+    def flush(self):
+        """รอให้เซฟที่ค้างในคิวเขียนเสร็จ (เรียกตอนปิดเกมเท่านั้น การอ่านใช้ unwritten() แทน)"""
+        if self.thread is not None:
+            self.jobs.join()
+
+
+save_writer = SaveWriter()
+
+
+def read_index():
+    """summary ของทุกเซฟ {name: {...}} ไม่ต้องเปิดไฟล์เซฟเต็ม
+
+    slot ที่ยังเขียนไม่เสร็จใช้ summary จาก state ในคิวของ save_writer (ไม่มี 'file' / 'stamp')
+    """
+    # อ่านคิวก่อน index: ถ้าเซฟเขียนเสร็จระหว่างสองบรรทัดนี้ index ก็มี summary ใหม่อยู่แล้ว
+    unwritten = save_writer.unwritten()
+    with _index_lock:
+        entries = {name: dict(entry) for name, entry in _ensure_index().items()}
+    for name, state in unwritten.items():
+        entries[name] = _state_summary(state)
+    return entries
+
+
+def latest_save_name(names, index=None):
+    """ชื่อเซฟที่ saved_at ใหม่ที่สุดในรายการ names (None ถ้าไม่มีสักอัน)"""
+    index = read_index() if index is None else index
+    best, best_ts = None, None
+    for name in names:
+        entry = index.get(name)
+        if entry is None:
+            continue
+        ts = entry.get('saved_at', '')
+        if best is None or ts > best_ts:
+            best, best_ts = name, ts
+    return best
+
+
+def load_save(name):
+    """อ่านเซฟตามชื่อ คืน None ถ้าไม่มีหรืออ่านไม่ได้
+
+    ถ้า slot นี้ยังค้างใน save_writer จะคืน state ในคิวผ่าน encode/decode (ได้ค่าเหมือนอ่านจากไฟล์ และเป็นสำเนา)
+    """
+    state = save_writer.unwritten().get(name)
+    if state is not None:
+        return decode(encode(state))
+    path = find_save(name)
+    if path is None:
+        return None
+    try:
+        return read_save(path)
+    except Exception as e:
+        print(f"DEBUG: Error loading save {path}: {e}")
+        return None
@@ -0,0 +1,186 @@
+import hashlib
+from collections import namedtuple
+from data.settings import *
+from assets.Tiles.collision_map import CollisionMap
+from assets.Tiles.pathfinding import Pathfinder
+from assets.Tiles.visibility import VisibilityService
+from entities.characters.enemy_logic import EnemyLogic
+from entities.characters.enemy_swarm import EnemySwarm
+from entities.characters.player_logic import PlayerLogic
+from managers.replay import game_rng, trajectory_update
+
+# ระยะ Manhattan (px) จากผู้เล่นที่ตัวละครยังถูกอัปเดต ไกลกว่านี้หยุดนิ่ง
+UPDATE_DISTANCE = 600
+
+# ตำแหน่ง Reaper สำหรับโหมด headless (Player.check_reaper_collision ใช้แค่ .x / .y)
+ReaperSpot = namedtuple('ReaperSpot', 'x y')
+
+
+class Simulation:
+    """แกนเกมเพลย์แบบ pure Python: การเดินของผู้เล่น, สตามิน่า, การไล่ของศัตรู, safe zone และดาเมจ
+
+    ไม่ import Kivy เลย ใช้ PlayerLogic / EnemyLogic / CollisionMap จึงรันบนเครื่องที่ไม่มีจอได้
+    และ step() ได้เร็วกว่าเวลาจริงหลายพันครั้งต่อวินาที (ใช้ทดสอบสมดุลเกมหรือเทียบผลย้อนหลัง)
+
+    GameWidget ใช้ update_enemies() ตัวเดียวกันกับ Player/Enemy ที่วาดจริง ผลของทั้งสองฝั่งจึงตรงกัน
+    """
+
+    def __init__(self, collision=None, player=None, enemies=None, reapers=None, max_health=3):
+        self.collision = collision or CollisionMap([], MAP_WIDTH // TILE_SIZE, MAP_HEIGHT // TILE_SIZE)
+        self.player = player or PlayerLogic()
+        self.enemies = enemies if enemies is not None else []
+        self.reapers = reapers if reapers is not None else []
+        self.max_health = max_health
+        self.health = max_health
+        self.deaths = 0
+        self.destroyed_enemies = []
+        self.respawn_pos = list(self.player.logic_pos)
+        self.time = 0.0
+        self.ticks = 0
+
+        self.pathfinder = Pathfinder(PATHFINDING_MAX_STEPS)
+        self.visibility = VisibilityService()
+        self.swarm = EnemySwarm()
+
+    @classmethod
+    def from_map(cls, map_file=MAP_FILE, day=1):
+        """สร้างโลกแบบเดียวกับตอนเริ่มวันใหม่ในแมพหลัก (ศัตรูสะสมตามวัน + Reaper ที่จุดเริ่ม)"""
+        collision = CollisionMap.from_map(map_file)
+        if collision is None:
+            raise FileNotFoundError(f"Could not load map {map_file}")
+
+        player = PlayerLogic()
+        map_w_px = collision.width * TILE_SIZE
+        map_h_px = collision.height * TILE_SIZE
+        player.map_bounds = (TILE_SIZE, TILE_SIZE, map_w_px - TILE_SIZE * 2, map_h_px - TILE_SIZE * 2)
+
+        # ID ของศัตรูนับต่อกันตามวัน แบบเดียวกับ WorldManager.create_enemies
+        enemies = []
+        for d in range(1, day + 1):
+            for data in ENEMY_SPAWN_DATA.get(d, []):
+                x, y = data['pos']
+                enemies.append(EnemyLogic(x, y, enemy_id=len(enemies), enemy_type=data.get('type', 1)))
+
+        return cls(collision, player, enemies, [ReaperSpot(*REAPER_START_POS)])
+
+    def step(self, dt, inputs=()):
+        """เดินโลกไปหนึ่ง tick: inputs คือชุดปุ่มที่กดค้างอยู่ (รูปแบบเดียวกับ InputHandler.pressed_keys)"""
+        self.time += dt
+        self.ticks += 1
+        self.player.move(inputs, None, list(self.reapers), self.collision.solid_index)
+        self.update_enemies(dt, self.player, self.enemies, self.collision,
+                            [(r.x, r.y) for r in self.reapers], self.destroyed_enemies, self._on_player_hit)
+
+    def run_replay(self, replayer):
+        """เดินตามไฟล์อินพุตที่อัดไว้ (InputReplayer) ด้วย seed เดิม คืน hash ของเส้นทางผู้เล่น/ศัตรูทุก tick
+
+        ปุ่มกดครั้งเดียว (E/Enter) ไม่มีผลในโหมดนี้ เพราะบทสนทนา/เควสไม่ได้อยู่ใน Simulation
+        """
+        game_rng.seed(replayer.seed)
+        digest = hashlib.sha1()
+        for dt, _presses, held in replayer:
+            self.step(dt, held)
+            trajectory_update(digest, self.player, self.enemies)
+        return digest.hexdigest()
+
+    def _on_player_hit(self):
+        """ดาเมจจากการชน (เหมือน HeartUI.take_damage + respawn_at_reaper) คืน True ถ้าตายแล้วเกิดใหม่"""
+        self.health -= 1
+        if self.health > 0:
+            return False
+        self.deaths += 1
+        self.health = self.max_health
+        self.player.is_moving = False
+        self.player.state = 'idle'
+        self.player.logic_pos = list(self.respawn_pos)
+        self.player.target_pos = list(self.respawn_pos)
+        self.player.x, self.player.y = self.respawn_pos
+        self.player.direction = 'up'
+        return True
+
+    def update_enemies(self, dt, player, enemies, game_map, reaper_positions, destroyed, on_player_hit):
+        """อัปเดตศัตรูทั้งฝูงหนึ่งเฟรม: culling, การไล่, การชนผู้เล่น, safe zone ของ Reaper และลบตัวที่จางหายแล้ว
+
+        ศัตรูแต่ละตัวทำตามลำดับเดิมของลูปใน GameWidget: update -> ชนผู้เล่น -> safe zone
+        (ตัวถัดไปจึงเห็นผลของตัวก่อนหน้า เช่นผู้เล่นที่ถูกส่งกลับจุดเกิดแล้ว)
+        player: ตัวที่มี logic_pos (อ่านใหม่ทุกครั้ง เพราะ on_player_hit อาจย้ายผู้เล่นไปจุดเกิดใหม่)
+        destroyed: list ของ id ศัตรูที่ถูกกำจัด (เก็บลงเซฟ) จะถูกเพิ่มเข้าไปตรงๆ
+        on_player_hit(): เรียกเมื่อโดนชน (ไม่เกินครั้งละหนึ่งต่อเฟรม) คืน True ถ้าผู้เล่นตาย/เกิดใหม่
+        คืน set ของประเภทศัตรูที่กำลังไล่ผู้เล่น
+        """
+        px, py = player.logic_pos
+        # Cull far enemies: หยุดไล่ถ้าไกลเกินไป (ระยะ Manhattan) ตัวที่ไกลไม่ถูกอัปเดตเลย
+        # คัดจาก xs / ys ของทั้งฝูงรอบเดียว แล้วเก็บตัวที่อยู่ในรัศมีตรวจจับไว้ถาม LOS ทีเดียว
+        swarm = self.swarm
+        swarm.bind(enemies)
+        xs, ys = swarm.xs, swarm.ys
+        near = swarm.cull(px, py, UPDATE_DISTANCE)
+        watchers = swarm.within(near, px, py, ENEMY_DETECTION_RADIUS)
+
+        if enemies:
+            self.pathfinder.update(game_map.walk_grid, player.logic_pos)
+            # ถาม LOS ของศัตรูทุกตัวในรัศมีตรวจจับทีเดียว (ผลถูก memo ไว้ให้ enemy.update ใช้ต่อ)
+            self.visibility.bind(game_map)
+            self.visibility.batch_line_of_sight(watchers, player.logic_pos)
+
+        damage_taken_this_frame = False # ป้องกันโดนดาเมจซ้อนในเฟรมเดียว (1 ผี = 1 เล็กด้าเมจ)
+        safe_sq = SAFE_ZONE_RADIUS * SAFE_ZONE_RADIUS
+        chasing_types = set()
+        k = 0
+        while k < len(near):
+            i = near[k]
+            k += 1
+            enemy = swarm.enemies[i]
+            # ส่ง solid_index และ enemies เข้าไปด้วยเพื่อให้ศัตรูไม่เดินทะลุกำแพงและไม่ชนกัน
+            enemy.update(dt, player.logic_pos, reaper_positions, game_map.solid_index, enemies,
+                         self.pathfinder, self.visibility)
+            xs[i], ys[i] = enemy.logic_pos
+
+            # บันทึกสถานะศัตรูที่กำลังจางหาย (ไม่ว่าจะจากชนหรือวง Reaper) ให้จดจำในเซฟ
+            if enemy.is_fading:
+                if enemy.id not in destroyed:
+                    destroyed.append(enemy.id)
+                # ถ้าจางหายจนจบแล้ว ให้ลบจริงออกจากฉาก (ตัวที่เหลือในเฟรมนี้จะไม่ชนกับมันอีก)
+                # swarm จะ bind ใหม่เองในเฟรมถัดไปเพราะ list เปลี่ยน
+                if enemy.fading_done:
+                    enemy.destroy()
+                    if enemy in enemies:
+                        enemies.remove(enemy)
+                # ถ้ากำลังจางหาย ไม่ต้องตรวจจับการชนซ้ำ
+                continue
+
+            # ตัวที่ไกลไม่เคยไล่ (cull ตั้ง is_chasing = False ไว้แล้ว) และตัวที่จางหาย update ก็ตั้งเป็น False
+            # จึงเก็บเฉพาะตัวที่อัปเดตในเฟรมนี้
+            if enemy.is_chasing:
+                chasing_types.add(enemy.enemy_type)
+
+            # เช็คการชนระหว่าง Player กับ Enemy
+            if enemy.check_player_collision_logic(player.logic_pos, TILE_SIZE):
+                if enemy.id not in destroyed:
+                    destroyed.append(enemy.id)
+                enemy.start_fade()
+
+                # หักเลือดเพียงครั้งเดียวต่อเฟรม (แก้ปัญหาผีซ้อนกันแล้วลด 2 เลือด)
+                if not damage_taken_this_frame:
+                    damage_taken_this_frame = True
+                    if on_player_hit():
+                        # ผู้เล่นถูกย้ายไปจุดเกิดใหม่: ตัวที่เหลือในเฟรมนี้คัดระยะและไล่ตามตำแหน่งใหม่
+                        self.pathfinder.update(game_map.walk_grid, player.logic_pos)
+                        near = near[:k] + swarm.cull(player.logic_pos[0], player.logic_pos[1],
+                                                     UPDATE_DISTANCE, start=i + 1)
+                continue
+
+            # ตรวจสอบว่าศัตรูเข้าใกล้ Reaper หรือยัง (Safe Zone) - ระยะยกกำลังสอง ไม่ใช้ sqrt
+            # ใช้ตำแหน่งมุมซ้ายล่างเทียบกันได้เลย (offset กึ่งกลางเท่ากันทั้งสองฝั่ง)
+            ex, ey = enemy.logic_pos
+            for r_pos in reaper_positions:
+                if (ex - r_pos[0]) ** 2 + (ey - r_pos[1]) ** 2 >= safe_sq: continue
+                # ตรวจสอบว่ามีกำแพงกั้นระหว่างศัตรูกับ Reaper หรือไม่
+                if self.visibility.has_line_of_sight(enemy.logic_pos, r_pos):
+                    print(f"Enemy {enemy.id} entered safe zone and starting fade!")
+                    if enemy.id not in destroyed:
+                        destroyed.append(enemy.id)
+                    enemy.start_fade()
+                    break
+
+        return chasing_types
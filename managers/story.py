@@ -91,10 +91,11 @@ class StoryManager:
 
     def _check_tutorial_triggers(self):
         px, py = self.game.player.logic_pos
+        self.game.visibility.bind(self.game.game_map)
         for enemy in self.game.enemies:
             ex, ey = enemy.logic_pos
             if ((px - ex)**2 + (py - ey)**2)**0.5 < ENEMY_DETECTION_RADIUS:
-                if enemy.has_line_of_sight(self.game.player.logic_pos, self.game.game_map.solid_rects):
+                if self.game.visibility.has_line_of_sight(enemy.logic_pos, self.game.player.logic_pos):
                     if not self.game.tutorial_triggered:
                         self._stop_player_and_snap()
                         self.game.tutorial_mode = True
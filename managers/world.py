@@ -4,7 +4,8 @@ from entities.characters.npc import NPC
 from entities.characters.enemy import Enemy
 from entities.characters.reaper import REAPER_START_POS
 from entities.items.star import Star
-from assets.Tiles.map_loader import KivyTiledMap
+from assets.Tiles.map_registry import map_registry
+from assets.Tiles.map_preloader import map_preloader
 from kivy.core.image import Image as CoreImage
 from data.settings import *
 import random
@@ -187,85 +188,11 @@ class WorldManager:
 
     def spawn_random_enemies(self):
         """สุ่มเกิดศัตรูเพิ่มเติมเมื่อผู้เล่นเปิดพิกัดอันตรายแล้ว (ใช้ Seed คงที่เพื่อให้กลับมายังจุดเดิมเมื่อโหลดเซฟ)"""
-        r = random.Random(999)
-        
-        count = 60 # ศัตรูแบบสุ่ม เพิ่มความท้าทายในโซนอันตราย
-        base_id = 100 
-        
-        spawned = 0
-        attempts = 0
-        solid_rects = self.game.game_map.solid_rects
-        
-        candidate_positions = []
-        for day, spawns in ENEMY_SPAWN_DATA.items():
-            if day <= self.game.current_day:
-                candidate_positions.extend(spawns)
-        candidates_xy = [(d['pos'][0], d['pos'][1]) for d in candidate_positions]
-        
-        while spawned < count and attempts < 2000:
-            attempts += 1
-            # 1. สุ่มโอกาสเกิดตามโซนต่างๆ ก่อน
-            if r.random() < 0.5:
-                # โซนบนขวา: x > 656 และ y > 464 (แก้ Y ให้เป็นด้านบน)
-                x = r.randint(656, MAP_WIDTH - 64)
-                y = r.randint(464, MAP_HEIGHT - 64)
-            else:
-                # โซนซ้าย: x < 656 หรือ โซนบน (y > 464)
-                if r.random() < 0.7:  # 70% โอกาสไปซ้าย
-                    x = r.randint(32, 656)
-                    y = r.randint(32, MAP_HEIGHT - 64)
-                else:  # 30% โอกาสกระจายไปด้านบนๆ ทั้งหมด
-                    x = r.randint(32, MAP_WIDTH - 64)
-                    y = r.randint(464, MAP_HEIGHT - 64)
-            
-            # บังคับให้เกิดเฉพาะใน 'เขตอันตราย'
-            if self.game.current_day == 1:
-                # สำหรับ Day 1: ห้ามเกิดในเขตปลอดภัย (ล่างขวา)
-                if x >= 656 and y <= 464:
-                    continue
-            elif self.game.current_day == 3:
-                # สำหรับ Day 3: "ครึ่งล่างกับซ้ายบนปลอดภัย" -> อันตรายแค่ "ขวาบน" (x >= 880 และ y >= 464)
-                # ดังนั้นถ้าไม่ได้อยู่ในเขต ขวาบน ให้ข้ามการเกิดศัตรู
-                if not (x >= 880 and y >= 464):
-                    continue
-            else:
-                # สำหรับ Day 2, 4, 5: ห้ามเกิดในเขตปลอดภัย (แถบล่างทั้งหมด)
-                if y <= 464:
-                    continue
-            
-            # ระยะห่างระหว่างศัตรูสุ่ม: สุ่มให้ห่างกันประมาณ 5-8 block (80-128px)
-            # แต่ละตัวได้ระยะ min_dist ต่างกันเพื่อกระจายแบบไม่สม่ำเสมอ (แบบสุ่ม)
-            min_dist = r.randint(5, 8) * TILE_SIZE
-            too_close = False
-            for cx, cy in candidates_xy:
-                if ((x - cx)**2 + (y - cy)**2)**0.5 < min_dist:
-                    too_close = True
-                    break
-            if too_close:
-                continue
-                
-            # ไม่ทับกำแพง
-            rect = (x, y, ENEMY_WIDTH, ENEMY_HEIGHT)
-            collision = False
-            for solid in solid_rects:
-                if (rect[0] < solid[0] + solid[2] and rect[0] + rect[2] > solid[0] and
-                    rect[1] < solid[1] + solid[3] and rect[1] + rect[3] > solid[1]):
-                    collision = True
-                    break
-            if collision:
-                continue
-                
-            candidates_xy.append((x, y))
-            
-            enemy_id = base_id + spawned
-            etype = r.choice([1, 2, 3])
-            
+        for enemy_id, x, y, etype in random_enemy_spawns(self.game.game_map.solid_index, self.game.current_day):
             # ถ้ายังไม่ถูกกำจัดในเซฟ
             if enemy_id not in self.game.destroyed_enemies:
                 enemy = Enemy(self.game.sorting_layer, x, y, enemy_id=enemy_id, enemy_type=etype)
                 self.game.enemies.append(enemy)
-                
-            spawned += 1
             
     def create_stars(self):
         """สร้างดาวตามพิกัดที่กำหนด (Day 1 และ Day 4)"""
@@ -434,8 +361,8 @@ class WorldManager:
         self.game.candles = []
         self.game.extra_reapers = []
 
-        # 2. สร้าง instance แมพใหม่
-        self.game.game_map = KivyTiledMap(map_file)
+        # 2. ดึงแมพจาก registry (ถ้าเคยโหลดแล้วจะได้ instance เดิม ไม่ต้อง build ใหม่)
+        self.game.game_map = map_registry.get(map_file)
         
         # อัปเดตขนาด Clipping ตามแมพใหม่
         map_w_px = self.game.game_map.width * TILE_SIZE
@@ -482,6 +409,22 @@ class WorldManager:
         
         print(f"DEBUG: Map swapped to {map_file} (via World Manager)")
 
+    def prefetch_nearby_maps(self):
+        """เริ่มโหลดแมพปลายทางเบื้องหลังเมื่อผู้เล่นเดินเข้าใกล้ portal (กันเฟรมค้างตอนกด E)"""
+        if self.game.current_day != 5 or 'underground.tmj' in self.game.game_map.filename.lower():
+            return
+        px, py = self.game.player.logic_pos
+        ux, uy = UNDERGROUND_PORTAL_POS
+        if abs(px - ux) <= MAP_PREFETCH_DISTANCE and abs(py - uy) <= MAP_PREFETCH_DISTANCE:
+            map_preloader.prefetch('assets/Tiles/underground.tmj')
+
+    def prefetch_respawn_map(self):
+        """โดนผีชนแล้วแต่ยังไม่ตาย: ถ้าจุดเกิดใหม่อยู่คนละแมพ เริ่มโหลดแมพนั้นไว้ก่อน
+        (respawn_at_reaper จะได้หยิบจาก registry แทนการ build ทั้งแมพตอนตาย)"""
+        _, _, target_map = self.game.gameplay_manager.respawn_target()
+        if target_map != self.game.game_map.filename:
+            map_preloader.prefetch(target_map)
+
     def refresh_darkness(self):
         """วาดหรือล้างหมอกสีดำปิดโซนอันตราย"""
         if not hasattr(self.game, 'darkness_group') or self.game.darkness_group is None:
@@ -602,17 +545,15 @@ class WorldManager:
         if getattr(self.game.player, 'is_underground', False):
             self.game.player.is_underground = False
             from kivy.app import App
-            from kivy.core.audio import SoundLoader
+            from assets.sound_bank import sound_bank
             app = App.get_running_app()
             if hasattr(app, 'bg_loop') and app.bg_loop:
                 app.bg_loop.stop()
             original_bgm_path = 'assets/sound/loop/Ambiance_Cave_Dark_Loop_Stereo.wav'
             import os
             if os.path.exists(original_bgm_path):
-                original_bgm = SoundLoader.load(original_bgm_path)
+                original_bgm = sound_bank.load(original_bgm_path, 0.8, loop=True)
                 if original_bgm:
-                    original_bgm.loop = True
-                    original_bgm.volume = 0.8
                     original_bgm.play()
                     app.bg_loop = original_bgm
 
@@ -644,3 +585,76 @@ class WorldManager:
         self.restore_delivered_marks()
         self.refresh_darkness()
         self.game.request_keyboard_back()
+
+
+def random_enemy_spawns(solid_index, current_day):
+    """ตำแหน่งศัตรูสุ่มของวันนั้น [(enemy_id, x, y, enemy_type), ...] (Seed คงที่ ได้ผลเดิมทุกครั้ง ไม่สร้างกราฟิก)"""
+    r = random.Random(999)
+    
+    count = 60 # ศัตรูแบบสุ่ม เพิ่มความท้าทายในโซนอันตราย
+    base_id = 100 
+    
+    result = []
+    spawned = 0
+    attempts = 0
+    
+    candidate_positions = []
+    for day, spawns in ENEMY_SPAWN_DATA.items():
+        if day <= current_day:
+            candidate_positions.extend(spawns)
+    candidates_xy = [(d['pos'][0], d['pos'][1]) for d in candidate_positions]
+    
+    while spawned < count and attempts < 2000:
+        attempts += 1
+        # 1. สุ่มโอกาสเกิดตามโซนต่างๆ ก่อน
+        if r.random() < 0.5:
+            # โซนบนขวา: x > 656 และ y > 464 (แก้ Y ให้เป็นด้านบน)
+            x = r.randint(656, MAP_WIDTH - 64)
+            y = r.randint(464, MAP_HEIGHT - 64)
+        else:
+            # โซนซ้าย: x < 656 หรือ โซนบน (y > 464)
+            if r.random() < 0.7:  # 70% โอกาสไปซ้าย
+                x = r.randint(32, 656)
+                y = r.randint(32, MAP_HEIGHT - 64)
+            else:  # 30% โอกาสกระจายไปด้านบนๆ ทั้งหมด
+                x = r.randint(32, MAP_WIDTH - 64)
+                y = r.randint(464, MAP_HEIGHT - 64)
+        
+        # บังคับให้เกิดเฉพาะใน 'เขตอันตราย'
+        if current_day == 1:
+            # สำหรับ Day 1: ห้ามเกิดในเขตปลอดภัย (ล่างขวา)
+            if x >= 656 and y <= 464:
+                continue
+        elif current_day == 3:
+            # สำหรับ Day 3: "ครึ่งล่างกับซ้ายบนปลอดภัย" -> อันตรายแค่ "ขวาบน" (x >= 880 และ y >= 464)
+            # ดังนั้นถ้าไม่ได้อยู่ในเขต ขวาบน ให้ข้ามการเกิดศัตรู
+            if not (x >= 880 and y >= 464):
+                continue
+        else:
+            # สำหรับ Day 2, 4, 5: ห้ามเกิดในเขตปลอดภัย (แถบล่างทั้งหมด)
+            if y <= 464:
+                continue
+        
+        # ระยะห่างระหว่างศัตรูสุ่ม: สุ่มให้ห่างกันประมาณ 5-8 block (80-128px)
+        # แต่ละตัวได้ระยะ min_dist ต่างกันเพื่อกระจายแบบไม่สม่ำเสมอ (แบบสุ่ม)
+        min_dist = r.randint(5, 8) * TILE_SIZE
+        too_close = False
+        for cx, cy in candidates_xy:
+            if ((x - cx)**2 + (y - cy)**2)**0.5 < min_dist:
+                too_close = True
+                break
+        if too_close:
+            continue
+            
+        # ไม่ทับกำแพง
+        if solid_index.any_overlap(x, y, ENEMY_WIDTH, ENEMY_HEIGHT):
+            continue
+            
+        candidates_xy.append((x, y))
+        
+        enemy_id = base_id + spawned
+        etype = r.choice([1, 2, 3])
+        
+        result.append((enemy_id, x, y, etype))
+        spawned += 1
+    return result
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# โปรเจกต์ไม่ได้ติดตั้งเป็นแพ็กเกจ: ให้ import managers/... ได้เมื่อรัน pytest จากที่ไหนก็ได้
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
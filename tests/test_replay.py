@@ -0,0 +1,40 @@
+import pytest
+
+from managers.replay import InputRecorder, InputReplayer
+
+
+def record(path, frames):
+    recorder = InputRecorder(str(path), seed=1234, initial_data={"day": 2})
+    for presses, held in frames:
+        for key in presses:
+            recorder.press(key)
+        recorder.tick(1 / 60, set(held))
+    recorder.close()
+
+
+FRAMES = [((), ()), ((), ('w',)), (('e',), ('w', 'shift')), ((), ())]
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / 'run.btsr'
+    record(path, FRAMES)
+    replayer = InputReplayer(str(path))
+    assert replayer.seed == 1234
+    assert replayer.initial_data == {"day": 2}
+    assert [(presses, set(held)) for _, presses, held in replayer] == \
+        [(presses, set(held)) for presses, held in FRAMES]
+
+
+@pytest.mark.parametrize('cut', range(1, 12))
+def test_truncated_tail_keeps_complete_ticks(tmp_path, capsys, cut):
+    path = tmp_path / 'run.btsr'
+    record(path, FRAMES)
+    full = len(InputReplayer(str(path)).ticks)
+    data = path.read_bytes()
+    path.write_bytes(data[:-cut])
+
+    replayer = InputReplayer(str(path))
+    # record สุดท้าย (OP_TICK 9 ไบต์) ขาดไป: เหลือทุก tick ก่อนหน้า
+    assert len(replayer.ticks) == full - 1
+    if cut < 9:
+        assert 'partial record' in capsys.readouterr().out
@@ -0,0 +1,144 @@
+import json
+import os
+import threading
+
+import pytest
+
+from managers import save_store
+
+
+STATE = {
+    "day": 3,
+    "current_map": "assets/Tiles/beyond.tmj",
+    "player_pos": [480, 912.5],
+    "heart": 2,
+    "play_time": 321.25,
+    "saved_at": "2026-10-18T12:00:00",
+    "quests": {"light_candles": {"count": 1}},
+    "destroyed_enemies": [4, 9],
+    "enemies_data": [
+        {"id": 1, "pos": [64, 128], "type": 1},
+        {"id": 2, "pos": [70.5, 16], "type": 2},
+    ],
+}
+
+
+@pytest.fixture
+def save_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(save_store, 'SAVE_DIR', str(tmp_path))
+    monkeypatch.setattr(save_store, '_index', None)
+    return tmp_path
+
+
+@pytest.mark.parametrize('compact', [True, False])
+def test_round_trip(compact):
+    raw = save_store.encode(STATE, compact=compact)
+    assert raw.startswith(save_store.SAVE_MAGIC)
+    assert save_store.decode(raw) == STATE
+
+
+def test_round_trip_keeps_integer_positions():
+    state = save_store.decode(save_store.encode(STATE, compact=True))
+    x, y = state["enemies_data"][0]["pos"]
+    assert isinstance(x, int) and isinstance(y, int)
+    assert isinstance(state["destroyed_enemies"][0], int)
+
+
+def test_legacy_json_is_migrated():
+    legacy = dict(STATE)
+    del legacy["saved_at"]
+    del legacy["destroyed_enemies"]
+    state = save_store.decode(json.dumps(legacy, indent=4).encode('utf-8'))
+    assert state["saved_at"] == ''
+    assert state["destroyed_enemies"] == []
+    assert state["enemies_data"] == STATE["enemies_data"]
+
+
+def test_migrate_rejects_newer_schema():
+    with pytest.raises(ValueError):
+        save_store.migrate({}, save_store.SCHEMA_VERSION + 1)
+
+
+def test_index_picks_up_legacy_and_current_saves(save_dir):
+    with open(save_dir / 'slot_1.json', 'w', encoding='utf-8') as f:
+        json.dump(dict(STATE, day=1), f)
+    save_store.write_atomic(save_store.save_path('slot_2'), save_store.encode(dict(STATE, day=2)))
+
+    with save_store._index_lock:
+        entries = save_store._ensure_index()
+    assert entries['slot_1']['day'] == 1
+    assert entries['slot_1']['file'] == 'slot_1.json'
+    assert entries['slot_2']['day'] == 2
+    assert 'quests' not in entries['slot_2']
+    assert os.path.exists(save_store.index_path())
+    assert not list(save_dir.glob('*.tmp'))
+
+
+def test_index_refreshes_stale_entries(save_dir):
+    writer = save_store.SaveWriter()
+    writer.write('slot_1', dict(STATE, day=1))
+
+    # ไฟล์ถูกแก้นอกเกม: stamp ไม่ตรง index ต้องอ่านไฟล์ใหม่
+    save_store.write_atomic(save_store.save_path('slot_1'), save_store.encode(dict(STATE, day=4)))
+    os.utime(save_store.save_path('slot_1'), ns=(1, 1))
+    save_store._index = None  # เหมือนเปิดเกมใหม่: index ในหน่วยความจำยังไม่ถูกโหลด
+    with save_store._index_lock:
+        assert save_store._ensure_index()['slot_1']['day'] == 4
+
+
+def test_writer_replaces_legacy_file(save_dir):
+    with open(save_dir / 'slot_3.json', 'w', encoding='utf-8') as f:
+        json.dump(STATE, f)
+    save_store.SaveWriter().write('slot_3', STATE)
+    assert not (save_dir / 'slot_3.json').exists()
+    assert save_store.load_save('slot_3') == STATE
+    assert save_store.read_index()['slot_3']['file'] == 'slot_3.sav'
+
+
+def test_failed_save_stays_dirty_and_is_retried(save_dir, monkeypatch):
+    monkeypatch.setattr(save_store, 'SAVE_BACKGROUND_WRITE', False)
+    errors = []
+    writer = save_store.SaveWriter(on_error=lambda name, e: errors.append(name))
+
+    real_write_atomic = save_store.write_atomic
+
+    def broken(path, raw):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(save_store, 'write_atomic', broken)
+    writer.submit('slot_1', STATE)
+    assert errors == ['slot_1']
+    assert writer.is_dirty('slot_1')
+
+    monkeypatch.setattr(save_store, 'write_atomic', real_write_atomic)
+    writer.submit('autosave', dict(STATE, is_auto_save=True))
+    assert not writer.is_dirty('slot_1')
+    assert save_store.load_save('slot_1') == STATE
+    assert save_store.load_save('autosave')['is_auto_save'] is True
+
+
+def test_reads_serve_queued_save_without_waiting(save_dir, monkeypatch):
+    monkeypatch.setattr(save_store, 'SAVE_BACKGROUND_WRITE', True)
+    writer = save_store.SaveWriter()
+    monkeypatch.setattr(save_store, 'save_writer', writer)
+
+    # thread เขียนเซฟค้างอยู่จนกว่าจะปล่อย: การอ่านต้องไม่รอมัน
+    release = threading.Event()
+    real_write_atomic = save_store.write_atomic
+
+    def blocked(path, raw):
+        assert release.wait(5)
+        real_write_atomic(path, raw)
+
+    monkeypatch.setattr(save_store, 'write_atomic', blocked)
+    writer.submit('slot_2', dict(STATE, day=5))
+
+    assert save_store.load_save('slot_2') == dict(STATE, day=5)
+    assert save_store.read_index()['slot_2']['day'] == 5
+    assert not (save_dir / 'slot_2.sav').exists()
+
+    release.set()
+    writer.flush()
+    assert writer.unwritten() == {}
+    assert save_store.read_index()['slot_2']['file'] == 'slot_2.sav'
+    assert save_store.load_save('slot_2') == dict(STATE, day=5)
@@ -0,0 +1,127 @@
+from data.settings import TILE_SIZE, SAFE_ZONE_RADIUS
+from assets.Tiles.collision_map import CollisionMap
+from entities.characters.enemy_logic import EnemyLogic
+from entities.characters.player_logic import PlayerLogic
+from managers.replay import game_rng
+from managers.simulation import Simulation, ReaperSpot, UPDATE_DISTANCE
+
+DT = 1 / 60
+REAPER = (480, 480)
+
+
+def legacy_update_enemies(sim, dt, reaper_positions):
+    """ลูปศัตรูแบบเดิมของ GameWidget._move_step_logic (ก่อนย้ายมาไว้ใน Simulation) ใช้เป็นผลอ้างอิง"""
+    px, py = sim.player.logic_pos
+    game_map = sim.collision
+    sim.pathfinder.update(game_map.walk_grid, sim.player.logic_pos)
+    sim.visibility.bind(game_map)
+    damage_taken_this_frame = False
+    for enemy in sim.enemies[:]:
+        if abs(enemy.logic_pos[0] - px) + abs(enemy.logic_pos[1] - py) > UPDATE_DISTANCE:
+            enemy.is_chasing = False
+            continue
+        enemy.update(dt, sim.player.logic_pos, reaper_positions, game_map.solid_index, sim.enemies,
+                     sim.pathfinder, sim.visibility)
+        if enemy.is_fading:
+            if enemy.id not in sim.destroyed_enemies:
+                sim.destroyed_enemies.append(enemy.id)
+        if enemy.fading_done:
+            enemy.destroy()
+            if enemy in sim.enemies:
+                sim.enemies.remove(enemy)
+            continue
+        if enemy.is_fading:
+            continue
+        if enemy.check_player_collision_logic(sim.player.logic_pos, TILE_SIZE):
+            if enemy.id not in sim.destroyed_enemies:
+                sim.destroyed_enemies.append(enemy.id)
+            enemy.start_fade()
+            if not damage_taken_this_frame:
+                damage_taken_this_frame = True
+                if sim._on_player_hit():
+                    sim.pathfinder.update(game_map.walk_grid, sim.player.logic_pos)
+        ecx = enemy.logic_pos[0] + TILE_SIZE / 2
+        ecy = enemy.logic_pos[1] + TILE_SIZE / 2
+        for rx, ry in reaper_positions:
+            dist_sq = (ecx - rx - TILE_SIZE / 2) ** 2 + (ecy - ry - TILE_SIZE / 2) ** 2
+            if dist_sq < SAFE_ZONE_RADIUS ** 2:
+                if enemy.has_line_of_sight((rx, ry), game_map.solid_index):
+                    if enemy.id not in sim.destroyed_enemies:
+                        sim.destroyed_enemies.append(enemy.id)
+                    enemy.start_fade()
+                    break
+
+
+def make_sim(player_pos, enemy_spots, health, walls=()):
+    collision = CollisionMap(list(walls), 60, 60)
+    player = PlayerLogic()
+    player.logic_pos = list(player_pos)
+    player.target_pos = list(player_pos)
+    enemies = [EnemyLogic(x, y, enemy_id=i, enemy_type=1 + i % 3) for i, (x, y) in enumerate(enemy_spots)]
+    sim = Simulation(collision, player, enemies, [ReaperSpot(*REAPER)], max_health=3)
+    sim.health = health
+    sim.respawn_pos = [REAPER[0], REAPER[1] - TILE_SIZE * 2]
+    return sim
+
+
+def snapshot(sim):
+    return (sim.health, sim.deaths, list(sim.player.logic_pos), list(sim.destroyed_enemies),
+            [(e.id, list(e.logic_pos), e.is_fading, e.is_chasing) for e in sim.enemies])
+
+
+def compare(player_pos, enemy_spots, health, frames=3, walls=()):
+    results = []
+    for legacy in (False, True):
+        game_rng.seed(11)
+        sim = make_sim(player_pos, enemy_spots, health, walls)
+        for _ in range(frames):
+            if legacy:
+                legacy_update_enemies(sim, DT, [REAPER])
+            else:
+                sim.update_enemies(DT, sim.player, sim.enemies, sim.collision, [REAPER],
+                                   sim.destroyed_enemies, sim._on_player_hit)
+        results.append(snapshot(sim))
+    assert results[0] == results[1]
+    return results[0]
+
+
+def test_contact_frame_matches_legacy_loop():
+    # สองตัวชนผู้เล่นพร้อมกัน: หักเลือดครั้งเดียว แต่ทั้งสองตัวจางหาย
+    health, deaths, _, destroyed, enemies = compare(
+        (160, 160), [(160 + TILE_SIZE, 160), (160, 160 - TILE_SIZE), (160 + 8 * TILE_SIZE, 160)], health=3)
+    assert health == 2 and deaths == 0
+    assert destroyed[:2] == [0, 1]
+
+
+def test_safe_zone_frame_matches_legacy_loop():
+    # ตัวแรกอยู่ในวง Reaper และมองเห็น ตัวที่สองอยู่ในวงแต่มีกำแพงกั้น
+    wall = (REAPER[0] - TILE_SIZE * 2, REAPER[1] - TILE_SIZE, TILE_SIZE, TILE_SIZE * 3)
+    _, _, _, destroyed, enemies = compare(
+        (REAPER[0] + 200, REAPER[1] + 200),
+        [(REAPER[0] + TILE_SIZE * 2, REAPER[1]), (REAPER[0] - TILE_SIZE * 4, REAPER[1])],
+        health=3, walls=[wall])
+    assert destroyed == [0]
+
+
+def test_respawn_frame_still_fades_enemies_at_reaper():
+    # ชนจนเลือดหมด (เกิดใหม่) ในเฟรมเดียวกับที่อีกตัวเข้าวง Reaper: ตัวนั้นต้องจางหายด้วย
+    health, deaths, player_pos, destroyed, _ = compare(
+        (REAPER[0] + 96, REAPER[1]),
+        [(REAPER[0] + 96 + TILE_SIZE, REAPER[1]), (REAPER[0] + TILE_SIZE * 2, REAPER[1] + TILE_SIZE)],
+        health=1, frames=1)
+    assert deaths == 1 and health == 3
+    assert player_pos == [REAPER[0], REAPER[1] - TILE_SIZE * 2]
+    assert sorted(destroyed) == [0, 1]
+
+
+def test_respawn_frame_culls_the_rest_against_the_respawn_point():
+    # ตัวที่สองไกลจากจุดที่โดนชน แต่ใกล้จุดเกิดใหม่: หลังเกิดใหม่ต้องถูกอัปเดตในเฟรมเดียวกัน
+    # มันเดินเข้าวง Reaper แล้วจางหายจนถูกลบ (swarm ต้อง bind ใหม่หลังลบออกจาก list)
+    # ส่วนตัวแรกค้างอยู่ไกลผู้เล่นจึงไม่ถูกอัปเดตจนจางหายจบ
+    far = (REAPER[0] + 700, REAPER[1])
+    health, deaths, _, destroyed, enemies = compare(
+        far, [(far[0] + TILE_SIZE, far[1]), (REAPER[0] - TILE_SIZE * 5, REAPER[1] - TILE_SIZE * 2)],
+        health=1, frames=60)
+    assert deaths == 1
+    assert destroyed == [0, 1]
+    assert [e[0] for e in enemies] == [0]
@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+from data.settings import TILE_SIZE, ENEMY_DETECTION_RADIUS
+from assets.Tiles.collision_map import CollisionMap
+from assets.Tiles.visibility import VisibilityService
+from assets.Tiles.walkability import TILE_FREE
+from entities.characters.enemy_logic import EnemyLogic
+
+PAIRS = 1500
+
+
+def legacy_line_of_sight(enemy, target, rects):
+    """Enemy.has_line_of_sight แบบก่อนมี spatial hash: ยิง 3 เส้นแล้วเช็คกับ rect ทุกอันในแมพ"""
+    def ray_clear(x1, y1, x2, y2):
+        min_x, max_x = min(x1, x2), max(x1, x2)
+        min_y, max_y = min(y1, y2), max(y1, y2)
+        for r in rects:
+            rx, ry, rw, rh = r
+            if rx + rw < min_x or rx > max_x or ry + rh < min_y or ry > max_y: continue
+            if enemy.line_intersects_rect(x1, y1, x2, y2, r):
+                return False
+        return True
+
+    ex, ey = enemy.logic_pos
+    px, py = target[0] + TILE_SIZE / 2, target[1] + TILE_SIZE / 2
+    starts = [(ex + TILE_SIZE / 2, ey + TILE_SIZE / 2), (ex + 2, ey + 2), (ex + TILE_SIZE - 2, ey + TILE_SIZE - 2)]
+    return any(ray_clear(x, y, px, py) for x, y in starts)
+
+
+@pytest.mark.parametrize('map_file', ['assets/Tiles/beyond.tmj', 'assets/Tiles/home.tmj', 'assets/Tiles/underground.tmj'])
+def test_grid_line_of_sight_matches_ray_casting(map_file):
+    # ตัวละครยืนตรง grid บนช่องว่างเสมอ จึงสุ่มเฉพาะคู่ช่อง TILE_FREE ที่ห่างกันไม่เกินรัศมีตรวจจับ
+    game_map = CollisionMap.from_map(map_file)
+    grid = game_map.walk_grid
+    visibility = VisibilityService()
+    visibility.bind(game_map)
+    free = [(x, y) for y in range(grid.rows) for x in range(grid.cols) if grid.state(x, y) == TILE_FREE]
+    reach = ENEMY_DETECTION_RADIUS // TILE_SIZE + 1
+
+    r = random.Random(8)
+    checked, mismatches = 0, []
+    while checked < PAIRS:
+        a = r.choice(free)
+        b = (a[0] + r.randint(-reach, reach), a[1] + r.randint(-reach, reach))
+        if grid.state(*b) != TILE_FREE:
+            continue
+        checked += 1
+        enemy = EnemyLogic(a[0] * TILE_SIZE, a[1] * TILE_SIZE, enemy_id=0)
+        target = (b[0] * TILE_SIZE, b[1] * TILE_SIZE)
+        expected = legacy_line_of_sight(enemy, target, game_map.solid_rects)
+        assert enemy.has_line_of_sight(target, game_map.solid_index) == expected
+        if visibility.has_line_of_sight(enemy.logic_pos, target) != expected:
+            mismatches.append((a, b, expected))
+    assert mismatches == []
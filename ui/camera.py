@@ -9,6 +9,8 @@ class Camera:
             self.scale = Scale(1, 1, 1)
             self.trans_pos = Translate(0, 0)
         self.locked = False
+        self.visible_w = CAMERA_WIDTH   # ขนาดพื้นที่โลกที่มองเห็นจริง (อัปเดตทุกครั้งที่ update)
+        self.visible_h = CAMERA_HEIGHT
             
     def end_camera(self, canvas_after):
         with canvas_after:
@@ -23,6 +25,8 @@ class Camera:
         scale_y = height / CAMERA_HEIGHT
         scale_factor = min(scale_x, scale_y)
         self.scale.xyz = (scale_factor, scale_factor, 1)
+        self.visible_w = width / scale_factor
+        self.visible_h = height / scale_factor
 
         if self.locked:
             return
@@ -57,6 +61,13 @@ class Camera:
         # เลื่อนหน้าจอ
         self.trans_pos.xy = (-cam_x, -cam_y)
 
+    def get_view_rect(self, margin=0):
+        """สี่เหลี่ยมพิกัดโลก (x1, y1, x2, y2) ที่กล้องมองเห็นอยู่ ขยายออกด้านละ margin"""
+        cx, cy = -self.trans_pos.x, -self.trans_pos.y
+        half_w = self.visible_w / 2 + margin
+        half_h = self.visible_h / 2 + margin
+        return (cx - half_w, cy - half_h, cx + half_w, cy + half_h)
+
     def world_to_screen(self, x, y):
         """แปลงพิกัดโลก (World) ในเกมให้เป็นพิกัดหน้าจอ (Screen)"""
         # 1. เลื่อนตามตำแหน่งกล้อง
@@ -1,5 +1,5 @@
 # storygame/choice.py
-import random
+from managers.replay import game_rng
 from kivy.uix.button import Button
 from kivy.uix.boxlayout import BoxLayout
 from kivy.graphics import Color, RoundedRectangle, Line
@@ -135,7 +135,7 @@ def handle_choice_selection(game, choice):
                         break
 
                 # 4. delay 0.4 วิ แล้วค่อย spawn ผี (ผู้เล่นกระเด็นห่างแล้ว)
-                ghost_type = random.choice([1, 2, 3])
+                ghost_type = game_rng.choice([1, 2, 3])
                 def spawn_ghost(dt, gtype=ghost_type, sx=spawn_x, sy=spawn_y):
                     ghost = Enemy(game.sorting_layer, sx, sy, enemy_id=9999, enemy_type=gtype)
                     # ใช้ stun() แทน is_chasing=False เพราะ update() จะ override is_chasing ทุก frame
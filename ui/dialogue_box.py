@@ -0,0 +1,202 @@
+from kivy.uix.floatlayout import FloatLayout
+from kivy.uix.widget import Widget
+from kivy.graphics import Color, Rectangle
+from kivy.clock import Clock
+from data.settings import GAME_FONT
+from data.chat import DIALOGUE_CONFIG
+from assets.texture_cache import texture_cache
+from ui.glyph_text import GlyphText
+
+
+class PortraitView:
+    """รูป Portrait หนึ่งฝั่ง (widget + Rectangle เดียวใช้ตลอดเกม) เปลี่ยนแค่ texture/ขนาด/ตำแหน่ง
+
+    จำรูปและตัวคูณขนาดล่าสุดไว้เอง ตอนหน้าจอเปลี่ยนขนาดจึงแค่เรียก layout() ใหม่ (ไม่ต้องรู้ว่ามาจากประโยคไหน)
+    """
+
+    def __init__(self, left=False):
+        self.widget = Widget(size_hint=(None, None))
+        self.left = left
+        self.char_scale_mult = 1.0
+        self.source = None
+        with self.widget.canvas:
+            Color(1, 1, 1, 1)
+            self.rect = Rectangle()
+
+    def show(self, root, source, scale, screen_width, char_scale_mult=1.0):
+        if source != self.source:
+            try:
+                # texture มาจาก cache กลาง: สลับรูปไปมาไม่ต้อง decode PNG ใหม่
+                self.rect.texture = texture_cache.get(source, nearest=True)
+            except Exception:
+                self.rect.source = source
+            self.source = source
+        self.char_scale_mult = char_scale_mult
+        self.layout(scale, screen_width)
+        self.widget.opacity = 1
+        if self.widget.parent is None:
+            root.add_widget(self.widget)
+
+    def layout(self, scale, screen_width):
+        """ขนาด/ตำแหน่งตามสเกลหน้าจอ: ขอบล่างวางบนขอบบนของกล่องข้อความ ชิดซ้ายหรือขวาของจอ"""
+        size = 280 * scale * self.char_scale_mult
+        x_pos = 20 * scale if self.left else screen_width - size - (20 * scale)
+        self.widget.size = (size, size)
+        self.rect.size = self.widget.size
+        self.rect.pos = (x_pos, DIALOGUE_CONFIG["box_height"] * scale)
+
+    def hide(self):
+        """ซ่อนชั่วคราวระหว่างคุย (ยังอยู่ในจอ)"""
+        self.widget.opacity = 0
+
+    def detach(self):
+        if self.widget.parent:
+            self.widget.parent.remove_widget(self.widget)
+
+    @property
+    def is_attached(self):
+        return self.widget.parent is not None
+
+
+class DialogueBox:
+    """กล่องบทสนทนาแบบ VN ที่สร้างครั้งเดียวต่อเกม (แถบดำ + ชื่อ + ข้อความ + สามเหลี่ยมกระพริบ)
+
+    แต่ละประโยคแค่เปลี่ยน text ของ Label เดิม ไม่สร้าง widget หรือ Clock ใหม่
+    ขนาด/ฟอนต์คำนวณใหม่เฉพาะตอนสเกลหน้าจอเปลี่ยน
+    """
+
+    def __init__(self, manager):
+        self.manager = manager  # ใช้ create_pixel_triangle / animate_pixel_triangle ของ DialogueManager
+        cfg = DIALOGUE_CONFIG
+        self.bg = FloatLayout(size_hint=(1, None), pos_hint={'x': 0, 'y': 0})
+        with self.bg.canvas.before:
+            Color(0, 0, 0, 0.8)
+            self.bg_rect = Rectangle()
+        self.bg.bind(size=self._update_bg_rect, pos=self._update_bg_rect)
+
+        # ชื่อ/ข้อความเปลี่ยนทุกประโยค ใช้ GlyphText (อัปเดตแค่ vertex ไม่ต้อง render texture ใหม่)
+        self.name_label = GlyphText(font_name=GAME_FONT, color=cfg["name_color"], size_hint=(1, None),
+                                halign='center', valign='middle')
+        self.name_label.bind(size=self.name_label.setter('text_size'))
+        self.text_label = GlyphText(font_name=GAME_FONT, color=cfg["msg_color"], size_hint=(1, None),
+                                halign='center', valign='top')
+        self.text_label.bind(size=self._update_text_size)
+        self.bg.add_widget(self.name_label)
+        self.bg.add_widget(self.text_label)
+
+        self.triangle = None
+        self.tri_event = None
+        self.scale = None
+
+        # Typewriter: จำนวนตัวอักษรที่โผล่แล้ว (float สะสมตาม dt ของลูปเกม เล่น replay ได้ผลเดิม)
+        self.reveal_speed = 0
+        self.revealed = 0.0
+        self.is_revealing = False
+        self.wants_triangle = False
+
+    def _update_bg_rect(self, instance, value):
+        self.bg_rect.pos = instance.pos
+        self.bg_rect.size = instance.size
+
+    def _update_text_size(self, instance, value):
+        instance.text_size = (instance.width - (DIALOGUE_CONFIG["side_padding"] * 2 * self.scale), instance.height)
+
+    @property
+    def is_open(self):
+        return self.bg.parent is not None
+
+    @property
+    def box_height(self):
+        return DIALOGUE_CONFIG["box_height"] * (self.scale or 1.0)
+
+    def apply_scale(self, scale):
+        """จัดขนาด/ตำแหน่งตามสเกลหน้าจอ (ทำเฉพาะตอนสเกลเปลี่ยนจริง) ไม่แตะสถานะ typewriter"""
+        if scale == self.scale:
+            return
+        self.scale = scale
+        cfg = DIALOGUE_CONFIG
+        box_h = cfg["box_height"] * scale
+        self.bg.height = box_h
+
+        top_pad = cfg["top_padding"] * scale
+        name_h = cfg["name_height"] * scale
+        self.name_label.font_size = cfg["name_font_size"] * scale
+        self.name_label.height = name_h
+        self.name_label.pos_hint = {'center_x': 0.5, 'top': 1 - (top_pad / box_h)}
+
+        text_top_ratio = (top_pad + name_h + cfg["msg_margin_top"] * scale) / box_h
+        self.text_label.font_size = cfg["msg_font_size"] * scale
+        self.text_label.height = box_h * (1 - text_top_ratio) - (10 * scale)
+        self.text_label.pos_hint = {'center_x': 0.5, 'top': 1 - text_top_ratio}
+        self._update_text_size(self.text_label, None)
+
+        # สามเหลี่ยมวาดด้วยขนาด pixel ตามสเกล สร้างใหม่เฉพาะตอนสเกลเปลี่ยน
+        was_animating = self.tri_event is not None
+        self._stop_triangle()
+        if self.triangle is not None:
+            self.bg.remove_widget(self.triangle)
+        self.triangle = self.manager.create_pixel_triangle(scale, pos_y_ratio=0.1)
+        self.triangle.opacity = 0
+        self.bg.add_widget(self.triangle)
+        if was_animating:
+            self._start_triangle()
+
+    def show(self, root, scale, character_name, text, show_triangle):
+        self.apply_scale(scale)
+        self.name_label.text = character_name or ""
+        self.name_label.opacity = 1 if character_name else 0
+        self.text_label.text = text
+
+        self.wants_triangle = show_triangle
+        cfg = DIALOGUE_CONFIG
+        speed = cfg.get("reveal_speed_by_character", {}).get(character_name, cfg.get("reveal_speed", 0))
+        if speed > 0 and text:
+            self.reveal_speed = speed
+            self.revealed = 0.0
+            self.text_label.visible_glyphs = 0
+            self.is_revealing = True
+            self._stop_triangle()
+        else:
+            self.finish_reveal()
+
+        if self.bg.parent is not root:
+            if self.bg.parent:
+                self.bg.parent.remove_widget(self.bg)
+            root.add_widget(self.bg)
+
+    def tick_reveal(self, dt):
+        """เรียกทุกเฟรมจากลูปเกม: แค่เลื่อนจำนวนตัวที่วาด (vertex วางไว้ครบตั้งแต่ตั้ง text)"""
+        if not self.is_revealing:
+            return
+        self.revealed += self.reveal_speed * dt
+        if self.revealed >= self.text_label.glyph_count and self.text_label.lines:
+            self.finish_reveal()
+        else:
+            self.text_label.visible_glyphs = int(self.revealed)
+
+    def finish_reveal(self):
+        """แสดงทั้งประโยคทันที (กด Enter/E ระหว่างพิมพ์ หรือจบการพิมพ์เอง)"""
+        self.is_revealing = False
+        self.text_label.visible_glyphs = -1
+        if self.wants_triangle:
+            self._start_triangle()
+        else:
+            self._stop_triangle()
+
+    def hide(self):
+        self.is_revealing = False
+        self._stop_triangle()
+        if self.bg.parent:
+            self.bg.parent.remove_widget(self.bg)
+
+    def _start_triangle(self):
+        self.triangle.opacity = 1
+        if self.tri_event is None:
+            self.tri_event = self.manager.animate_pixel_triangle(self.triangle)
+
+    def _stop_triangle(self):
+        if self.tri_event is not None:
+            Clock.unschedule(self.tri_event)
+            self.tri_event = None
+        if self.triangle is not None:
+            self.triangle.opacity = 0
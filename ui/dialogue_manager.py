@@ -4,37 +4,28 @@ from kivy.uix.widget import Widget
 from kivy.graphics import Color, Rectangle, Line, Ellipse
 from kivy.clock import Clock
 from data.settings import GAME_FONT, WINDOW_HEIGHT
-from data.chat import DIALOGUE_CONFIG
 from ui.choice import draw_choice_buttons, clear_choices
-from kivy.core.image import Image as CoreImage
+from assets.texture_cache import texture_cache
+from ui.dialogue_box import DialogueBox, PortraitView
 import math
 
 class DialogueManager:
     def __init__(self, game):
         self.game = game
-        self.dialogue_bg = None
-        self.dialogue_text = None
-        self.name_label = None
-        self.portrait_widget = None
-        self.left_portrait_widget = None
+        # กล่องบทสนทนาและรูป Portrait ทั้งสองฝั่ง สร้างครั้งแรกที่ใช้แล้วใช้ซ้ำตลอดเกม
+        self.box = None
+        self.portrait = None
+        self.left_portrait = None
         self.is_item_notif_active = False
         self.item_notif_widget = None
         self.last_notif_text = ""
         self.last_notif_image = None
         
-        self.chat_tri_event = None
         self.item_tri_event = None
         p_event = None
         self.portrait_anim_event = p_event # Dummy to satisfy typing
         self.current_anim_character = None
         
-        # UI Elements and State
-        self.bg_rect = None
-        self.portrait_rect = None
-        self.left_portrait_rect = None
-        self._portrait_update_bound = False
-        self._left_portrait_update_bound = False
-        
         # Discovery elements
         self.notif_banner_rect = None
         self.notif_line_top = None
@@ -83,64 +74,32 @@ class DialogueManager:
                 tri_widget.update_now(tri_widget)
         return Clock.schedule_interval(_animate, 0.03)
 
+    def _ensure_views(self):
+        if self.box is None:
+            self.box = DialogueBox(self)
+            self.portrait = PortraitView()
+            self.left_portrait = PortraitView(left=True)
+
+    @staticmethod
+    def _portrait_mult(p_source, item_mult):
+        """รูปไอเทม/สัญลักษณ์ใช้ขนาดเล็กกว่ารูปตัวละคร"""
+        if "Items" in p_source or "mark" in p_source or "note" in p_source:
+            return item_mult
+        return 1.0
+
     def show_vn_dialogue(self, character_name, dialogue, choices=None, portrait=None, left_portrait=None):
         dialogue = str(dialogue) if dialogue is not None else ""  # safety cast
         root = self.game.dialogue_root if self.game.dialogue_root else self.game
-        cfg = DIALOGUE_CONFIG
         scale = self.get_ui_scale()
         self.game.current_choices = choices if choices else []
         if hasattr(self.game, 'clear_interaction_hints'):
             self.game.clear_interaction_hints()
 
         self.stop_portrait_animation()
-        if self.dialogue_bg is not None:
-            if self.dialogue_bg.parent: self.dialogue_bg.parent.remove_widget(self.dialogue_bg)
-            self.dialogue_bg = None
-        if self.chat_tri_event: Clock.unschedule(self.chat_tri_event); self.chat_tri_event = None
-
-        box_h = cfg["box_height"] * scale
-        bg_widget = FloatLayout(size_hint=(1, None), height=box_h, pos_hint={'x': 0, 'y': 0})
-        with bg_widget.canvas.before:
-            Color(0, 0, 0, 0.8)
-            self.bg_rect = Rectangle(size=bg_widget.size, pos=bg_widget.pos)
-        def update_bg_rect(instance, value):
-            self.bg_rect.pos = instance.pos
-            self.bg_rect.size = instance.size
-        bg_widget.bind(size=update_bg_rect, pos=update_bg_rect)
-        root.add_widget(bg_widget)
-        self.dialogue_bg = bg_widget
-
-        if character_name:
-            top_pad = cfg["top_padding"] * scale
-            name_h = cfg["name_height"] * scale
-            self.name_label = Label(
-                text=character_name, font_name=GAME_FONT,
-                font_size=cfg["name_font_size"] * scale, color=cfg["name_color"],
-                size_hint=(1, None), height=name_h,
-                pos_hint={'center_x': 0.5, 'top': 1 - (top_pad / box_h)},
-                halign='center', valign='middle'
-            )
-            self.name_label.bind(size=self.name_label.setter('text_size'))
-            bg_widget.add_widget(self.name_label)
-
-        msg_margin = cfg["msg_margin_top"] * scale
-        text_top_ratio = ( (cfg["top_padding"] * scale) + (cfg["name_height"] * scale) + msg_margin) / box_h
-        self.dialogue_text = Label(
-            text=dialogue, font_name=GAME_FONT,
-            font_size=cfg["msg_font_size"] * scale, color=cfg["msg_color"],
-            size_hint=(1, None), height=box_h * (1 - text_top_ratio) - (10 * scale),
-            pos_hint={'center_x': 0.5, 'top': 1 - text_top_ratio},
-            halign='center', valign='top'
-        )
-        def update_msg_text_size(instance, value):
-            instance.text_size = (instance.width - (cfg["side_padding"] * 2 * scale), instance.height)
-        self.dialogue_text.bind(size=update_msg_text_size)
-        bg_widget.add_widget(self.dialogue_text)
-
-        if not choices:
-            tri = self.create_pixel_triangle(scale, pos_y_ratio=0.1)
-            bg_widget.add_widget(tri)
-            self.chat_tri_event = self.animate_pixel_triangle(tri)
+        self._ensure_views()
+
+        # เปลี่ยนแค่ข้อความ/ชื่อในกล่องเดิม (ไม่สร้าง widget ใหม่ทุกประโยค)
+        self.box.show(root, scale, character_name, dialogue, show_triangle=not choices)
 
         # รายชื่อตัวละครปกติที่มีรูป Portrait ประจำตัว
         portrait_characters = ["Little girl", "Angel", "Devil", "Father", "Mother", "Reaper"]
@@ -172,119 +131,14 @@ class DialogueManager:
             # ถ้าสุดท้ายมีรูปให้โชว์ (p_source ไม่เป็น None)
             if p_source:
                 # ทุกรูป (ไม่ว่าจะตัวละครหรือไอเทม) ให้ใช้สเกลมาตรฐานเดียวกับ Little girl
-                char_scale_mult = 1.0
-                if "Items" in p_source or "mark" in p_source or "note" in p_source:
-                    char_scale_mult = 0.7 # ปรับให้ใหญ่ขึ้น เพื่อความชัดเจน
-            p_size = 280 * scale * char_scale_mult
-            
-            # ให้ขอบล่างของภาพ (Y) วางอยู่บนขอบบนของกล่องข้อความพอดี (box_h)
-            # ไม่ต้องมี y_offset ติดลบ เพื่อไม่ให้จมลงไปในกล่อง
-            y_base = box_h
-            # วางชิดขวาของจอ
-            x_pos = self.game.width - p_size - (20 * scale)
-
-            if not self.portrait_widget:
-                self.portrait_widget = Widget(size_hint=(None, None), size=(p_size, p_size))
-                with self.portrait_widget.canvas:
-                    Color(1, 1, 1, 1)
-                    try:
-                        tex = CoreImage(p_source).texture
-                        tex.mag_filter = 'nearest'
-                        tex.min_filter = 'nearest'
-                        self.portrait_rect = Rectangle(texture=tex, size=self.portrait_widget.size,
-                                                    pos=(x_pos, y_base))
-                    except Exception:
-                        self.portrait_rect = Rectangle(source=p_source, size=self.portrait_widget.size,
-                                                    pos=(x_pos, y_base))
-                root.add_widget(self.portrait_widget)
-                
-                if not hasattr(self, '_portrait_update_bound'):
-                    def _p_upd(instance, value):
-                        if self.portrait_widget and self.portrait_rect:
-                            sc = self.get_ui_scale()
-                            cur_box_h = DIALOGUE_CONFIG["box_height"] * sc
-                            
-                            # ดึงสเกลที่เก็บไว้ในตัวแปรคลาสถ้ามีการเก็บไว้
-                            mult = getattr(self.portrait_widget, 'char_scale_mult', 1.0)
-                            new_p_size = 280 * sc * mult
-                            new_x_pos = self.game.width - new_p_size - (20 * sc)
-                            new_y_base = cur_box_h
-                            
-                            self.portrait_widget.size = (new_p_size, new_p_size)
-                            self.portrait_rect.size = self.portrait_widget.size
-                            self.portrait_rect.pos = (new_x_pos, new_y_base)
-                    self.game.bind(size=_p_upd)
-                    self._portrait_update_bound = True
-                
-                # เก็บค่าสเกลไว้ใน widget เพื่อให้ update bound ใช้ได้
-                self.portrait_widget.char_scale_mult = char_scale_mult
-            else:
-                # ถ้ามีลูปอยู่แล้ว แต่อยากเปลี่ยนรูปหน้า (เช่น สลับจาก n เป็น s หรือสลับตัวละครคุยกัน)
-                if hasattr(self, 'portrait_rect'):
-                    try:
-                        tex = CoreImage(p_source).texture
-                        tex.mag_filter = 'nearest'
-                        tex.min_filter = 'nearest'
-                        self.portrait_rect.texture = tex
-                    except Exception:
-                        self.portrait_rect.source = p_source
-                    self.portrait_widget.char_scale_mult = char_scale_mult
-                    
-                    # บังคับอัปเดตขนาดและตำแหน่งใหม่ทันทีที่มีการสลับตัวละคร
-                    self.portrait_widget.size = (p_size, p_size)
-                    self.portrait_rect.size = self.portrait_widget.size
-                    self.portrait_rect.pos = (x_pos, y_base)
-                    print(f"DEBUG: Updated portrait source to {p_source} with scale {char_scale_mult}")
+                char_scale_mult = self._portrait_mult(p_source, 0.7) # รูปไอเทมปรับให้ใหญ่ขึ้น เพื่อความชัดเจน
+                # ให้ขอบล่างของภาพ (Y) วางอยู่บนขอบบนของกล่องข้อความพอดี และวางชิดขวาของจอ
+                self.portrait.show(root, p_source, scale, self.game.width, char_scale_mult)
 
         # --- Handle Left Portrait ---
         if left_portrait:
-            l_char_scale_mult = 1.0
-            if "Items" in left_portrait or "mark" in left_portrait or "note" in left_portrait:
-                l_char_scale_mult = 0.6
-            l_p_size = 280 * scale * l_char_scale_mult
-            l_x_pos = 20 * scale
-            l_y_base = box_h
-            
-            if not self.left_portrait_widget:
-                self.left_portrait_widget = Widget(size_hint=(None, None), size=(l_p_size, l_p_size))
-                with self.left_portrait_widget.canvas:
-                    Color(1, 1, 1, 1)
-                    try:
-                        tex = CoreImage(left_portrait).texture
-                        tex.mag_filter = 'nearest'
-                        tex.min_filter = 'nearest'
-                        self.left_portrait_rect = Rectangle(texture=tex, size=self.left_portrait_widget.size, pos=(l_x_pos, l_y_base))
-                    except Exception:
-                        self.left_portrait_rect = Rectangle(source=left_portrait, size=self.left_portrait_widget.size, pos=(l_x_pos, l_y_base))
-                root.add_widget(self.left_portrait_widget)
-                
-                if not hasattr(self, '_left_portrait_update_bound'):
-                    def _l_p_upd(instance, value):
-                        if self.left_portrait_widget and self.left_portrait_rect:
-                            sc = self.get_ui_scale()
-                            cur_box_h = DIALOGUE_CONFIG["box_height"] * sc
-                            mult = getattr(self.left_portrait_widget, 'char_scale_mult', 1.0)
-                            new_p_size = 280 * sc * mult
-                            new_x_pos = 20 * sc
-                            new_y_base = cur_box_h
-                            self.left_portrait_widget.size = (new_p_size, new_p_size)
-                            self.left_portrait_rect.size = self.left_portrait_widget.size
-                            self.left_portrait_rect.pos = (new_x_pos, new_y_base)
-                    self.game.bind(size=_l_p_upd)
-                    self._left_portrait_update_bound = True
-                
-                self.left_portrait_widget.char_scale_mult = l_char_scale_mult
-            else:
-                if hasattr(self, 'left_portrait_rect'):
-                    try:
-                        tex = CoreImage(left_portrait).texture
-                        tex.mag_filter = 'nearest'
-                        tex.min_filter = 'nearest'
-                        self.left_portrait_rect.texture = tex
-                    except Exception:
-                        self.left_portrait_rect.source = left_portrait
-                    self.left_portrait_rect.pos = (l_x_pos, l_y_base)
-                    self.left_portrait_rect.size = (l_p_size, l_p_size)
+            l_char_scale_mult = self._portrait_mult(left_portrait, 0.6)
+            self.left_portrait.show(root, left_portrait, scale, self.game.width, l_char_scale_mult)
 
         if choices:
             draw_choice_buttons(self.game, choices)
@@ -302,123 +156,24 @@ class DialogueManager:
 
     def update_left_portrait(self, p_source):
         """อัปเดตหรือซ่อนภาพ Portrait ฝั่งซ้ายกลางคันระหว่างคุย"""
-        if not p_source:
-            if self.left_portrait_widget:
-                self.left_portrait_widget.opacity = 0
-            return
-            
-        root = self.game.dialogue_root if self.game.dialogue_root else self.game
-        scale = self.get_ui_scale()
-        box_h = DIALOGUE_CONFIG["box_height"] * scale
-        char_scale_mult = 1.0
-        if "Items" in p_source or "mark" in p_source:
-            char_scale_mult = 0.6
-        p_size = 280 * scale * char_scale_mult
-        y_base = box_h
-        x_pos = 20 * scale
-
-        if not self.left_portrait_widget:
-            self.left_portrait_widget = Widget(size_hint=(None, None), size=(p_size, p_size))
-            with self.left_portrait_widget.canvas:
-                Color(1, 1, 1, 1)
-                try:
-                    tex = CoreImage(p_source).texture
-                    tex.mag_filter = 'nearest'
-                    tex.min_filter = 'nearest'
-                    self.left_portrait_rect = Rectangle(texture=tex, size=self.left_portrait_widget.size, pos=(x_pos, y_base))
-                except Exception:
-                    self.left_portrait_rect = Rectangle(source=p_source, size=self.left_portrait_widget.size, pos=(x_pos, y_base))
-            root.add_widget(self.left_portrait_widget)
-            
-            if not hasattr(self, '_left_portrait_update_bound'):
-                def _l_p_upd(instance, value):
-                    if self.left_portrait_widget and self.left_portrait_rect:
-                        sc = self.get_ui_scale()
-                        cur_box_h = DIALOGUE_CONFIG["box_height"] * sc
-                        mult = getattr(self.left_portrait_widget, 'char_scale_mult', 1.0)
-                        new_p_size = 280 * sc * mult
-                        new_x_pos = 20 * sc
-                        new_y_base = cur_box_h
-                        self.left_portrait_widget.size = (new_p_size, new_p_size)
-                        self.left_portrait_rect.size = self.left_portrait_widget.size
-                        self.left_portrait_rect.pos = (new_x_pos, new_y_base)
-                self.game.bind(size=_l_p_upd)
-                self._left_portrait_update_bound = True
-        
-        self.left_portrait_widget.opacity = 1
-        self.left_portrait_widget.char_scale_mult = char_scale_mult
-        self.left_portrait_widget.size = (p_size, p_size)
-        
-        if hasattr(self, 'left_portrait_rect'):
-            try:
-                tex = CoreImage(p_source).texture
-                tex.mag_filter = 'nearest'
-                tex.min_filter = 'nearest'
-                self.left_portrait_rect.texture = tex
-            except Exception:
-                self.left_portrait_rect.source = p_source
-            self.left_portrait_rect.size = self.left_portrait_widget.size
-            self.left_portrait_rect.pos = (x_pos, y_base)
+        self._update_side_portrait(self.left_portrait if self.box else None, p_source, left=True)
 
     def update_right_portrait(self, p_source):
         """อัปเดตหรือซ่อนภาพ Portrait ฝั่งขวากลางคันระหว่างคุย"""
+        self._update_side_portrait(self.portrait if self.box else None, p_source, left=False)
+
+    def _update_side_portrait(self, view, p_source, left):
         if not p_source:
-            if self.portrait_widget:
-                self.portrait_widget.opacity = 0
+            if view and view.is_attached:
+                view.hide()
             return
-            
+
+        self._ensure_views()
+        view = self.left_portrait if left else self.portrait
         root = self.game.dialogue_root if self.game.dialogue_root else self.game
         scale = self.get_ui_scale()
-        box_h = DIALOGUE_CONFIG["box_height"] * scale
-        char_scale_mult = 1.0
-        if "Items" in p_source or "mark" in p_source:
-            char_scale_mult = 0.6
-        p_size = 280 * scale * char_scale_mult
-        y_base = box_h
-        x_pos = self.game.width - p_size - (20 * scale)
-
-        if not self.portrait_widget:
-            self.portrait_widget = Widget(size_hint=(None, None), size=(p_size, p_size))
-            with self.portrait_widget.canvas:
-                Color(1, 1, 1, 1)
-                try:
-                    tex = CoreImage(p_source).texture
-                    tex.mag_filter = 'nearest'
-                    tex.min_filter = 'nearest'
-                    self.portrait_rect = Rectangle(texture=tex, size=self.portrait_widget.size, pos=(x_pos, y_base))
-                except Exception:
-                    self.portrait_rect = Rectangle(source=p_source, size=self.portrait_widget.size, pos=(x_pos, y_base))
-            root.add_widget(self.portrait_widget)
-            
-            if not hasattr(self, '_portrait_update_bound'):
-                def _p_upd(instance, value):
-                    if self.portrait_widget and self.portrait_rect:
-                        sc = self.get_ui_scale()
-                        cur_box_h = DIALOGUE_CONFIG["box_height"] * sc
-                        mult = getattr(self.portrait_widget, 'char_scale_mult', 1.0)
-                        new_p_size = 280 * sc * mult
-                        new_x_pos = self.game.width - new_p_size - (20 * sc)
-                        new_y_base = cur_box_h
-                        self.portrait_widget.size = (new_p_size, new_p_size)
-                        self.portrait_rect.size = self.portrait_widget.size
-                        self.portrait_rect.pos = (new_x_pos, new_y_base)
-                self.game.bind(size=_p_upd)
-                self._portrait_update_bound = True
-        
-        self.portrait_widget.opacity = 1
-        self.portrait_widget.char_scale_mult = char_scale_mult
-        self.portrait_widget.size = (p_size, p_size)
-        
-        if hasattr(self, 'portrait_rect'):
-            try:
-                tex = CoreImage(p_source).texture
-                tex.mag_filter = 'nearest'
-                tex.min_filter = 'nearest'
-                self.portrait_rect.texture = tex
-            except Exception:
-                self.portrait_rect.source = p_source
-            self.portrait_rect.size = self.portrait_widget.size
-            self.portrait_rect.pos = (x_pos, y_base)
+        char_scale_mult = 0.6 if ("Items" in p_source or "mark" in p_source) else 1.0
+        view.show(root, p_source, scale, self.game.width, char_scale_mult)
 
     def start_portrait_animation(self, character_name):
         self.stop_portrait_animation()
@@ -450,10 +205,14 @@ class DialogueManager:
         self.current_anim_character = None
 
     def update_ui_scaling(self):
-        if self.game.is_dialogue_active and self.dialogue_bg:
-            char_name = getattr(self.name_label, 'text', "") if self.name_label else ""
-            msg_text = self.dialogue_text.text if self.dialogue_text else ""
-            self.show_vn_dialogue(char_name, msg_text, choices=self.game.current_choices)
+        if self.game.is_dialogue_active and self.box and self.box.is_open:
+            scale = self.get_ui_scale()
+            # แค่จัดขนาดกล่องใหม่ ข้อความ/ตัวที่พิมพ์ไปแล้ว (revealed) และปุ่ม choice ที่เลือกอยู่คงเดิม
+            self.box.apply_scale(scale)
+            # รูปเดิมที่แสดงอยู่ (รวมรูปที่ส่งมาเองหรือสลับกลางคัน) แค่จัดขนาด/ตำแหน่งใหม่ ไม่เลือกรูปใหม่จากชื่อ
+            for view in (self.portrait, self.left_portrait):
+                if view.is_attached:
+                    view.layout(scale, self.game.width)
         
         if self.is_item_notif_active and self.item_notif_widget:
             text = self.last_notif_text
@@ -468,18 +227,11 @@ class DialogueManager:
         has_choices = len(getattr(self.game, 'current_choices', [])) > 0
         
         self.stop_portrait_animation()
-        if self.chat_tri_event: Clock.unschedule(self.chat_tri_event); self.chat_tri_event = None
-        if self.dialogue_bg:
-            if self.dialogue_bg.parent: self.dialogue_bg.parent.remove_widget(self.dialogue_bg)
-            self.dialogue_bg = None
-        if self.portrait_widget:
-            if self.portrait_widget.parent: self.portrait_widget.parent.remove_widget(self.portrait_widget)
-            self.portrait_widget = None
-        if self.left_portrait_widget:
-            if self.left_portrait_widget.parent: self.left_portrait_widget.parent.remove_widget(self.left_portrait_widget)
-            self.left_portrait_widget = None
-        self.dialogue_text = None
-        self.name_label = None
+        # ถอดออกจากจอแต่เก็บ widget ไว้ใช้กับบทสนทนาครั้งถัดไป
+        if self.box:
+            self.box.hide()
+            self.portrait.detach()
+            self.left_portrait.detach()
         clear_choices(self.game)
 
         # คืนสถานะการคุย
@@ -519,6 +271,18 @@ class DialogueManager:
         if hasattr(self.game, 'temp_dialogue_chars'):
             self.game.temp_dialogue_chars = []
 
+    def tick(self, dt):
+        """เดิน typewriter ของกล่องบทสนทนา (เรียกจากลูปเกมทุกเฟรม)"""
+        if self.box:
+            self.box.tick_reveal(dt)
+
+    def skip_reveal(self):
+        """ถ้าข้อความกำลังพิมพ์ทีละตัวอยู่ ให้แสดงทั้งประโยคแล้วคืน True (กดครั้งนี้ยังไม่ไปประโยคถัดไป)"""
+        if self.box and self.box.is_open and self.box.is_revealing:
+            self.box.finish_reveal()
+            return True
+        return False
+
     def next_dialogue(self):
         """ไปยังข้อความถัดไปในคิว"""
         if self.game.current_choices and self.game.current_dialogue_index == len(self.game.current_dialogue_queue) - 1:
@@ -645,18 +409,14 @@ class DialogueManager:
                         # รองรับ tuple (path, cols, rows, col_idx, row_idx) สำหรับ spritesheet
                         if isinstance(img, (tuple, list)) and len(img) >= 5:
                             img_path, s_cols, s_rows, s_col, s_row = img[0], img[1], img[2], img[3], img[4]
-                            full_tex = CoreImage(img_path).texture
-                            full_tex.mag_filter = 'nearest'
-                            full_tex.min_filter = 'nearest'
+                            full_tex = texture_cache.get(img_path, nearest=True)
                             frame_w = full_tex.width // s_cols
                             frame_h = full_tex.height // s_rows
                             # Kivy y-up: row 0 = บน = inv_y = height - frame_h
                             inv_y = full_tex.height - (s_row + 1) * frame_h
                             tex = full_tex.get_region(s_col * frame_w, inv_y, frame_w, frame_h)
                         else:
-                            tex = CoreImage(img).texture
-                            tex.mag_filter = 'nearest'
-                            tex.min_filter = 'nearest'
+                            tex = texture_cache.get(img, nearest=True)
                         box.rect = Rectangle(texture=tex, size=(i_sz, i_sz))
                     except Exception:
                         img_src = img[0] if isinstance(img, (tuple, list)) else img
@@ -0,0 +1,217 @@
+from kivy.uix.widget import Widget
+from kivy.graphics import Color, Mesh
+from kivy.clock import Clock
+from kivy.core.text import Label as CoreLabel
+from kivy.properties import (StringProperty, NumericProperty, BooleanProperty, ColorProperty,
+                             OptionProperty, ListProperty)
+from data.settings import GAME_FONT
+from ui.sprite_batch import quad_indices
+
+# ตัวอักษรที่ rasterize ไว้ตั้งแต่แรก (ASCII ที่พิมพ์ได้ ยกเว้นช่องว่างซึ่งเป็นแค่ระยะเว้น)
+BASE_CHARSET = ''.join(chr(c) for c in range(33, 127))
+
+
+class GlyphAtlas:
+    """texture แถวเดียวของทุกตัวอักษรในฟอนต์/ขนาดหนึ่ง (rasterize ผ่าน text provider ครั้งเดียว)
+
+    ตำแหน่งของแต่ละตัวในแถวมาจาก get_extents ของข้อความส่วนหน้า (chars[:i]) ไม่ใช่ผลบวกความกว้างรายตัว
+    ซึ่งคลาดได้เมื่อ provider ปัดเศษหรือมี kerning ความกว้างของแต่ละตัวหลัง rasterize จึงเท่ากับช่องจริงใน texture
+    ตัวอักษรที่ไม่เคยเจอจะถูกเพิ่มแล้ว rasterize แถวใหม่ (texture เดิมยังใช้ได้ต่อ)
+    """
+
+    def __init__(self, font_name, font_size, bold=False):
+        self.font_name = font_name
+        self.font_size = font_size
+        self.bold = bold
+        self.chars = BASE_CHARSET
+        self._label = CoreLabel(text=' ', font_name=font_name, font_size=font_size, bold=bold)
+        self.line_height = self._label.get_extents('Ag')[1]
+        self.space_advance = self._label.get_extents('A A')[0] - self._label.get_extents('AA')[0]
+        self.advances = {' ': self.space_advance}
+        self._measure(self.chars)
+        self.texture = None
+        self.glyphs = {}  # char -> (advance, u0, u1, v_bottom, v_top) หลัง rasterize
+
+    def _measure(self, chars):
+        get_extents = self._label.get_extents
+        for ch in chars:
+            if ch not in self.advances:
+                self.advances[ch] = get_extents(ch)[0]
+
+    def advance(self, ch):
+        adv = self.advances.get(ch)
+        if adv is None:
+            self._measure(ch)
+            adv = self.advances[ch]
+        return adv
+
+    def measure(self, text):
+        advance = self.advance
+        return sum(advance(ch) for ch in text)
+
+    def prepare(self, text):
+        """ให้แน่ใจว่าทุกตัวอักษรใน text อยู่ใน texture แล้ว (rasterize แถวใหม่ครั้งเดียวถ้ามีตัวใหม่)"""
+        missing = ''.join(ch for ch in set(text) if ch not in self.chars and ch not in ' \n')
+        if missing:
+            self._measure(missing)
+            self.chars += missing
+        if missing or self.texture is None:
+            self._rasterize()
+
+    def _rasterize(self):
+        label = CoreLabel(text=self.chars, font_name=self.font_name, font_size=self.font_size,
+                          bold=self.bold, padding=0)
+        label.refresh()
+        tex = label.texture
+        tex.mag_filter = 'nearest'
+        tex.min_filter = 'nearest'
+        # tex_coords ของทั้งแถว (รองรับกรณีที่ provider กลับด้าน texture)
+        tc = tex.tex_coords
+        u_left, u_right = tc[0], tc[2]
+        v_bottom, v_top = tc[1], tc[5]
+        width = float(tex.width)
+
+        glyphs = {}
+        get_extents = self._label.get_extents
+        chars = self.chars
+        x = 0
+        for i, ch in enumerate(chars):
+            x_next = get_extents(chars[:i + 1])[0]
+            adv = x_next - x
+            u0 = u_left + (u_right - u_left) * (x / width)
+            u1 = u_left + (u_right - u_left) * (x_next / width)
+            glyphs[ch] = (adv, u0, u1, v_bottom, v_top)
+            # ให้การวัด/ตัดบรรทัดใช้ความกว้างเดียวกับช่องใน texture
+            self.advances[ch] = adv
+            x = x_next
+        self.texture = tex
+        self.glyphs = glyphs
+        self.line_height = tex.height
+
+
+_atlases = {}
+
+
+def get_atlas(font_name, font_size, bold=False):
+    """atlas ที่ใช้ร่วมกันทั้งเกม ต่อ (ฟอนต์, ขนาดเต็มพิกเซล, ตัวหนา)"""
+    key = (font_name, max(1, int(round(font_size))), bool(bold))
+    atlas = _atlases.get(key)
+    if atlas is None:
+        atlas = _atlases[key] = GlyphAtlas(*key)
+    return atlas
+
+
+def wrap_lines(text, atlas, width):
+    """ตัดบรรทัดตามคำให้กว้างไม่เกิน width (None = ไม่ตัด แต่ยังแยกตาม \\n)"""
+    lines = []
+    for para in text.split('\n'):
+        if width is None:
+            lines.append(para)
+            continue
+        current = ''
+        for word in para.split(' '):
+            candidate = word if not current else current + ' ' + word
+            if current and atlas.measure(candidate) > width:
+                lines.append(current)
+                current = word
+            else:
+                current = candidate
+        lines.append(current)
+    return lines
+
+
+class GlyphText(Widget):
+    """ข้อความที่วาดจาก GlyphAtlas เป็น quad ใน Mesh เดียว (ใช้แทน Label ที่ข้อความเปลี่ยนบ่อย)
+
+    property ชื่อเดียวกับ Label (text, font_name, font_size, color, bold, halign, valign, text_size)
+    เปลี่ยนข้อความ = คำนวณ vertex ใหม่ ไม่ต้องให้ text provider วาด texture ทั้งก้อนใหม่
+    """
+
+    text = StringProperty('')
+    font_name = StringProperty(GAME_FONT)
+    font_size = NumericProperty(15)
+    color = ColorProperty([1, 1, 1, 1])
+    bold = BooleanProperty(False)
+    halign = OptionProperty('left', options=['left', 'center', 'right'])
+    valign = OptionProperty('bottom', options=['bottom', 'middle', 'top'])
+    text_size = ListProperty([None, None])
+    line_height = NumericProperty(1.0)
+    visible_glyphs = NumericProperty(-1)  # วาดแค่กี่ตัวแรก (-1 = ทั้งหมด) ใช้ทำ typewriter โดยไม่ต้อง layout ใหม่
+
+    def __init__(self, **kwargs):
+        self.glyph_count = 0  # จำนวนตัวอักษร (quad) ที่วางไว้ใน mesh
+        self.lines = []
+        super().__init__(**kwargs)
+        with self.canvas:
+            self._color = Color(*self.color)
+            self.mesh = Mesh(mode='triangles')
+        self._trigger_layout = Clock.create_trigger(self._layout, -1)
+        self.fbind('color', self._update_color)
+        self.fbind('visible_glyphs', self._update_visible)
+        for prop in ('text', 'font_name', 'font_size', 'bold', 'halign', 'valign',
+                     'text_size', 'line_height', 'pos', 'size'):
+            self.fbind(prop, self._trigger_layout)
+        self._trigger_layout()
+
+    def _update_color(self, *args):
+        self._color.rgba = self.color
+
+    def _visible_count(self):
+        if self.visible_glyphs < 0:
+            return self.glyph_count
+        return min(int(self.visible_glyphs), self.glyph_count)
+
+    def _update_visible(self, *args):
+        # vertex ทั้งประโยควางไว้แล้ว เปลี่ยนแค่จำนวน index ที่วาด
+        self.mesh.indices = quad_indices(self._visible_count())
+
+    def _layout(self, *args):
+        atlas = get_atlas(self.font_name, self.font_size, self.bold)
+        atlas.prepare(self.text)
+        wrap_w, box_h = self.text_size
+        lines = wrap_lines(self.text, atlas, wrap_w)
+        line_h = atlas.line_height * self.line_height
+        widths = [atlas.measure(line) for line in lines]
+        block_w = wrap_w if wrap_w is not None else max(widths or [0])
+        block_h = box_h if box_h is not None else line_h * len(lines)
+
+        # กล่องข้อความอยู่กลาง widget แบบเดียวกับ texture ของ Label
+        left = self.x + (self.width - block_w) / 2.0
+        bottom = self.y + (self.height - block_h) / 2.0
+        text_h = line_h * len(lines)
+        if self.valign == 'top':
+            top = bottom + block_h
+        elif self.valign == 'middle':
+            top = bottom + (block_h + text_h) / 2.0
+        else:
+            top = bottom + text_h
+
+        verts = []
+        count = 0
+        glyph_h = atlas.line_height
+        glyphs = atlas.glyphs
+        for i, line in enumerate(lines):
+            if self.halign == 'center':
+                x = left + (block_w - widths[i]) / 2.0
+            elif self.halign == 'right':
+                x = left + block_w - widths[i]
+            else:
+                x = left
+            # ปัดเป็นพิกเซลเต็มเพื่อให้ฟอนต์ pixel คมเหมือนเดิม
+            x = round(x)
+            y = round(top - line_h * (i + 1))
+            for ch in line:
+                if ch == ' ':
+                    x += atlas.space_advance
+                    continue
+                adv, u0, u1, vb, vt = glyphs[ch]
+                verts.extend((x, y, u0, vb, x + adv, y, u1, vb,
+                              x + adv, y + glyph_h, u1, vt, x, y + glyph_h, u0, vt))
+                x += adv
+                count += 1
+
+        self.lines = lines
+        self.glyph_count = count
+        self.mesh.texture = atlas.texture
+        self.mesh.vertices = verts
+        self.mesh.indices = quad_indices(self._visible_count())
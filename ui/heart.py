@@ -1,6 +1,6 @@
 from kivy.graphics import Rectangle, Color, RoundedRectangle
 from kivy.clock import Clock
-from kivy.core.image import Image as CoreImage
+from assets.texture_cache import texture_cache
 from data.settings import WINDOW_HEIGHT
 
 class HeartUI:
@@ -13,17 +13,9 @@ class HeartUI:
         self.current_health = initial_health
         
         # โหลด Texture ของหัวใจ
-        self.tex_heart_full = CoreImage('assets/Heart/หัวใจ-1.png').texture
-        self.tex_heart_full.mag_filter = 'nearest'
-        self.tex_heart_full.min_filter = 'nearest'
-
-        self.tex_heart_break = CoreImage('assets/Heart/หัวใจ-2.png').texture
-        self.tex_heart_break.mag_filter = 'nearest'
-        self.tex_heart_break.min_filter = 'nearest'
-
-        self.tex_heart_empty = CoreImage('assets/Heart/หัวใจ-3.png').texture
-        self.tex_heart_empty.mag_filter = 'nearest'
-        self.tex_heart_empty.min_filter = 'nearest'
+        self.tex_heart_full = texture_cache.get('assets/Heart/หัวใจ-1.png', nearest=True)
+        self.tex_heart_break = texture_cache.get('assets/Heart/หัวใจ-2.png', nearest=True)
+        self.tex_heart_empty = texture_cache.get('assets/Heart/หัวใจ-3.png', nearest=True)
 
         self.hearts = []
         self.stun_visible = False # คุมการโชว์แถบคูลดาวน์
@@ -143,9 +135,10 @@ class HeartUI:
 
         # จัดการ Label ตัวเลขบนแถบ
         if self.stun_label is None:
-            from kivy.uix.label import Label
+            # ตัวเลขเปลี่ยนทุก 0.1 วินาที ใช้ GlyphText แทน Label (ไม่ต้อง render texture ใหม่ทุกครั้ง)
+            from ui.glyph_text import GlyphText
             from data.settings import GAME_FONT
-            self.stun_label = Label(
+            self.stun_label = GlyphText(
                 text="", font_name=GAME_FONT, font_size=12 * ui_scale,
                 color=(1, 1, 1, 0), bold=True, size_hint=(None, None),
                 halign='center', valign='middle'
@@ -3,7 +3,7 @@ from kivy.uix.label import Label
 from kivy.graphics import Color, Rectangle
 from kivy.clock import Clock
 from kivy.animation import Animation
-from kivy.core.audio import SoundLoader
+from assets.sound_bank import sound_bank
 import os
 from data.settings import GAME_FONT, WINDOW_HEIGHT
 
@@ -45,16 +45,14 @@ class IntroScreen(FloatLayout):
         close_path = 'assets/sound/door/Door_close.wav'
         
         if self.play_sound and os.path.exists(door_path):
-            s_open = SoundLoader.load(door_path)
+            s_open = sound_bank.load(door_path, 0.6)
             if s_open:
-                s_open.volume = 0.6
                 s_open.play()
                 
                 # เสียงปิดประตูตามมา (ถ้ามีไฟล์)
                 if os.path.exists(close_path):
-                    s_close = SoundLoader.load(close_path)
+                    s_close = sound_bank.load(close_path, 0.6)
                     if s_close:
-                        s_close.volume = 0.6
                         Clock.schedule_once(lambda dt: s_close.play(), 1.2)
 
         # สำคัญ: ต้องผูกเหตุการณ์ Resize เพื่อให้อัปเดต UI ตามขนาดจอ
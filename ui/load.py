@@ -2,13 +2,13 @@ from kivy.uix.floatlayout import FloatLayout
 from kivy.uix.label import Label
 from kivy.uix.image import Image
 from kivy.core.image import Image as CoreImage
-from kivy.core.audio import SoundLoader
+from assets.sound_bank import sound_bank
 from kivy.uix.scrollview import ScrollView
 from kivy.uix.boxlayout import BoxLayout
 from kivy.graphics import Color, Rectangle, Line
 from kivy.core.window import Window
 from data.settings import *
-import os
+from managers.save_store import read_index, slot_name
 
 class SaveSlot(FloatLayout):
     """A single save/load slot showing game progress."""
@@ -168,9 +168,7 @@ class SaveLoadScreen(FloatLayout):
         self.index = 0
         
         # โหลดเสียงคลิกสำหรับเมนูเซฟ
-        self.click_sound = SoundLoader.load('assets/sound/click.wav')
-        if self.click_sound:
-            self.click_sound.volume = 0.5
+        self.click_sound = sound_bank.load('assets/sound/click.wav', 0.5)
         
         with self.canvas.before:
             Color(0, 0, 0, 1) # พื้นหลังดำสนิท
@@ -206,22 +204,12 @@ class SaveLoadScreen(FloatLayout):
         self.slot_container.bind(minimum_height=self.slot_container.setter('height'))
         self.scroll_view.add_widget(self.slot_container)
 
-        # โหลดข้อมูลเซฟ
-        import json
-        save_data = [None] * 5
-        if os.path.exists('saves'):
-            for i in range(5):
-                slot_num = i + 1
-                file_path = f'saves/slot_{slot_num}.json'
-                if os.path.exists(file_path):
-                    try:
-                        with open(file_path, 'r') as f:
-                            save_data[i] = json.load(f)
-                    except Exception as e:
-                        print(f"Error loading save slot {slot_num}: {e}")
+        # โหลดข้อมูลเซฟ (แค่ summary จาก saves/index.json ไฟล์เต็มอ่านตอนเลือกสล็อต)
+        index = read_index()
+        save_data = [index.get(slot_name(i + 1)) for i in range(SAVE_SLOT_COUNT)]
         
         # สร้างสล็อตจากข้อมูล (เรียง 5 ช่อง)
-        for i in range(5):
+        for i in range(SAVE_SLOT_COUNT):
             slot = SaveSlot(slot_id=i+1, data=save_data[i])
             slot.pos_hint = {'center_x': 0.5}
             self.slot_container.add_widget(slot)
@@ -3,7 +3,7 @@ from kivy.uix.label import Label
 from kivy.uix.boxlayout import BoxLayout
 from kivy.graphics import Color, Rectangle, Line
 from kivy.core.window import Window
-from kivy.core.audio import SoundLoader
+from assets.sound_bank import sound_bank
 import os
 from data.settings import GAME_FONT
 from ui.screen import GameMenu
@@ -25,9 +25,7 @@ class PauseMenu(FloatLayout):
         }
         
         # โหลดเสียงคลิกสำหรับหน้า Pause
-        self.click_sound = SoundLoader.load('assets/sound/click.wav')
-        if self.click_sound:
-            self.click_sound.volume = 0.5
+        self.click_sound = sound_bank.load('assets/sound/click.wav', 0.5)
         
         # 1. พื้นหลังดำจางๆ
         with self.canvas.before:
@@ -8,12 +8,13 @@ from kivy.graphics import Color, Rectangle, Line
 from kivy.core.window import Window
 from kivy.clock import Clock
 from kivy.core.image import Image as CoreImage
-from kivy.core.audio import SoundLoader
+from assets.sound_bank import sound_bank
 from kivy.animation import Animation
 import os
 
 from ui.load import SaveLoadScreen # นำเข้าหน้าจอเซฟ
 from data.settings import GAME_FONT
+from managers.save_store import read_index, load_save, slot_name, manual_save_names
 
 class MenuButton(ButtonBehavior, FloatLayout):
     """Custom button used within GameMenu."""
@@ -79,9 +80,7 @@ class GameMenu(FloatLayout):
         self.index = 0
         
         # โหลดเสียงคลิกสำหรับเมนู
-        self.click_sound = SoundLoader.load('assets/sound/click.wav')
-        if self.click_sound:
-            self.click_sound.volume = 0.5
+        self.click_sound = sound_bank.load('assets/sound/click.wav', 0.5)
         
         with self.canvas.before:
             # กรอบเมนูสีดำขอบขาว
@@ -212,12 +211,8 @@ class SplashScreen(FloatLayout):
         self.add_widget(self.title_sight)
         
         # ตรวจสอบว่ามีไฟล์เซฟหรือไม่
-        has_saves = False
-        if os.path.exists('saves'):
-            for i in range(1, 6):
-                if os.path.exists(f'saves/slot_{i}.json'):
-                    has_saves = True
-                    break
+        index = read_index()
+        has_saves = any(name in index for name in manual_save_names())
         
         # รายการเมนูทั้งหมด
         menu_items = ["New Game", "Load Game", "Exit"]
@@ -252,17 +247,9 @@ class SplashScreen(FloatLayout):
             Window.close()
 
     def on_slot_selected(self, slot_id, load_screen=None):
-        import json
-        save_path = f'saves/slot_{slot_id}.json'
-        data = None
-        
-        if os.path.exists(save_path):
-            try:
-                with open(save_path, 'r') as f:
-                    data = json.load(f)
-                print(f"Loaded Slot {slot_id}: {data}")
-            except Exception as e:
-                print(f"Error loading save: {e}")
+        data = load_save(slot_name(slot_id))
+        if data is not None:
+            print(f"Loaded Slot {slot_id}: {data}")
         
         if load_screen:
             load_screen.close()
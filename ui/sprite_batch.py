@@ -0,0 +1,116 @@
+from kivy.graphics import RenderContext, Mesh
+from data.settings import TILE_SIZE
+
+# shader เดียวกับของ Kivy แต่คูณสีด้วย vColor ของแต่ละ vertex (alpha ตอนจางหาย / สีเทาตอนโดน stun)
+_VS = '''
+$HEADER$
+attribute vec4 vColor;
+void main(void) {
+    frag_color = vColor * color * vec4(1.0, 1.0, 1.0, opacity);
+    tex_coord0 = vTexCoords0;
+    gl_Position = projection_mat * modelview_mat * vec4(vPosition.xy, 0.0, 1.0);
+}
+'''
+_FS = '''
+$HEADER$
+void main(void) {
+    gl_FragColor = frag_color * texture2D(texture0, tex_coord0);
+}
+'''
+_FMT = [(b'vPosition', 2, 'float'), (b'vTexCoords0', 2, 'float'), (b'vColor', 4, 'float')]
+_QUAD_INDICES = []  # (0, 1, 2, 2, 3, 0, 4, 5, 6, ...) ต่อขยายเมื่อมีสไปรต์มากขึ้น
+
+
+def quad_indices(count):
+    for k in range(len(_QUAD_INDICES) // 6, count):
+        b = k * 4
+        _QUAD_INDICES.extend((b, b + 1, b + 2, b + 2, b + 3, b))
+    return _QUAD_INDICES[:count * 6]
+
+
+class SpriteBatch:
+    """Mesh เดียวที่วาดสไปรต์หลายตัวซึ่งใช้ texture เดียวกันในแถว Y เดียวกัน (1 draw call)"""
+
+    def __init__(self):
+        # ใช้ matrix ของ canvas แม่ (กล้อง) แต่สลับไปใช้ shader ที่อ่านสีจาก vertex
+        self.group = RenderContext(use_parent_projection=True, use_parent_modelview=True,
+                                   use_parent_frag_modelview=True)
+        self.group.shader.vs = _VS
+        self.group.shader.fs = _FS
+        self.mesh = Mesh(mode='triangles', fmt=_FMT)
+        self.group.add(self.mesh)
+        self.vertices = []
+        self.count = 0
+
+    def set_sprites(self, texture, sprites):
+        """sprites = [(rect, color_instr), ...] อัปโหลด vertex ใหม่เฉพาะเมื่อค่าเปลี่ยน"""
+        if self.mesh.texture is not texture:
+            self.mesh.texture = texture
+        verts = []
+        for rect, color in sprites:
+            x, y = rect.pos
+            w, h = rect.size
+            tc = rect.tex_coords
+            rgba = color.rgba
+            verts.extend((x, y, tc[0], tc[1]))
+            verts.extend(rgba)
+            verts.extend((x + w, y, tc[2], tc[3]))
+            verts.extend(rgba)
+            verts.extend((x + w, y + h, tc[4], tc[5]))
+            verts.extend(rgba)
+            verts.extend((x, y + h, tc[6], tc[7]))
+            verts.extend(rgba)
+        if verts != self.vertices:
+            self.vertices = verts
+            self.mesh.vertices = verts
+        if len(sprites) != self.count:
+            self.count = len(sprites)
+            self.mesh.indices = quad_indices(self.count)
+
+
+class SpriteBatcher:
+    """รวมสไปรต์ของศัตรูที่อยู่ในจอเป็น Mesh ต่อ (แถว tile, texture) แทน Color + Rectangle รายตัว
+
+    แถว = int(y // TILE_SIZE) ทุก batch ในแถวเดียวกันใช้ sort_y เดียวคือขอบล่างของแถว
+    จึงส่งเข้า YSortedLayer ปนกับตัวละครอื่นได้ตามปกติ และ key ไม่เปลี่ยนระหว่างที่ศัตรูเดินอยู่ในแถวเดิม
+    ภายในแถวสไปรต์ถูกวาดตามลำดับใน list ที่ส่งเข้ามา
+    batch ที่ไม่ได้ใช้แล้วเก็บไว้ใน pool เพื่อนำกลับมาใช้ ไม่ต้องสร้าง shader ใหม่
+    """
+
+    def __init__(self):
+        self.batches = {}  # (row, texture) -> SpriteBatch เรียงตามลำดับที่เจอ
+        self.pool = []
+
+    def update(self, sprites):
+        """sprites = [(sort_y, entity), ...] (entity มี rect และ color_instr)
+
+        อัปเดต vertex ของทุก batch คืน True ถ้าชุดของ batch (แถว/texture) เปลี่ยน
+        """
+        buckets = {}
+        for y, entity in sprites:
+            key = (int(y // TILE_SIZE), entity.rect.texture)
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = []
+            bucket.append((entity.rect, entity.color_instr))
+
+        old = self.batches
+        changed = buckets.keys() != old.keys()
+        batches = {}
+        for key, members in buckets.items():
+            batch = old.pop(key, None)
+            if batch is None:
+                batch = self.pool.pop() if self.pool else SpriteBatch()
+            batch.set_sprites(key[1], members)
+            batches[key] = batch
+        self.pool.extend(old.values())
+        self.batches = batches
+        return changed
+
+    def items(self):
+        """[(sort_y, group), ...] สำหรับส่งให้ YSortedLayer"""
+        return [(key[0] * TILE_SIZE, batch.group) for key, batch in self.batches.items()]
+
+    def clear(self):
+        self.pool.extend(self.batches.values())
+        self.batches = {}
@@ -0,0 +1,78 @@
+class YSortedLayer:
+    """ลำดับการวาด (Y-Sorting) ของ sorting_layer แบบ incremental
+
+    จำลำดับของ group ที่วางไว้บน layer ครั้งก่อน แต่ละเฟรมแค่อัปเดตค่า y แล้วไล่ insertion sort
+    ย้ายเฉพาะ group ที่ลำดับเปลี่ยนจริง (remove + insert) ถ้าลำดับเหมือนเดิมจะไม่แตะ canvas เลย
+    group ที่หายไปจาก items (ออกนอกจอ/ถูกลบ) จะถูกถอด ส่วน group ใหม่จะถูกแทรกตรงตำแหน่งของมัน
+    สร้าง layer ใหม่ทั้งหมดเฉพาะตอนมีโค้ดอื่นไป clear/add layer เอง
+    """
+
+    def __init__(self, layer):
+        self.layer = layer
+        self.entries = []  # [sort_y, group] เรียงจาก y มากไปน้อย (วาดก่อน = อยู่ด้านหลัง)
+
+    def update(self, items):
+        """items = [(sort_y, group), ...] เรียงตามลำดับความสำคัญเดิม (ใช้ตัดสินเมื่อ y เท่ากัน)
+
+        คืน True ถ้ามีการแก้ไข canvas
+        """
+        layer = self.layer
+        if layer.children != [group for _, group in self.entries]:
+            self._rebuild(items)
+            return True
+
+        key_of = {id(group): y for y, group in items}
+        moved = False
+        # 1. ถอด group ที่ไม่ต้องวาดแล้ว
+        if any(id(group) not in key_of for _, group in self.entries):
+            kept = []
+            for entry in self.entries:
+                if id(entry[1]) in key_of:
+                    kept.append(entry)
+                else:
+                    layer.remove(entry[1])
+            self.entries = kept
+            moved = True
+
+        entries = self.entries
+        present = set()
+        for entry in entries:
+            entry[0] = key_of[id(entry[1])]
+            present.add(id(entry[1]))
+
+        # 2. insertion sort ย้ายเฉพาะตัวที่ลำดับผิด
+        for i in range(1, len(entries)):
+            entry = entries[i]
+            y = entry[0]
+            j = i
+            while j > 0 and entries[j - 1][0] < y:
+                j -= 1
+            if j != i:
+                entries.insert(j, entries.pop(i))
+                layer.remove(entry[1])
+                layer.insert(j, entry[1])
+                moved = True
+
+        # 3. แทรก group ใหม่ (เพิ่งเข้ามาในจอ) หลังตัวสุดท้ายที่ y ไม่น้อยกว่า
+        for y, group in items:
+            if id(group) in present: continue
+            j = 0
+            while j < len(entries) and entries[j][0] >= y:
+                j += 1
+            entries.insert(j, [y, group])
+            layer.insert(j, group)
+            present.add(id(group))
+            moved = True
+        return moved
+
+    def _rebuild(self, items):
+        # sort แบบ stable: y เท่ากันคงลำดับเดิมของ items เหมือน y_sorting เดิม
+        ordered = sorted(items, key=lambda item: item[0], reverse=True)
+        self.layer.clear()
+        for _, group in ordered:
+            self.layer.add(group)
+        self.entries = [[y, group] for y, group in ordered]
+
+    def reset(self):
+        """ลืมลำดับเดิมทั้งหมด (เรียกหลังมีโค้ดอื่น clear layer) ไม่ให้ค้าง reference ของ group ที่ถูกทำลายแล้ว"""
+        self.entries = []